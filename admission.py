@@ -0,0 +1,163 @@
+"""Admission control for mutation and upload endpoints
+
+Every non-GET /api/ request is charged against a token bucket per user and
+route class ('mutation' or 'upload'). Uploads additionally need one of
+HERA_UPLOAD_CONCURRENCY slots; a request waits up to
+HERA_UPLOAD_QUEUE_SECONDS for a slot before it is shed. Shed requests get a
+429 with a Retry-After header, and admitted/shed counts are exported
+through metrics.
+"""
+import math
+import os
+import threading
+import time
+
+from flask import g, jsonify, request
+from flask_login import current_user
+
+from metrics import metrics
+
+UPLOAD_ENDPOINTS = {'upload_files', 'upload_ring_photos'}
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+DEFAULT_LIMITS = {
+    # route class -> (tokens per second, burst)
+    'mutation': (20.0, 60),
+    'upload': (1.0, 10),
+}
+DEFAULT_UPLOAD_CONCURRENCY = 4
+DEFAULT_UPLOAD_QUEUE_SECONDS = 5.0
+MAX_BUCKETS = 10000
+
+
+class TokenBucket:
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now, cost=1):
+        """Spend `cost` tokens; returns 0 if admitted, else seconds until it would be"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0
+        return (cost - self.tokens) / self.rate
+
+    def full(self, now):
+        return self.tokens + (now - self.updated) * self.rate >= self.burst
+
+
+class AdmissionControl:
+    """Token-bucket rate limits per (user, route class) and a bounded upload pool"""
+
+    def __init__(self):
+        self.enabled = False
+        self.limits = dict(DEFAULT_LIMITS)
+        self.upload_queue_seconds = DEFAULT_UPLOAD_QUEUE_SECONDS
+        self._uploads = threading.BoundedSemaphore(DEFAULT_UPLOAD_CONCURRENCY)
+        self._buckets = {}  # (client, route class) -> TokenBucket
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('ADMISSION_ENABLED', True)
+        self.limits = {route_class: app.config.get(f'ADMISSION_{route_class.upper()}_LIMIT', limit)
+                       for route_class, limit in DEFAULT_LIMITS.items()}
+        self.upload_queue_seconds = app.config.get('ADMISSION_UPLOAD_QUEUE_SECONDS', DEFAULT_UPLOAD_QUEUE_SECONDS)
+        self._uploads = threading.BoundedSemaphore(
+            app.config.get('ADMISSION_UPLOAD_CONCURRENCY', DEFAULT_UPLOAD_CONCURRENCY))
+
+        metrics.describe('hera_admission_total', 'counter', 'Mutation and upload requests admitted or shed')
+        metrics.describe('hera_admission_queue_seconds', 'histogram', 'Time uploads waited for a slot')
+
+        if not self.enabled:
+            return
+
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+    def route_class(self):
+        """'upload', 'mutation' or None for requests that are not limited"""
+        if request.endpoint in UPLOAD_ENDPOINTS:
+            return 'upload'
+        if request.method not in SAFE_METHODS and request.path.startswith('/api/'):
+            return 'mutation'
+        return None
+
+    def _client(self):
+        if current_user.is_authenticated:
+            return f'user:{current_user.get_id()}'
+        return f'addr:{request.remote_addr}'
+
+    def _take(self, client, route_class):
+        rate, burst = self.limits[route_class]
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get((client, route_class))
+            if bucket is None:
+                if len(self._buckets) >= MAX_BUCKETS:
+                    self._prune(now)
+                bucket = self._buckets[(client, route_class)] = TokenBucket(rate, burst, now)
+            return bucket.take(now)
+
+    def _prune(self, now):
+        """Forget buckets that have refilled; caller holds the lock"""
+        for key in [key for key, bucket in self._buckets.items() if bucket.full(now)]:
+            del self._buckets[key]
+
+    def _shed(self, route_class, reason, retry_after):
+        metrics.inc('hera_admission_total', route_class=route_class, outcome='shed', reason=reason)
+        seconds = max(1, math.ceil(retry_after))
+        response = jsonify({'success': False, 'error': f'Too many requests, retry in {seconds}s'})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(seconds)
+        return response
+
+    def _before_request(self):
+        # A /api/batch request is charged once: its operations share one save
+        route_class = self.route_class()
+        if route_class is None:
+            return None
+
+        retry_after = self._take(self._client(), route_class)
+        if retry_after:
+            return self._shed(route_class, 'rate', retry_after)
+
+        if route_class == 'upload':
+            started = time.perf_counter()
+            if not self._uploads.acquire(timeout=self.upload_queue_seconds):
+                return self._shed(route_class, 'concurrency', self.upload_queue_seconds)
+            metrics.observe('hera_admission_queue_seconds', time.perf_counter() - started)
+            # Batched operations run in nested request contexts that share g,
+            # so remember which request holds the slot
+            g._upload_slot = request._get_current_object()
+
+        metrics.inc('hera_admission_total', route_class=route_class, outcome='admitted')
+        return None
+
+    def _teardown_request(self, exc):
+        if g.get('_upload_slot') is request._get_current_object():
+            del g._upload_slot
+            self._uploads.release()
+
+
+admission = AdmissionControl()
+
+
+def configure(app):
+    """Read the HERA_ADMISSION / rate limit environment variables and wire up the app"""
+    env = os.environ.get
+    app.config.setdefault('ADMISSION_ENABLED', env('HERA_ADMISSION', '1').lower() in ('1', 'true', 'yes'))
+    for route_class, (rate, burst) in DEFAULT_LIMITS.items():
+        prefix = f'HERA_{route_class.upper()}'
+        app.config.setdefault(f'ADMISSION_{route_class.upper()}_LIMIT',
+                              (float(env(f'{prefix}_RATE', rate)), int(env(f'{prefix}_BURST', burst))))
+    app.config.setdefault('ADMISSION_UPLOAD_CONCURRENCY',
+                          int(env('HERA_UPLOAD_CONCURRENCY', DEFAULT_UPLOAD_CONCURRENCY)))
+    app.config.setdefault('ADMISSION_UPLOAD_QUEUE_SECONDS',
+                          float(env('HERA_UPLOAD_QUEUE_SECONDS', DEFAULT_UPLOAD_QUEUE_SECONDS)))
+    admission.init_app(app)
@@ -1,48 +1,66 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
-from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
-import json
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, g, has_app_context, has_request_context, session
+from markupsafe import Markup
+from flask_login import LoginManager, login_user, logout_user, login_required, current_user
+import copy
 import os
 from datetime import datetime, timedelta
 from werkzeug.utils import secure_filename
 from flask import send_file
-from werkzeug.datastructures import FileStorage
-import uuid
+from werkzeug.local import LocalProxy
 import mimetypes
+import time
+
+from admission import configure as configure_admission
+from jobs import configure as configure_jobs, jobs
+from metrics import configure as configure_metrics, metrics
+from offline import configure as configure_offline
+from photos import configure as configure_photos, photos as ring_photos
+from profiler import configure as configure_profiler
+from query import QueryError, SortSpec, normalize_date, normalize_time, run_query
+from records import RecordError, build_record, coerce_update, request_value
+from search import SEARCH_FIELDS
+from serializer import FastJSONProvider, dumps as json_dumps, script_json
+from users import LoginBusy, UserStore
+from timeline import format_minutes
+from uploads import (FILE_EXTENSIONS, IMAGE_EXTENSIONS, TYPE_LIMITS, StreamedUpload, UploadRejected,
+                     configure as configure_uploads, stream_uploads)
+from utils import export_to_columnar, write_columnar_snapshot
+from workspaces import COLLECTIONS, DEFAULT_WORKSPACE, Savepoint, WorkspaceManager, empty_data
 
 
 app = Flask(__name__)
 app.secret_key = 'hera_proposal_2025_emerald_lake_secret'
+app.json = FastJSONProvider(app)
 
 # Flask-Login setup
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
-class User(UserMixin):
-    def __init__(self, id, username, password_hash, display_name=None):
-        self.id = id
-        self.username = username
-        self.password_hash = password_hash
-        self.display_name = display_name or username
+configure_metrics(app)
+configure_profiler(app)
+configure_admission(app)
+configure_jobs(app)
+configure_offline(app)
+configure_photos(app)
+configure_uploads(app)
 
-users = {
-    'admin': User('admin', 'admin', generate_password_hash('admin123'), 'Vikrant')
-}
+user_store = UserStore()
 
 
 @login_manager.user_loader
 def load_user(user_id):
-    return users.get(user_id)
+    return user_store.get(user_id)
 
-# Your complete HERA data - exactly as requested
-HERA_DATA = {
+# Your complete HERA data - exactly as requested; seeds the default workspace
+DEFAULT_DATA = {
     "main": {
         "tripDates": "9/24/2025 - 9/29/2025",
         "totalBudget": 11691.2,
         "totalSaved": 7511.2,
         "totalRemaining": 4180,
         "proposalDate": "2025-09-26",
+        "utcOffset": "-06:00",
         "savingsTimeline": [
             {"amount": 5000, "month": "march"},
             {"amount": 5000, "month": "april"},
@@ -197,26 +215,223 @@ def format_file_size(size_bytes):
     return f"{s} {size_names[i]}"
 
 
+def upload_limit(filename):
+    """Largest accepted size of a file, by its type"""
+    return TYPE_LIMITS.get(get_file_type(filename), TYPE_LIMITS['text'])
+
+
+def upload_quota_left():
+    """Bytes the current user may still add to this workspace's files"""
+    used = sum(f.get('size_bytes') or 0
+               for f in collection_indexes['files'].lookup('uploaded_by', current_user.get_id()))
+    return max(0, app.config['UPLOAD_USER_QUOTA'] - used)
+
+
 # Data persistence functions
 def save_data():
-    """Save current data to JSON file"""
-    with open('hera_data.json', 'w') as f:
-        json.dump(HERA_DATA, f, indent=2)
+    """Save current data to JSON file (deferred to the end of a /api/batch request)"""
+    if has_app_context() and '_deferred_save' in g:
+        g._deferred_save = True
+        return
+    started = time.perf_counter()
+    size = current_workspace().save()
+    metrics.record_save(time.perf_counter() - started, size)
+
+
+def after_commit(action):
+    """Run `action` now, or once the enclosing /api/batch commits (dropped if it rolls back)"""
+    if has_app_context() and '_on_commit' in g:
+        g._on_commit.append(action)
+    else:
+        action()
+
+
+def remove_upload(path):
+    """Delete an uploaded file once the data change that drops it is committed"""
+    def unlink():
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    after_commit(unlink)
+
+
+def api_error(e, message=None):
+    """Log and count an exception caught by an API route; returns a 400/500 JSON response"""
+    metrics.record_error(e)
+    error = f'{message}: {e}' if message else str(e)
+    if isinstance(e, RecordError):
+        app.logger.warning('%s rejected: %s', request.endpoint, e)
+        return jsonify({'success': False, 'error': error}), 400
+    app.logger.exception('%s failed', request.endpoint)
+    return jsonify({'success': False, 'error': error}), 500
 
 def load_data():
-    """Load data from JSON file if it exists"""
-    global HERA_DATA
-    if os.path.exists('hera_data.json'):
-        with open('hera_data.json', 'r') as f:
-            HERA_DATA = json.load(f)
+    """Reload the current workspace from its JSON file"""
+    workspace = current_workspace()
+    workspace.load(workspace_manager.initial_data(workspace.name))
+
+
+# Each trip is a workspace with its own data file and derived indexes; only
+# recently used workspaces are kept in memory
+workspace_manager = WorkspaceManager(
+    max_loaded=int(os.environ.get('HERA_MAX_WORKSPACES', 64)),
+    idle_seconds=int(os.environ.get('HERA_WORKSPACE_IDLE_SECONDS', 1800)),
+    default_data=lambda: copy.deepcopy(DEFAULT_DATA))
+
+
+def current_workspace():
+    """The workspace selected in the session, pinned in memory for the rest of the request"""
+    if not has_request_context():
+        return workspace_manager.get(DEFAULT_WORKSPACE)
+    workspace = g.get('_workspace')
+    if workspace is None:
+        name = session.get('workspace', DEFAULT_WORKSPACE)
+        if current_user.is_authenticated and not current_user.can_access(name):
+            name = next((w for w in current_user.workspaces if w != '*'), DEFAULT_WORKSPACE)
+        workspace = workspace_manager.checkout(name)
+        g._workspace = workspace
+    return workspace
+
+
+# Upload views stream their bodies to disk first and lock only around the data change
+UNLOCKED_ENDPOINTS = {'upload_files', 'upload_ring_photos'}
+
+
+@app.before_request
+def lock_workspace():
+    # Writes to one workspace run one at a time, so an /api/batch rollback
+    # never throws away a change another request made meanwhile
+    if (request.method in ('POST', 'PUT', 'DELETE') and request.endpoint not in UNLOCKED_ENDPOINTS
+            and current_user.is_authenticated):
+        workspace = current_workspace()
+        workspace.lock.acquire()
+        g._locked_workspace = workspace
+
+
+@app.teardown_appcontext
+def release_workspace(exc):
+    # Batched operations share the app context, so this runs once per outer request
+    locked = g.pop('_locked_workspace', None)
+    if locked is not None:
+        locked.lock.release()
+    workspace = g.pop('_workspace', None)
+    if workspace is not None:
+        workspace_manager.unpin(workspace)
+
+
+# Module-level names for the current workspace's data and derived indexes
+HERA_DATA = LocalProxy(lambda: current_workspace().data)
+search_index = LocalProxy(lambda: current_workspace().search_index)
+collection_indexes = LocalProxy(lambda: current_workspace().collection_indexes)
+timeline = LocalProxy(lambda: current_workspace().timeline)
+# Encoded top-level HERA_DATA values, reused by save_data() and the dashboard API
+fragments = LocalProxy(lambda: current_workspace().fragments)
+
+
+def get_collection(name):
+    """Return the list backing a record collection (tasks live under 'main')"""
+    return current_workspace().collection(name)
+
+
+def change_client():
+    """Client id the service worker sends with mutations, so replays can tell its own edits apart"""
+    return g.get('_client_id') if has_app_context() else None
+
+
+def reindex_item(collection, item):
+    """Refresh derived indexes after a record was added or changed"""
+    fragments.touch('main' if collection == 'tasks' else collection)
+    current_workspace().record_change(collection, item['id'], change_client())
+    collection_indexes[collection].add(item)
+    search_index.add(collection, item)
+    if collection == 'itinerary':
+        timeline.add(item)
+    elif collection == 'travel':
+        timeline.set_flights(get_collection('travel'))
+
+
+def unindex_item(collection, item_id):
+    """Drop a deleted record from derived indexes"""
+    fragments.touch('main' if collection == 'tasks' else collection)
+    current_workspace().record_change(collection, item_id, change_client())
+    collection_indexes[collection].remove(item_id)
+    search_index.remove(collection, item_id)
+    if collection == 'itinerary':
+        timeline.remove(item_id)
+    elif collection == 'travel':
+        timeline.set_flights(get_collection('travel'))
+
+
+def validate_indexes():
+    """Check every derived index against HERA_DATA; returns a list of problems"""
+    problems = []
+    for name in COLLECTIONS:
+        problems.extend(collection_indexes[name].validate(get_collection(name)))
+    indexed = sum(len(get_collection(name)) for name in COLLECTIONS
+                  if get_collection(name) and name in SEARCH_FIELDS)
+    if len(search_index) != indexed:
+        problems.append(f'search: {len(search_index)} documents indexed, expected {indexed}')
+    return problems
+
+
+def rebuild_indexes():
+    """Rebuild every derived index from HERA_DATA"""
+    current_workspace().rebuild_indexes()
 
 def calculate_days_until_proposal():
-    """Calculate days until proposal"""
-    proposal_date = datetime(2025, 9, 26)  # September 26, 2025
+    """Calculate days until the current workspace's proposal date"""
+    proposal_date = normalize_date(HERA_DATA['main'].get('proposalDate'))
+    if proposal_date is None:
+        return 0
+    proposal_date = datetime.strptime(proposal_date, '%Y-%m-%d')
     today = datetime.now()
     delta = proposal_date - today
     return max(0, delta.days)
 
+# Used when the trip has no flight on its first day or no proposal activity
+DEFAULT_DEPARTURE_TIME = '08:00'
+DEFAULT_PROPOSAL_TIME = '12:00'
+
+def trip_schedule():
+    """Countdown targets for the client scheduler, as ISO datetimes in the trip's local time"""
+    main = HERA_DATA['main']
+    trip_dates = (main.get('tripDates') or '').split(' - ')
+    start, end = normalize_date(trip_dates[0]), normalize_date(trip_dates[-1])
+    proposal_date = normalize_date(main.get('proposalDate'))
+    offset = main.get('utcOffset', '')
+
+    index = collection_indexes['itinerary']
+    proposal = next((index.records[item_id] for item_id in index.hashed['date'].ids(proposal_date)
+                     if index.records[item_id].get('isProposal')), None) if proposal_date else None
+    proposal_time = normalize_time(proposal.get('time')) if proposal else None
+    departure = timeline.first_departure(1)
+    departure_time = format_minutes(departure) if departure is not None else DEFAULT_DEPARTURE_TIME
+
+    return {
+        'departure': start and f'{start}T{departure_time}:00{offset}',
+        'proposal': proposal_date and f'{proposal_date}T{proposal_time or DEFAULT_PROPOSAL_TIME}:00{offset}',
+        'tripEnd': end and f'{end}T23:59:59{offset}',
+        'proposalLocation': proposal.get('location', '') if proposal else '',
+    }
+
+@app.context_processor
+def inject_trip_schedule():
+    return {'trip_schedule': trip_schedule}
+
+
+def hydration_state(*keys):
+    """The page's initial client state: `keys` of HERA_DATA and the revision they are from
+
+    base.html embeds it as the #hera-state JSON blob; pages then bring it up
+    to date with /api/sync?since=<revision> instead of refetching everything.
+    """
+    workspace = current_workspace()
+    body = (b'{"workspace":' + json_dumps(workspace.name)
+            + b',"revision":' + json_dumps(workspace.revision)
+            + b',"data":' + fragments.encode({key: workspace.data[key] for key in keys}) + b'}')
+    return Markup(script_json(body))
+
 def calculate_budget_stats():
     """Calculate budget statistics"""
     total_budget = sum(item['budget'] for item in HERA_DATA['budget'])
@@ -231,15 +446,20 @@ def calculate_budget_stats():
         'budget_progress': budget_progress
     }
 
+
 # Routes
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
         username = request.form['username']
         password = request.form['password']
-        user = users.get(username)
+        try:
+            user = user_store.verify(username, password)
+        except LoginBusy:
+            flash('Too many login attempts, please try again in a moment')
+            return render_template('login.html'), 429
 
-        if user and check_password_hash(user.password_hash, password):
+        if user:
             login_user(user)
             return redirect(url_for('dashboard'))
         else:
@@ -263,34 +483,18 @@ def dashboard():
     budget_stats = calculate_budget_stats()
 
     # Calculate task completion stats
-    completed_tasks = [t for t in HERA_DATA['main']['tasks'] if 'Complete' in t['status']]
+    completed_tasks = collection_indexes['tasks'].lookup('completed', True)
     total_tasks = len(HERA_DATA['main']['tasks'])
     task_progress = (len(completed_tasks) / total_tasks * 100) if total_tasks > 0 else 0
 
     # Family approval stats
-    approved_family = len([f for f in HERA_DATA['family'] if f['status'] == 'Approved'])
+    approved_family = collection_indexes['family'].count('status', 'Approved')
     total_family = len(HERA_DATA['family'])
 
-    # Packing progress - FIX THE CATEGORY ISSUE HERE
-    packed_items = len([p for p in HERA_DATA['packing'] if p['packed']])
+    # Packing progress
+    packed_items = collection_indexes['packing'].count('packed', True)
     total_items = len(HERA_DATA['packing'])
 
-    # CRITICAL FIX: Ensure all packing items have a category
-    for item in HERA_DATA['packing']:
-        if 'category' not in item or not item['category']:
-            # Assign categories based on item names
-            item_lower = item['item'].lower()
-            if any(word in item_lower for word in ['ring', 'documents', 'passport']):
-                item['category'] = 'Essential'
-            elif any(word in item_lower for word in ['camera', 'tripod', 'gear']):
-                item['category'] = 'Equipment'
-            elif any(word in item_lower for word in ['clothes', 'hiking']):
-                item['category'] = 'Clothing'
-            elif any(word in item_lower for word in ['toiletries']):
-                item['category'] = 'Personal Care'
-            else:
-                item['category'] = 'General'
-
     return render_template('dashboard.html',
                            days_until=days_until,
                            budget_stats=budget_stats,
@@ -302,7 +506,8 @@ def dashboard():
                            total_tasks=total_tasks,
                            task_progress=task_progress,
                            top_budget_items=HERA_DATA['budget'][:5],
-                           HERA_DATA=HERA_DATA)
+                           HERA_DATA=HERA_DATA,
+                           hera_state=hydration_state('main', 'budget'))
 
 @app.route('/budget')
 @login_required
@@ -318,23 +523,18 @@ def budget():
 @login_required
 def ring():
     """Ring showcase page"""
-    # Check for ring images in uploads folder
-    ring_images = []
-    ring_upload_path = os.path.join('static', 'uploads', 'ring')
-    if os.path.exists(ring_upload_path):
-        ring_images = [f for f in os.listdir(ring_upload_path)
-                       if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif'))]
-
+    photos = ring_photos.list()
     return render_template('ring.html',
                            ring=HERA_DATA['ring'],
-                           ring_images=ring_images)
+                           photos=photos,
+                           ring_images=[photo['filename'] for photo in photos])
 
 
 @app.route('/family')
 @login_required
 def family():
     """Family permissions page"""
-    approved_count = len([f for f in HERA_DATA['family'] if f['status'] == 'Approved'])
+    approved_count = collection_indexes['family'].count('status', 'Approved')
     return render_template('family.html',
                          family_members=HERA_DATA['family'],
                          approved_count=approved_count,
@@ -345,13 +545,14 @@ def family():
 @login_required
 def travel():
     """Travel details page with organized data"""
-    # Separate travel data by type
-    outbound_flights = [t for t in HERA_DATA['travel'] if
-                        'IAD - DEN' in t.get('segment', '') or 'DEN - YYC' in t.get('segment', '')]
-    return_flights = [t for t in HERA_DATA['travel'] if
-                      'YYC - YYZ' in t.get('segment', '') or 'YYZ - DCA' in t.get('segment', '')]
-    hotels = [t for t in HERA_DATA['travel'] if 'Hotel' in t.get('segment', '')]
-    ground_transport = [t for t in HERA_DATA['travel'] if 'Rental Car' in t.get('segment', '')]
+    # Separate travel data by type; flights up to the proposal date are outbound
+    travel_index = collection_indexes['travel']
+    proposal_date = normalize_date(HERA_DATA['main'].get('proposalDate')) or ''
+    flights = travel_index.lookup('segment_type', 'flight')
+    outbound_flights = [t for t in flights if (normalize_date(t.get('date')) or '') <= proposal_date]
+    return_flights = [t for t in flights if (normalize_date(t.get('date')) or '') > proposal_date]
+    hotels = travel_index.lookup('segment_type', 'hotel')
+    ground_transport = travel_index.lookup('segment_type', 'car')
 
     return render_template('travel.html',
                            outbound_flights=outbound_flights,
@@ -360,36 +561,67 @@ def travel():
                            ground_transport=ground_transport,
                            travel_data=HERA_DATA['travel'])
 
+@app.template_filter('long_date')
+def long_date(value):
+    """'2025-09-24' -> 'September 24th'"""
+    day = datetime.strptime(value, '%Y-%m-%d')
+    suffix = 'th' if 11 <= day.day <= 13 else {1: 'st', 2: 'nd', 3: 'rd'}.get(day.day % 10, 'th')
+    return f"{day.strftime('%B')} {day.day}{suffix}"
+
+@app.template_filter('short_date')
+def short_date(value):
+    """'2025-09-24' -> 'Sep 24'"""
+    day = datetime.strptime(value, '%Y-%m-%d')
+    return f"{day.strftime('%b')} {day.day}"
+
+# Day subtitles for the default trip's itinerary page
+ITINERARY_DAY_SUBTITLES = {
+    1: 'Arrival & Check-in',
+    2: 'Exploring Banff',
+    3: 'Proposal Day at Emerald Lake',
+    4: 'Lake Minnewanka & Louise',
+    5: 'Scenic Drives & Views',
+    6: 'Departure Day',
+}
+ITINERARY_PAGE_SIZE = 200
+
 @app.route('/itinerary')
 @login_required
 def itinerary():
-    """Itinerary page with all 42 activities"""
+    """Itinerary page: per-day summaries and the first page of activities; itinerary.js loads the rest"""
+    index = collection_indexes['itinerary']
+    day_index = index.hashed['day']
+    completed_ids = index.hashed['completed'].ids(True)
+    proposal_date = normalize_date(HERA_DATA['main'].get('proposalDate'))
+    subtitles = ITINERARY_DAY_SUBTITLES if current_workspace().name == DEFAULT_WORKSPACE else {}
+
+    days = []
+    for day in sorted(d for d in set(day_index.values()) | set(subtitles) if isinstance(d, int)):
+        ids = day_index.ids(day)
+        date = timeline.date_of(day)
+        days.append({
+            'number': day,
+            'date': date,
+            'subtitle': subtitles.get(day, ''),
+            'proposal': date is not None and date == proposal_date,
+            'total': len(ids),
+            'completed': len(ids & completed_ids),
+        })
+
+    first_page = run_query(index, {'limit': ITINERARY_PAGE_SIZE})
     return render_template('itinerary.html',
-                         itinerary_items=HERA_DATA['itinerary'],
-                         total_activities=len(HERA_DATA['itinerary']))
+                           days=days,
+                           activities=first_page['items'],
+                           next_cursor=first_page['next_cursor'],
+                           trip_dates=HERA_DATA['main'].get('tripDates', ''),
+                           total_activities=len(index.records))
 
 
 @app.route('/packing')
 @login_required
 def packing():
     """Packing list page with categories"""
-    packed_count = len([p for p in HERA_DATA['packing'] if p['packed']])
-
-    # Add default category to items that don't have one
-    for item in HERA_DATA['packing']:
-        if 'category' not in item:
-            # Assign categories based on item names
-            item_lower = item['item'].lower()
-            if any(word in item_lower for word in ['ring', 'documents', 'passport']):
-                item['category'] = 'Essential'
-            elif any(word in item_lower for word in ['camera', 'tripod', 'gear']):
-                item['category'] = 'Equipment'
-            elif any(word in item_lower for word in ['clothes', 'hiking']):
-                item['category'] = 'Clothing'
-            elif any(word in item_lower for word in ['toiletries']):
-                item['category'] = 'Personal Care'
-            else:
-                item['category'] = 'General'
+    packed_count = collection_indexes['packing'].count('packed', True)
 
     # Get unique categories
     categories = list(set([item.get('category', 'General') for item in HERA_DATA['packing']]))
@@ -420,10 +652,11 @@ def toggle_budget_status(item_id):
             item['saved'] = 0
             item['remaining'] = item['budget']
 
+        reindex_item('budget', item)
         save_data()
         return jsonify({'success': True, 'status': item['status']})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 @app.route('/api/packing/<int:item_id>/toggle', methods=['POST'])
 @login_required
@@ -435,10 +668,53 @@ def toggle_packing_status(item_id):
             return jsonify({'success': False, 'error': 'Item not found'})
 
         item['packed'] = not item['packed']
+        reindex_item('packing', item)
         save_data()
         return jsonify({'success': True, 'packed': item['packed']})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
+
+@app.route('/api/packing/bulk', methods=['POST'])
+@login_required
+def bulk_update_packing():
+    """Set the packed state of all items, one category or a list of ids with a single save"""
+    try:
+        data = request.get_json() or {}
+        packed = data.get('packed')
+        if not isinstance(packed, bool):
+            return jsonify({'success': False, 'error': 'packed must be true or false'}), 400
+
+        # Only items not already in the requested state are touched
+        index = collection_indexes['packing']
+        pending = set(index.hashed['packed'].ids(not packed))
+        if data.get('category') is not None:
+            pending &= index.hashed['category'].ids(data['category'])
+        if data.get('ids') is not None:
+            if not isinstance(data['ids'], list):
+                return jsonify({'success': False, 'error': 'ids must be a list'}), 400
+            pending &= set(data['ids'])
+
+        updated = sorted(pending)
+        for item_id in updated:
+            item = index.records[item_id]
+            item['packed'] = packed
+            reindex_item('packing', item)
+        if updated:
+            save_data()
+
+        packed_ids = index.hashed['packed'].ids(True)
+        categories = {category: {'packed': len(ids & packed_ids), 'total': len(ids)}
+                      for category, ids in index.hashed['category'].groups()}
+        return jsonify({
+            'success': True,
+            'packed': packed,
+            'updated': updated,
+            'packed_count': len(packed_ids),
+            'total_count': len(index.records),
+            'categories': categories
+        })
+    except Exception as e:
+        return api_error(e)
 
 @app.route('/api/family/<int:member_id>/toggle', methods=['POST'])
 @login_required
@@ -455,17 +731,34 @@ def toggle_family_status(member_id):
         next_index = (current_index + 1) % len(status_cycle)
         member['status'] = status_cycle[next_index]
 
+        reindex_item('family', member)
         save_data()
         return jsonify({'success': True, 'status': member['status']})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
+
+
+def photo_session(taken):
+    """Location of the itinerary activity under way when a photo was taken"""
+    date, time_of_day = normalize_date(taken), normalize_time(taken[11:16])
+    started = [(normalize_time(activity.get('time')), activity)
+               for activity in collection_indexes['itinerary'].lookup('date', date)]
+    started = [(start, activity) for start, activity in started if start and start <= time_of_day]
+    return max(started, key=lambda pair: pair[0])[1].get('location') if started else None
 
 
 @app.route('/api/ring/upload-photos', methods=['POST'])
 @login_required
+@metrics.track_upload('ring_photos')
 def upload_ring_photos():
     """Handle ring photo uploads"""
+    batch = None
+    stored = []  # photos now in the index; anything else written is removed
     try:
+        # Photos are checked and written to the upload directory as the body is parsed
+        batch = stream_uploads(os.path.join(app.static_folder, 'uploads', 'ring'), 'ring', IMAGE_EXTENSIONS,
+                               lambda filename: TYPE_LIMITS['image'])
+
         # Check if files were sent
         if 'photos' not in request.files:
             return jsonify({'success': False, 'error': 'No photos provided'})
@@ -474,44 +767,40 @@ def upload_ring_photos():
         if not files or files[0].filename == '':
             return jsonify({'success': False, 'error': 'No photos selected'})
 
-        # Create upload directory if it doesn't exist
-        upload_dir = os.path.join(app.static_folder, 'uploads', 'ring')
-        os.makedirs(upload_dir, exist_ok=True)
-
         uploaded_files = []
-        allowed_extensions = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
-
         for file in files:
-            # Validate file type
-            if not file.filename:
-                continue
-
-            file_ext = file.filename.rsplit('.', 1)[1].lower() if '.' in file.filename else ''
-            if file_ext not in allowed_extensions:
-                continue
-
-            # Generate safe filename with timestamp to avoid conflicts
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            random_id = str(uuid.uuid4())[:8]
-            safe_filename = f"ring_{timestamp}_{random_id}.{file_ext}"
-
-            # Save file
-            file_path = os.path.join(upload_dir, safe_filename)
-            file.save(file_path)
-            uploaded_files.append(safe_filename)
+            upload = file.stream
+            if not isinstance(upload, StreamedUpload):
+                continue  # not an image extension; never stored
+            upload.finish()
+            uploaded_files.append(upload.filename)
 
         if not uploaded_files:
             return jsonify({'success': False, 'error': 'No valid image files were uploaded'})
 
+        for filename in uploaded_files:
+            ring_photos.add(filename, session_for=photo_session)
+            stored.append(filename)
+
+        # Thumbnails and placeholders are made in the background
+        if ring_photos.can_derive:
+            for filename in uploaded_files:
+                jobs.enqueue('photos.derive', filename=filename)
+
         return jsonify({
             'success': True,
             'message': f'{len(uploaded_files)} photos uploaded successfully',
-            'files': uploaded_files
+            'files': uploaded_files,
+            'photos': [ring_photos.get(filename) for filename in uploaded_files]
         })
 
+    except UploadRejected as e:
+        return jsonify({'success': False, 'error': str(e)}), e.status
     except Exception as e:
-        print(f"Upload error: {e}")  # For debugging
-        return jsonify({'success': False, 'error': f'Upload failed: {str(e)}'})
+        return api_error(e, 'Upload failed')
+    finally:
+        if batch:
+            batch.discard(keep=stored)
 
 
 @app.route('/api/ring/delete-photo/<filename>', methods=['DELETE'])
@@ -529,34 +818,34 @@ def delete_ring_photo(filename):
 
         # Check if file exists and delete it
         if os.path.exists(file_path):
-            os.remove(file_path)
+            remove_upload(file_path)
+            after_commit(lambda: ring_photos.remove(safe_filename))
             return jsonify({'success': True, 'message': 'Photo deleted successfully'})
         else:
             return jsonify({'success': False, 'error': 'Photo not found'})
 
     except Exception as e:
-        print(f"Delete error: {e}")  # For debugging
-        return jsonify({'success': False, 'error': f'Delete failed: {str(e)}'})
+        return api_error(e, 'Delete failed')
 
 
-# Optional: Add route to get ring photo list (for refreshing without page reload)
 @app.route('/api/ring/photos', methods=['GET'])
 @login_required
 def get_ring_photos():
-    """Get list of ring photos"""
+    """Get a page of ring photos, sorted and filtered from the metadata index"""
     try:
-        ring_upload_path = os.path.join(app.static_folder, 'uploads', 'ring')
-        if not os.path.exists(ring_upload_path):
-            return jsonify({'success': True, 'photos': []})
-
-        photos = [f for f in os.listdir(ring_upload_path)
-                  if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp'))]
-
-        return jsonify({'success': True, 'photos': photos})
+        page = ring_photos.query(request.args)
+        return jsonify({
+            'success': True,
+            'photos': page['items'],
+            'sort': page['sort'],
+            'next_cursor': page['next_cursor'],
+            'has_more': page['has_more']
+        })
 
+    except QueryError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
-        print(f"Get photos error: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 @app.route('/api/refresh_data', methods=['POST'])
 @login_required
@@ -566,7 +855,250 @@ def refresh_data():
         load_data()
         return jsonify({'success': True, 'message': 'Data refreshed successfully'})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
+
+@app.route('/api/indexes/validate', methods=['GET'])
+@login_required
+def check_indexes():
+    """Report any drift between the secondary indexes and HERA_DATA"""
+    problems = validate_indexes()
+    return jsonify({'success': not problems, 'problems': problems})
+
+# Mutation endpoints /api/batch will not run: uploads need multipart bodies,
+# refresh_data reloads from disk, batches cannot nest and a batch stays in one
+# workspace
+BATCH_EXCLUDED_ENDPOINTS = {'batch', 'upload_files', 'upload_ring_photos', 'refresh_data',
+                            'create_workspace', 'activate_workspace'}
+MAX_BATCH_OPERATIONS = 500
+
+
+def batch_write_keys(path):
+    """Top-level HERA_DATA keys an /api/<collection>/... operation can change, or None if unknown"""
+    parts = path.split('/')
+    segment = parts[2] if len(parts) > 2 else ''
+    if segment == 'tasks':
+        return ['main']
+    if segment in HERA_DATA:
+        return [segment]
+    return None
+
+
+def run_batch_operation(operation, replay_base=None):
+    """Dispatch one {method, url, body} operation to its view; returns (status, JSON body)
+
+    `replay_base` is the revision a replayed offline batch was made against;
+    operations that would overwrite a newer change get a 409 instead.
+    """
+    method = str(operation.get('method', 'POST')).upper()
+    url = operation.get('url', '')
+    if method not in ('POST', 'PUT', 'DELETE') or not url.startswith('/api/'):
+        return 400, {'success': False, 'error': 'Only POST, PUT and DELETE /api/ operations can be batched'}
+
+    kwargs = {'json': operation['body']} if operation.get('body') is not None else {}
+    with app.test_request_context(url, method=method, **kwargs):
+        if request.routing_exception is not None:
+            return request.routing_exception.code, {'success': False, 'error': 'No such route'}
+        if request.endpoint in BATCH_EXCLUDED_ENDPOINTS:
+            return 400, {'success': False, 'error': f'{request.endpoint} cannot be batched'}
+        if replay_base is not None:
+            conflict = replay_conflict(replay_base)
+            if conflict:
+                return 409, conflict
+        savepoint = g.get('_savepoint')
+        if savepoint is not None:
+            savepoint.keep(batch_write_keys(request.path))
+        response = app.make_response(app.view_functions[request.endpoint](**request.view_args))
+        return response.status_code, response.get_json(silent=True)
+
+
+@app.route('/api/batch', methods=['POST'])
+@login_required
+def batch():
+    """Apply an ordered list of mutations with a single save_data() flush
+
+    Atomic batches (the default) stop at the first failed operation and roll
+    HERA_DATA back; otherwise every operation runs and the successful ones
+    are kept. Uploaded files are only deleted once the batch commits. The
+    workspace stays locked for writes until the batch commits or rolls back.
+    """
+    try:
+        data = request.get_json() or {}
+        operations = data.get('operations')
+        atomic = data.get('atomic', True)
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'success': False, 'error': 'operations must be a non-empty list'}), 400
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            return jsonify({'success': False,
+                            'error': f'At most {MAX_BATCH_OPERATIONS} operations per batch'}), 400
+
+        workspace = current_workspace()
+        replay_base = request.headers.get(REPLAY_REVISION_HEADER, type=int)
+        with workspace.lock:
+            # Only the collections an operation is about to change are copied
+            savepoint = Savepoint(workspace) if atomic else None
+            results = []
+            failed = False
+            g._deferred_save = False
+            g._on_commit = []  # file deletions, held back until the batch commits
+            g._savepoint = savepoint
+            try:
+                for operation in operations:
+                    if failed and atomic:
+                        results.append({'status': None, 'skipped': True})
+                        continue
+                    status, body = run_batch_operation(operation if isinstance(operation, dict) else {}, replay_base)
+                    ok = status < 400 and bool(body and body.get('success', True))
+                    failed = failed or not ok
+                    results.append({'status': status, 'success': ok, 'body': body})
+            finally:
+                pending = g.pop('_deferred_save', False)
+                on_commit = g.pop('_on_commit', [])
+                g.pop('_savepoint', None)
+
+            committed = not (failed and atomic)
+            if not committed:
+                savepoint.restore()
+            else:
+                if pending:
+                    save_data()
+                for action in on_commit:
+                    action()
+
+        return jsonify({'success': not failed, 'committed': committed, 'results': results})
+
+    except Exception as e:
+        return api_error(e)
+
+@app.route('/api/workspaces', methods=['GET'])
+@login_required
+def list_workspaces():
+    """Workspaces the current user can open, and the active one"""
+    names = [name for name in workspace_manager.names() if current_user.can_access(name)]
+    return jsonify({'success': True, 'active': current_workspace().name, 'workspaces': names})
+
+@app.route('/api/workspaces', methods=['POST'])
+@login_required
+def create_workspace():
+    """Create an empty workspace for a new trip"""
+    try:
+        data = request.get_json() or {}
+        name = str(data.get('name', '')).strip().lower()
+        if not current_user.can_access(name):
+            return jsonify({'success': False, 'error': 'You do not have access to that workspace'}), 403
+        try:
+            workspace = workspace_manager.create(
+                name, empty_data(data.get('tripDates', ''), data.get('proposalDate', '')))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        return jsonify({'success': True, 'workspace': workspace.name})
+    except Exception as e:
+        return api_error(e)
+
+@app.route('/api/workspaces/<name>/activate', methods=['POST'])
+@login_required
+def activate_workspace(name):
+    """Switch the session to another workspace"""
+    if not current_user.can_access(name) or not workspace_manager.exists(name):
+        return jsonify({'success': False, 'error': 'Workspace not found'}), 404
+    session['workspace'] = name
+    return jsonify({'success': True, 'workspace': name})
+
+# Offline clients: the service worker keeps a replica of HERA_DATA current
+# through /api/sync and replays edits queued while offline with the revision
+# they were made against, so an edit to a record that another client changed
+# in the meantime is refused instead of silently overwriting it
+CLIENT_HEADER = 'X-Hera-Client'
+REPLAY_REVISION_HEADER = 'X-Hera-Base-Revision'
+REPLAY_WORKSPACE_HEADER = 'X-Hera-Workspace'
+
+
+def mutation_target():
+    """(collection, record id) the current mutation edits, or None if it names no record"""
+    parts = request.path.split('/')
+    if len(parts) < 4 or parts[1] != 'api' or parts[2] not in COLLECTIONS:
+        return None
+    item_id = next((value for value in (request.view_args or {}).values() if isinstance(value, int)), None)
+    if item_id is None:
+        body = request.get_json(silent=True)
+        item_id = body.get('id') if isinstance(body, dict) else None
+    try:
+        return parts[2], int(item_id)
+    except (TypeError, ValueError):
+        return None
+
+
+def replay_conflict(base_revision, workspace_name=None):
+    """409 body if a replayed mutation would overwrite a newer change, else None"""
+    workspace = current_workspace()
+    if workspace_name and workspace_name != workspace.name:
+        return {'success': False, 'error': f"This change was made in workspace '{workspace_name}'",
+                'conflict': {'workspace': workspace.name}}
+    target = mutation_target()
+    if target is None:
+        return None
+    collection, item_id = target
+    revision = workspace.record_changed_since(collection, item_id, base_revision, change_client())
+    if revision is None:
+        return None
+    return {'success': False,
+            'error': f'{collection} #{item_id} changed on the server after this edit was made offline',
+            'conflict': {'collection': collection, 'id': item_id, 'revision': revision,
+                         'record': collection_indexes[collection].records.get(item_id)}}
+
+
+@app.before_request
+def check_offline_replay():
+    client = request.headers.get(CLIENT_HEADER)
+    if client:
+        g._client_id = client
+    base_revision = request.headers.get(REPLAY_REVISION_HEADER, type=int)
+    if base_revision is None or request.method in ('GET', 'HEAD', 'OPTIONS') or not current_user.is_authenticated:
+        return None
+    conflict = replay_conflict(base_revision, request.headers.get(REPLAY_WORKSPACE_HEADER))
+    if conflict:
+        return jsonify(conflict), 409
+    return None
+
+
+@app.after_request
+def add_revision_headers(response):
+    # Lets the service worker tell whether a cached page or replica is current
+    workspace = g.get('_workspace')
+    if workspace is not None:
+        response.headers['X-Hera-Revision'] = str(workspace.revision)
+        response.headers['X-Hera-Workspace'] = workspace.name
+    return response
+
+
+@app.route('/api/sync', methods=['GET'])
+@login_required
+def sync_data():
+    """HERA_DATA values changed since revision `since` of `workspace`
+
+    Used by the offline replica and to refresh hydrated page state;
+    `keys=main,budget` limits the response to those values. Every value is
+    sent, with `full` set, when `since` is missing or refers to another
+    workspace or a revision this process does not know.
+    """
+    try:
+        workspace = current_workspace()
+        since = request.args.get('since', type=int)
+        if request.args.get('workspace') != workspace.name:
+            since = None
+        changed = workspace.changed_since(since)
+        full = changed is None
+        keys = list(workspace.data) if full else changed
+        wanted = request.args.get('keys')
+        if wanted:
+            wanted = set(wanted.split(','))
+            keys = [key for key in keys if key in wanted]
+        body = (b'{"success":true,"workspace":' + json_dumps(workspace.name)
+                + b',"revision":' + json_dumps(workspace.revision)
+                + b',"full":' + json_dumps(full)
+                + b',"changes":' + fragments.encode({key: workspace.data[key] for key in keys}) + b'}')
+        return app.response_class(body, mimetype='application/json')
+    except Exception as e:
+        return api_error(e)
 
 @app.route('/export_json')
 @login_required
@@ -574,12 +1106,28 @@ def export_json():
     """Export current data as JSON file"""
     try:
         save_data()
-        flash('Data exported successfully to hera_data.json')
+        flash(f'Data exported successfully to {current_workspace().path}')
         return redirect(url_for('dashboard'))
     except Exception as e:
         flash(f'Export error: {str(e)}')
         return redirect(url_for('dashboard'))
 
+@app.route('/export_columnar')
+@login_required
+def export_columnar():
+    """Export current data as typed Parquet (or Arrow IPC with ?format=arrow) files
+
+    With ?snapshot=1 the files go to a new timestamped directory under
+    exports/snapshots, with a manifest, instead of replacing the last export.
+    """
+    snapshot = request.args.get('snapshot') in ('1', 'true', 'yes')
+    fmt = request.args.get('format', 'arrow' if snapshot else 'parquet')
+    # Exports are interactive, so they run ahead of routine jobs, and are not retried
+    job_id = jobs.enqueue('export.columnar', priority=5, max_attempts=1, workspace=current_workspace().name, fmt=fmt,
+                          snapshot=snapshot)
+    flash(f"Columnar {'snapshot' if snapshot else 'export'} queued as job {job_id}")
+    return redirect(url_for('dashboard'))
+
 # Keep the existing export_csv_route for template compatibility
 @app.route('/export_csv')
 @login_required
@@ -597,23 +1145,26 @@ def add_budget_item():
 
         # Generate new ID
         max_id = max([item['id'] for item in HERA_DATA['budget']], default=0)
-        new_item = {
+        budget = request_value(data, 'budget_amount', 'number')
+        saved = request_value(data, 'budget_saved', 'number')
+        new_item = build_record('budget', {
             'id': max_id + 1,
-            'category': data['category'],
-            'budget': float(data['budget_amount']),
-            'saved': float(data['budget_saved']),
-            'remaining': float(data['budget_amount']) - float(data['budget_saved']),
+            'category': request_value(data, 'category'),
+            'budget': budget,
+            'saved': saved,
+            'remaining': budget - saved,
             'notes': data.get('notes', ''),
-            'status': data['status'],
+            'status': request_value(data, 'status'),
             'priority': data.get('priority', 'medium')
-        }
+        })
 
         HERA_DATA['budget'].append(new_item)
+        reindex_item('budget', new_item)
         save_data()
 
         return jsonify({'success': True, 'budget_item': new_item})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 @app.route('/api/budget/update', methods=['POST'])
@@ -622,25 +1173,31 @@ def update_budget_item():
     """Update existing budget item"""
     try:
         data = request.get_json()
-        item_id = int(data['id'])
+        item_id = request_value(data, 'id', 'int')
+        category, status = request_value(data, 'category'), request_value(data, 'status')
+        budget = request_value(data, 'budget_amount', 'number')
+        saved = request_value(data, 'budget_saved', 'number')
 
         item = next((item for item in HERA_DATA['budget'] if item['id'] == item_id), None)
         if not item:
             return jsonify({'success': False, 'error': 'Item not found'})
 
-        # Update item
-        item['category'] = data['category']
-        item['budget'] = float(data['budget_amount'])
-        item['saved'] = float(data['budget_saved'])
-        item['remaining'] = item['budget'] - item['saved']
-        item['notes'] = data.get('notes', '')
-        item['status'] = data['status']
-        item['priority'] = data.get('priority', 'medium')
+        # Validate every field before writing any of them
+        item.update(coerce_update('budget', {
+            'category': category,
+            'budget': budget,
+            'saved': saved,
+            'remaining': budget - saved,
+            'notes': data.get('notes', ''),
+            'status': status,
+            'priority': data.get('priority', 'medium')
+        }))
 
+        reindex_item('budget', item)
         save_data()
         return jsonify({'success': True, 'budget_item': item})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 @app.route('/api/budget/delete/<int:item_id>', methods=['DELETE'])
@@ -649,10 +1206,11 @@ def delete_budget_item(item_id):
     """Delete budget item"""
     try:
         HERA_DATA['budget'] = [item for item in HERA_DATA['budget'] if item['id'] != item_id]
+        unindex_item('budget', item_id)
         save_data()
         return jsonify({'success': True})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 # FAMILY CRUD OPERATIONS
@@ -662,19 +1220,20 @@ def update_family_member():
     """Update family member details"""
     try:
         data = request.get_json()
-        member_id = int(data['id'])
-        field = data['field']
-        value = data['value']
+        member_id = request_value(data, 'id', 'int')
+        field = request_value(data, 'field', 'str')
+        value = request_value(data, 'value')
 
         member = next((m for m in HERA_DATA['family'] if m['id'] == member_id), None)
         if not member:
             return jsonify({'success': False, 'error': 'Member not found'})
 
-        member[field] = value
+        member.update(coerce_update('family', {field: value}))
+        reindex_item('family', member)
         save_data()
         return jsonify({'success': True})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 # PACKING CRUD OPERATIONS
@@ -687,22 +1246,23 @@ def add_packing_item():
 
         # Generate new ID
         max_id = max([item['id'] for item in HERA_DATA['packing']], default=0)
-        new_item = {
+        new_item = build_record('packing', {
             'id': max_id + 1,
-            'item': data['item_name'],
+            'item': request_value(data, 'item_name'),
             'category': data.get('category', 'General'),
             'packed': data.get('packed', False),
             'notes': data.get('notes', ''),
-            'quantity': int(data.get('quantity', 1)),
+            'quantity': request_value(data, 'quantity', 'int', default=1),
             'priority': data.get('priority', 'medium')
-        }
+        })
 
         HERA_DATA['packing'].append(new_item)
+        reindex_item('packing', new_item)
         save_data()
 
         return jsonify({'success': True, 'packing_item': new_item})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 @app.route('/api/packing/update', methods=['POST'])
@@ -711,19 +1271,20 @@ def update_packing_item():
     """Update packing item"""
     try:
         data = request.get_json()
-        item_id = int(data['id'])
-        field = data['field']
-        value = data['value']
+        item_id = request_value(data, 'id', 'int')
+        field = request_value(data, 'field', 'str')
+        value = request_value(data, 'value')
 
         item = next((item for item in HERA_DATA['packing'] if item['id'] == item_id), None)
         if not item:
             return jsonify({'success': False, 'error': 'Item not found'})
 
-        item[field] = value
+        item.update(coerce_update('packing', {field: value}))
+        reindex_item('packing', item)
         save_data()
         return jsonify({'success': True})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 @app.route('/api/packing/delete/<int:item_id>', methods=['DELETE'])
@@ -732,10 +1293,11 @@ def delete_packing_item(item_id):
     """Delete packing item"""
     try:
         HERA_DATA['packing'] = [item for item in HERA_DATA['packing'] if item['id'] != item_id]
+        unindex_item('packing', item_id)
         save_data()
         return jsonify({'success': True})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 # RING UPDATE OPERATIONS
@@ -745,8 +1307,8 @@ def update_ring():
     """Update ring details"""
     try:
         data = request.get_json()
-        field = data['field']
-        value = data['value']
+        field = request_value(data, 'field', 'str')
+        value = request_value(data, 'value')
 
         # Map template field names to data keys
         field_mapping = {
@@ -760,10 +1322,11 @@ def update_ring():
 
         actual_field = field_mapping.get(field, field)
         HERA_DATA['ring'][actual_field] = value
+        fragments.touch('ring')
         save_data()
         return jsonify({'success': True})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 # ITINERARY CRUD OPERATIONS
@@ -776,23 +1339,24 @@ def add_itinerary_item():
 
         # Generate new ID
         max_id = max([item['id'] for item in HERA_DATA['itinerary']], default=0)
-        new_item = {
+        new_item = build_record('itinerary', {
             'id': max_id + 1,
-            'day': int(data.get('day', 1)),  # ADD this line
-            'time': data['time'],
-            'activity': data['activity'],
+            'day': request_value(data, 'day', 'int', default=1),  # ADD this line
+            'time': request_value(data, 'time'),
+            'activity': request_value(data, 'activity'),
             'location': data.get('location', ''),  # Make optional
             'notes': data.get('notes', ''),
             'isProposal': data.get('isProposal', False),
             'completed': False  # ADD this line
-        }
+        })
 
         HERA_DATA['itinerary'].append(new_item)
+        reindex_item('itinerary', new_item)
         save_data()
 
         return jsonify({'success': True, 'itinerary_item': new_item})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 @app.route('/api/itinerary/update', methods=['POST'])
@@ -801,28 +1365,27 @@ def update_itinerary_item():
     """Update itinerary activity - ENHANCED"""
     try:
         data = request.get_json()
-        item_id = int(data['id'])
+        item_id = request_value(data, 'id', 'int')
 
-        item = next((item for item in HERA_DATA['itinerary'] if item['id'] == item_id), None)
+        item = collection_indexes['itinerary'].records.get(item_id)
         if not item:
             return jsonify({'success': False, 'error': 'Item not found'})
 
         # Handle single field updates (inline editing)
         if 'field' in data and 'value' in data:
-            field = data['field']
-            value = data['value']
-            item[field] = value
+            changes = {request_value(data, 'field', 'str'): data['value']}
         else:
             # Handle full item updates (modal editing) - ADD this block
             allowed_fields = ['day', 'time', 'activity', 'location', 'notes', 'isProposal']
-            for field in allowed_fields:
-                if field in data:
-                    item[field] = data[field]
+            changes = {field: data[field] for field in allowed_fields if field in data}
 
+        # Validate every field before writing any of them
+        item.update(coerce_update('itinerary', changes))
+        reindex_item('itinerary', item)
         save_data()
-        return jsonify({'success': True})
+        return jsonify({'success': True, 'itinerary_item': item})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 @app.route('/api/itinerary/delete/<int:item_id>', methods=['DELETE'])
@@ -831,10 +1394,11 @@ def delete_itinerary_item(item_id):
     """Delete itinerary activity"""
     try:
         HERA_DATA['itinerary'] = [item for item in HERA_DATA['itinerary'] if item['id'] != item_id]
+        unindex_item('itinerary', item_id)
         save_data()
         return jsonify({'success': True})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 @app.route('/api/itinerary/<int:item_id>/complete', methods=['POST'])
@@ -845,15 +1409,55 @@ def toggle_itinerary_complete(item_id):
         data = request.get_json()
         completed = data.get('completed', False)
 
-        item = next((item for item in HERA_DATA['itinerary'] if item['id'] == item_id), None)
+        item = collection_indexes['itinerary'].records.get(item_id)
         if not item:
             return jsonify({'success': False, 'error': 'Item not found'})
 
         item['completed'] = completed
+        reindex_item('itinerary', item)
         save_data()
         return jsonify({'success': True})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
+
+
+@app.route('/api/itinerary/conflicts', methods=['GET'])
+@login_required
+def get_itinerary_conflicts():
+    """Overlapping activities and flight/travel-gap conflicts, grouped by day"""
+    try:
+        conflicts, recomputed = timeline.conflicts()
+        return jsonify({
+            'success': True,
+            'conflicts': [{'day': day, 'date': timeline.date_of(day), 'conflicts': found}
+                          for day, found in conflicts.items()],
+            'total': sum(len(found) for found in conflicts.values()),
+            'recomputed_days': recomputed
+        })
+    except Exception as e:
+        return api_error(e)
+
+
+@app.route('/api/itinerary/timeline', methods=['GET'])
+@login_required
+def get_itinerary_timeline():
+    """What is happening at a point in time (?at=ISO datetime, default now) and what comes next"""
+    try:
+        at = request.args.get('at')
+        when = datetime.fromisoformat(at) if at else datetime.now()
+        return jsonify({
+            'success': True,
+            'at': when.isoformat(timespec='minutes'),
+            'current': timeline.at(when),
+            'next': timeline.next_after(when)
+        })
+    except ValueError:
+        return jsonify({'success': False, 'error': 'at must be an ISO datetime'}), 400
+    except Exception as e:
+        return api_error(e)
+
+
+FILES_PAGE_SIZE = 50
 
 
 @app.route('/files')
@@ -867,28 +1471,34 @@ def files():
     total_size_formatted = format_file_size(total_size)
 
     # Get unique categories
-    categories = list(set(file.get('category', 'other') for file in files_data))
+    file_index = collection_indexes['files']
+    categories = file_index.hashed['category'].values()
 
-    # Count recent uploads (last 7 days)
+    # Count recent uploads (last 7 days), newest first so the walk stops early
     recent_count = 0
-    week_ago = datetime.now() - timedelta(days=7)
-    for file in files_data:
-        if file.get('upload_date'):
-            upload_date = datetime.fromisoformat(file['upload_date'].replace('Z', '+00:00'))
-            if upload_date > week_ago:
-                recent_count += 1
+    week_ago = (datetime.now() - timedelta(days=7)).isoformat()
+    newest_first = SortSpec('files', '-upload_date')
+    for file_id in file_index.sorted_index(newest_first.name, newest_first.key).ids_after():
+        if (file_index.records[file_id].get('upload_date') or '') <= week_ago:
+            break
+        recent_count += 1
+
+    # Only the first page is rendered; files.js loads the rest on demand
+    first_page = run_query(collection_indexes['files'], {'limit': FILES_PAGE_SIZE})
 
     # Count files by category
     category_counts = {
-        'travel_docs_count': len([f for f in files_data if f.get('category') == 'travel']),
-        'reservations_count': len([f for f in files_data if f.get('category') == 'reservations']),
-        'photos_count': len([f for f in files_data if f.get('category') == 'photos']),
-        'documents_count': len([f for f in files_data if f.get('category') == 'documents']),
-        'other_count': len([f for f in files_data if f.get('category') == 'other']),
+        'travel_docs_count': file_index.count('category', 'travel'),
+        'reservations_count': file_index.count('category', 'reservations'),
+        'photos_count': file_index.count('category', 'photos'),
+        'documents_count': file_index.count('category', 'documents'),
+        'other_count': file_index.count('category', 'other'),
     }
 
     return render_template('files.html',
-                           files=files_data,
+                           files=first_page['items'],
+                           next_cursor=first_page['next_cursor'],
+                           total_files=len(files_data),
                            total_size=total_size_formatted,
                            categories=categories,
                            recent_count=recent_count,
@@ -897,9 +1507,17 @@ def files():
 
 @app.route('/api/files/upload', methods=['POST'])
 @login_required
+@metrics.track_upload('files')
 def upload_files():
     """Handle file uploads"""
+    batch = None
+    stored = ()  # files with a saved record; anything else written is removed
     try:
+        # Files are sniffed, measured, hashed and written in one pass as the body
+        # is parsed; a bad or oversized file stops the parse
+        batch = stream_uploads(os.path.join(app.static_folder, 'uploads', 'files'), 'file', FILE_EXTENSIONS,
+                               upload_limit, quota=upload_quota_left())
+
         # Check if files were sent
         if 'files' not in request.files:
             return jsonify({'success': False, 'error': 'No files provided'})
@@ -911,60 +1529,43 @@ def upload_files():
         if not files or files[0].filename == '':
             return jsonify({'success': False, 'error': 'No files selected'})
 
-        # Create upload directory if it doesn't exist
-        upload_dir = os.path.join(app.static_folder, 'uploads', 'files')
-        os.makedirs(upload_dir, exist_ok=True)
-
-        uploaded_files = []
-        allowed_extensions = {
-            'pdf', 'doc', 'docx', 'txt', 'zip', 'xlsx', 'xls',
-            'jpg', 'jpeg', 'png', 'gif', 'webp'
-        }
-
-        for i, file in enumerate(files):
-            if not file.filename:
-                continue
-
-            # Validate file type
-            file_ext = file.filename.rsplit('.', 1)[1].lower() if '.' in file.filename else ''
-            if file_ext not in allowed_extensions:
-                continue
-
-            # Generate safe filename with timestamp to avoid conflicts
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            random_id = str(uuid.uuid4())[:8]
-            safe_filename = f"file_{timestamp}_{random_id}.{file_ext}"
-
-            # Save file
-            file_path = os.path.join(upload_dir, safe_filename)
-            file.save(file_path)
-
-            # Get file info
-            file_size = os.path.getsize(file_path)
-            file_type = get_file_type(file.filename)
-
-            # Create file record
-            file_record = {
-                'id': len(HERA_DATA['files']) + len(uploaded_files) + 1,
-                'filename': safe_filename,
-                'original_name': file.filename,
-                'size': format_file_size(file_size),
-                'size_bytes': file_size,
-                'type': file_type,
-                'category': categories[i] if i < len(categories) else 'other',
-                'notes': notes_list[i] if i < len(notes_list) else '',
-                'upload_date': datetime.now().isoformat(),
-                'mimetype': file.mimetype
-            }
-
-            uploaded_files.append(file_record)
-
-        if not uploaded_files:
-            return jsonify({'success': False, 'error': 'No valid files were uploaded'})
-
-        # Add to HERA_DATA and save
-        HERA_DATA['files'].extend(uploaded_files)
-        save_data()
+        # The body is parsed by now; lock only for the data change (see lock_workspace)
+        with current_workspace().lock:
+            max_id = max([f['id'] for f in HERA_DATA['files']], default=0)
+            uploaded_files = []
+            for i, file in enumerate(files):
+                upload = file.stream
+                if not isinstance(upload, StreamedUpload):
+                    continue  # unsupported extension; never stored
+                upload.finish()
+
+                # Create file record
+                file_record = build_record('files', {
+                    'id': max_id + len(uploaded_files) + 1,
+                    'filename': upload.filename,
+                    'original_name': file.filename,
+                    'size': format_file_size(upload.size),
+                    'size_bytes': upload.size,
+                    'type': get_file_type(file.filename),
+                    'category': categories[i] if i < len(categories) else 'other',
+                    'notes': notes_list[i] if i < len(notes_list) else '',
+                    'upload_date': datetime.now().isoformat(),
+                    'mimetype': mimetypes.guess_type(file.filename)[0] or 'application/octet-stream',
+                    'checksum': upload.checksum,
+                    'uploaded_by': current_user.get_id()
+                })
+
+                uploaded_files.append(file_record)
+
+            if not uploaded_files:
+                return jsonify({'success': False, 'error': 'No valid files were uploaded'})
+
+            # Add to HERA_DATA and save
+            HERA_DATA['files'].extend(uploaded_files)
+            stored = {file_record['filename'] for file_record in uploaded_files}
+            for file_record in uploaded_files:
+                reindex_item('files', file_record)
+            save_data()
 
         return jsonify({
             'success': True,
@@ -973,9 +1574,37 @@ def upload_files():
             'files': uploaded_files
         })
 
+    except UploadRejected as e:
+        return jsonify({'success': False, 'error': str(e)}), e.status
     except Exception as e:
-        print(f"Upload error: {e}")  # For debugging
-        return jsonify({'success': False, 'error': f'Upload failed: {str(e)}'})
+        return api_error(e, 'Upload failed')
+    finally:
+        if batch:
+            batch.discard(keep=stored)
+
+
+@jobs.handler('photos.derive')
+def derive_ring_photo(filename):
+    """Write a ring photo's thumbnail and blurred placeholder"""
+    record = ring_photos.derive(filename)
+    return {'filename': filename, 'thumbnail': record and record['thumbnail']}
+
+
+@jobs.handler('export.columnar')
+def export_columnar_job(workspace, fmt, snapshot=False):
+    """Write a workspace's collections as Parquet or Arrow IPC files (or a timestamped snapshot)"""
+    root = 'exports' if workspace == DEFAULT_WORKSPACE else os.path.join('exports', workspace)
+    workspace = workspace_manager.checkout(workspace)
+    try:
+        if snapshot:
+            success, message = write_columnar_snapshot(workspace.data, root=os.path.join(root, 'snapshots'), fmt=fmt)
+        else:
+            success, message = export_to_columnar(workspace.data, output_dir=os.path.join(root, fmt), fmt=fmt)
+    finally:
+        workspace_manager.unpin(workspace)
+    if not success:
+        raise RuntimeError(message)
+    return {'message': message}
 
 
 @app.route('/api/files/download/<filename>')
@@ -1000,8 +1629,7 @@ def download_file(filename):
         return send_file(file_path, as_attachment=True, download_name=download_name)
 
     except Exception as e:
-        print(f"Download error: {e}")
-        return jsonify({'error': str(e)}), 500
+        return api_error(e)
 
 
 @app.route('/api/files/delete/<int:file_id>', methods=['DELETE'])
@@ -1016,18 +1644,17 @@ def delete_file(file_id):
 
         # Delete physical file
         file_path = os.path.join(app.static_folder, 'uploads', 'files', file_record['filename'])
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        remove_upload(file_path)
 
         # Remove from data
         HERA_DATA['files'] = [f for f in HERA_DATA['files'] if f['id'] != file_id]
+        unindex_item('files', file_id)
         save_data()
 
         return jsonify({'success': True, 'message': 'File deleted successfully'})
 
     except Exception as e:
-        print(f"Delete error: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 @app.route('/api/files/update/<int:file_id>', methods=['POST'])
@@ -1038,7 +1665,7 @@ def update_file(file_id):
         data = request.get_json()
 
         # Find file record
-        file_record = next((f for f in HERA_DATA['files'] if f['id'] == file_id), None)
+        file_record = collection_indexes['files'].records.get(file_id)
         if not file_record:
             return jsonify({'success': False, 'error': 'File not found'})
 
@@ -1051,6 +1678,7 @@ def update_file(file_id):
             file_record['notes'] = data['notes']
 
         file_record['updated_date'] = datetime.now().isoformat()
+        reindex_item('files', file_record)
         save_data()
 
         return jsonify({
@@ -1064,8 +1692,7 @@ def update_file(file_id):
         })
 
     except Exception as e:
-        print(f"Update error: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 @app.route('/api/tasks/<int:task_id>/toggle', methods=['POST'])
@@ -1089,6 +1716,7 @@ def toggle_task_status(task_id):
             if 'Complete' in task['status']:
                 task['status'] = 'In Progress, On Schedule'
 
+        reindex_item('tasks', task)
         save_data()
         return jsonify({
             'success': True,
@@ -1097,7 +1725,7 @@ def toggle_task_status(task_id):
         })
 
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 @app.route('/api/tasks/<int:task_id>/update', methods=['POST'])
@@ -1122,6 +1750,7 @@ def update_task(task_id):
         if 'notes' in data:
             task['notes'] = data['notes']
 
+        reindex_item('tasks', task)
         save_data()
         return jsonify({
             'success': True,
@@ -1134,7 +1763,7 @@ def update_task(task_id):
         })
 
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 @app.route('/api/tasks/add', methods=['POST'])
@@ -1146,21 +1775,22 @@ def add_task():
 
         # Generate new ID
         max_id = max([t['id'] for t in HERA_DATA['main']['tasks']], default=0)
-        new_task = {
+        new_task = build_record('tasks', {
             'id': max_id + 1,
-            'task': data['task'],
-            'deadline': data['deadline'],
+            'task': request_value(data, 'task'),
+            'deadline': request_value(data, 'deadline'),
             'status': data.get('status', 'Not Started'),
             'notes': data.get('notes', '')
-        }
+        })
 
         HERA_DATA['main']['tasks'].append(new_task)
+        reindex_item('tasks', new_task)
         save_data()
 
         return jsonify({'success': True, 'task': new_task})
 
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 @app.route('/api/tasks/<int:task_id>/delete', methods=['DELETE'])
@@ -1170,12 +1800,13 @@ def delete_task(task_id):
     try:
         # Remove task from main.tasks
         HERA_DATA['main']['tasks'] = [t for t in HERA_DATA['main']['tasks'] if t['id'] != task_id]
+        unindex_item('tasks', task_id)
         save_data()
 
         return jsonify({'success': True})
 
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 @app.route('/api/dashboard/data', methods=['GET'])
@@ -1187,57 +1818,103 @@ def get_dashboard_data():
         days_until = calculate_days_until_proposal()
 
         # Count completed tasks
-        completed_tasks = len([t for t in HERA_DATA['main']['tasks'] if 'Complete' in t['status']])
+        completed_tasks = collection_indexes['tasks'].count('completed', True)
         total_tasks = len(HERA_DATA['main']['tasks'])
 
         # Family stats
-        approved_family = len([f for f in HERA_DATA['family'] if f['status'] == 'Approved'])
+        approved_family = collection_indexes['family'].count('status', 'Approved')
         total_family = len(HERA_DATA['family'])
 
         # Packing stats
-        packed_items = len([p for p in HERA_DATA['packing'] if p['packed']])
+        packed_items = collection_indexes['packing'].count('packed', True)
         total_packing = len(HERA_DATA['packing'])
 
-        return jsonify({
-            'success': True,
-            'data': HERA_DATA,
-            'stats': {
-                'budget': budget_stats,
-                'days_until': days_until,
-                'tasks': {'completed': completed_tasks, 'total': total_tasks},
-                'family': {'approved': approved_family, 'total': total_family},
-                'packing': {'packed': packed_items, 'total': total_packing}
-            }
-        })
+        stats = {
+            'budget': budget_stats,
+            'days_until': days_until,
+            'tasks': {'completed': completed_tasks, 'total': total_tasks},
+            'family': {'approved': approved_family, 'total': total_family},
+            'packing': {'packed': packed_items, 'total': total_packing}
+        }
+
+        # Splice the cached encoding of HERA_DATA instead of re-encoding it
+        body = b'{"success":true,"data":' + fragments.encode(HERA_DATA) + b',"stats":' + json_dumps(stats) + b'}'
+        return app.response_class(body, mimetype='application/json')
 
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 @app.route('/api/files', methods=['GET'])
 @login_required
 def get_files():
-    """Get list of files with optional filtering"""
+    """Get a page of files with optional filtering, sorting and cursor pagination"""
     try:
-        category = request.args.get('category')
         search = request.args.get('search', '').lower()
+        args = request.args.to_dict()
+        args.setdefault('limit', FILES_PAGE_SIZE)
 
-        files_data = HERA_DATA.get('files', [])
+        name_filter = None
+        if search:
+            name_filter = lambda f: (search in f.get('original_name', '').lower()
+                                     or search in f.get('category', '').lower())
 
-        # Apply filters
-        if category and category != 'all':
-            files_data = [f for f in files_data if f.get('category') == category]
+        page = run_query(collection_indexes['files'], args, extra_filter=name_filter)
 
-        if search:
-            files_data = [f for f in files_data
-                          if search in f.get('original_name', '').lower()
-                          or search in f.get('category', '').lower()]
+        return jsonify({
+            'success': True,
+            'files': page['items'],
+            'next_cursor': page['next_cursor'],
+            'has_more': page['has_more']
+        })
+
+    except QueryError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return api_error(e)
+
+
+@app.route('/api/query/<collection>', methods=['GET'])
+@login_required
+def query_collection(collection):
+    """Cursor-paginated, sorted and filtered listing of any collection"""
+    try:
+        if collection not in collection_indexes:
+            return jsonify({'success': False, 'error': f"Unknown collection '{collection}'"}), 404
+
+        page = run_query(collection_indexes[collection], request.args)
+        return jsonify({'success': True, **page})
+
+    except QueryError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return api_error(e)
 
-        return jsonify({'success': True, 'files': files_data})
+
+@app.route('/api/search', methods=['GET'])
+@login_required
+def search():
+    """Full-text search across all collections with paging and highlighted snippets"""
+    try:
+        query = request.args.get('q', '').strip()
+        page = max(1, request.args.get('page', 1, type=int))
+        per_page = min(100, max(1, request.args.get('per_page', 20, type=int)))
+        collections = [c for c in request.args.get('collections', '').split(',') if c]
+
+        total, results = search_index.search(query, collections=collections or None,
+                                             offset=(page - 1) * per_page, limit=per_page)
+
+        return jsonify({
+            'success': True,
+            'query': query,
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'results': results
+        })
 
     except Exception as e:
-        print(f"Get files error: {e}")
-        return jsonify({'success': False, 'error': str(e)})
+        return api_error(e)
 
 
 if __name__ == '__main__':
@@ -1276,6 +1953,10 @@ if __name__ == '__main__':
     print(f"\n🎉 Days until proposal: {calculate_days_until_proposal()}")
     print("=" * 60)
 
+    # Pick up jobs left queued by the last run; under the reloader only the serving child works
+    if not debug_mode or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        jobs.start()
+
     try:
         app.run(debug=debug_mode, host='0.0.0.0', port=port)
     except KeyboardInterrupt:
@@ -0,0 +1,668 @@
+"""HERA benchmark harness
+
+Generates synthetic HERA_DATA at a configurable scale (10 to 1M items per
+collection) and measures the persistence/export paths, the indexes and the
+HTTP API. Results are printed as JSON so runs from different commits can be
+diffed.
+
+    python benchmark.py --scale 100000 formats
+    python benchmark.py --scale 10000 --requests 200 http
+    python benchmark.py --scale 10000 --requests 500 --concurrency 8 server
+"""
+import argparse
+import copy
+import csv
+import http.client
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from http.cookies import SimpleCookie
+
+import utils
+
+STATUSES = {
+    'budget': ['Paid', 'Outstanding'],
+    'family': ['Approved', 'Pending', 'Not Asked'],
+    'tasks': ['Complete, On Schedule', 'In Progress, On Schedule', 'Not Started, On Schedule'],
+    'files': ['travel', 'reservations', 'photos', 'documents', 'other'],
+    'packing': ['Essential', 'Equipment', 'Clothing', 'Personal Care', 'General'],
+}
+WORDS = ['lake', 'banff', 'dinner', 'lodge', 'drive', 'gondola', 'summit', 'breakfast', 'photoshoot',
+         'emerald', 'canalta', 'reservation', 'scenic', 'spa', 'hot', 'tub', 'flight', 'yoho', 'falls']
+
+
+def _words(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+
+def synthetic_data(scale, seed=42, collections=None):
+    """Build a HERA_DATA-shaped dict with `scale` items in every collection (or only in `collections`)"""
+    rng = random.Random(seed)
+    count = lambda name: scale if collections is None or name in collections else 0
+    start = date(2025, 9, 24)
+
+    tasks = [{'id': i, 'task': _words(rng, 3).title(), 'deadline': (start - timedelta(days=i % 120)).isoformat(),
+              'status': rng.choice(STATUSES['tasks']), 'notes': _words(rng, 8)} for i in range(1, count('tasks') + 1)]
+
+    budget = []
+    for i in range(1, count('budget') + 1):
+        amount = round(rng.uniform(10, 5000), 2)
+        saved = amount if rng.random() < 0.5 else 0
+        budget.append({'id': i, 'category': _words(rng, 1).title(), 'budget': amount, 'saved': saved,
+                       'remaining': amount - saved, 'notes': _words(rng, 6),
+                       'status': 'Paid' if saved else 'Outstanding', 'priority': rng.choice(['low', 'medium', 'high'])})
+
+    family = [{'id': i, 'name': f'Member {i}', 'status': rng.choice(STATUSES['family']),
+               'notes': _words(rng, 5)} for i in range(1, count('family') + 1)]
+
+    travel = []
+    for i in range(1, count('travel') + 1):
+        day = start + timedelta(days=i % 6)
+        hour = rng.randint(6, 20)
+        travel.append({'id': i, 'segment': f'{rng.choice(["IAD", "DEN", "YYC", "YYZ"])} - '
+                                           f'{rng.choice(["DEN", "YYC", "YYZ", "DCA"])}',
+                       'airline': 'United', 'flightNumber': f'UA{rng.randint(100, 9999)}',
+                       'departureTime': f'{(hour - 1) % 12 + 1}:{rng.randint(0, 59):02d} {"AM" if hour < 12 else "PM"}',
+                       'arrivalTime': f'{hour % 12 + 1}:{rng.randint(0, 59):02d} PM',
+                       'duration': '2h 30m', 'date': f'{day.month}/{day.day}/{day.year}',
+                       'confirmationNumber': 'AT9Z8V', 'seat': '2E, 2F', 'status': 'Confirmed'})
+
+    itinerary = []
+    for i in range(1, count('itinerary') + 1):
+        day = i % 6 + 1
+        itinerary.append({'id': i, 'date': (start + timedelta(days=day - 1)).isoformat(), 'day': day,
+                          'time': f'{rng.randint(6, 22):02d}:{rng.choice([0, 15, 30, 45]):02d}',
+                          'activity': _words(rng, 3).title(), 'location': _words(rng, 2).title(),
+                          'notes': _words(rng, 6), 'completed': rng.random() < 0.3})
+
+    packing = [{'id': i, 'item': _words(rng, 2).title(), 'packed': rng.random() < 0.5, 'notes': '',
+                'category': rng.choice(STATUSES['packing'])} for i in range(1, count('packing') + 1)]
+
+    files = []
+    for i in range(1, count('files') + 1):
+        size = rng.randint(1_000, 20_000_000)
+        files.append({'id': i, 'filename': f'file_{i}.pdf', 'original_name': f'{_words(rng, 2)}.pdf',
+                      'size': f'{round(size / 1024, 2)} KB', 'size_bytes': size, 'type': 'pdf',
+                      'category': rng.choice(STATUSES['files']), 'notes': _words(rng, 4),
+                      'upload_date': (datetime(2025, 6, 1) + timedelta(minutes=i)).isoformat(),
+                      'mimetype': 'application/pdf'})
+
+    return {
+        'main': {'tripDates': '9/24/2025 - 9/29/2025', 'proposalDate': '2025-09-26',
+                 'savingsTimeline': [{'amount': 5000, 'month': 'march'}], 'tasks': tasks},
+        'budget': budget,
+        'ring': {'Jeweler': 'GWFJ', 'Metal': 'Yellow Gold, 18k'},
+        'family': family,
+        'travel': travel,
+        'itinerary': itinerary,
+        'packing': packing,
+        'files': files,
+    }
+
+
+def _timed(fn, repeat=3):
+    """Best-of-`repeat` wall time in milliseconds and the last return value"""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 3), result
+
+
+def _git_revision():
+    """Commit hash of the benchmarked tree, so reports from different commits can be compared"""
+    try:
+        import subprocess
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _dir_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def bench_formats(data, workdir):
+    """Compare indented JSON, CSV and columnar exports by write/load time and size"""
+    results = {}
+
+    json_path = os.path.join(workdir, 'hera_data.json')
+
+    def write_json():
+        with open(json_path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    def load_json():
+        with open(json_path) as f:
+            return json.load(f)
+
+    write_ms, _ = _timed(write_json)
+    load_ms, _ = _timed(load_json)
+    results['json'] = {'write_ms': write_ms, 'load_ms': load_ms, 'bytes': _dir_size(json_path)}
+
+    csv_dir = os.path.join(workdir, 'csv')
+    collections = utils._columnar_collections(data)
+
+    def write_csv():
+        os.makedirs(csv_dir, exist_ok=True)
+        for name, rows in collections.items():
+            fields = sorted({key for row in rows for key in row})
+            with open(os.path.join(csv_dir, f'{name}.csv'), 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(rows)
+
+    def load_csv():
+        loaded = {}
+        for name in collections:
+            with open(os.path.join(csv_dir, f'{name}.csv'), newline='', encoding='utf-8') as f:
+                loaded[name] = list(csv.DictReader(f))
+        return loaded
+
+    write_ms, _ = _timed(write_csv)
+    load_ms, _ = _timed(load_csv)
+    results['csv'] = {'write_ms': write_ms, 'load_ms': load_ms, 'bytes': _dir_size(csv_dir)}
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        results['columnar'] = {'skipped': 'pyarrow is not installed'}
+        return results
+
+    for fmt in ('parquet', 'arrow'):
+        out_dir = os.path.join(workdir, fmt)
+        write_ms, (ok, message) = _timed(lambda: utils.export_to_columnar(data, output_dir=out_dir, fmt=fmt))
+        if not ok:
+            results[fmt] = {'error': message}
+            continue
+        paths = [os.path.join(out_dir, f) for f in os.listdir(out_dir)]
+        load_ms, _ = _timed(lambda: [utils.read_columnar(p, memory_map=False) for p in paths])
+        mmap_ms, _ = _timed(lambda: [utils.read_columnar(p, memory_map=True) for p in paths])
+        results[fmt] = {'write_ms': write_ms, 'load_ms': load_ms, 'mmap_load_ms': mmap_ms,
+                        'bytes': _dir_size(out_dir)}
+
+    return results
+
+
+def _percentiles(samples_ms):
+    ordered = sorted(samples_ms)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+    return {'p50_ms': pick(0.50), 'p99_ms': pick(0.99), 'max_ms': round(ordered[-1], 3), 'samples': len(ordered)}
+
+
+def bench_search(data, workdir, queries=200):
+    """Index build time and query latency of the full-text search index"""
+    from search import SearchIndex
+
+    index = SearchIndex()
+    collections = {'tasks': data['main']['tasks'], **{k: data[k] for k in
+                   ('budget', 'family', 'travel', 'itinerary', 'packing', 'files')}}
+
+    started = time.perf_counter()
+    for name, rows in collections.items():
+        for row in rows:
+            index.add(name, row)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    rng = random.Random(7)
+    query_kinds = {
+        'single_term': lambda: rng.choice(WORDS),
+        'prefix': lambda: rng.choice(WORDS)[:3],
+        'two_terms': lambda: f'{rng.choice(WORDS)} {rng.choice(WORDS)}',
+    }
+    latencies = {}
+    for kind, make_query in query_kinds.items():
+        samples = []
+        for _ in range(queries):
+            q = make_query()
+            started = time.perf_counter()
+            index.search(q, limit=20)
+            samples.append((time.perf_counter() - started) * 1000)
+        latencies[kind] = _percentiles(samples)
+
+    update_samples = []
+    for row in data['itinerary'][:queries]:
+        row = dict(row, notes=_words(rng, 6))
+        started = time.perf_counter()
+        index.add('itinerary', row)
+        update_samples.append((time.perf_counter() - started) * 1000)
+
+    return {'documents': len(index), 'build_ms': round(build_ms, 3), 'query': latencies,
+            'incremental_update': _percentiles(update_samples)}
+
+
+def bench_indexes(data, workdir, repeat=20):
+    """Full-list partitioning (as the page routes used to do) vs secondary index lookups"""
+    from indexes import CollectionIndex
+
+    collections = {'tasks': data['main']['tasks'], 'family': data['family'], 'packing': data['packing'],
+                   'files': data['files'], 'travel': data['travel']}
+    indexes = {}
+    started = time.perf_counter()
+    for name, rows in collections.items():
+        indexes[name] = CollectionIndex(name)
+        for row in rows:
+            indexes[name].add(row)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    def scan():
+        return {
+            'approved': len([f for f in data['family'] if f['status'] == 'Approved']),
+            'packed': len([p for p in data['packing'] if p['packed']]),
+            'completed': len([t for t in data['main']['tasks'] if 'Complete' in t['status']]),
+            'files_by_category': {c: len([f for f in data['files'] if f.get('category') == c])
+                                  for c in STATUSES['files']},
+            'flights': len([t for t in data['travel'] if ' - ' in t.get('segment', '')]),
+        }
+
+    def lookup():
+        return {
+            'approved': indexes['family'].count('status', 'Approved'),
+            'packed': indexes['packing'].count('packed', True),
+            'completed': indexes['tasks'].count('completed', True),
+            'files_by_category': {c: indexes['files'].count('category', c) for c in STATUSES['files']},
+            'flights': indexes['travel'].count('segment_type', 'flight'),
+        }
+
+    scan_ms, scanned = _timed(scan, repeat)
+    lookup_ms, looked_up = _timed(lookup, repeat)
+
+    problems = []
+    for name, rows in collections.items():
+        problems.extend(indexes[name].validate(rows))
+    validate_ms, _ = _timed(lambda: [indexes[n].validate(r) for n, r in collections.items()], 1)
+
+    update_samples = []
+    for row in data['packing'][:1000]:
+        row['packed'] = not row['packed']
+        started = time.perf_counter()
+        indexes['packing'].add(row)
+        update_samples.append((time.perf_counter() - started) * 1000)
+
+    return {'build_ms': round(build_ms, 3), 'scan_ms': scan_ms, 'lookup_ms': lookup_ms,
+            'results_match': scanned == looked_up, 'validate_ms': validate_ms, 'problems': problems,
+            'incremental_update': _percentiles(update_samples)}
+
+
+def bench_serializer(data, workdir, repeat=3):
+    """Snapshot encode/decode throughput and size: indented json.dump vs the serializer module"""
+    import serializer
+
+    results = {}
+    encoders = {
+        'json_indent': (lambda: json.dumps(data, indent=2).encode(), json.loads),
+        'json_compact': (lambda: json.dumps(data, separators=(',', ':')).encode(), json.loads),
+        f'serializer_{serializer.BACKEND}': (lambda: serializer.dumps(data), serializer.loads),
+    }
+    for name, (encode, decode) in encoders.items():
+        encode_ms, encoded = _timed(encode, repeat)
+        decode_ms, _ = _timed(lambda: decode(encoded), repeat)
+        mb = len(encoded) / 1_000_000
+        results[name] = {'encode_ms': encode_ms, 'decode_ms': decode_ms, 'bytes': len(encoded),
+                         'encode_mb_per_s': round(mb / (encode_ms / 1000), 2) if encode_ms else None,
+                         'decode_mb_per_s': round(mb / (decode_ms / 1000), 2) if decode_ms else None}
+
+    # Re-encoding the snapshot after one record changed, as save_data() does
+    cache = serializer.FragmentCache()
+    cold_ms, _ = _timed(lambda: (cache.clear(), cache.encode(data)), repeat)
+
+    def touched():
+        data['packing'][0]['packed'] = not data['packing'][0]['packed']
+        cache.touch('packing')
+        return cache.encode(data)
+
+    warm_ms, encoded = _timed(touched, repeat)
+    results['fragment_cache'] = {'cold_ms': cold_ms, 'one_collection_changed_ms': warm_ms,
+                                 'matches_full_encode': serializer.loads(encoded) == data}
+    return results
+
+
+def bench_records(data, workdir):
+    """Memory and load time of itinerary items as plain dicts vs slotted records"""
+    import gc
+    import tracemalloc
+
+    import serializer
+    from records import ItineraryItem, hydrate
+
+    encoded = serializer.dumps(data['itinerary'])
+    del data
+
+    def measure(build):
+        gc.collect()
+        tracemalloc.start()
+        started = time.perf_counter()
+        items = build()
+        elapsed = (time.perf_counter() - started) * 1000
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return items, {'load_ms': round(elapsed, 3), 'bytes': size, 'bytes_per_item': round(size / len(items), 1)}
+
+    dicts, results_dicts = measure(lambda: serializer.loads(encoded))
+    count = len(dicts)
+    del dicts
+    _, results_records = measure(lambda: [ItineraryItem(item) for item in serializer.loads(encoded)])
+
+    sample = serializer.loads(encoded)[:1000]
+    round_trip = serializer.loads(serializer.dumps(hydrate({'main': {}, 'itinerary': list(sample)})['itinerary']))
+    return {'items': count, 'dicts': results_dicts, 'records': results_records,
+            'saving_pct': round(100 * (1 - results_records['bytes'] / results_dicts['bytes']), 1),
+            'round_trip_matches': round_trip == sample}
+
+
+def bench_jobs(data, workdir, worker_counts=(1, 2, 4, 8), job_ms=5):
+    """Background job throughput against worker count, with I/O-bound jobs of `job_ms` each"""
+    from jobs import JobQueue
+
+    count = min(len(data['itinerary']), 400)
+    results = {}
+    for workers in worker_counts:
+        queue = JobQueue(os.path.join(workdir, f'jobs_{workers}.sqlite3'), workers=0)
+        queue.handler('bench.sleep')(lambda: time.sleep(job_ms / 1000))
+        for _ in range(count):
+            queue.enqueue('bench.sleep')
+        threads = [threading.Thread(target=queue.work, kwargs={'once': True}) for _ in range(workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        counts = queue.counts()
+        results[str(workers)] = {'jobs': count, 'elapsed_s': round(elapsed, 3),
+                                 'jobs_per_second': round(count / elapsed, 1), 'done': counts['done']}
+    return results
+
+
+UPLOAD_BYTES = 64 * 1024
+# Uploads are sniffed, so the payload needs a real PDF signature
+UPLOAD_PAYLOAD = b'%PDF-1.4\n' + os.urandom(UPLOAD_BYTES - 9)
+
+
+def _load_app(data, workdir):
+    """Import the Flask app against `data`, with uploads and hera_data.json kept in `workdir`"""
+    os.chdir(workdir)
+    with open('hera_data.json', 'w') as f:
+        json.dump(data, f)
+
+    # Measure the routes themselves, not the rate limiter (set HERA_ADMISSION=1 to include it)
+    os.environ.setdefault('HERA_ADMISSION', '0')
+    import app as hera
+    hera.app.config['TESTING'] = True
+    hera.app.static_folder = os.path.join(workdir, 'static')
+    hera.load_data()
+    return hera
+
+
+def _api_scenarios(scale, requests):
+    """(name, method, path, json body) generators for the routes under test
+
+    Each generator takes the request number so toggles, updates and deletes
+    hit existing records and never repeat a delete.
+    """
+    ids = lambda i: i % scale + 1
+    return [
+        ('dashboard', 'GET', lambda i: '/dashboard', None),
+        ('get_dashboard_data', 'GET', lambda i: '/api/dashboard/data', None),
+        ('toggle_budget_status', 'POST', lambda i: f'/api/budget/{ids(i)}/toggle', None),
+        ('toggle_packing_status', 'POST', lambda i: f'/api/packing/{ids(i)}/toggle', None),
+        ('toggle_task_status', 'POST', lambda i: f'/api/tasks/{ids(i)}/toggle',
+         lambda i: {'completed': i % 2 == 0}),
+        ('add_budget_item', 'POST', lambda i: '/api/budget/add',
+         lambda i: {'category': f'Bench {i}', 'budget_amount': 100, 'budget_saved': 0, 'status': 'Outstanding'}),
+        ('add_task', 'POST', lambda i: '/api/tasks/add',
+         lambda i: {'task': f'Bench task {i}', 'deadline': '2025-09-01'}),
+        ('update_budget_item', 'POST', lambda i: '/api/budget/update',
+         lambda i: {'id': ids(i), 'category': 'Updated', 'budget_amount': 250, 'budget_saved': 50,
+                    'status': 'Outstanding'}),
+        ('update_packing_item', 'POST', lambda i: '/api/packing/update',
+         lambda i: {'id': ids(i), 'field': 'notes', 'value': f'note {i}'}),
+        ('delete_budget_item', 'DELETE', lambda i: f'/api/budget/delete/{scale - i % scale}', None),
+        ('delete_task', 'DELETE', lambda i: f'/api/tasks/{scale - i % scale}/delete', None),
+    ]
+
+
+def _summary(latencies_ms, elapsed_s, errors):
+    summary = _percentiles(latencies_ms) if latencies_ms else {'samples': 0}
+    summary['throughput_rps'] = round(len(latencies_ms) / elapsed_s, 2) if elapsed_s else None
+    summary['errors'] = errors
+    return summary
+
+
+def _multipart(field, filename, payload):
+    boundary = uuid.uuid4().hex
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n').encode() + payload + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+def bench_http(data, workdir, requests=100):
+    """Drive the API through the Flask test client, one request at a time"""
+    hera = _load_app(data, workdir)
+    client = hera.app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+
+    results = {}
+    for name, method, path, body in _api_scenarios(len(data['budget']), requests):
+        latencies, errors = [], 0
+        started = time.perf_counter()
+        for i in range(requests):
+            kwargs = {'json': body(i)} if body else {}
+            sent = time.perf_counter()
+            response = client.open(path(i), method=method, **kwargs)
+            latencies.append((time.perf_counter() - sent) * 1000)
+            errors += response.status_code >= 400
+        results[name] = _summary(latencies, time.perf_counter() - started, errors)
+
+    payload = UPLOAD_PAYLOAD
+    latencies, errors, uploaded = [], 0, []
+    started = time.perf_counter()
+    for i in range(requests):
+        sent = time.perf_counter()
+        response = client.post('/api/files/upload', content_type='multipart/form-data',
+                               data={'files': (io.BytesIO(payload), f'bench_{i}.pdf')})
+        latencies.append((time.perf_counter() - sent) * 1000)
+        if response.status_code >= 400 or not response.get_json().get('success'):
+            errors += 1
+        else:
+            uploaded.extend(f['filename'] for f in response.get_json()['files'])
+    results['upload_files'] = _summary(latencies, time.perf_counter() - started, errors)
+
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for i in range(requests):
+        sent = time.perf_counter()
+        response = client.get(f'/api/files/download/{uploaded[i % len(uploaded)]}' if uploaded else '/api/files/download/x')
+        response.get_data()
+        response.close()
+        latencies.append((time.perf_counter() - sent) * 1000)
+        errors += response.status_code >= 400
+    results['download_file'] = _summary(latencies, time.perf_counter() - started, errors)
+
+    return {'requests_per_route': requests, 'upload_bytes': UPLOAD_BYTES, 'routes': results}
+
+
+class _HttpClient:
+    """Keep-alive HTTP/1.1 connection carrying the session cookie"""
+
+    def __init__(self, port):
+        self.port = port
+        self.cookie = ''
+        self.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+
+    def request(self, method, path, body=None, content_type=None):
+        headers = {'Cookie': self.cookie} if self.cookie else {}
+        if content_type:
+            headers['Content-Type'] = content_type
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+        except (http.client.HTTPException, OSError):
+            self.connection.close()
+            self.connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+            return 599, b''
+        content = response.read()
+        if response.getheader('Set-Cookie'):
+            cookie = SimpleCookie(response.getheader('Set-Cookie'))
+            self.cookie = '; '.join(f'{k}={v.value}' for k, v in cookie.items())
+        return response.status, content
+
+    def login(self):
+        self.request('POST', '/login', 'username=admin&password=admin123', 'application/x-www-form-urlencoded')
+
+
+def bench_server(data, workdir, requests=200, concurrency=4):
+    """Drive the API over real HTTP with `concurrency` keep-alive clients per route"""
+    from werkzeug.serving import make_server, WSGIRequestHandler
+
+    hera = _load_app(data, workdir)
+    WSGIRequestHandler.protocol_version = 'HTTP/1.1'
+    WSGIRequestHandler.log_request = lambda *args, **kwargs: None
+    server = make_server('127.0.0.1', 0, hera.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    clients = [_HttpClient(server.server_port) for _ in range(concurrency)]
+    for client in clients:
+        client.login()
+
+    def run(make_request):
+        """Split `requests` across the clients; returns the route summary and response bodies"""
+        latencies, bodies, errors = [], [], [0]
+        lock = threading.Lock()
+
+        def worker(client, numbers):
+            for i in numbers:
+                sent = time.perf_counter()
+                status, content = make_request(client, i)
+                elapsed = (time.perf_counter() - sent) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                    bodies.append(content)
+                    errors[0] += status >= 400
+
+        threads = [threading.Thread(target=worker, args=(client, range(n, requests, concurrency)))
+                   for n, client in enumerate(clients)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return _summary(latencies, time.perf_counter() - started, errors[0]), bodies
+
+    results = {}
+    try:
+        for name, method, path, body in _api_scenarios(len(data['budget']), requests):
+            results[name], _ = run(lambda client, i: client.request(
+                method, path(i), json.dumps(body(i)) if body else None, 'application/json' if body else None))
+
+        payload = UPLOAD_PAYLOAD
+
+        def upload(client, i):
+            body, content_type = _multipart('files', f'bench_{i}.pdf', payload)
+            return client.request('POST', '/api/files/upload', body, content_type)
+
+        results['upload_files'], bodies = run(upload)
+        uploaded = []
+        for content in bodies:
+            try:
+                uploaded.extend(f['filename'] for f in json.loads(content).get('files', []))
+            except ValueError:
+                continue
+
+        results['download_file'], _ = run(lambda client, i: client.request(
+            'GET', f'/api/files/download/{uploaded[i % len(uploaded)]}' if uploaded else '/api/files/download/x'))
+    finally:
+        server.shutdown()
+
+    return {'requests_per_route': requests, 'concurrency': concurrency, 'upload_bytes': UPLOAD_BYTES,
+            'routes': results}
+
+
+BENCHMARKS = {
+    'formats': bench_formats,
+    'search': bench_search,
+    'indexes': bench_indexes,
+    'serializer': bench_serializer,
+    'records': bench_records,
+    'http': bench_http,
+    'server': bench_server,
+    'jobs': bench_jobs,
+}
+
+# Collections a benchmark needs, so large runs only generate those
+BENCHMARK_COLLECTIONS = {
+    'records': ('itinerary',),
+    'jobs': ('itinerary',),
+}
+
+# Command line options forwarded to benchmarks that accept them
+BENCHMARK_OPTIONS = {
+    'http': ('requests',),
+    'server': ('requests', 'concurrency'),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='HERA benchmark harness')
+    parser.add_argument('benchmarks', nargs='*', default=list(BENCHMARKS), help='benchmarks to run')
+    parser.add_argument('--scale', type=int, default=1000, help='items per collection')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=100, help='requests per route (http, server)')
+    parser.add_argument('--concurrency', type=int, default=4, help='concurrent HTTP clients (server)')
+    parser.add_argument('--output', help='write JSON results to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f'unknown benchmark(s): {", ".join(unknown)}')
+
+    needed = set()
+    for name in args.benchmarks:
+        if name not in BENCHMARK_COLLECTIONS:
+            needed = None
+            break
+        needed.update(BENCHMARK_COLLECTIONS[name])
+    data = synthetic_data(args.scale, seed=args.seed, collections=needed)
+    report = {
+        'scale': args.scale,
+        'seed': args.seed,
+        'commit': _git_revision(),
+        'python': sys.version.split()[0],
+        'timestamp': datetime.now().isoformat(),
+        'results': {},
+    }
+
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix='hera_bench_')
+    try:
+        for name in args.benchmarks:
+            options = {option: getattr(args, option) for option in BENCHMARK_OPTIONS.get(name, ())}
+            run_data = data if len(args.benchmarks) == 1 else copy.deepcopy(data)
+            report['results'][name] = BENCHMARKS[name](run_data, workdir, **options)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
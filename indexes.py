@@ -0,0 +1,212 @@
+"""Secondary indexes maintained alongside the HERA_DATA collections"""
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+
+from query import normalize_date
+
+MAX_SORTED_INDEXES = 16
+
+
+def segment_type(item):
+    """Classify a travel segment as flight, hotel, car or other"""
+    segment = item.get('segment', '')
+    if item.get('flightNumber') or (' - ' in segment and segment.split(' - ')[0].isupper()):
+        return 'flight'
+    if 'Hotel' in segment:
+        return 'hotel'
+    if 'Rental Car' in segment or 'Car' in segment:
+        return 'car'
+    return 'other'
+
+
+# Equality indexes kept per collection: index name -> value extractor
+HASH_INDEXES = {
+    'tasks': {
+        'status': lambda t: t.get('status'),
+        'completed': lambda t: 'Complete' in t.get('status', ''),
+        'deadline': lambda t: normalize_date(t.get('deadline')),
+    },
+    'budget': {
+        'status': lambda b: b.get('status'),
+        'category': lambda b: b.get('category'),
+    },
+    'family': {
+        'status': lambda f: f.get('status'),
+    },
+    'travel': {
+        'segment_type': segment_type,
+        'date': lambda t: normalize_date(t.get('date') or t.get('pickupDate')),
+    },
+    'itinerary': {
+        'day': lambda i: i.get('day'),
+        'date': lambda i: normalize_date(i.get('date')),
+        'completed': lambda i: bool(i.get('completed')),
+    },
+    'packing': {
+        'category': lambda p: p.get('category'),
+        'packed': lambda p: bool(p.get('packed')),
+    },
+    'files': {
+        'category': lambda f: f.get('category', 'other'),
+        'type': lambda f: f.get('type'),
+        'uploaded_by': lambda f: f.get('uploaded_by'),
+    },
+}
+
+
+class HashIndex:
+    """Maps each value of a derived key to the set of record ids holding it"""
+
+    def __init__(self, key_func):
+        self._key_func = key_func
+        self._ids = {}     # value -> set of ids
+        self._values = {}  # id -> value
+
+    def clear(self):
+        self._ids.clear()
+        self._values.clear()
+
+    def add(self, item):
+        self.remove(item['id'])
+        value = self._key_func(item)
+        self._ids.setdefault(value, set()).add(item['id'])
+        self._values[item['id']] = value
+
+    def remove(self, item_id):
+        if item_id not in self._values:
+            return
+        value = self._values.pop(item_id)
+        ids = self._ids[value]
+        ids.discard(item_id)
+        if not ids:
+            del self._ids[value]
+
+    def ids(self, value):
+        return self._ids.get(value, set())
+
+    def count(self, value):
+        return len(self._ids.get(value, ()))
+
+    def values(self):
+        return list(self._ids)
+
+    def counts(self):
+        return {value: len(ids) for value, ids in self._ids.items()}
+
+    def groups(self):
+        """Each value and the set of ids holding it; callers must not modify the sets"""
+        return self._ids.items()
+
+
+class SortedIndex:
+    """Record ids kept ordered by a sort key, updated one record at a time"""
+
+    def __init__(self, key_func):
+        self._key_func = key_func
+        self._entries = []  # sorted (key, id)
+        self._keys = {}     # id -> (key, id)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def entries(self):
+        return list(self._entries)
+
+    def add(self, item):
+        self.remove(item['id'])
+        entry = (self._key_func(item), item['id'])
+        insort(self._entries, entry)
+        self._keys[item['id']] = entry
+
+    def remove(self, item_id):
+        entry = self._keys.pop(item_id, None)
+        if entry is None:
+            return
+        index = bisect_left(self._entries, entry)
+        if index < len(self._entries) and self._entries[index] == entry:
+            del self._entries[index]
+
+    def ids_after(self, position=None):
+        """Yield ids in order, starting after the (key, id) `position`"""
+        start = bisect_right(self._entries, position) if position is not None else 0
+        for index in range(start, len(self._entries)):
+            yield self._entries[index][1]
+
+
+class CollectionIndex:
+    """Id lookup, equality indexes and lazily built sorted indexes for one collection"""
+
+    def __init__(self, name):
+        self.name = name
+        self.records = {}
+        self.hashed = {field: HashIndex(key_func) for field, key_func in HASH_INDEXES.get(name, {}).items()}
+        self._sorted = OrderedDict()
+
+    def add(self, item):
+        self.records[item['id']] = item
+        for index in self.hashed.values():
+            index.add(item)
+        for index in self._sorted.values():
+            index.add(item)
+
+    def remove(self, item_id):
+        self.records.pop(item_id, None)
+        for index in self.hashed.values():
+            index.remove(item_id)
+        for index in self._sorted.values():
+            index.remove(item_id)
+
+    def clear(self):
+        self.records.clear()
+        for index in self.hashed.values():
+            index.clear()
+        self._sorted.clear()
+
+    def count(self, field, value):
+        return self.hashed[field].count(value)
+
+    def lookup(self, field, value):
+        """Records whose `field` index value equals `value`, in id order"""
+        return [self.records[item_id] for item_id in sorted(self.hashed[field].ids(value))]
+
+    def validate(self, items):
+        """Compare every index against a fresh scan of `items`; returns a list of problems"""
+        problems = []
+        by_id = {item['id']: item for item in items}
+        if len(by_id) != len(items):
+            problems.append(f'{self.name}: duplicate ids in collection')
+        if set(by_id) != set(self.records):
+            missing = sorted(set(by_id) - set(self.records), key=str)
+            stale = sorted(set(self.records) - set(by_id), key=str)
+            problems.append(f'{self.name}: records out of sync (missing={missing}, stale={stale})')
+        for item_id, item in by_id.items():
+            if item_id in self.records and self.records[item_id] is not item:
+                problems.append(f'{self.name}: record {item_id} points at a replaced object')
+
+        for field, index in self.hashed.items():
+            expected = {}
+            for item in by_id.values():
+                expected.setdefault(index._key_func(item), set()).add(item['id'])
+            if expected != index._ids:
+                problems.append(f'{self.name}.{field}: hash index does not match collection')
+
+        for name, index in self._sorted.items():
+            expected = sorted((index._key_func(item), item['id']) for item in by_id.values())
+            if expected != index.entries():
+                problems.append(f'{self.name}[{name}]: sorted index does not match collection')
+
+        return problems
+
+    def sorted_index(self, name, key_func):
+        """Return the sorted index called `name`, building it on first use"""
+        index = self._sorted.get(name)
+        if index is None:
+            index = SortedIndex(key_func)
+            for item in self.records.values():
+                index.add(item)
+            self._sorted[name] = index
+            if len(self._sorted) > MAX_SORTED_INDEXES:
+                self._sorted.popitem(last=False)
+        else:
+            self._sorted.move_to_end(name)
+        return index
@@ -0,0 +1,288 @@
+"""Background job queue persisted in SQLite
+
+Jobs are rows in hera_jobs.sqlite3 and survive restarts. Worker threads
+claim the highest-priority job that is due, run its registered handler and
+record the result; failed jobs are retried with exponential backoff until
+they run out of attempts. A job left 'running' by a worker that died is
+reclaimed once its lease expires (a live worker renews the lease while
+its handler runs), so several processes can share one queue. Run
+`python jobs.py` to start a standalone worker process.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+from contextlib import closing
+
+from flask import jsonify, request
+from flask_login import login_required
+
+from metrics import metrics
+
+JOBS_DB = 'hera_jobs.sqlite3'
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_ATTEMPTS = 3
+BACKOFF_SECONDS = 2.0
+LEASE_SECONDS = 300
+HEARTBEAT_SECONDS = LEASE_SECONDS / 3
+POLL_SECONDS = 1.0
+KEEP_FINISHED_SECONDS = 7 * 24 * 3600
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_at REAL NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, priority DESC, run_at);
+'''
+
+STATUSES = ('queued', 'running', 'done', 'failed')
+
+
+class UnknownJob(ValueError):
+    """Raised when a job kind has no registered handler"""
+
+
+def _row(row):
+    job = dict(row)
+    job['payload'] = json.loads(job['payload'])
+    job['result'] = json.loads(job['result']) if job['result'] is not None else None
+    return job
+
+
+class JobQueue:
+    """SQLite-backed priority queue with an in-process worker pool"""
+
+    def __init__(self, path=JOBS_DB, workers=DEFAULT_WORKERS):
+        self.path = path
+        self.workers = workers
+        self.handlers = {}
+        self._threads = []
+        self._wake = threading.Condition()
+        self._stopping = False
+        self._ready = False
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        if not self._ready:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.executescript(SCHEMA)
+            self._ready = True
+        return connection
+
+    def handler(self, kind):
+        """Register the function that runs jobs of `kind`; it is called with the payload as kwargs"""
+        def decorator(fn):
+            self.handlers[kind] = fn
+            return fn
+        return decorator
+
+    # Producer side
+
+    def enqueue(self, kind, priority=0, max_attempts=DEFAULT_MAX_ATTEMPTS, delay=0, **payload):
+        """Queue a job and return its id; higher priorities run first"""
+        if kind not in self.handlers:
+            raise UnknownJob(f"No handler registered for job '{kind}'")
+        now = time.time()
+        with closing(self._connect()) as connection:
+            cursor = connection.execute(
+                'INSERT INTO jobs (kind, payload, priority, max_attempts, run_at, created, updated) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (kind, json.dumps(payload), priority, max_attempts, now + delay, now, now))
+        metrics.inc('hera_jobs_total', kind=kind, outcome='queued')
+        self.start()
+        with self._wake:
+            self._wake.notify()
+        return cursor.lastrowid
+
+    def get(self, job_id):
+        with closing(self._connect()) as connection:
+            row = connection.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return _row(row) if row else None
+
+    def list(self, status=None, limit=50):
+        query, params = 'SELECT * FROM jobs', ()
+        if status:
+            query, params = query + ' WHERE status = ?', (status,)
+        with closing(self._connect()) as connection:
+            rows = connection.execute(f'{query} ORDER BY id DESC LIMIT ?', params + (limit,)).fetchall()
+        return [_row(row) for row in rows]
+
+    def counts(self):
+        with closing(self._connect()) as connection:
+            rows = connection.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+        return {status: 0 for status in STATUSES} | {status: count for status, count in rows}
+
+    # Worker side
+
+    def claim(self):
+        """Mark the next due job as running and return it, or None"""
+        now = time.time()
+        with closing(self._connect()) as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            row = connection.execute(
+                "SELECT * FROM jobs WHERE (status = 'queued' AND run_at <= ?) "
+                "OR (status = 'running' AND updated < ?) ORDER BY priority DESC, run_at LIMIT 1",
+                (now, now - LEASE_SECONDS)).fetchone()
+            if row is not None:
+                connection.execute("UPDATE jobs SET status = 'running', attempts = attempts + 1, updated = ? "
+                                   "WHERE id = ?", (now, row['id']))
+            connection.execute('COMMIT')
+        if row is None:
+            return None
+        job = _row(row)
+        job['attempts'] += 1
+        return job
+
+    def run(self, job):
+        """Run a claimed job and record its outcome"""
+        started = time.perf_counter()
+        try:
+            handler = self.handlers.get(job['kind'])
+            if handler is None:
+                raise UnknownJob(f"No handler registered for job '{job['kind']}'")
+            done = threading.Event()
+            heartbeat = threading.Thread(target=self._heartbeat, args=(job['id'], done),
+                                         name=f"hera-jobs-heartbeat-{job['id']}", daemon=True)
+            heartbeat.start()
+            try:
+                result = handler(**job['payload'])
+            finally:
+                done.set()
+                heartbeat.join()
+        except Exception as e:
+            retry = job['attempts'] < job['max_attempts'] and not isinstance(e, UnknownJob)
+            now = time.time()
+            with closing(self._connect()) as connection:
+                connection.execute(
+                    'UPDATE jobs SET status = ?, run_at = ?, updated = ?, error = ? WHERE id = ?',
+                    ('queued' if retry else 'failed', now + BACKOFF_SECONDS * 2 ** (job['attempts'] - 1), now,
+                     ''.join(traceback.format_exception_only(type(e), e)).strip(), job['id']))
+            metrics.inc('hera_jobs_total', kind=job['kind'], outcome='retried' if retry else 'failed')
+            return False
+        with closing(self._connect()) as connection:
+            connection.execute("UPDATE jobs SET status = 'done', updated = ?, result = ?, error = NULL WHERE id = ?",
+                               (time.time(), json.dumps(result), job['id']))
+        metrics.inc('hera_jobs_total', kind=job['kind'], outcome='done')
+        metrics.observe('hera_job_duration_seconds', time.perf_counter() - started, kind=job['kind'])
+        return True
+
+    def _heartbeat(self, job_id, done):
+        """Renew a running job's lease until `done` is set, so long jobs are not reclaimed"""
+        while not done.wait(HEARTBEAT_SECONDS):
+            with closing(self._connect()) as connection:
+                connection.execute("UPDATE jobs SET updated = ? WHERE id = ? AND status = 'running'",
+                                   (time.time(), job_id))
+
+    def work(self, once=False):
+        """Claim and run jobs until stopped (or until the queue is empty with once=True)"""
+        while not self._stopping:
+            job = self.claim()
+            if job is not None:
+                self.run(job)
+                continue
+            if once:
+                return
+            with self._wake:
+                self._wake.wait(POLL_SECONDS)
+
+    def purge(self, older_than=KEEP_FINISHED_SECONDS):
+        """Delete finished jobs older than `older_than` seconds"""
+        with closing(self._connect()) as connection:
+            connection.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated < ?",
+                               (time.time() - older_than,))
+
+    def start(self):
+        """Start the in-process worker threads (once)"""
+        if self._threads or self.workers <= 0:
+            return
+        with self._wake:
+            if self._threads:
+                return
+            self._stopping = False
+            for i in range(self.workers):
+                thread = threading.Thread(target=self.work, name=f'hera-jobs-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        self._stopping = True
+        with self._wake:
+            self._wake.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    # Flask wiring
+
+    def init_app(self, app):
+        self.path = app.config.get('JOBS_DB', JOBS_DB)
+        self.workers = app.config.get('JOB_WORKERS', DEFAULT_WORKERS)
+        metrics.describe('hera_jobs_total', 'counter', 'Background jobs by kind and outcome')
+        metrics.describe('hera_job_duration_seconds', 'histogram', 'Background job run time by kind')
+        # Workers otherwise only start on the first enqueue, leaving jobs queued
+        # before a restart (and expired leases) untouched; start() is a no-op once running
+        app.before_request(self.start)
+        app.add_url_rule('/api/jobs', 'list_jobs', login_required(self._list_view))
+        app.add_url_rule('/api/jobs/<int:job_id>', 'get_job', login_required(self._job_view))
+
+    def _list_view(self):
+        status = request.args.get('status')
+        if status and status not in STATUSES:
+            return jsonify({'success': False, 'error': f"status must be one of {', '.join(STATUSES)}"}), 400
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        return jsonify({'success': True, 'counts': self.counts(), 'jobs': self.list(status, limit)})
+
+    def _job_view(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        return jsonify({'success': True, 'job': job})
+
+
+jobs = JobQueue()
+
+
+def configure(app):
+    """Read HERA_JOBS_DB / HERA_JOB_WORKERS from the environment and wire up the app"""
+    app.config.setdefault('JOBS_DB', os.environ.get('HERA_JOBS_DB', JOBS_DB))
+    app.config.setdefault('JOB_WORKERS', int(os.environ.get('HERA_JOB_WORKERS', DEFAULT_WORKERS)))
+    jobs.init_app(app)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run HERA background job workers')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args(argv)
+
+    # Importing app registers the handlers on the `jobs` module's queue
+    # (this file runs as __main__, a separate module object)
+    import app  # noqa: F401
+    from jobs import jobs as queue
+    queue.workers = args.workers
+    queue.start()
+    print(f'Running {args.workers} job workers on {queue.path}')
+    try:
+        while True:
+            time.sleep(3600)
+            queue.purge()
+    except KeyboardInterrupt:
+        queue.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""Request, persistence and error instrumentation exposed in Prometheus text format
+
+Disabled unless HERA_METRICS is set; when disabled no request hooks are
+registered and the record_* helpers return immediately.
+"""
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import Response, abort, g, request
+from flask import before_render_template, template_rendered
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+THROUGHPUT_BUCKETS = (1e4, 1e5, 1e6, 1e7, 5e7, 1e8, 5e8)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+def _labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    escaped = (f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), " ")}"'
+               for k, v in items)
+    return '{' + ','.join(escaped) + '}'
+
+
+class Metrics:
+    """Thread-safe counters and histograms keyed by (name, labels)"""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+
+    def describe(self, name, kind, text):
+        self._help[name] = (kind, text)
+
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda kv: kv[0])
+            snapshots = [(key, list(h.buckets), list(h.counts), h.total, h.count) for key, h in histograms]
+
+        seen = set()
+
+        def header(name):
+            if name not in seen and name in self._help:
+                kind, text = self._help[name]
+                lines.append(f'# HELP {name} {text}')
+                lines.append(f'# TYPE {name} {kind}')
+            seen.add(name)
+
+        for (name, labels), value in counters:
+            header(name)
+            lines.append(f'{name}{_labels(labels)} {value}')
+
+        for (name, labels), buckets, counts, total, count in snapshots:
+            header(name)
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{_labels(labels, ("le", bound))} {cumulative}')
+            lines.append(f'{name}_bucket{_labels(labels, ("le", "+Inf"))} {count}')
+            lines.append(f'{name}_sum{_labels(labels)} {total}')
+            lines.append(f'{name}_count{_labels(labels)} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+    # Instrumentation helpers used by app.py
+
+    def record_save(self, seconds, bytes_written):
+        self.observe('hera_save_data_duration_seconds', seconds)
+        self.observe('hera_save_data_bytes', bytes_written, buckets=SIZE_BUCKETS)
+        self.inc('hera_save_data_bytes_total', bytes_written)
+
+    def record_upload(self, route, bytes_received, seconds):
+        self.inc('hera_upload_bytes_total', bytes_received, route=route)
+        if seconds > 0:
+            self.observe('hera_upload_throughput_bytes_per_second', bytes_received / seconds,
+                         buckets=THROUGHPUT_BUCKETS, route=route)
+
+    def track_upload(self, route):
+        """Decorator recording request body size and throughput of an upload view"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return view(*args, **kwargs)
+                started = time.perf_counter()
+                response = view(*args, **kwargs)
+                self.record_upload(route, request.content_length or 0, time.perf_counter() - started)
+                return response
+            return wrapper
+        return decorator
+
+    def record_error(self, exc):
+        self.inc('hera_errors_total', endpoint=request.endpoint if request else None,
+                 exception=type(exc).__name__)
+
+    # Flask wiring
+
+    def init_app(self, app):
+        self.enabled = app.config.get('METRICS_ENABLED', False)
+        self.token = app.config.get('METRICS_TOKEN')
+
+        self.describe('hera_http_requests_total', 'counter', 'HTTP requests by endpoint, method and status')
+        self.describe('hera_http_request_duration_seconds', 'histogram', 'Request latency by endpoint')
+        self.describe('hera_http_response_size_bytes', 'histogram', 'Response body size by endpoint')
+        self.describe('hera_template_render_seconds', 'histogram', 'Jinja render time by template')
+        self.describe('hera_save_data_duration_seconds', 'histogram', 'save_data() duration')
+        self.describe('hera_save_data_bytes', 'histogram', 'Bytes written per save_data() call')
+        self.describe('hera_save_data_bytes_total', 'counter', 'Total bytes written by save_data()')
+        self.describe('hera_upload_bytes_total', 'counter', 'Bytes received by upload routes')
+        self.describe('hera_upload_throughput_bytes_per_second', 'histogram', 'Upload request throughput')
+        self.describe('hera_errors_total', 'counter', 'Exceptions caught by API routes, by exception type')
+
+        app.add_url_rule('/metrics', 'metrics', self._metrics_view)
+
+        if not self.enabled:
+            return
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+
+    def _before_request(self):
+        g._metrics_started = time.perf_counter()
+
+    def _after_request(self, response):
+        started = g.pop('_metrics_started', None)
+        if started is not None:
+            endpoint = request.endpoint or 'unmatched'
+            self.observe('hera_http_request_duration_seconds', time.perf_counter() - started,
+                         endpoint=endpoint, method=request.method)
+            self.observe('hera_http_response_size_bytes', response.content_length or 0,
+                         buckets=SIZE_BUCKETS, endpoint=endpoint)
+            self.inc('hera_http_requests_total', endpoint=endpoint, method=request.method,
+                     status=response.status_code)
+        return response
+
+    def _before_render(self, sender, template, context, **extra):
+        g.setdefault('_metrics_renders', []).append(time.perf_counter())
+
+    def _after_render(self, sender, template, context, **extra):
+        renders = g.get('_metrics_renders')
+        if renders:
+            self.observe('hera_template_render_seconds', time.perf_counter() - renders.pop(),
+                         template=template.name)
+
+    def _metrics_view(self):
+        if not self.enabled:
+            abort(404)
+        if self.token:
+            if request.headers.get('Authorization') != f'Bearer {self.token}':
+                abort(401)
+        else:
+            from flask_login import current_user
+            if not current_user.is_authenticated:
+                abort(401)
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+metrics = Metrics()
+
+
+def configure(app):
+    """Read HERA_METRICS / HERA_METRICS_TOKEN from the environment and wire up the app"""
+    app.config.setdefault('METRICS_ENABLED', os.environ.get('HERA_METRICS', '').lower() in ('1', 'true', 'yes'))
+    app.config.setdefault('METRICS_TOKEN', os.environ.get('HERA_METRICS_TOKEN'))
+    metrics.init_app(app)
@@ -0,0 +1,106 @@
+"""Offline support: fingerprinted static URLs and the service worker
+
+url_for('static', ...) URLs for the app's own css/js/images carry a
+?v=<content hash>, so browsers and the service worker can cache them
+indefinitely; a changed file gets a new URL. /sw.js is rendered from
+templates/sw.js with the assets and pages to precache and a version
+derived from their fingerprints, so any asset change installs a fresh
+worker that drops the old caches. LAZY_MODULES lists page code that is
+fetched on first use (HERA.loadModule) rather than with the page.
+"""
+import hashlib
+import os
+import threading
+
+from flask import current_app, render_template, request, url_for
+
+FINGERPRINTED_DIRS = ('css', 'js', 'images')
+OFFLINE_PAGES = ('dashboard', 'budget', 'ring', 'family', 'travel', 'itinerary', 'packing', 'files')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+LAZY_MODULES = {
+    'ring-media': ('js/ring-media.js', 'css/ring-media.css'),
+}
+
+
+class AssetFingerprints:
+    """Content hashes of static files, recomputed only when a file's mtime changes"""
+
+    def __init__(self):
+        self.static_folder = None
+        self._cache = {}  # filename -> (mtime_ns, digest)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.static_folder = app.static_folder
+        app.url_defaults(self._url_defaults)
+        app.after_request(self._cache_headers)
+        app.add_url_rule('/sw.js', 'service_worker', self._service_worker_view)
+        app.context_processor(lambda: {'lazy_modules': self.lazy_modules})
+
+    def fingerprint(self, filename):
+        """Short content hash of a static file, or None if it is not fingerprinted"""
+        if filename.split('/', 1)[0] not in FINGERPRINTED_DIRS:
+            return None
+        path = os.path.join(self.static_folder, filename)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        cached = self._cache.get(filename)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        with self._lock:
+            self._cache[filename] = (mtime, digest)
+        return digest
+
+    def assets(self):
+        """Fingerprinted static files, relative to the static folder"""
+        files = []
+        for directory in FINGERPRINTED_DIRS:
+            root = os.path.join(self.static_folder, directory)
+            for dirpath, _, filenames in os.walk(root):
+                for name in filenames:
+                    files.append(os.path.relpath(os.path.join(dirpath, name), self.static_folder).replace(os.sep, '/'))
+        return sorted(files)
+
+    def lazy_modules(self):
+        """Fingerprinted URLs of each lazily loaded module's files"""
+        return {name: [url_for('static', filename=filename) for filename in files]
+                for name, files in LAZY_MODULES.items()}
+
+    def version(self, assets):
+        digest = hashlib.sha256()
+        for filename in assets:
+            digest.update(f'{filename}:{self.fingerprint(filename)}\n'.encode())
+        return digest.hexdigest()[:12]
+
+    def _url_defaults(self, endpoint, values):
+        if endpoint == 'static' and 'v' not in values:
+            fingerprint = self.fingerprint(values.get('filename', ''))
+            if fingerprint:
+                values['v'] = fingerprint
+
+    def _cache_headers(self, response):
+        if request.endpoint == 'static' and request.args.get('v') and response.status_code == 200:
+            response.headers['Cache-Control'] = IMMUTABLE
+        return response
+
+    def _service_worker_view(self):
+        assets = self.assets()
+        body = render_template('sw.js',
+                               version=self.version(assets),
+                               assets=[url_for('static', filename=filename) for filename in assets],
+                               pages=[url_for(endpoint) for endpoint in OFFLINE_PAGES])
+        response = current_app.response_class(body, mimetype='application/javascript')
+        # The browser checks for a new worker on navigation; never serve it stale
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+
+assets = AssetFingerprints()
+
+
+def configure(app):
+    assets.init_app(app)
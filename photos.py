@@ -0,0 +1,376 @@
+"""Ring photo library backed by hera_photos.json
+
+Photos live in static/uploads/ring. Each one's metadata (pixel size, file
+size, upload time and, from EXIF, capture time, camera and orientation) is
+recorded in the index when it is uploaded, read from the file header alone,
+so the gallery renders, sorts and filters from the index without listing
+the directory or opening an image. With Pillow installed, a
+background job also writes a small progressive JPEG thumbnail and a tiny
+blurred placeholder (LQIP) that the page shows while the real image loads.
+Run `python photos.py` to re-index the directory after copying photos in.
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import struct
+import threading
+from datetime import datetime
+
+from indexes import CollectionIndex
+from query import run_query
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # optional dependency
+    Image = None
+
+PHOTOS_FILE = 'hera_photos.json'
+PHOTOS_DIR = os.path.join('static', 'uploads', 'ring')
+THUMBNAIL_DIR = 'thumbs'
+PHOTO_EXTENSIONS = ('png', 'jpg', 'jpeg', 'gif', 'webp')
+THUMBNAIL_SIZE = 320
+PLACEHOLDER_SIZE = 16
+HEADER_BYTES = 256 * 1024  # room for a large EXIF block before the JPEG frame header
+
+
+# EXIF orientations that rotate the photo a quarter turn (width and height swap)
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+EXIF_ORIENTATION, EXIF_MAKE, EXIF_MODEL, EXIF_DATETIME = 0x0112, 0x010F, 0x0110, 0x0132
+EXIF_IFD_POINTER, EXIF_DATETIME_ORIGINAL = 0x8769, 0x9003
+
+
+def _jpeg_segments(data):
+    """Yield (marker, payload) for each JPEG segment up to the image data"""
+    offset = 2
+    while offset + 4 <= len(data):
+        if data[offset] != 0xFF:
+            return
+        marker = data[offset + 1]
+        if marker == 0xFF:  # fill byte
+            offset += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:  # markers without a length
+            offset += 2
+            continue
+        if marker == 0xDA:  # start of scan
+            return
+        length = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+        yield marker, data[offset + 4:offset + 2 + length]
+        offset += 2 + length
+
+
+def _jpeg_size(data):
+    for marker, payload in _jpeg_segments(data):
+        # SOF0-SOF15 carry the frame size; C4, C8 and CC are other markers
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC) and len(payload) >= 5:
+            height, width = struct.unpack('>HH', payload[1:5])
+            return width, height
+    return None
+
+
+def _webp_size(data):
+    chunk = data[12:16]
+    if chunk == b'VP8 ' and len(data) >= 30:
+        width, height = struct.unpack('<HH', data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(data) >= 25:
+        bits = int.from_bytes(data[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X' and len(data) >= 30:
+        return int.from_bytes(data[24:27], 'little') + 1, int.from_bytes(data[27:30], 'little') + 1
+    return None
+
+
+def image_size(data):
+    """(width, height) from the first bytes of a PNG, GIF, JPEG or WebP file, or None"""
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        return struct.unpack('>II', data[16:24])
+    if data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+        return struct.unpack('<HH', data[6:10])
+    if data[:2] == b'\xff\xd8':
+        return _jpeg_size(data)
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return _webp_size(data)
+    return None
+
+
+def _exif_block(data):
+    """The TIFF-structured EXIF block of a JPEG, PNG or WebP file, or None"""
+    if data[:2] == b'\xff\xd8':
+        for marker, payload in _jpeg_segments(data):
+            if marker == 0xE1 and payload[:6] == b'Exif\x00\x00':
+                return payload[6:]
+        return None
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        offset, chunk_type = 8, None
+        while offset + 8 <= len(data) and chunk_type != b'IEND':
+            length, chunk_type = struct.unpack('>I4s', data[offset:offset + 8])
+            if chunk_type == b'eXIf':
+                return data[offset + 8:offset + 8 + length]
+            offset += 12 + length
+        return None
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        offset = 12
+        while offset + 8 <= len(data):
+            chunk_type, length = struct.unpack('<4sI', data[offset:offset + 8])
+            if chunk_type == b'EXIF':
+                block = data[offset + 8:offset + 8 + length]
+                return block[6:] if block[:6] == b'Exif\x00\x00' else block
+            offset += 8 + length + (length & 1)
+    return None
+
+
+def _ifd(tiff, offset, order):
+    """Tag -> value for the ASCII, SHORT and LONG entries of one TIFF IFD"""
+    tags = {}
+    if offset + 2 > len(tiff):
+        return tags
+    count = struct.unpack(order + 'H', tiff[offset:offset + 2])[0]
+    for entry in range(offset + 2, min(offset + 2 + 12 * count, len(tiff) - 11), 12):
+        tag, kind, length = struct.unpack(order + 'HHI', tiff[entry:entry + 8])
+        if kind == 2:  # ASCII, stored inline when it fits in four bytes
+            start = entry + 8 if length <= 4 else struct.unpack(order + 'I', tiff[entry + 8:entry + 12])[0]
+            tags[tag] = tiff[start:start + length].split(b'\x00', 1)[0].decode('ascii', 'replace').strip()
+        elif kind == 3:
+            tags[tag] = struct.unpack(order + 'H', tiff[entry + 8:entry + 10])[0]
+        elif kind == 4:
+            tags[tag] = struct.unpack(order + 'I', tiff[entry + 8:entry + 12])[0]
+    return tags
+
+
+def _exif_time(value):
+    try:
+        return datetime.strptime(value[:19], '%Y:%m:%d %H:%M:%S').isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+def read_exif(data):
+    """Capture time, camera and orientation from the first bytes of a photo"""
+    exif = {'taken': None, 'camera': None, 'orientation': 1}
+    tiff = _exif_block(data)
+    if not tiff or tiff[:4] not in (b'II*\x00', b'MM\x00*'):
+        return exif
+    order = '<' if tiff[:2] == b'II' else '>'
+    try:
+        tags = _ifd(tiff, struct.unpack(order + 'I', tiff[4:8])[0], order)
+        if EXIF_IFD_POINTER in tags:
+            tags.update(_ifd(tiff, tags[EXIF_IFD_POINTER], order))
+    except struct.error:
+        return exif  # truncated or malformed; keep what the defaults say
+
+    make, model = tags.get(EXIF_MAKE) or '', tags.get(EXIF_MODEL) or ''
+    exif['camera'] = (model if model.lower().startswith(make.lower()) else f'{make} {model}').strip() or None
+    exif['taken'] = _exif_time(tags.get(EXIF_DATETIME_ORIGINAL)) or _exif_time(tags.get(EXIF_DATETIME))
+    if tags.get(EXIF_ORIENTATION) in range(1, 9):
+        exif['orientation'] = tags[EXIF_ORIENTATION]
+    return exif
+
+
+def is_photo(filename):
+    return filename.rsplit('.', 1)[-1].lower() in PHOTO_EXTENSIONS if '.' in filename else False
+
+
+class PhotoLibrary:
+    """Photo metadata keyed by filename, persisted as JSON and cached per file version
+
+    Records are also held in a CollectionIndex ('photos'), so gallery queries
+    run through query.run_query like the other collections.
+    """
+
+    def __init__(self, path=PHOTOS_FILE, directory=PHOTOS_DIR):
+        self.path = path
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._photos = {}
+        self._version = None
+        self.index = CollectionIndex('photos')
+
+    def init_app(self, app):
+        self.directory = os.path.join(app.static_folder, 'uploads', 'ring')
+
+    @property
+    def can_derive(self):
+        """Whether thumbnails and placeholders can be made (needs Pillow)"""
+        return Image is not None
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self):
+        """Reload the index if it changed since the last read"""
+        version = self._stat()
+        if version == self._version:
+            return
+        with self._lock:
+            version = self._stat()
+            if version == self._version:
+                return
+            if version is None:
+                self._photos = {}
+            else:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._photos = json.load(f)
+            index = CollectionIndex('photos')
+            for filename, record in self._photos.items():
+                record.setdefault('id', filename)
+                index.add(record)
+            self.index = index
+            self._version = version
+
+    def _write(self):
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._photos, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self._version = self._stat()
+
+    def _describe(self, filename, uploaded=None):
+        path = os.path.join(self.directory, filename)
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_BYTES)
+        width, height = image_size(header) or (None, None)
+        exif = read_exif(header)
+        if exif['orientation'] in ROTATED_ORIENTATIONS:
+            width, height = height, width  # as displayed
+        return {
+            'id': filename,
+            'filename': filename,
+            'width': width,
+            'height': height,
+            'size': os.path.getsize(path),
+            'uploaded': uploaded or datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec='seconds'),
+            'taken': exif['taken'],
+            'camera': exif['camera'],
+            'orientation': exif['orientation'],
+            'session': None,
+            'thumbnail': None,
+            'placeholder': None,
+        }
+
+    def add(self, filename, session_for=None):
+        """Index a photo just saved to the directory
+
+        `session_for(taken)` names the shoot a capture time belongs to.
+        """
+        record = self._describe(filename, uploaded=datetime.now().isoformat(timespec='seconds'))
+        if session_for and record['taken']:
+            record['session'] = session_for(record['taken'])
+        self._refresh()
+        with self._lock:
+            self._photos[filename] = record
+            self.index.add(record)
+            self._write()
+        return record
+
+    def update(self, filename, **fields):
+        self._refresh()
+        with self._lock:
+            record = self._photos.get(filename)
+            if record is None:
+                return None  # deleted meanwhile
+            record.update(fields)
+            self.index.add(record)
+            self._write()
+            return record
+
+    def remove(self, filename):
+        """Drop a photo's record and its thumbnail (the caller deletes the photo)"""
+        self._refresh()
+        with self._lock:
+            record = self._photos.pop(filename, None)
+            if record is None:
+                return None
+            self.index.remove(filename)
+            self._write()
+        if record.get('thumbnail'):
+            try:
+                os.remove(os.path.join(self.directory, record['thumbnail']))
+            except FileNotFoundError:
+                pass
+        return record
+
+    def get(self, filename):
+        self._refresh()
+        return self._photos.get(filename)
+
+    def list(self):
+        """Records in upload order"""
+        self._refresh()
+        return sorted(self._photos.values(), key=lambda record: (record['uploaded'], record['filename']))
+
+    def query(self, args):
+        """A sorted, filtered page of records (see query.run_query)"""
+        self._refresh()
+        return run_query(self.index, args)
+
+    def sync(self):
+        """Index photos in the directory the index has not seen; returns their filenames"""
+        if not os.path.isdir(self.directory):
+            return []
+        self._refresh()
+        present = {name for name in os.listdir(self.directory)
+                   if is_photo(name) and os.path.isfile(os.path.join(self.directory, name))}
+        with self._lock:
+            added = sorted(present - set(self._photos))
+            removed = set(self._photos) - present
+            if not added and not removed:
+                return []
+            for filename in added:
+                self._photos[filename] = self._describe(filename)
+                self.index.add(self._photos[filename])
+            for filename in removed:
+                del self._photos[filename]
+                self.index.remove(filename)
+            self._write()
+        return added
+
+    def derive(self, filename):
+        """Write a photo's thumbnail and placeholder and record them (needs Pillow)"""
+        if Image is None or self.get(filename) is None:
+            return None
+        with Image.open(os.path.join(self.directory, filename)) as image:
+            image = ImageOps.exif_transpose(image).convert('RGB')
+            image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            os.makedirs(os.path.join(self.directory, THUMBNAIL_DIR), exist_ok=True)
+            thumbnail = f"{THUMBNAIL_DIR}/{filename.rsplit('.', 1)[0]}.jpg"
+            # Progressive, so a partly downloaded thumbnail already shows the whole photo
+            image.save(os.path.join(self.directory, thumbnail), 'JPEG', quality=80,
+                       optimize=True, progressive=True)
+            image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+            buffer = io.BytesIO()
+            image.save(buffer, 'JPEG', quality=40)
+        placeholder = 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+        return self.update(filename, thumbnail=thumbnail, placeholder=placeholder)
+
+
+photos = PhotoLibrary()
+
+
+def configure(app):
+    photos.init_app(app)
+    # First run with an existing photo directory: index what is already there
+    if not os.path.exists(photos.path):
+        photos.sync()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Re-index the ring photo directory')
+    parser.add_argument('--derive', action='store_true',
+                        help='also make thumbnails and placeholders for newly indexed photos')
+    args = parser.parse_args(argv)
+    added = photos.sync()
+    if args.derive:
+        for filename in added:
+            photos.derive(filename)
+    print(f'Indexed {len(added)} new photo(s); {len(photos.list())} in total')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""Opt-in sampling profiler for slow requests
+
+A single background thread samples the Python stack of every request being
+profiled. Profiles are kept for requests on HERA_PROFILE_ROUTES, requests
+carrying the X-Hera-Profile admin header, and any request slower than
+HERA_PROFILE_THRESHOLD_MS. The last HERA_PROFILE_KEEP profiles are held in
+memory and served as collapsed stacks or speedscope JSON.
+"""
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+from flask import Response, abort, g, jsonify, request
+from flask_login import current_user, login_required
+
+PROFILE_HEADER = 'X-Hera-Profile'
+DEFAULT_INTERVAL_MS = 5
+DEFAULT_KEEP = 20
+MAX_STACK_DEPTH = 128
+
+
+def _stack(frame):
+    """Root-first tuple of (file, function, first line) for a frame"""
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+def _frame_name(frame):
+    filename, function, line = frame
+    return f'{function} ({os.path.basename(filename)}:{line})'
+
+
+class Profile:
+    __slots__ = ('id', 'endpoint', 'method', 'path', 'reason', 'started', 'duration_ms', 'interval_ms', 'samples')
+
+    def __init__(self, profile_id, reason, interval_ms):
+        self.id = profile_id
+        self.endpoint = request.endpoint
+        self.method = request.method
+        self.path = request.full_path.rstrip('?')
+        self.reason = reason
+        self.started = datetime.now().isoformat()
+        self.duration_ms = None
+        self.interval_ms = interval_ms
+        self.samples = Counter()
+
+    def summary(self):
+        return {
+            'id': self.id,
+            'endpoint': self.endpoint,
+            'method': self.method,
+            'path': self.path,
+            'reason': self.reason,
+            'started': self.started,
+            'duration_ms': self.duration_ms,
+            'samples': sum(self.samples.values()),
+        }
+
+    def collapsed(self):
+        """Brendan Gregg's collapsed stack format, one 'a;b;c count' line per stack"""
+        return '\n'.join(f"{';'.join(_frame_name(f) for f in stack)} {count}"
+                         for stack, count in self.samples.most_common()) + '\n'
+
+    def speedscope(self):
+        """Sampled profile in the speedscope file format"""
+        frames, frame_ids, samples, weights = [], {}, [], []
+        for stack, count in self.samples.most_common():
+            ids = []
+            for frame in stack:
+                if frame not in frame_ids:
+                    frame_ids[frame] = len(frames)
+                    frames.append({'name': frame[1], 'file': frame[0], 'line': frame[2]})
+                ids.append(frame_ids[frame])
+            samples.append(ids)
+            weights.append(count * self.interval_ms)
+        name = f'{self.method} {self.path}'
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'hera-profiler',
+            'activeProfileIndex': 0,
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': samples,
+                'weights': weights,
+            }],
+        }
+
+
+class Profiler:
+    """Samples request threads from one background thread while any profile is active"""
+
+    def __init__(self):
+        self.enabled = False
+        self.routes = set()
+        self.threshold_ms = None
+        self.token = None
+        self.interval_ms = DEFAULT_INTERVAL_MS
+        self._profiles = deque(maxlen=DEFAULT_KEEP)
+        self._active = {}  # thread id -> Profile
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._ids = itertools.count(1)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('PROFILE_ENABLED', False)
+        self.routes = set(app.config.get('PROFILE_ROUTES', ()))
+        self.threshold_ms = app.config.get('PROFILE_THRESHOLD_MS')
+        self.token = app.config.get('PROFILE_TOKEN')
+        self.interval_ms = app.config.get('PROFILE_INTERVAL_MS', DEFAULT_INTERVAL_MS)
+        self._profiles = deque(maxlen=app.config.get('PROFILE_KEEP', DEFAULT_KEEP))
+
+        app.add_url_rule('/api/profiles', 'list_profiles', login_required(self._list_view))
+        app.add_url_rule('/api/profiles/<int:profile_id>', 'get_profile', login_required(self._profile_view))
+
+        if not self.enabled:
+            return
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    # Sampling
+
+    def _ensure_sampler(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._sample_loop, name='hera-profiler', daemon=True)
+            self._thread.start()
+
+    def _sample_loop(self):
+        interval = self.interval_ms / 1000
+        while True:
+            self._wake.wait()
+            with self._lock:
+                targets = list(self._active.items())
+                if not targets:
+                    self._wake.clear()
+                    continue
+            frames = sys._current_frames()
+            for thread_id, profile in targets:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    profile.samples[_stack(frame)] += 1
+            del frames
+            time.sleep(interval)
+
+    def _reason(self):
+        """Why this request should be profiled, or None"""
+        header = request.headers.get(PROFILE_HEADER)
+        if header:
+            if self.token:
+                if header == self.token:
+                    return 'header'
+            elif current_user.is_authenticated:
+                return 'header'
+        if request.endpoint in self.routes:
+            return 'route'
+        if self.threshold_ms is not None:
+            return 'threshold'
+        return None
+
+    def _before_request(self):
+        reason = self._reason()
+        if reason is None:
+            return
+        self._ensure_sampler()
+        profile = Profile(next(self._ids), reason, self.interval_ms)
+        g._profile = profile
+        g._profile_started = time.perf_counter()
+        with self._lock:
+            self._active[threading.get_ident()] = profile
+        self._wake.set()
+
+    def _finish(self):
+        profile = g.pop('_profile', None)
+        if profile is None:
+            return None
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+        profile.duration_ms = round((time.perf_counter() - g.pop('_profile_started')) * 1000, 3)
+        if profile.reason == 'threshold' and profile.duration_ms < self.threshold_ms:
+            return None
+        with self._lock:
+            self._profiles.append(profile)
+        return profile
+
+    def _after_request(self, response):
+        profile = self._finish()
+        if profile is not None:
+            response.headers['X-Hera-Profile-Id'] = str(profile.id)
+        return response
+
+    def _teardown_request(self, exc):
+        # Requests that raised never reach after_request
+        self._finish()
+
+    # Endpoints
+
+    def _list_view(self):
+        if not self.enabled:
+            abort(404)
+        with self._lock:
+            profiles = [p.summary() for p in reversed(self._profiles)]
+        return jsonify({'success': True, 'profiles': profiles})
+
+    def _profile_view(self, profile_id):
+        if not self.enabled:
+            abort(404)
+        with self._lock:
+            profile = next((p for p in self._profiles if p.id == profile_id), None)
+        if profile is None:
+            return jsonify({'success': False, 'error': 'Profile not found'}), 404
+        if request.args.get('format') == 'collapsed':
+            return Response(profile.collapsed(), mimetype='text/plain')
+        response = jsonify(profile.speedscope())
+        response.headers['Content-Disposition'] = f'attachment; filename=hera_profile_{profile.id}.speedscope.json'
+        return response
+
+
+profiler = Profiler()
+
+
+def configure(app):
+    """Read the HERA_PROFILE_* environment variables and wire up the app"""
+    env = os.environ.get
+    routes = [r.strip() for r in env('HERA_PROFILE_ROUTES', '').split(',') if r.strip()]
+    threshold = env('HERA_PROFILE_THRESHOLD_MS')
+    app.config.setdefault('PROFILE_ENABLED', env('HERA_PROFILE', '').lower() in ('1', 'true', 'yes'))
+    app.config.setdefault('PROFILE_ROUTES', routes)
+    app.config.setdefault('PROFILE_THRESHOLD_MS', float(threshold) if threshold else None)
+    app.config.setdefault('PROFILE_TOKEN', env('HERA_PROFILE_TOKEN'))
+    app.config.setdefault('PROFILE_INTERVAL_MS', float(env('HERA_PROFILE_INTERVAL_MS', DEFAULT_INTERVAL_MS)))
+    app.config.setdefault('PROFILE_KEEP', int(env('HERA_PROFILE_KEEP', DEFAULT_KEEP)))
+    profiler.init_app(app)
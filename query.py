@@ -0,0 +1,269 @@
+"""Uniform paginated query layer over HERA_DATA collections
+
+Queries walk a SortedIndex from an opaque cursor instead of sorting the full
+collection per request, applying filters as they go.
+"""
+import base64
+import json
+from datetime import datetime
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def _text(value):
+    return str(value).lower() if value not in (None, '') else None
+
+
+def _number(value):
+    try:
+        return float(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_date(value):
+    """Parse '2025-09-24', '9/24/2025' and ISO timestamps to a date"""
+    if not value:
+        return None
+    value = str(value).strip()
+    for fmt, text in (('%Y-%m-%d', value[:10]), ('%m/%d/%Y', value)):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_time(value):
+    """Parse '15:15', '8:15 AM' and ranges like '08:00–10:00' (their start) to a time"""
+    if not value:
+        return None
+    value = str(value).replace('–', '-').split('-')[0].strip()
+    for fmt in ('%H:%M', '%I:%M %p'):
+        try:
+            return datetime.strptime(value, fmt).time()
+        except ValueError:
+            continue
+    return None
+
+
+def normalize_date(value):
+    """Normalize any date parse_date accepts to 'YYYY-MM-DD'"""
+    parsed = parse_date(value)
+    return parsed.isoformat() if parsed else None
+
+
+def normalize_time(value):
+    """Normalize any time parse_time accepts to zero-padded 24h 'HH:MM'"""
+    parsed = parse_time(value)
+    return parsed.strftime('%H:%M') if parsed else None
+
+
+def _timestamp(value):
+    return str(value) if value else None
+
+
+def _field(name, normalize):
+    extract = lambda item: normalize(item.get(name))
+    # The type a non-None extracted value has, for checking decoded cursors
+    extract.type = (int, float) if normalize is _number else str
+    return extract
+
+
+# Sortable fields per collection: query name -> extractor returning a
+# normalized, mutually comparable value (or None)
+SORT_FIELDS = {
+    'itinerary': {'id': _field('id', _number), 'day': _field('day', _number), 'date': _field('date', normalize_date),
+                  'time': _field('time', normalize_time), 'activity': _field('activity', _text)},
+    'tasks': {'id': _field('id', _number), 'deadline': _field('deadline', normalize_date), 'status': _field('status', _text),
+              'task': _field('task', _text)},
+    'budget': {'id': _field('id', _number), 'amount': _field('budget', _number), 'saved': _field('saved', _number),
+               'remaining': _field('remaining', _number), 'category': _field('category', _text),
+               'status': _field('status', _text)},
+    'family': {'id': _field('id', _number), 'name': _field('name', _text), 'status': _field('status', _text)},
+    'travel': {'id': _field('id', _number), 'date': _field('date', normalize_date),
+               'departure': _field('departureTime', normalize_time), 'segment': _field('segment', _text)},
+    'packing': {'id': _field('id', _number), 'item': _field('item', _text), 'category': _field('category', _text),
+                'packed': _field('packed', _number)},
+    'files': {'id': _field('id', _number), 'upload_date': _field('upload_date', _timestamp),
+              'size': _field('size_bytes', _number), 'name': _field('original_name', _text),
+              'category': _field('category', _text)},
+    'photos': {'id': _field('id', _text), 'taken': _field('taken', _timestamp), 'uploaded': _field('uploaded', _timestamp),
+               'size': _field('size', _number), 'camera': _field('camera', _text), 'session': _field('session', _text)},
+}
+
+# Record id types where they are not ints
+ID_TYPES = {'photos': str}
+
+DEFAULT_SORTS = {
+    'itinerary': 'day,time',
+    'tasks': 'deadline',
+    'budget': 'id',
+    'family': 'id',
+    'travel': 'id',
+    'packing': 'category,item',
+    'files': '-upload_date',
+    'photos': 'taken,uploaded',
+}
+
+# Exact-match filters (?category=a,b) and the field used for date ranges
+FILTER_FIELDS = {
+    'itinerary': {'day': 'day', 'completed': 'completed'},
+    'tasks': {'status': 'status'},
+    'budget': {'category': 'category', 'status': 'status', 'priority': 'priority'},
+    'family': {'status': 'status'},
+    'travel': {'status': 'status'},
+    'packing': {'category': 'category', 'packed': 'packed', 'priority': 'priority'},
+    'files': {'category': 'category', 'type': 'type'},
+    'photos': {'session': 'session', 'camera': 'camera', 'orientation': 'orientation'},
+}
+DATE_FIELDS = {'itinerary': 'date', 'tasks': 'deadline', 'travel': 'date', 'files': 'upload_date', 'photos': 'taken'}
+
+
+class QueryError(ValueError):
+    """Raised for malformed query parameters"""
+
+
+class Descending:
+    """Wraps a key component so it sorts in reverse"""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+class SortSpec:
+    """A parsed multi-field sort such as 'day,-time'; 'id' is always the final tie-breaker"""
+
+    def __init__(self, collection, spec=None):
+        fields = SORT_FIELDS[collection]
+        spec = spec or DEFAULT_SORTS[collection]
+        self.fields = []
+        for part in spec.split(','):
+            part = part.strip()
+            descending = part.startswith('-')
+            name = part.lstrip('-')
+            if name not in fields:
+                raise QueryError(f"Cannot sort {collection} by '{name}'")
+            self.fields.append((name, descending))
+        self.name = ','.join(('-' if d else '') + n for n, d in self.fields)
+        self._extractors = [fields[n] for n, _ in self.fields]
+        self.id_type = ID_TYPES.get(collection, int)
+
+    def values(self, item):
+        return [extract(item) for extract in self._extractors]
+
+    def accepts(self, values, item_id):
+        """Whether decoded cursor values and id have the types this sort produces"""
+        if not isinstance(values, list) or len(values) != len(self._extractors):
+            return False
+        if isinstance(item_id, bool) or not isinstance(item_id, self.id_type):
+            return False
+        return all(value is None or (isinstance(value, extract.type) and not isinstance(value, bool))
+                   for extract, value in zip(self._extractors, values))
+
+    def key_from_values(self, values):
+        key = []
+        for (name, descending), value in zip(self.fields, values):
+            missing = value is None
+            value = '' if missing else value
+            key.append((missing, Descending(value) if descending else value))
+        return tuple(key)
+
+    def key(self, item):
+        return self.key_from_values(self.values(item))
+
+
+def encode_cursor(spec, item):
+    payload = json.dumps([spec.name, spec.values(item), item['id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(spec, cursor):
+    """Return the (key, id) position a cursor points at"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        name, values, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise QueryError('Invalid cursor')
+    if name != spec.name:
+        raise QueryError('Cursor does not match the requested sort')
+    if not spec.accepts(values, item_id):
+        raise QueryError('Invalid cursor')
+    return spec.key_from_values(values), item_id
+
+
+def _truthy(value):
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+def build_filters(collection, args):
+    """Turn request args into a predicate over records"""
+    checks = []
+    for param, field_name in FILTER_FIELDS.get(collection, {}).items():
+        raw = args.get(param)
+        if raw in (None, '', 'all'):
+            continue
+        if param in ('packed', 'completed'):
+            wanted = _truthy(raw)
+            checks.append(lambda item, f=field_name, w=wanted: bool(item.get(f)) == w)
+        else:
+            wanted = {v.strip().lower() for v in raw.split(',')}
+            checks.append(lambda item, f=field_name, w=wanted: str(item.get(f, '')).lower() in w)
+
+    date_field = DATE_FIELDS.get(collection)
+    date_from, date_to = normalize_date(args.get('date_from')), normalize_date(args.get('date_to'))
+    if date_field and (date_from or date_to):
+        def in_range(item, f=date_field):
+            value = normalize_date(item.get(f))
+            if value is None:
+                return False
+            return (not date_from or value >= date_from) and (not date_to or value <= date_to)
+        checks.append(in_range)
+
+    return lambda item: all(check(item) for check in checks)
+
+
+def run_query(collection_index, args, extra_filter=None):
+    """Execute a query against a CollectionIndex; returns a JSON-ready page"""
+    collection = collection_index.name
+    if collection not in SORT_FIELDS:
+        raise QueryError(f"Unknown collection '{collection}'")
+
+    spec = SortSpec(collection, args.get('sort'))
+    try:
+        limit = int(args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise QueryError('limit must be an integer')
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    cursor = args.get('cursor')
+    position = decode_cursor(spec, cursor) if cursor else None
+    matches = build_filters(collection, args)
+
+    index = collection_index.sorted_index(spec.name, spec.key)
+    page = []
+    has_more = False
+    for item_id in index.ids_after(position):
+        item = collection_index.records[item_id]
+        if not matches(item) or (extra_filter and not extra_filter(item)):
+            continue
+        if len(page) == limit:
+            has_more = True
+            break
+        page.append(item)
+
+    return {
+        'items': page,
+        'sort': spec.name,
+        'limit': limit,
+        'has_more': has_more,
+        'next_cursor': encode_cursor(spec, page[-1]) if has_more else None,
+    }
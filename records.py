@@ -0,0 +1,277 @@
+"""Slotted record types for the HERA_DATA collections
+
+Each record stores its known fields in __slots__ instead of a per-record
+dict, coerces values to the field's type on assignment, and keeps any
+unknown keys in a small overflow dict. Records implement the mutable
+mapping protocol, so routes, indexes and templates keep using item['field']
+and item.get('field') unchanged.
+"""
+from collections.abc import Mapping, MutableMapping
+
+_MISSING = object()
+
+
+class RecordError(ValueError):
+    """Raised when a value does not match a record field's type"""
+
+
+def _str(field, value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return str(value)
+    raise RecordError(f"'{field}' must be a string")
+
+
+def _int(field, value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    raise RecordError(f"'{field}' must be an integer")
+
+
+def _number(field, value):
+    if value is None or (isinstance(value, (int, float)) and not isinstance(value, bool)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            pass
+    raise RecordError(f"'{field}' must be a number")
+
+
+def _bool(field, value):
+    if isinstance(value, bool):
+        return value
+    if value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.lower() in ('true', 'false', '1', '0', 'yes', 'no'):
+        return value.lower() in ('true', '1', 'yes')
+    raise RecordError(f"'{field}' must be true or false")
+
+
+class Record(MutableMapping):
+    """Base class; subclasses declare FIELDS (name -> coercer) and matching __slots__"""
+    __slots__ = ('_extra',)
+    FIELDS = {}
+    REQUIRED = ()
+
+    def __init__(self, values=()):
+        self._extra = None
+        fields = self.FIELDS
+        for key, value in (values.items() if isinstance(values, Mapping) else values):
+            coerce = fields.get(key)
+            if coerce is None:
+                if self._extra is None:
+                    self._extra = {}
+                self._extra[key] = value
+            else:
+                setattr(self, key, coerce(key, value))
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = getattr(self, key, _MISSING)
+        else:
+            value = self._extra.get(key, _MISSING) if self._extra else _MISSING
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            return getattr(self, key, default)
+        return self._extra.get(key, default) if self._extra else default
+
+    def __setitem__(self, key, value):
+        coerce = self.FIELDS.get(key)
+        if coerce is not None:
+            setattr(self, key, coerce(key, value))
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self.FIELDS:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        elif self._extra and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in self.FIELDS:
+            return hasattr(self, key)
+        return bool(self._extra) and key in self._extra
+
+    def __iter__(self):
+        for name in self.FIELDS:
+            if hasattr(self, name):
+                yield name
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.to_dict()!r})'
+
+    def to_dict(self):
+        return {key: self[key] for key in self}
+
+    def validate(self):
+        """Check required fields are present and non-empty; returns self"""
+        missing = [name for name in self.REQUIRED if self.get(name) in (None, '')]
+        if missing:
+            raise RecordError(f"{type(self).__name__} is missing {', '.join(repr(m) for m in missing)}")
+        return self
+
+
+class Task(Record):
+    FIELDS = {'id': _int, 'task': _str, 'deadline': _str, 'status': _str, 'notes': _str}
+    __slots__ = tuple(FIELDS)
+    REQUIRED = ('id', 'task', 'deadline')
+
+
+class BudgetItem(Record):
+    FIELDS = {'id': _int, 'category': _str, 'budget': _number, 'saved': _number, 'remaining': _number,
+              'notes': _str, 'status': _str, 'priority': _str}
+    __slots__ = tuple(FIELDS)
+    REQUIRED = ('id', 'category')
+
+
+class FamilyMember(Record):
+    FIELDS = {'id': _int, 'name': _str, 'status': _str, 'notes': _str}
+    __slots__ = tuple(FIELDS)
+    REQUIRED = ('id', 'name')
+
+
+class TravelSegment(Record):
+    FIELDS = {'id': _int, 'segment': _str, 'airline': _str, 'flightNumber': _str, 'departureTime': _str,
+              'arrivalTime': _str, 'duration': _str, 'date': _str, 'confirmationNumber': _str, 'seat': _str,
+              'status': _str, 'provider': _str, 'address': _str, 'phone': _str, 'checkIn': _str,
+              'checkOut': _str, 'roomType': _str, 'location': _str, 'pickupDate': _str, 'carType': _str,
+              'notes': _str}
+    __slots__ = tuple(FIELDS)
+    REQUIRED = ('id', 'segment')
+
+
+class ItineraryItem(Record):
+    FIELDS = {'id': _int, 'date': _str, 'day': _int, 'time': _str, 'end_time': _str, 'activity': _str,
+              'location': _str, 'notes': _str, 'isProposal': _bool, 'completed': _bool}
+    __slots__ = tuple(FIELDS)
+    REQUIRED = ('id', 'time', 'activity')
+
+
+def default_packing_category(name):
+    """Category for a packing item without one, based on its name"""
+    name = (name or '').lower()
+    if any(word in name for word in ['ring', 'documents', 'passport']):
+        return 'Essential'
+    if any(word in name for word in ['camera', 'tripod', 'gear']):
+        return 'Equipment'
+    if any(word in name for word in ['clothes', 'hiking']):
+        return 'Clothing'
+    if any(word in name for word in ['toiletries']):
+        return 'Personal Care'
+    return 'General'
+
+
+class PackingItem(Record):
+    FIELDS = {'id': _int, 'item': _str, 'category': _str, 'packed': _bool, 'notes': _str, 'quantity': _int,
+              'priority': _str}
+    __slots__ = tuple(FIELDS)
+    REQUIRED = ('id', 'item')
+
+    def __init__(self, values=()):
+        super().__init__(values)
+        if not self.get('category'):
+            self.category = default_packing_category(self.get('item'))
+
+    def __setitem__(self, key, value):
+        if key == 'category' and not value:
+            value = default_packing_category(self.get('item'))
+        super().__setitem__(key, value)
+
+
+class FileRecord(Record):
+    FIELDS = {'id': _int, 'filename': _str, 'original_name': _str, 'size': _str, 'size_bytes': _int,
+              'type': _str, 'category': _str, 'notes': _str, 'upload_date': _str, 'updated_date': _str,
+              'mimetype': _str, 'checksum': _str, 'uploaded_by': _str}
+    __slots__ = tuple(FIELDS)
+    REQUIRED = ('id', 'filename')
+
+
+RECORD_TYPES = {
+    'tasks': Task,
+    'budget': BudgetItem,
+    'family': FamilyMember,
+    'travel': TravelSegment,
+    'itinerary': ItineraryItem,
+    'packing': PackingItem,
+    'files': FileRecord,
+}
+
+
+def build_record(collection, values):
+    """Validated record for `collection` built from request data"""
+    return RECORD_TYPES[collection](values).validate()
+
+
+def coerce_update(collection, values):
+    """`values` coerced like `collection`'s record fields, without touching a record
+
+    'id' and fields the record type does not declare raise RecordError, so
+    a whole update is checked before any of it is applied.
+    """
+    fields = RECORD_TYPES[collection].FIELDS
+    changes = {}
+    for key, value in values.items():
+        if key == 'id' or key not in fields:
+            raise RecordError(f"'{key}' cannot be updated")
+        changes[key] = fields[key](key, value)
+    return changes
+
+
+REQUEST_TYPES = {'str': _str, 'int': _int, 'number': _number, 'bool': _bool}
+
+
+def request_value(data, key, kind=None, default=_MISSING):
+    """data[key] from a request body, coerced like a record field of type `kind`
+
+    A missing required key, a body that is not an object and a null or
+    malformed typed value all raise RecordError, which routes answer with
+    a 400. Without a `kind` the value is returned as sent.
+    """
+    if not isinstance(data, Mapping):
+        raise RecordError('Request body must be a JSON object')
+    if key not in data:
+        if default is _MISSING:
+            raise RecordError(f"'{key}' is required")
+        return default
+    value = data[key]
+    if kind is None:
+        return value
+    if value is None:
+        raise RecordError(f"'{key}' is required")
+    return REQUEST_TYPES[kind](key, value)
+
+
+def hydrate(data):
+    """Convert every HERA_DATA collection's dicts into records, in place"""
+    for collection, record_type in RECORD_TYPES.items():
+        items = data['main'].get('tasks') if collection == 'tasks' else data.get(collection)
+        if items:
+            items[:] = [item if isinstance(item, record_type) else record_type(item) for item in items]
+    return data
@@ -0,0 +1,193 @@
+"""In-memory full-text search over HERA_DATA collections"""
+import heapq
+import html
+import math
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+
+# Fields indexed per collection; the first field is used as the result title
+# and counts double when ranking.
+SEARCH_FIELDS = {
+    'itinerary': ['activity', 'location', 'notes'],
+    'tasks': ['task', 'notes', 'status'],
+    'budget': ['category', 'notes'],
+    'family': ['name', 'notes', 'status'],
+    'travel': ['segment', 'airline', 'provider', 'flightNumber', 'confirmationNumber', 'notes'],
+    'packing': ['item', 'category', 'notes'],
+    'files': ['original_name', 'category', 'notes'],
+}
+
+TITLE_BOOST = 2
+PREFIX_WEIGHT = 0.7
+MAX_PREFIX_EXPANSIONS = 64
+SNIPPET_RADIUS = 60
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize(text):
+    """Lowercase and strip accents so 'Café' matches 'cafe'"""
+    text = unicodedata.normalize('NFKD', str(text))
+    return ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text):
+    """Split text into normalized word tokens"""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(normalize(text))
+
+
+class SearchIndex:
+    """Inverted index with prefix matching and tf-idf ranking
+
+    Documents are keyed by (collection, id) and can be added, replaced or
+    removed one at a time, so mutation routes keep the index current without
+    rebuilding it.
+    """
+
+    def __init__(self):
+        self._postings = {}    # token -> {doc_key: weighted term frequency}
+        self._doc_terms = {}   # doc_key -> Counter of tokens
+        self._docs = {}        # doc_key -> (title, text)
+        self._vocabulary = []  # sorted tokens, for prefix lookups
+
+    def __len__(self):
+        return len(self._docs)
+
+    def clear(self):
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._docs.clear()
+        self._vocabulary.clear()
+
+    def add(self, collection, item):
+        """Index (or re-index) a single record"""
+        fields = SEARCH_FIELDS.get(collection)
+        if not fields or item.get('id') is None:
+            return
+
+        key = (collection, item['id'])
+        self.remove(collection, item['id'])
+
+        title = str(item.get(fields[0]) or '')
+        values = [str(item[f]) for f in fields if item.get(f)]
+        terms = Counter()
+        for token in tokenize(title):
+            terms[token] += TITLE_BOOST - 1
+        for value in values:
+            terms.update(tokenize(value))
+
+        self._docs[key] = (title, ' — '.join(values))
+        self._doc_terms[key] = terms
+        for token, tf in terms.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._vocabulary, token)
+            postings[key] = tf
+
+    def remove(self, collection, item_id):
+        """Drop a record from the index if present"""
+        key = (collection, item_id)
+        terms = self._doc_terms.pop(key, None)
+        if terms is None:
+            return
+        self._docs.pop(key, None)
+        for token in terms:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[token]
+                index = bisect_left(self._vocabulary, token)
+                if index < len(self._vocabulary) and self._vocabulary[index] == token:
+                    del self._vocabulary[index]
+
+    def _expand(self, token):
+        """Return [(vocabulary token, weight)] matching `token` exactly or by prefix"""
+        matches = []
+        start = bisect_left(self._vocabulary, token)
+        for candidate in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not candidate.startswith(token):
+                break
+            matches.append((candidate, 1.0 if candidate == token else PREFIX_WEIGHT))
+        return matches
+
+    def search(self, query, collections=None, offset=0, limit=20):
+        """Return (total, results) for documents matching every query token"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return 0, []
+
+        total_docs = len(self._docs) or 1
+        expanded = []
+        for token in tokens:
+            terms = [(self._postings[term], weight * math.log(1 + total_docs / len(self._postings[term])))
+                     for term, weight in self._expand(token)]
+            if not terms:
+                return 0, []
+            expanded.append(terms)
+
+        # Score the rarest token in full, then only probe the other tokens'
+        # postings for surviving candidates
+        expanded.sort(key=lambda terms: sum(len(postings) for postings, _ in terms))
+        candidates = {}
+        for postings, weight in expanded[0]:
+            for key, tf in postings.items():
+                if collections and key[0] not in collections:
+                    continue
+                score = weight * tf
+                if score > candidates.get(key, 0):
+                    candidates[key] = score
+
+        for terms in expanded[1:]:
+            narrowed = {}
+            for key, score in candidates.items():
+                best = 0
+                for postings, weight in terms:
+                    tf = postings.get(key)
+                    if tf is not None and weight * tf > best:
+                        best = weight * tf
+                if best:
+                    narrowed[key] = score + best
+            candidates = narrowed
+
+        top = heapq.nlargest(offset + limit, candidates.items(), key=lambda kv: kv[1])
+        results = []
+        for (collection, item_id), score in top[offset:]:
+            title, text = self._docs[(collection, item_id)]
+            results.append({
+                'collection': collection,
+                'id': item_id,
+                'title': title,
+                'score': round(score, 4),
+                'snippet': highlight(text, tokens),
+            })
+        return len(candidates), results
+
+
+def highlight(text, tokens, radius=SNIPPET_RADIUS):
+    """HTML-escaped snippet of `text` around the first match, matches wrapped in <mark>"""
+    matches = [m for m in _TOKEN_RE.finditer(text)
+               if any(normalize(m.group()).startswith(t) for t in tokens)]
+    if matches:
+        start = max(0, matches[0].start() - radius)
+        end = min(len(text), matches[0].end() + radius)
+    else:
+        start, end = 0, min(len(text), radius * 2)
+
+    parts = ['…' if start > 0 else '']
+    cursor = start
+    for m in matches:
+        if m.start() < start or m.end() > end:
+            continue
+        parts.append(html.escape(text[cursor:m.start()]))
+        parts.append(f'<mark>{html.escape(m.group())}</mark>')
+        cursor = m.end()
+    parts.append(html.escape(text[cursor:end]))
+    parts.append('…' if end < len(text) else '')
+    return ''.join(parts)
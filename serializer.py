@@ -0,0 +1,118 @@
+"""JSON encoding for the hera_data.json snapshot and API responses
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Both paths emit compact UTF-8 JSON and encode date, time and
+datetime values as ISO 8601 strings.
+
+Top-level HERA_DATA collections are encoded once and reused until they are
+touched, so snapshots and /api/dashboard/data only re-encode what changed.
+"""
+import json
+from datetime import date, datetime, time
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(value):
+    to_dict = getattr(value, 'to_dict', None)
+    if to_dict is not None:
+        return to_dict()
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+if orjson is not None:
+    BACKEND = 'orjson'
+
+    def dumps(value, indent=False):
+        """Encode `value` as UTF-8 JSON bytes"""
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(value, default=_default, option=option)
+
+    def loads(data):
+        return orjson.loads(data)
+else:
+    BACKEND = 'json'
+    _compact = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(',', ':'))
+    _indented = json.JSONEncoder(default=_default, ensure_ascii=False, indent=2)
+
+    def dumps(value, indent=False):
+        """Encode `value` as UTF-8 JSON bytes"""
+        return (_indented if indent else _compact).encode(value).encode('utf-8')
+
+    def loads(data):
+        return json.loads(data)
+
+
+def script_json(encoded):
+    """JSON bytes as text that can be embedded in a <script> element"""
+    return (encoded.replace(b'<', b'\\u003c').replace(b'>', b'\\u003e')
+            .replace(b'&', b'\\u0026').replace(b"'", b'\\u0027').decode('utf-8'))
+
+
+class FragmentCache:
+    """Encoded top-level values of a dict, reused until touched or replaced
+
+    A cached fragment is reused only if its key has not been touched since it
+    was encoded and the dict still holds the same object, so rebinding a
+    collection (HERA_DATA['budget'] = [...]) also invalidates it.
+    """
+
+    def __init__(self):
+        self._revisions = {}
+        self._fragments = {}  # key -> (value, revision, encoded)
+
+    def touch(self, key):
+        self._revisions[key] = self._revisions.get(key, 0) + 1
+
+    def revision(self, key):
+        return self._revisions.get(key, 0)
+
+    def clear(self):
+        self._fragments.clear()
+        self._revisions.clear()
+
+    def fragment(self, key, value):
+        revision = self._revisions.get(key, 0)
+        cached = self._fragments.get(key)
+        if cached is not None and cached[0] is value and cached[1] == revision:
+            return cached[2]
+        encoded = dumps(value)
+        self._fragments[key] = (value, revision, encoded)
+        return encoded
+
+    def encode(self, document, prefix=None):
+        """Encode a dict, splicing in cached fragments for its values
+
+        Keys in `prefix` are written first and never cached.
+        """
+        parts = [dumps(str(key)) + b':' + dumps(value) for key, value in (prefix or {}).items()]
+        parts.extend(dumps(str(key)) + b':' + self.fragment(key, value) for key, value in document.items())
+        return b'{' + b','.join(parts) + b'}'
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by dumps()/loads() above"""
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        # Flask's tagged session serializer passes object_hook, which only json supports
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj, indent=self._app.debug), mimetype=self.mimetype)
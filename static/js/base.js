@@ -13,9 +13,10 @@ document.addEventListener('DOMContentLoaded', function() {
     updateCountdown();
     setupNavigation();
     setupFlashMessages();
+    setupOfflineSupport();
 
-    // Update countdown every minute
-    setInterval(updateCountdown, 60000);
+    // Update the countdown on the minute (pages with a richer countdown replace this job)
+    scheduler.every('countdown', 60000, updateCountdown, { align: true });
 });
 
 function initializeApp() {
@@ -56,11 +57,11 @@ function updateCountdown() {
     const countdownElement = document.getElementById('countdown-text');
     if (!countdownElement) return;
 
-    // Calculate days until September 26, 2025
-    const proposalDate = new Date('2025-09-26');
-    const today = new Date();
-    const diffTime = proposalDate - today;
-    const diffDays = Math.ceil(diffTime / (1000 * 60 * 60 * 24));
+    // Days until the trip's proposal date (from the server; keep the rendered text without one)
+    const proposalDate = tripSchedule.proposal;
+    if (!proposalDate) return;
+    const startOfDay = date => new Date(date.getFullYear(), date.getMonth(), date.getDate());
+    const diffDays = Math.round((startOfDay(proposalDate) - startOfDay(new Date())) / (1000 * 60 * 60 * 24));
 
     if (diffDays > 0) {
         countdownElement.textContent = `${diffDays} days until proposal`;
@@ -216,7 +217,7 @@ function startInlineEdit(element) {
             element.classList.remove('editing');
 
             if (newValue !== originalValue) {
-                saveInlineEdit(itemId, field, newValue, element);
+                saveInlineEdit(itemId, field, newValue, element, originalValue);
             }
         }
 
@@ -241,7 +242,7 @@ function startInlineEdit(element) {
             element.classList.remove('editing');
 
             if (newValue && newValue !== originalValue) {
-                saveInlineEdit(itemId, field, newValue, element);
+                saveInlineEdit(itemId, field, newValue, element, originalValue);
             }
         }
 
@@ -257,10 +258,7 @@ function startInlineEdit(element) {
     }
 }
 
-function saveInlineEdit(itemId, field, value, element) {
-    // Show loading state
-    element.style.opacity = '0.6';
-
+function saveInlineEdit(itemId, field, value, element, originalValue) {
     // Determine endpoint based on current page
     let endpoint = '/api/update-item';
     const currentPage = window.location.pathname;
@@ -279,34 +277,20 @@ function saveInlineEdit(itemId, field, value, element) {
         endpoint = '/api/packing/update';
     }
 
-    fetch(endpoint, {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
+    // The element already shows the new value; put the old one back on failure
+    optimisticUpdate({
+        key: `${endpoint}:${itemId}`,
+        apply: () => () => {
+            element.textContent = originalValue;
+            element.classList.add('error');
+            setTimeout(() => element.classList.remove('error'), 1000);
         },
-        body: JSON.stringify({
-            id: itemId,
-            field: field,
-            value: value
-        })
-    })
-    .then(response => response.json())
-    .then(data => {
-        element.style.opacity = '1';
-        if (data.success) {
-            showNotification('Changes saved successfully', 'success');
+        send: () => queueMutation('POST', endpoint, { id: itemId, field: field, value: value }),
+        confirm: () => {
             element.classList.add('success');
             setTimeout(() => element.classList.remove('success'), 1000);
-        } else {
-            showNotification('Error saving changes: ' + data.error, 'error');
-            element.classList.add('error');
-            setTimeout(() => element.classList.remove('error'), 1000);
-        }
-    })
-    .catch(error => {
-        element.style.opacity = '1';
-        console.error('Error:', error);
-        showNotification('Error saving changes', 'error');
+        },
+        failure: 'Error saving changes'
     });
 }
 
@@ -611,7 +595,11 @@ function makeRequest(url, options = {}) {
     return fetch(url, finalOptions)
         .then(response => {
             if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
+                return response.json()
+                    .catch(() => ({}))
+                    .then(data => {
+                        throw new Error(data.error || `HTTP error! status: ${response.status}`);
+                    });
             }
             return response.json();
         })
@@ -622,6 +610,446 @@ function makeRequest(url, options = {}) {
         });
 }
 
+function escapeHtml(value) {
+    return String(value == null ? '' : value)
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;')
+        .replace(/"/g, '&quot;')
+        .replace(/'/g, '&#39;');
+}
+
+// Virtualized Lists
+// Only the rows in (or near) the viewport are in the DOM; spacers stand in
+// for the rest. Works for lists that scroll themselves (overflow: auto) and
+// for lists or grids that scroll with the page.
+class VirtualList {
+    constructor(container, { renderItem, keyAttribute, rowHeight = 72, overscan = 4, onNearEnd = null }) {
+        this.container = container;
+        this.renderItem = renderItem;
+        this.keyAttribute = keyAttribute;
+        this.rowHeight = rowHeight;
+        this.overscan = overscan;
+        this.onNearEnd = onNearEnd;
+        this.items = [];
+        this.range = null;
+        this.measured = false;
+        this.frame = null;
+
+        const overflow = getComputedStyle(container).overflowY;
+        this.scroller = (overflow === 'auto' || overflow === 'scroll') ? container : window;
+        this.isGrid = getComputedStyle(container).display === 'grid';
+
+        // Anything already in the container (an empty state, say) stays ahead of the rows
+        this.topSpacer = this.createSpacer();
+        this.bottomSpacer = this.createSpacer();
+        container.append(this.topSpacer, this.bottomSpacer);
+
+        this.onScroll = () => this.schedule();
+        this.scroller.addEventListener('scroll', this.onScroll, { passive: true });
+        window.addEventListener('resize', this.onScroll, { passive: true });
+    }
+
+    createSpacer() {
+        const spacer = document.createElement('div');
+        spacer.className = 'virtual-spacer';
+        spacer.setAttribute('aria-hidden', 'true');
+        if (getComputedStyle(this.container).display === 'grid') spacer.style.gridColumn = '1 / -1';
+        return spacer;
+    }
+
+    columns() {
+        if (!this.isGrid) return 1;
+        return getComputedStyle(this.container).gridTemplateColumns.split(' ').filter(Boolean).length || 1;
+    }
+
+    setItems(items) {
+        this.items = items;
+        this.refresh();
+    }
+
+    // Re-render the visible window on the next frame (after inserts, removals or resorting)
+    refresh() {
+        this.range = null;
+        this.schedule();
+    }
+
+    schedule() {
+        if (this.frame) return;
+        this.frame = requestAnimationFrame(() => {
+            this.frame = null;
+            this.render();
+        });
+    }
+
+    viewport() {
+        if (this.scroller === this.container) {
+            return { top: this.container.scrollTop, height: this.container.clientHeight };
+        }
+        const rect = this.container.getBoundingClientRect();
+        return { top: Math.max(0, -rect.top), height: window.innerHeight };
+    }
+
+    render() {
+        const columns = this.columns();
+        const rows = Math.ceil(this.items.length / columns);
+        const { top, height } = this.viewport();
+        const startRow = Math.max(0, Math.floor(top / this.rowHeight) - this.overscan);
+        const endRow = Math.min(rows, Math.ceil((top + height) / this.rowHeight) + this.overscan);
+        const key = `${startRow}:${endRow}:${columns}:${this.items.length}`;
+
+        if (this.range !== key) {
+            this.range = key;
+            while (this.topSpacer.nextSibling !== this.bottomSpacer) {
+                this.topSpacer.nextSibling.remove();
+            }
+            const visible = this.items.slice(startRow * columns, endRow * columns);
+            this.topSpacer.insertAdjacentHTML('afterend', visible.map(this.renderItem).join(''));
+            this.topSpacer.style.height = `${startRow * this.rowHeight}px`;
+            this.bottomSpacer.style.height = `${(rows - endRow) * this.rowHeight}px`;
+            this.measure();
+        }
+
+        if (this.onNearEnd && endRow >= rows - this.overscan) {
+            this.onNearEnd();
+        }
+    }
+
+    // Use the real height of a rendered row once, then keep the spacers in step with it
+    measure() {
+        if (this.measured) return;
+        const first = this.topSpacer.nextElementSibling;
+        if (!first || first === this.bottomSpacer) return;
+        const gap = parseFloat(getComputedStyle(this.container).rowGap) || 0;
+        const height = first.getBoundingClientRect().height + gap;
+        this.measured = true;
+        if (height > 0 && Math.abs(height - this.rowHeight) > 1) {
+            this.rowHeight = height;
+            this.refresh();
+        }
+    }
+
+    // Re-render one item in place if it is on screen; O(1) for off-screen edits
+    updateItem(item) {
+        const key = typeof item === 'object' ? item.id : item;
+        const node = this.container.querySelector(`[${this.keyAttribute}="${key}"]`);
+        if (node) node.outerHTML = this.renderItem(item);
+    }
+
+    destroy() {
+        this.scroller.removeEventListener('scroll', this.onScroll);
+        window.removeEventListener('resize', this.onScroll);
+        cancelAnimationFrame(this.frame);
+    }
+}
+
+// Mutation Batching
+// Rapid edits (toggles, inline updates, deletes) are queued and sent together
+// to /api/batch, which applies them with a single save on the server.
+const MUTATION_BATCH_DELAY = 150;
+const MUTATION_BATCH_MAX = 50;
+let mutationQueue = [];
+let mutationTimer = null;
+
+function queueMutation(method, url, body = null) {
+    return new Promise((resolve, reject) => {
+        mutationQueue.push({ operation: { method, url, body }, resolve, reject });
+
+        if (mutationQueue.length >= MUTATION_BATCH_MAX) {
+            flushMutations();
+        } else if (!mutationTimer) {
+            mutationTimer = setTimeout(flushMutations, MUTATION_BATCH_DELAY);
+        }
+    });
+}
+
+function flushMutations() {
+    clearTimeout(mutationTimer);
+    mutationTimer = null;
+    if (mutationQueue.length === 0) return Promise.resolve();
+
+    const queued = mutationQueue;
+    mutationQueue = [];
+
+    // Independent edits: one failure should not roll back the others
+    return fetch('/api/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ atomic: false, operations: queued.map(entry => entry.operation) })
+    })
+    .then(response => {
+        if (response.status === 429) {
+            // Rate limited: put the edits back and retry once the server allows it
+            const retryAfter = parseInt(response.headers.get('Retry-After'), 10) || 1;
+            mutationQueue = queued.concat(mutationQueue);
+            clearTimeout(mutationTimer);
+            mutationTimer = setTimeout(flushMutations, retryAfter * 1000);
+            return null;
+        }
+        return response.json();
+    })
+    .then(data => {
+        if (data === null) return;
+        if (!data.results) {
+            throw new Error(data.error || 'Batch request failed');
+        }
+        queued.forEach((entry, index) => {
+            const result = data.results[index];
+            entry.resolve(result.body || { success: false, error: `HTTP ${result.status}` });
+        });
+    })
+    .catch(error => {
+        console.error('Batch request failed:', error);
+        queued.forEach(entry => entry.reject(error));
+    });
+}
+
+// Send anything still queued when the page is hidden or closed
+window.addEventListener('pagehide', () => {
+    if (mutationQueue.length === 0) return;
+    clearTimeout(mutationTimer);
+    mutationTimer = null;
+    const payload = JSON.stringify({ atomic: false, operations: mutationQueue.map(entry => entry.operation) });
+    mutationQueue = [];
+    navigator.sendBeacon('/api/batch', new Blob([payload], { type: 'application/json' }));
+});
+
+// Optimistic Updates
+// An edit is applied to the page's model and DOM straight away, then sent.
+// `apply()` makes the change and returns a function that undoes it; if the
+// server rejects the edit it is undone and an error shown, otherwise
+// `confirm(data)` reconciles the page with the server's copy. Edits to the
+// same `key` (one record) are sent in order; when one fails, it and every
+// later edit to that record are undone, newest first. A record added while
+// offline has no saved id until the outbox is replayed, so further edits to
+// it are refused (and undone) rather than sent with its temporary id.
+const pendingUpdates = new Map();  // key -> edits applied but not yet settled, oldest first
+const savedIds = new Map();        // temporary id -> id the server assigned
+const unsyncedKeys = new Set();    // keys of records whose add is waiting in the offline outbox
+let nextTemporaryId = -1;
+
+function optimisticUpdate({ key = null, apply, send, confirm = null, failure = 'Update failed' }) {
+    const entry = { undo: apply() || (() => {}), cancelled: false };
+    const queue = key === null ? [] : (pendingUpdates.get(key) || []);
+    const previous = queue.length ? queue[queue.length - 1].settled : Promise.resolve();
+    queue.push(entry);
+    if (key !== null) pendingUpdates.set(key, queue);
+
+    entry.settled = previous
+        .then(() => {
+            if (entry.cancelled) return false;
+            return Promise.resolve()
+                .then(() => {
+                    if (unsyncedKeys.has(key)) {
+                        throw new Error('Added offline: reload once it has synced to change it');
+                    }
+                    return send();
+                })
+                .then(data => {
+                    if (!data || !data.success) throw new Error((data && data.error) || failure);
+                    if (data.queued && isTemporaryKey(key)) unsyncedKeys.add(key);
+                    if (confirm) confirm(data);
+                    return true;
+                })
+                .catch(error => {
+                    console.error(`${failure}:`, error);
+                    queue.slice(queue.indexOf(entry)).reverse().forEach(pending => {
+                        pending.cancelled = true;
+                        pending.undo();
+                    });
+                    showNotification(error.message || failure, 'error');
+                    return false;
+                });
+        })
+        .finally(() => {
+            queue.splice(queue.indexOf(entry), 1);
+            if (key !== null && queue.length === 0) pendingUpdates.delete(key);
+        });
+    return entry.settled;
+}
+
+// Placeholder id for a record that has been added locally but not yet saved.
+// Edits queued behind the add look the real id up with savedId() when sent.
+function temporaryId() {
+    return nextTemporaryId--;
+}
+
+function rememberSavedId(temporary, saved) {
+    savedIds.set(temporary, saved);
+}
+
+function savedId(id) {
+    return savedIds.has(id) ? savedIds.get(id) : id;
+}
+
+// Whether `key` ("packing:-3") names a record that only has a temporary id
+function isTemporaryKey(key) {
+    if (key === null) return false;
+    const id = Number(key.slice(key.lastIndexOf(':') + 1));
+    return id < 0 && !savedIds.has(id);
+}
+
+// Several field updates that must succeed or fail together
+function sendAtomic(operations) {
+    return fetch('/api/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ atomic: true, operations })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success || !data.results) return data;
+        const failed = data.results.find(result => result.success === false);
+        return { success: false, error: (failed && failed.body && failed.body.error) || data.error };
+    });
+}
+
+// Hydrated State
+// Pages that need trip data on the client get it embedded as #hera-state
+// ({ workspace, revision, data }) instead of fetching it after load.
+// fetchStateChanges() asks /api/sync for just the values changed since that
+// revision, and applyStateChanges() merges them in.
+function loadHydratedState() {
+    const element = document.getElementById('hera-state');
+    return element ? JSON.parse(element.textContent) : null;
+}
+
+function fetchStateChanges(state = heraState) {
+    const params = new URLSearchParams({
+        since: state.revision,
+        workspace: state.workspace,
+        keys: Object.keys(state.data).join(',')
+    });
+    return fetch(`/api/sync?${params}`)
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) throw new Error(data.error || 'Failed to refresh data');
+            return { ...data, since: state.revision };
+        });
+}
+
+// Resolves to the keys that changed. Changes fetched (by another tab, say)
+// against a different revision than ours are fetched again for ours.
+function applyStateChanges(changes, state = heraState) {
+    if (!changes.full && changes.since !== state.revision) {
+        if (changes.revision <= state.revision) return Promise.resolve([]);
+        return fetchStateChanges(state).then(fresh => applyStateChanges(fresh, state));
+    }
+    const keys = Object.keys(changes.changes).filter(key => key in state.data);
+    keys.forEach(key => {
+        state.data[key] = changes.changes[key];
+    });
+    state.workspace = changes.workspace;
+    state.revision = changes.revision;
+    return Promise.resolve(keys);
+}
+
+const heraState = loadHydratedState();
+
+// Lazy Modules
+// Code for UI most visits never open (upload dialogs, the photo lightbox) is
+// left out of the page and fetched by loadModule(name) on first use; the
+// files come from #hera-modules (offline.LAZY_MODULES). Hovering or focusing
+// an element marked data-module="<name>" starts the fetch a little early.
+const lazyModuleUrls = (() => {
+    const element = document.getElementById('hera-modules');
+    return element ? JSON.parse(element.textContent) : {};
+})();
+const loadedModules = new Map();
+
+function loadModuleFile(url) {
+    return new Promise((resolve, reject) => {
+        const isStylesheet = new URL(url, location.href).pathname.endsWith('.css');
+        const element = document.createElement(isStylesheet ? 'link' : 'script');
+        if (isStylesheet) {
+            element.rel = 'stylesheet';
+            element.href = url;
+        } else {
+            element.src = url;
+        }
+        element.onload = () => resolve();
+        element.onerror = () => reject(new Error(`Failed to load ${url}`));
+        (isStylesheet ? document.head : document.body).appendChild(element);
+    });
+}
+
+function loadModule(name) {
+    if (!loadedModules.has(name)) {
+        const urls = lazyModuleUrls[name];
+        const loading = urls
+            ? Promise.all(urls.map(loadModuleFile))
+            : Promise.reject(new Error(`Unknown module: ${name}`));
+        // A failed fetch (offline, say) can be retried on the next interaction
+        loadedModules.set(name, loading.catch(error => {
+            loadedModules.delete(name);
+            throw error;
+        }));
+    }
+    return loadedModules.get(name);
+}
+
+function preloadModuleFor(event) {
+    const trigger = event.target.closest && event.target.closest('[data-module]');
+    if (trigger) loadModule(trigger.dataset.module).catch(() => {});
+}
+
+document.addEventListener('pointerover', preloadModuleFor, { passive: true });
+document.addEventListener('focusin', preloadModuleFor);
+
+// Offline Support
+// The service worker (/sw.js) caches pages and assets, keeps an IndexedDB
+// replica of the trip data and queues edits made without a connection;
+// queued edits resolve as { success: true, queued: true }
+function setupOfflineSupport() {
+    if (!('serviceWorker' in navigator)) return;
+
+    navigator.serviceWorker.register('/sw.js').catch(error => {
+        console.warn('Offline support unavailable:', error);
+    });
+    navigator.serviceWorker.addEventListener('message', event => handleOfflineMessage(event.data || {}));
+    // One tab keeps the replica fresh for all of them
+    navigator.serviceWorker.ready.then(() => {
+        scheduler.every('offline-sync', 60000, () => postToServiceWorker({ type: 'sync' }), { shared: true });
+    });
+
+    window.addEventListener('online', () => {
+        showNotification('Back online, syncing changes...', 'info');
+        postToServiceWorker({ type: 'sync', force: true });
+    });
+    window.addEventListener('offline', () => {
+        showNotification('You are offline. Changes will sync when the connection returns.', 'warning', 5000);
+    });
+}
+
+function postToServiceWorker(message) {
+    if (navigator.serviceWorker && navigator.serviceWorker.controller) {
+        navigator.serviceWorker.controller.postMessage(message);
+    }
+}
+
+function handleOfflineMessage(message) {
+    const plural = count => (count === 1 ? 'change' : 'changes');
+    switch (message.type) {
+        case 'queued':
+            showNotification(`Saved offline: ${message.count} ${plural(message.count)} waiting to sync`, 'info');
+            break;
+        case 'replayed':
+            if (message.conflicts.length > 0) {
+                console.warn('Offline changes not applied:', message.conflicts);
+                showNotification(`${message.conflicts.length} offline ${plural(message.conflicts.length)} ` +
+                                 'not applied: the data changed on the server', 'error', 8000);
+            } else {
+                showNotification(`Synced ${message.count} offline ${plural(message.count)}`, 'success');
+            }
+            break;
+        case 'page-updated':
+            if (message.url === window.location.pathname) {
+                showNotification('Newer data is available. Reload to see it.', 'info', 6000);
+            }
+            break;
+    }
+}
+
 // Form Validation
 function validateForm(form) {
     const requiredFields = form.querySelectorAll('[required]');
@@ -685,6 +1113,22 @@ window.HERA = {
     formatTime,
     setLoadingState,
     makeRequest,
+    queueMutation,
+    flushMutations,
+    optimisticUpdate,
+    temporaryId,
+    rememberSavedId,
+    savedId,
+    sendAtomic,
+    heraState,
+    fetchStateChanges,
+    applyStateChanges,
+    loadModule,
+    postToServiceWorker,
+    scheduler,
+    tripSchedule,
+    escapeHtml,
+    VirtualList,
     validateForm,
     animateElement,
     updateCountdown,
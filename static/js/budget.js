@@ -136,203 +136,119 @@ function closeAllModals() {
 }
 
 // Budget Item Management
-function addBudgetItem(event) {
-    event.preventDefault();
-
-    const formData = {
-        category: document.getElementById('add-budget-category').value,
-        budget: parseFloat(document.getElementById('add-budget-amount').value),
-        saved: parseFloat(document.getElementById('add-budget-saved').value) || 0,
-        status: document.getElementById('add-budget-status').value,
-        notes: document.getElementById('add-budget-notes').value,
-        emoji: '💰' // Default emoji
+// Edits show immediately and are rolled back if the server rejects them
+function readBudgetForm(prefix) {
+    return {
+        category: document.getElementById(`${prefix}-category`).value,
+        budget: parseFloat(document.getElementById(`${prefix}-amount`).value),
+        saved: parseFloat(document.getElementById(`${prefix}-saved`).value) || 0,
+        status: document.getElementById(`${prefix}-status`).value,
+        notes: document.getElementById(`${prefix}-notes`).value
     };
+}
 
-    // Validate data
-    if (!formData.category || !formData.budget) {
+function validateBudgetItem(item) {
+    if (!item.category || !item.budget) {
         showNotification('Please fill in all required fields', 'error');
-        return;
+        return false;
     }
-
-    if (formData.saved > formData.budget) {
+    if (item.saved > item.budget) {
         showNotification('Amount saved cannot exceed budget amount', 'error');
-        return;
+        return false;
     }
+    return true;
+}
 
-    // Show loading state
-    const submitBtn = event.target.querySelector('button[type="submit"]');
-    const originalText = submitBtn.innerHTML;
-    submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Adding...';
-    submitBtn.disabled = true;
-
-    // Make API call - using the budget add API structure
-    fetch('/api/budget/add', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify(formData)
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            showNotification('Budget item added successfully', 'success');
-            closeAddBudgetModal();
+// The API names the amounts budget_amount / budget_saved
+function budgetPayload(item) {
+    return {
+        id: item.id,
+        category: item.category,
+        budget_amount: item.budget,
+        budget_saved: item.saved,
+        status: item.status,
+        notes: item.notes,
+        priority: item.priority
+    };
+}
 
-            // Add to local data
+function findBudgetItem(itemId) {
+    return window.BUDGET_DATA.items.find(item => item.id === savedId(itemId));
+}
+
+function addBudgetItem(event) {
+    event.preventDefault();
+
+    const item = { id: temporaryId(), emoji: '💰', ...readBudgetForm('add-budget') };
+    if (!validateBudgetItem(item)) return;
+
+    closeAddBudgetModal();
+    optimisticUpdate({
+        key: `budget:${item.id}`,
+        apply: () => {
+            window.BUDGET_DATA.items.push(item);
+            document.getElementById('budget-items-list').insertAdjacentHTML('beforeend', renderBudgetItem(item));
+            updateBudgetSummary();
+            return () => removeBudgetItem(item.id);
+        },
+        send: () => queueMutation('POST', '/api/budget/add', budgetPayload(item)),
+        confirm: data => {
+            // Swap the placeholder id for the saved record (absent when queued offline)
             if (data.budget_item) {
-                window.BUDGET_DATA.items.push(data.budget_item);
+                replaceBudgetItem(item.id, data.budget_item);
+                rememberSavedId(item.id, data.budget_item.id);
             }
-
-            // Refresh the page to show updates
-            setTimeout(() => {
-                window.location.reload();
-            }, 1000);
-        } else {
-            showNotification(data.error || 'Failed to add budget item', 'error');
-        }
-    })
-    .catch(error => {
-        console.error('Error adding budget item:', error);
-        showNotification('Failed to add budget item', 'error');
-    })
-    .finally(() => {
-        // Reset button state
-        submitBtn.innerHTML = originalText;
-        submitBtn.disabled = false;
+            showNotification('Budget item added successfully', 'success');
+        },
+        failure: 'Failed to add budget item'
     });
 }
 
 function updateBudgetItem(event) {
     event.preventDefault();
 
-    const itemId = document.getElementById('budget-item-id').value;
-    const formData = {
-        id: parseInt(itemId),
-        category: document.getElementById('budget-category').value,
-        budget: parseFloat(document.getElementById('budget-amount').value),
-        saved: parseFloat(document.getElementById('budget-saved').value) || 0,
-        status: document.getElementById('budget-status').value,
-        notes: document.getElementById('budget-notes').value
-    };
-
-    // Validate data
-    if (!formData.category || !formData.budget) {
-        showNotification('Please fill in all required fields', 'error');
-        return;
-    }
-
-    if (formData.saved > formData.budget) {
-        showNotification('Amount saved cannot exceed budget amount', 'error');
+    const itemId = parseInt(document.getElementById('budget-item-id').value);
+    const previous = findBudgetItem(itemId);
+    if (!previous) {
+        showNotification('Budget item not found', 'error');
         return;
     }
-
-    // Show loading state
-    const submitBtn = event.target.querySelector('button[type="submit"]');
-    const originalText = submitBtn.innerHTML;
-    submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Saving...';
-    submitBtn.disabled = true;
-
-    // Make API call - using the budget update API structure
-    fetch('/api/budget/update', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
+    const item = { ...previous, ...readBudgetForm('budget') };
+    if (!validateBudgetItem(item)) return;
+
+    closeBudgetModal();
+    optimisticUpdate({
+        key: `budget:${itemId}`,
+        apply: () => {
+            replaceBudgetItem(itemId, item);
+            return () => replaceBudgetItem(itemId, previous);
         },
-        body: JSON.stringify(formData)
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
+        send: () => queueMutation('POST', '/api/budget/update', budgetPayload({ ...item, id: savedId(itemId) })),
+        confirm: data => {
+            if (data.budget_item) replaceBudgetItem(itemId, data.budget_item);
             showNotification('Budget item updated successfully', 'success');
-            closeBudgetModal();
-
-            // Update local data
-            const itemIndex = window.BUDGET_DATA.items.findIndex(item => item.id === formData.id);
-            if (itemIndex > -1) {
-                window.BUDGET_DATA.items[itemIndex] = { ...window.BUDGET_DATA.items[itemIndex], ...formData };
-            }
-
-            // Refresh the page to show updates
-            setTimeout(() => {
-                window.location.reload();
-            }, 1000);
-        } else {
-            showNotification(data.error || 'Failed to update budget item', 'error');
-        }
-    })
-    .catch(error => {
-        console.error('Error updating budget item:', error);
-        showNotification('Failed to update budget item', 'error');
-    })
-    .finally(() => {
-        // Reset button state
-        submitBtn.innerHTML = originalText;
-        submitBtn.disabled = false;
+        },
+        failure: 'Failed to update budget item'
     });
 }
 
 function toggleBudgetStatus(itemId) {
-    const budgetItem = window.BUDGET_DATA.items.find(item => item.id === itemId);
-    if (!budgetItem) {
+    const previous = findBudgetItem(itemId);
+    if (!previous) {
         showNotification('Budget item not found', 'error');
         return;
     }
+    const newStatus = previous.status === 'Paid' ? 'Outstanding' : 'Paid';
 
-    const itemElement = document.querySelector(`[data-item-id="${itemId}"]`);
-    if (itemElement) {
-        // Add loading state
-        itemElement.style.opacity = '0.7';
-        itemElement.style.pointerEvents = 'none';
-    }
-
-    const newStatus = budgetItem.status === 'Paid' ? 'Outstanding' : 'Paid';
-
-    fetch(`/api/budget/${itemId}/toggle`, {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        }
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            // Update local data
-            budgetItem.status = newStatus;
-
-            // Update UI
-            if (itemElement) {
-                itemElement.className = `budget-item ${newStatus.toLowerCase() === 'paid' ? 'paid' : 'outstanding'}`;
-
-                // Update status text
-                const statusElement = itemElement.querySelector('.item-category');
-                if (statusElement) {
-                    statusElement.textContent = newStatus;
-                }
-
-                // Update button icon
-                const toggleBtn = itemElement.querySelector('.pay-btn i');
-                if (toggleBtn) {
-                    toggleBtn.className = `fas fa-${newStatus === 'Paid' ? 'undo' : 'check'}`;
-                }
-            }
-
-            showNotification(`Item marked as ${newStatus.toLowerCase()}`, 'success');
-            updateBudgetSummary();
-        } else {
-            showNotification(data.error || 'Failed to update status', 'error');
-        }
-    })
-    .catch(error => {
-        console.error('Error toggling status:', error);
-        showNotification('Failed to update status', 'error');
-    })
-    .finally(() => {
-        // Remove loading state
-        if (itemElement) {
-            itemElement.style.opacity = '';
-            itemElement.style.pointerEvents = '';
-        }
+    optimisticUpdate({
+        key: `budget:${itemId}`,
+        apply: () => {
+            replaceBudgetItem(itemId, { ...previous, status: newStatus });
+            return () => replaceBudgetItem(itemId, previous);
+        },
+        send: () => queueMutation('POST', `/api/budget/${savedId(itemId)}/toggle`),
+        confirm: () => showNotification(`Item marked as ${newStatus.toLowerCase()}`, 'success'),
+        failure: 'Failed to update status'
     });
 }
 
@@ -341,68 +257,94 @@ function deleteBudgetItem(itemId) {
         return;
     }
 
+    const item = findBudgetItem(itemId);
     const itemElement = document.querySelector(`[data-item-id="${itemId}"]`);
-    if (itemElement) {
-        // Add loading state
-        itemElement.style.opacity = '0.7';
-        itemElement.style.pointerEvents = 'none';
-    }
-
-    fetch(`/api/budget/${itemId}`, {
-        method: 'DELETE',
-        headers: {
-            'Content-Type': 'application/json',
-        }
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            // Remove from local data
-            const itemIndex = window.BUDGET_DATA.items.findIndex(item => item.id === itemId);
-            if (itemIndex > -1) {
-                window.BUDGET_DATA.items.splice(itemIndex, 1);
-            }
-
-            // Animate out and remove element
-            if (itemElement) {
-                itemElement.style.transition = 'all 0.3s ease';
-                itemElement.style.transform = 'translateX(100%)';
-                itemElement.style.opacity = '0';
+    if (!item || !itemElement) return;
+    const position = window.BUDGET_DATA.items.indexOf(item);
+    const nextSibling = itemElement.nextElementSibling;
+
+    optimisticUpdate({
+        key: `budget:${itemId}`,
+        apply: () => {
+            removeBudgetItem(itemId);
+            return () => {
+                window.BUDGET_DATA.items.splice(position, 0, item);
+                const list = document.getElementById('budget-items-list');
+                list.insertBefore(itemElement, nextSibling && nextSibling.isConnected ? nextSibling : null);
+                updateBudgetSummary();
+            };
+        },
+        send: () => queueMutation('DELETE', `/api/budget/delete/${savedId(itemId)}`),
+        confirm: () => showNotification('Budget item deleted successfully', 'success'),
+        failure: 'Failed to delete budget item'
+    });
+}
 
-                setTimeout(() => {
-                    itemElement.remove();
-                }, 300);
-            }
+// UI Updates
+function renderBudgetItem(item) {
+    const budget = parseFloat(item.budget) || 0;
+    const saved = parseFloat(item.saved) || 0;
+    const percent = budget > 0 ? (saved / budget) * 100 : 0;
+    const paid = item.status === 'Paid';
+    const amount = value => `$${Math.round(value).toLocaleString()}`;
+
+    return `
+                <div class="budget-item ${paid ? 'paid' : 'outstanding'}" data-item-id="${item.id}">
+                    <div class="budget-item-content">
+                        <div class="item-emoji">
+                            ${escapeHtml(item.emoji || '💰')}
+                        </div>
+                        <div class="item-details">
+                            <div class="item-name">${escapeHtml(item.category)}</div>
+                            <div class="item-category">${escapeHtml(item.status)}</div>
+                            ${item.notes ? `<div class="item-notes">${escapeHtml(item.notes)}</div>` : ''}
+                        </div>
+                        <div class="budget-progress">
+                            <div class="progress-container">
+                                <div class="progress-bar">
+                                    <div class="progress-fill" style="width: ${percent}%"></div>
+                                </div>
+                                <div class="progress-text">${percent.toFixed(0)}%</div>
+                            </div>
+                        </div>
+                        <div class="budget-status">
+                            <div class="budget-amount">${amount(budget)}</div>
+                            ${saved > 0 ? `<div class="saved-amount">${amount(saved)} saved</div>` : ''}
+                            ${budget - saved > 0 ? `<div class="remaining-amount">${amount(budget - saved)} left</div>` : ''}
+                        </div>
+                        <div class="item-actions">
+                            <button class="action-btn edit-btn" onclick="openBudgetModal(${item.id})" title="Edit">
+                                <i class="fas fa-edit"></i>
+                            </button>
+                            <button class="action-btn pay-btn" onclick="toggleBudgetStatus(${item.id})" title="${paid ? 'Mark Outstanding' : 'Mark Paid'}">
+                                <i class="fas fa-${paid ? 'undo' : 'check'}"></i>
+                            </button>
+                            <button class="action-btn delete-btn" onclick="deleteBudgetItem(${item.id})" title="Delete">
+                                <i class="fas fa-trash"></i>
+                            </button>
+                        </div>
+                    </div>
+                </div>`;
+}
 
-            showNotification('Budget item deleted successfully', 'success');
-            updateBudgetSummary();
-        } else {
-            showNotification(data.error || 'Failed to delete budget item', 'error');
+// Put `item` in place of the record (and row) currently stored under `itemId`
+function replaceBudgetItem(itemId, item) {
+    itemId = savedId(itemId);
+    const items = window.BUDGET_DATA.items;
+    const index = items.findIndex(existing => existing.id === itemId);
+    if (index > -1) items[index] = item;
 
-            // Remove loading state on error
-            if (itemElement) {
-                itemElement.style.opacity = '';
-                itemElement.style.pointerEvents = '';
-            }
-        }
-    })
-    .catch(error => {
-        console.error('Error deleting budget item:', error);
-        showNotification('Failed to delete budget item', 'error');
-
-        // Remove loading state on error
-        if (itemElement) {
-            itemElement.style.opacity = '';
-            itemElement.style.pointerEvents = '';
-        }
-    });
+    const itemElement = document.querySelector(`[data-item-id="${itemId}"]`);
+    if (itemElement) itemElement.outerHTML = renderBudgetItem(item);
+    updateBudgetSummary();
 }
 
-// UI Updates
-function refreshBudgetList() {
-    // In a full implementation, you'd reload the list from the server
-    // For now, we'll just reload the page
-    window.location.reload();
+function removeBudgetItem(itemId) {
+    itemId = savedId(itemId);
+    window.BUDGET_DATA.items = window.BUDGET_DATA.items.filter(item => item.id !== itemId);
+    const itemElement = document.querySelector(`[data-item-id="${itemId}"]`);
+    if (itemElement) itemElement.remove();
+    updateBudgetSummary();
 }
 
 function updateBudgetSummary() {
@@ -1,15 +1,10 @@
 // Enhanced Dual-Phase Countdown for HERA Dashboard
-// Phase 1: Countdown to Trip Departure (Sept 24, 8 AM)
-// Phase 2: Countdown to Proposal Moment (Sept 26, during Emerald Lake activity)
+// Phase 1: Countdown to Trip Departure (first flight of the trip)
+// Phase 2: Countdown to Proposal Moment (the proposal activity's start)
+// Targets come from the server (tripSchedule in scheduler.js); the shared
+// scheduler updates the display on the minute while the tab is visible.
 
-let countdownInterval;
-
-// Key dates and times
-const TRIP_DATES = {
-    departure: new Date('2025-09-24T08:00:00-06:00'), // 8 AM Mountain Time - Flight departure
-    proposal: new Date('2025-09-26T14:30:00-06:00'),  // 2:30 PM Mountain Time - Proposal at Emerald Lake
-    tripEnd: new Date('2025-09-29T23:59:59-06:00')   // End of trip
-};
+const TRIP_DATES = tripSchedule;
 
 document.addEventListener('DOMContentLoaded', function() {
     initializeDualCountdown();
@@ -19,16 +14,16 @@ function initializeDualCountdown() {
     console.log('💍 Starting HERA Dual-Phase countdown timer...');
     console.log('Trip Departure:', TRIP_DATES.departure);
     console.log('Proposal Moment:', TRIP_DATES.proposal);
-    
-    updateCountdown();
 
-    // Update every second for real-time precision
-    countdownInterval = setInterval(updateCountdown, 1000);
+    // Replaces base.js's banner-only countdown; the display shows minutes, so
+    // update on the minute
+    scheduler.every('countdown', 60000, updateCountdown, { align: true });
 }
 
 function updateCountdown() {
     const now = new Date();
-    
+    if (!TRIP_DATES.departure || !TRIP_DATES.proposal || !TRIP_DATES.tripEnd) return;
+
     // Determine which phase we're in
     if (now < TRIP_DATES.departure) {
         // PHASE 1: Countdown to trip departure
@@ -47,14 +42,12 @@ function updateCountdown() {
 
 function updateTripCountdown(now) {
     const timeDiff = TRIP_DATES.departure - now;
-    const { days, hours, minutes, seconds } = calculateTimeComponents(timeDiff);
-    
-    console.log(`Trip Countdown: ${days}d ${hours}h ${minutes}m ${seconds}s`);
-    
+    const { days, hours, minutes } = calculateTimeComponents(timeDiff);
+
     // Update countdown display
     updateCountdownDisplay({
         title: "Until The Big Trip",
-        subtitle: "Departure to Banff • September 24, 2025",
+        subtitle: `Departure • ${formatTripDate(TRIP_DATES.departure)}`,
         days, hours, minutes,
         phase: "trip"
     });
@@ -65,14 +58,13 @@ function updateTripCountdown(now) {
 
 function updateProposalCountdown(now) {
     const timeDiff = TRIP_DATES.proposal - now;
-    const { days, hours, minutes, seconds } = calculateTimeComponents(timeDiff);
-    
-    console.log(`Proposal Countdown: ${days}d ${hours}h ${minutes}m ${seconds}s`);
-    
+    const { days, hours, minutes } = calculateTimeComponents(timeDiff);
+
     // Update countdown display with proposal theme
+    const place = TRIP_DATES.proposalLocation ? ` at ${TRIP_DATES.proposalLocation}` : '';
     updateCountdownDisplay({
         title: "Until The Big Moment",
-        subtitle: "Proposal at Emerald Lake • September 26, 2025",
+        subtitle: `Proposal${place} • ${formatTripDate(TRIP_DATES.proposal)}`,
         days, hours, minutes,
         phase: "proposal"
     });
@@ -140,7 +132,7 @@ function showTripInProgress() {
     const minutesElement = document.getElementById('countdown-minutes');
     
     if (countdownTitle) countdownTitle.textContent = "The Big Moment Happened!";
-    if (tripDates) tripDates.textContent = "Enjoying the engagement trip in Banff 🎉";
+    if (tripDates) tripDates.textContent = "Enjoying the engagement trip 🎉";
     
     // Show celebration message
     if (daysElement) daysElement.textContent = "💍";
@@ -173,7 +165,7 @@ function showTripCompleted() {
     const minutesElement = document.getElementById('countdown-minutes');
     
     if (countdownTitle) countdownTitle.textContent = "The Adventure is Complete!";
-    if (tripDates) tripDates.textContent = "September 24-29, 2025 • Banff, Alberta ✅";
+    if (tripDates) tripDates.textContent = `${formatTripDate(TRIP_DATES.departure)} - ${formatTripDate(TRIP_DATES.tripEnd)} ✅`;
     
     // Show completion message
     if (daysElement) daysElement.textContent = "✅";
@@ -188,12 +180,13 @@ function showTripCompleted() {
     });
     
     document.title = "💍 HERA - Trip Complete!";
-    
-    // Clear the interval
-    if (countdownInterval) {
-        clearInterval(countdownInterval);
-        countdownInterval = null;
-    }
+
+    // Nothing left to count down to
+    stopCountdown();
+}
+
+function formatTripDate(date) {
+    return date.toLocaleDateString('en-US', { month: 'long', day: 'numeric', year: 'numeric' });
 }
 
 function calculateTimeComponents(timeDiff) {
@@ -282,25 +275,10 @@ function getCurrentPhase() {
 
 // Cleanup function
 function stopCountdown() {
-    if (countdownInterval) {
-        clearInterval(countdownInterval);
-        countdownInterval = null;
-        console.log('⏹️ Countdown stopped');
-    }
+    scheduler.cancel('countdown');
+    console.log('⏹️ Countdown stopped');
 }
 
-// Handle page visibility changes
-document.addEventListener('visibilitychange', function() {
-    if (document.hidden) {
-        console.log('📴 Page hidden, countdown continues...');
-    } else {
-        console.log('👀 Page visible, ensuring countdown is active...');
-        if (!countdownInterval) {
-            initializeDualCountdown();
-        }
-    }
-});
-
 // Export functions for global access
 window.HERA_Countdown = {
     start: initializeDualCountdown,
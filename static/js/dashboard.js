@@ -83,66 +83,36 @@ function closeModal(modalId) {
 function toggleTaskStatus(taskId) {
     console.log('Toggling task status:', taskId);
 
-    const taskItem = document.querySelector(`[data-task-id="${taskId}"]`);
+    const taskItem = document.querySelector(`.task-item[data-task-id="${taskId}"]`);
     const checkbox = document.querySelector(`#task-${taskId}`);
 
     if (!taskItem || !checkbox) return;
 
-    // Add loading state
-    taskItem.classList.add('completing');
-
-    // Determine new status
+    // The checkbox has already flipped; show the status the server will set
+    const previous = readTaskItem(taskItem);
     const newCompleted = checkbox.checked;
-    const newStatus = newCompleted ? 'Complete' : 'In Progress';
-
-    // Make API call
-    fetch(`/api/tasks/${taskId}/toggle`, {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
+    let newStatus = previous.status;
+    if (newCompleted && !newStatus.includes('Complete')) newStatus = 'Complete, On Schedule';
+    if (!newCompleted && newStatus.includes('Complete')) newStatus = 'In Progress, On Schedule';
+
+    optimisticUpdate({
+        key: `task:${taskId}`,
+        apply: () => {
+            updateTaskDisplay(taskId, { ...previous, status: newStatus });
+            return () => updateTaskDisplay(taskId, previous);
         },
-        body: JSON.stringify({
+        send: () => queueMutation('POST', `/api/tasks/${savedId(taskId)}/toggle`, {
             completed: newCompleted,
             status: newStatus
-        })
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            // Update UI
-            if (newCompleted) {
-                taskItem.classList.add('completed');
-            } else {
-                taskItem.classList.remove('completed');
-            }
-
-            // Update task status display
-            const statusElement = taskItem.querySelector('.task-status');
-            if (statusElement) {
-                statusElement.textContent = newStatus;
-                statusElement.className = `task-status status-${newStatus.toLowerCase().replace(' ', '-')}`;
-            }
-
-            // Update progress
-            updateTaskProgress();
-
+        }),
+        confirm: data => {
+            if (data.status) updateTaskDisplay(taskId, { ...previous, status: data.status });
             showNotification(
                 newCompleted ? 'Task marked as complete!' : 'Task marked as in progress',
                 'success'
             );
-        } else {
-            // Revert checkbox if failed
-            checkbox.checked = !newCompleted;
-            showNotification('Failed to update task status', 'error');
-        }
-    })
-    .catch(error => {
-        console.error('Error toggling task:', error);
-        checkbox.checked = !newCompleted;
-        showNotification('Error updating task', 'error');
-    })
-    .finally(() => {
-        taskItem.classList.remove('completing');
+        },
+        failure: 'Failed to update task status'
     });
 }
 
@@ -150,7 +120,7 @@ function editTask(taskId) {
     console.log('Editing task:', taskId);
 
     // Find task data
-    const taskData = window.HERA_DATA?.tasks?.find(t => t.id === taskId);
+    const taskData = dashboardTasks().find(t => t.id === taskId);
     if (!taskData) {
         console.error('Task data not found:', taskId);
         return;
@@ -235,46 +205,19 @@ function createTaskEditModal() {
     return modal;
 }
 
-function saveTaskChanges() {
-    if (!currentEditingTaskId) return;
-
-    const form = document.getElementById('edit-task-form');
-    const formData = new FormData(form);
-
-    const data = {
-        task: form.querySelector('#edit-task-name').value,
-        deadline: form.querySelector('#edit-task-deadline').value,
-        status: form.querySelector('#edit-task-status').value,
-        notes: form.querySelector('#edit-task-notes').value
+// Task fields as currently shown in a task row
+function readTaskItem(taskItem) {
+    const notesElement = taskItem.querySelector('.task-notes');
+    return {
+        task: taskItem.querySelector('.task-name').textContent.trim(),
+        deadline: taskItem.querySelector('.task-deadline').textContent.replace(/^Due:\s*/, '').trim(),
+        status: taskItem.querySelector('.task-status').textContent.trim(),
+        notes: notesElement && notesElement.style.display !== 'none' ? notesElement.textContent.trim() : ''
     };
-
-    fetch(`/api/tasks/${currentEditingTaskId}/update`, {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify(data)
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            showNotification('Task updated successfully!', 'success');
-            closeModal('edit-task-modal');
-
-            // Update task display
-            updateTaskDisplay(currentEditingTaskId, data.task);
-        } else {
-            showNotification('Failed to update task', 'error');
-        }
-    })
-    .catch(error => {
-        console.error('Error updating task:', error);
-        showNotification('Error updating task', 'error');
-    });
 }
 
 function updateTaskDisplay(taskId, taskData) {
-    const taskItem = document.querySelector(`[data-task-id="${taskId}"]`);
+    const taskItem = document.querySelector(`.task-item[data-task-id="${savedId(taskId)}"]`);
     if (!taskItem) return;
 
     // Update task name
@@ -285,15 +228,24 @@ function updateTaskDisplay(taskId, taskData) {
     const deadlineElement = taskItem.querySelector('.task-deadline');
     if (deadlineElement) deadlineElement.textContent = `Due: ${taskData.deadline}`;
 
-    // Update status
+    // Update status and completion
     const statusElement = taskItem.querySelector('.task-status');
     if (statusElement) {
         statusElement.textContent = taskData.status;
         statusElement.className = `task-status status-${taskData.status.toLowerCase().replace(/[^a-z0-9]/g, '-')}`;
     }
+    const completed = taskData.status.includes('Complete');
+    taskItem.classList.toggle('completed', completed);
+    const checkbox = taskItem.querySelector('input[type="checkbox"]');
+    if (checkbox) checkbox.checked = completed;
 
     // Update notes
-    const notesElement = taskItem.querySelector('.task-notes');
+    let notesElement = taskItem.querySelector('.task-notes');
+    if (taskData.notes && !notesElement) {
+        notesElement = document.createElement('div');
+        notesElement.className = 'task-notes';
+        taskItem.querySelector('.task-info').appendChild(notesElement);
+    }
     if (notesElement) {
         if (taskData.notes) {
             notesElement.textContent = taskData.notes;
@@ -302,6 +254,47 @@ function updateTaskDisplay(taskId, taskData) {
             notesElement.style.display = 'none';
         }
     }
+
+    // Keep the client copy in step
+    const task = dashboardTasks().find(t => t.id === savedId(taskId));
+    if (task) Object.assign(task, taskData);
+
+    updateTaskProgress();
+}
+
+function renderTaskItem(task) {
+    const completed = task.status.includes('Complete');
+    return `
+                <div class="task-item ${completed ? 'completed' : ''}" data-task-id="${task.id}">
+                    <div class="task-checkbox">
+                        <input type="checkbox"
+                               id="task-${task.id}"
+                               data-task-id="${task.id}"
+                               ${completed ? 'checked' : ''}
+                               onchange="toggleTaskStatus(${task.id})">
+                        <label for="task-${task.id}"></label>
+                    </div>
+
+                    <div class="task-info">
+                        <div class="task-name">${escapeHtml(task.task)}</div>
+                        <div class="task-details">
+                            <span class="task-deadline">Due: ${escapeHtml(task.deadline)}</span>
+                            <span class="task-status status-${task.status.toLowerCase().replace(/[^a-z0-9]/g, '-')}">
+                                ${escapeHtml(task.status)}
+                            </span>
+                        </div>
+                        ${task.notes ? `<div class="task-notes">${escapeHtml(task.notes)}</div>` : ''}
+                    </div>
+
+                    <div class="task-actions">
+                        <button class="task-action-btn edit" onclick="editTask(${task.id})" title="Edit Task">
+                            <i class="fas fa-edit"></i>
+                        </button>
+                        <button class="task-action-btn delete" onclick="deleteTask(${task.id})" title="Delete Task">
+                            <i class="fas fa-trash"></i>
+                        </button>
+                    </div>
+                </div>`;
 }
 
 function updateTaskProgress() {
@@ -345,7 +338,7 @@ function openBudgetModal(budgetId) {
     console.log('Opening budget modal for:', budgetId);
 
     // Find budget data
-    const budgetData = window.HERA_DATA?.budget?.find(b => b.id === budgetId);
+    const budgetData = dashboardBudget().find(b => b.id === budgetId);
     if (!budgetData) return;
 
     currentEditingBudgetId = budgetId;
@@ -510,40 +503,58 @@ function setupFormSubmissions() {
 function saveBudgetChanges() {
     if (!currentEditingBudgetId) return;
 
+    const budgetId = currentEditingBudgetId;
     const form = document.getElementById('edit-budget-form');
-    const data = {
+    const previous = dashboardBudget().find(b => b.id === budgetId);
+    if (!previous) return;
+
+    const item = {
+        ...previous,
         category: form.querySelector('#edit-budget-category').value,
-        budget_amount: parseFloat(form.querySelector('#edit-budget-amount').value),
-        budget_saved: parseFloat(form.querySelector('#edit-budget-saved').value),
+        budget: parseFloat(form.querySelector('#edit-budget-amount').value),
+        saved: parseFloat(form.querySelector('#edit-budget-saved').value) || 0,
         status: form.querySelector('#edit-budget-status').value,
         notes: form.querySelector('#edit-budget-notes').value
     };
 
-    fetch(`/api/budget/update`, {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
+    closeModal('edit-budget-modal');
+    optimisticUpdate({
+        key: `budget:${budgetId}`,
+        apply: () => {
+            updateBudgetDisplay(item);
+            return () => updateBudgetDisplay(previous);
         },
-        body: JSON.stringify({ id: currentEditingBudgetId, ...data })
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
+        send: () => queueMutation('POST', '/api/budget/update', {
+            id: budgetId,
+            category: item.category,
+            budget_amount: item.budget,
+            budget_saved: item.saved,
+            status: item.status,
+            notes: item.notes,
+            priority: item.priority
+        }),
+        confirm: data => {
+            if (data.budget_item) updateBudgetDisplay(data.budget_item);
             showNotification('Budget item updated successfully!', 'success');
-            closeModal('edit-budget-modal');
-
-            // Refresh page or update display
-            setTimeout(() => window.location.reload(), 1000);
-        } else {
-            showNotification('Failed to update budget item', 'error');
-        }
-    })
-    .catch(error => {
-        console.error('Error updating budget:', error);
-        showNotification('Error updating budget item', 'error');
+        },
+        failure: 'Failed to update budget item'
     });
 }
 
+function updateBudgetDisplay(item) {
+    const budget = dashboardBudget();
+    const index = budget.findIndex(b => b.id === item.id);
+    if (index > -1) budget[index] = item;
+
+    const element = document.querySelector(`.budget-item-compact[data-budget-id="${item.id}"]`);
+    if (!element) return;
+    element.querySelector('.budget-name').textContent = item.category;
+    const badge = element.querySelector('.budget-status-badge');
+    badge.textContent = item.status;
+    badge.className = `budget-status-badge status-${item.status.toLowerCase()}`;
+    element.querySelector('.budget-amount').textContent = formatCurrency(item.budget);
+}
+
 // =============================================================================
 // KEYBOARD SHORTCUTS
 // =============================================================================
@@ -657,42 +668,40 @@ function animateNumber(element, start, end, duration) {
 // FAMILY MEMBER INTERACTIONS
 // =============================================================================
 
+// Cycles Not Asked -> Pending -> Approved, as the server does
+const FAMILY_STATUS_CYCLE = ['Not Asked', 'Pending', 'Approved'];
+
 function toggleFamilyMemberStatus(memberId) {
     console.log('Toggling family member status:', memberId);
 
-    fetch(`/api/family/${memberId}/toggle`, {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        }
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            // Find and update the family member display
-            const memberElement = document.querySelector(`[data-member-id="${memberId}"]`);
-            if (memberElement) {
-                const statusElement = memberElement.querySelector('.member-status');
-                if (statusElement) {
-                    statusElement.textContent = data.status;
-                    statusElement.className = `member-status status-${data.status.toLowerCase().replace(' ', '-')}`;
-                }
-            }
+    const statusElement = document.querySelector(`[data-member-id="${memberId}"] .member-status`);
+    if (!statusElement) return;
 
-            showNotification(`Family member status updated to: ${data.status}`, 'success');
+    const previous = statusElement.textContent.trim();
+    const index = FAMILY_STATUS_CYCLE.indexOf(previous);
+    const next = FAMILY_STATUS_CYCLE[(Math.max(index, 0) + 1) % FAMILY_STATUS_CYCLE.length];
 
-            // Update family progress
-            updateFamilyProgress();
-        } else {
-            showNotification('Failed to update family member status', 'error');
-        }
-    })
-    .catch(error => {
-        console.error('Error toggling family status:', error);
-        showNotification('Error updating family member', 'error');
+    optimisticUpdate({
+        key: `family:${memberId}`,
+        apply: () => {
+            setFamilyMemberStatus(statusElement, next);
+            return () => setFamilyMemberStatus(statusElement, previous);
+        },
+        send: () => queueMutation('POST', `/api/family/${memberId}/toggle`),
+        confirm: data => {
+            if (data.status) setFamilyMemberStatus(statusElement, data.status);
+            showNotification(`Family member status updated to: ${data.status || next}`, 'success');
+        },
+        failure: 'Failed to update family member status'
     });
 }
 
+function setFamilyMemberStatus(statusElement, status) {
+    statusElement.textContent = status;
+    statusElement.className = `member-status status-${status.toLowerCase().replace(' ', '-')}`;
+    updateFamilyProgress();
+}
+
 function updateFamilyProgress() {
     // Count approved family members
     const familyMembers = document.querySelectorAll('.family-member');
@@ -846,33 +855,47 @@ function throttle(func, limit) {
 // DATA REFRESH & SYNC
 // =============================================================================
 
-function refreshDashboardData() {
-    console.log('🔄 Refreshing dashboard data...');
+// The dashboard's tasks and budget come hydrated with the page (#hera-state);
+// refreshes fetch only what changed since its revision
+function dashboardTasks() {
+    return heraState.data.main.tasks;
+}
 
-    fetch('/api/dashboard/data')
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                // Update global data
-                window.HERA_DATA = data.data;
+function dashboardBudget() {
+    return heraState.data.budget;
+}
 
-                // Update progress bars and stats
-                updateTaskProgress();
-                updateFamilyProgress();
+function fetchDashboardData() {
+    return fetchStateChanges();
+}
 
-                showNotification('Dashboard data refreshed!', 'success');
-            } else {
-                showNotification('Failed to refresh data', 'error');
-            }
-        })
+function applyDashboardData(changes) {
+    return applyStateChanges(changes).then(changed => {
+        if (changed.length === 0) return;
+
+        // Update progress bars and stats
+        updateTaskProgress();
+        updateFamilyProgress();
+    });
+}
+
+function refreshDashboardData() {
+    console.log('🔄 Refreshing dashboard data...');
+
+    return scheduler.runNow('dashboard-refresh')
+        .then(() => showNotification('Dashboard data refreshed!', 'success'))
         .catch(error => {
             console.error('Error refreshing data:', error);
             showNotification('Error refreshing dashboard data', 'error');
         });
 }
 
-// Auto-refresh data every 5 minutes
-setInterval(refreshDashboardData, 5 * 60 * 1000);
+// Refresh data every 5 minutes; one tab polls and shares the result with the others
+scheduler.every('dashboard-refresh', 5 * 60 * 1000, fetchDashboardData, {
+    shared: true,
+    immediate: false,
+    onResult: applyDashboardData
+});
 
 // =============================================================================
 // EXPORT FUNCTIONS FOR GLOBAL ACCESS
@@ -1011,39 +1034,28 @@ function deleteTask(taskId) {
 
     console.log('Deleting task:', taskId);
 
-    fetch(`/api/tasks/${taskId}/delete`, {
-        method: 'DELETE',
-        headers: {
-            'Content-Type': 'application/json',
-        }
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            showNotification('Task deleted successfully!', 'success');
-
-            // Remove task from UI
-            const taskItem = document.querySelector(`[data-task-id="${taskId}"]`);
-            if (taskItem) {
-                taskItem.style.opacity = '0';
-                taskItem.style.transform = 'translateX(-100%)';
-                setTimeout(() => {
-                    taskItem.remove();
-                    updateTaskProgress();
-                }, 300);
-            }
-
-            // Update global data
-            if (window.HERA_DATA && window.HERA_DATA.tasks) {
-                window.HERA_DATA.tasks = window.HERA_DATA.tasks.filter(t => t.id !== taskId);
-            }
-        } else {
-            showNotification('Failed to delete task', 'error');
-        }
-    })
-    .catch(error => {
-        console.error('Error deleting task:', error);
-        showNotification('Error deleting task', 'error');
+    const taskItem = document.querySelector(`.task-item[data-task-id="${taskId}"]`);
+    if (!taskItem) return;
+    const parent = taskItem.parentNode;
+    const nextSibling = taskItem.nextElementSibling;
+    const tasks = dashboardTasks();
+    const task = tasks.find(t => t.id === savedId(taskId));
+
+    optimisticUpdate({
+        key: `task:${taskId}`,
+        apply: () => {
+            taskItem.remove();
+            if (task) tasks.splice(tasks.indexOf(task), 1);
+            updateTaskProgress();
+            return () => {
+                parent.insertBefore(taskItem, nextSibling && nextSibling.isConnected ? nextSibling : null);
+                if (task) tasks.push(task);
+                updateTaskProgress();
+            };
+        },
+        send: () => queueMutation('DELETE', `/api/tasks/${savedId(taskId)}/delete`),
+        confirm: () => showNotification('Task deleted successfully!', 'success'),
+        failure: 'Failed to delete task'
     });
 }
 
@@ -1080,51 +1092,57 @@ function submitNewTask() {
         return;
     }
 
-    const data = {
+    const task = {
+        id: temporaryId(),
         task: form.querySelector('#add-task-name').value,
         deadline: form.querySelector('#add-task-deadline').value,
-        status: form.querySelector('#add-task-status').value,
+        status: form.querySelector('#add-task-status').value || 'Not Started',
         notes: form.querySelector('#add-task-notes').value
     };
 
     // Validate required fields
-    if (!data.task.trim()) {
+    if (!task.task.trim()) {
         showNotification('Please enter a task name', 'warning');
         return;
     }
 
-    if (!data.deadline) {
+    if (!task.deadline) {
         showNotification('Please select a deadline', 'warning');
         return;
     }
 
-    fetch('/api/tasks/add', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
+    closeModal('add-task-modal');
+    optimisticUpdate({
+        key: `task:${task.id}`,
+        apply: () => {
+            document.querySelector('.task-items').insertAdjacentHTML('beforeend', renderTaskItem(task));
+            dashboardTasks().push(task);
+            updateTaskProgress();
+            return () => {
+                const taskItem = document.querySelector(`.task-item[data-task-id="${savedId(task.id)}"]`);
+                if (taskItem) taskItem.remove();
+                const tasks = dashboardTasks();
+                if (tasks.includes(task)) tasks.splice(tasks.indexOf(task), 1);
+                updateTaskProgress();
+            };
         },
-        body: JSON.stringify(data)
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            showNotification('Task added successfully!', 'success');
-            closeModal('add-task-modal');
-
-            // Add to global data
-            if (window.HERA_DATA && window.HERA_DATA.tasks) {
-                window.HERA_DATA.tasks.push(data.task);
+        send: () => queueMutation('POST', '/api/tasks/add', {
+            task: task.task,
+            deadline: task.deadline,
+            status: task.status,
+            notes: task.notes
+        }),
+        confirm: data => {
+            // Swap the placeholder id for the saved one (absent when queued offline)
+            if (data.task) {
+                const taskItem = document.querySelector(`.task-item[data-task-id="${task.id}"]`);
+                if (taskItem) taskItem.outerHTML = renderTaskItem(data.task);
+                rememberSavedId(task.id, data.task.id);
+                task.id = data.task.id;
             }
-
-            // Refresh the page to show new task
-            setTimeout(() => window.location.reload(), 1000);
-        } else {
-            showNotification('Failed to add task: ' + (data.error || 'Unknown error'), 'error');
-        }
-    })
-    .catch(error => {
-        console.error('Error adding task:', error);
-        showNotification('Error adding task', 'error');
+            showNotification('Task added successfully!', 'success');
+        },
+        failure: 'Failed to add task'
     });
 }
 
@@ -1202,6 +1220,11 @@ function saveTaskChanges() {
         return;
     }
 
+    const taskId = currentEditingTaskId;
+    const taskItem = document.querySelector(`.task-item[data-task-id="${taskId}"]`);
+    if (!taskItem) return;
+
+    const previous = readTaskItem(taskItem);
     const data = {
         task: form.querySelector('#edit-task-name').value.trim(),
         deadline: form.querySelector('#edit-task-deadline').value,
@@ -1220,38 +1243,18 @@ function saveTaskChanges() {
         return;
     }
 
-    fetch(`/api/tasks/${currentEditingTaskId}/update`, {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
+    closeModal('edit-task-modal');
+    optimisticUpdate({
+        key: `task:${taskId}`,
+        apply: () => {
+            updateTaskDisplay(taskId, data);
+            return () => updateTaskDisplay(taskId, previous);
         },
-        body: JSON.stringify(data)
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
+        send: () => queueMutation('POST', `/api/tasks/${savedId(taskId)}/update`, data),
+        confirm: response => {
+            if (response.task) updateTaskDisplay(taskId, response.task);
             showNotification('Task updated successfully!', 'success');
-            closeModal('edit-task-modal');
-
-            // Update task display
-            updateTaskDisplay(currentEditingTaskId, data.task);
-
-            // Update global data
-            if (window.HERA_DATA && window.HERA_DATA.tasks) {
-                const taskIndex = window.HERA_DATA.tasks.findIndex(t => t.id === currentEditingTaskId);
-                if (taskIndex !== -1) {
-                    Object.assign(window.HERA_DATA.tasks[taskIndex], data.task);
-                }
-            }
-
-            // Update progress after changes
-            updateTaskProgress();
-        } else {
-            showNotification('Failed to update task: ' + (data.error || 'Unknown error'), 'error');
-        }
-    })
-    .catch(error => {
-        console.error('Error updating task:', error);
-        showNotification('Error updating task', 'error');
+        },
+        failure: 'Failed to update task'
     });
 }
\ No newline at end of file
@@ -60,33 +60,38 @@ function setupModal() {
 }
 
 function updateMemberStatus(selectElement) {
-    const memberId = selectElement.dataset.memberId;
+    const memberId = parseInt(selectElement.dataset.memberId);
     const newStatus = selectElement.value;
     const card = selectElement.closest('.family-card');
 
     if (!card) return;
 
-    // Show loading state
-    card.classList.add('loading');
+    const previous = readMemberCard(card);
 
-    // Store original status in case we need to revert
-    const originalStatus = card.dataset.status;
-    card.dataset.originalStatus = originalStatus;
-
-    // Simulate API call delay
-    setTimeout(() => {
-        // Update card status
-        updateCardStatus(card, newStatus);
-
-        // Update progress bar
-        updateProgressBar();
-
-        // Show success notification
-        showNotification(`${card.querySelector('.member-name').textContent}'s status updated to ${newStatus}`, 'success');
+    optimisticUpdate({
+        key: `family:${memberId}`,
+        apply: () => {
+            updateCardStatus(card, newStatus);
+            updateProgressBar();
+            return () => {
+                updateMemberCard(memberId, previous);
+                updateProgressBar();
+            };
+        },
+        send: () => queueMutation('POST', '/api/family/update', { id: memberId, field: 'status', value: newStatus }),
+        confirm: () => showNotification(`${previous.name}'s status updated to ${newStatus}`, 'success'),
+        failure: 'Failed to update status'
+    });
+}
 
-        // Remove loading state
-        card.classList.remove('loading');
-    }, 500);
+// Name, status and notes as currently shown on a member's card
+function readMemberCard(card) {
+    const notesElement = card.querySelector('.notes-text');
+    return {
+        name: card.querySelector('.member-name').textContent.trim(),
+        status: card.querySelector('.status-select').value,
+        notes: notesElement ? notesElement.textContent.trim() : ''
+    };
 }
 
 function updateCardStatus(card, status) {
@@ -153,11 +158,8 @@ function closeModal() {
 }
 
 function saveMemberChanges() {
-    const form = document.getElementById('edit-form');
-    const submitBtn = form.querySelector('button[type="submit"]');
-
     // Get form data
-    const memberId = document.getElementById('edit-member-id').value;
+    const memberId = parseInt(document.getElementById('edit-member-id').value);
     const name = document.getElementById('edit-name').value.trim();
     const status = document.getElementById('edit-status').value;
     const notes = document.getElementById('edit-notes').value.trim();
@@ -169,41 +171,32 @@ function saveMemberChanges() {
         return;
     }
 
-    // Show loading state
-    const originalText = submitBtn.innerHTML;
-    submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Saving...';
-    submitBtn.disabled = true;
+    const card = document.querySelector(`.family-card[data-member-id="${memberId}"]`);
+    if (!card) return;
 
-    const data = {
-        id: memberId,
-        name: name,
-        status: status,
-        notes: notes
-    };
+    const previous = readMemberCard(card);
+    const data = { name: name, status: status, notes: notes };
 
-    // Simulate API call
-    setTimeout(() => {
-        try {
-            // Update the card with new data
+    closeModal();
+    optimisticUpdate({
+        key: `family:${memberId}`,
+        apply: () => {
             updateMemberCard(memberId, data);
-
-            // Update progress bar
             updateProgressBar();
-
-            // Show success message
-            showNotification('Member details updated successfully', 'success');
-
-            // Close modal
-            closeModal();
-        } catch (error) {
-            console.error('Error updating member:', error);
-            showNotification('Failed to update member details', 'error');
-        } finally {
-            // Reset button state
-            submitBtn.innerHTML = originalText;
-            submitBtn.disabled = false;
-        }
-    }, 800);
+            return () => {
+                updateMemberCard(memberId, previous);
+                updateProgressBar();
+            };
+        },
+        // /api/family/update takes one field at a time; apply them together or not at all
+        send: () => sendAtomic(Object.entries(data).map(([field, value]) => ({
+            method: 'POST',
+            url: '/api/family/update',
+            body: { id: memberId, field: field, value: value }
+        }))),
+        confirm: () => showNotification('Member details updated successfully', 'success'),
+        failure: 'Failed to update member details'
+    });
 }
 
 function updateMemberCard(memberId, data) {
@@ -240,7 +233,7 @@ function updateMemberCard(memberId, data) {
                 <div class="member-notes">
                     <div class="notes-content">
                         <i class="fas fa-quote-left"></i>
-                        <p class="notes-text">${data.notes}</p>
+                        <p class="notes-text">${escapeHtml(data.notes)}</p>
                     </div>
                 </div>
             `;
@@ -4,18 +4,57 @@
 let selectedFiles = [];
 let currentEditingFileId = null;
 
+// Loaded files for the current filter; the grid renders only the visible cards
+const fileModel = {
+    files: [],
+    nextCursor: null,
+    loading: false,
+    counts: {},  // category -> count over all files, seeded from the server-rendered filters
+    list: null
+};
+
 document.addEventListener('DOMContentLoaded', function() {
     initializeFilesPage();
 });
 
 function initializeFilesPage() {
     console.log('🗂️ Initializing HERA Files Page...');
+    performance.mark('files-start');
+    setupFileGrid();
     setupFileUpload();
     setupDragAndDrop();
     setupSearch();
     setupCategoryFilters();
     setupModals();
-    console.log('✅ Files page initialized successfully');
+    requestAnimationFrame(() => {
+        performance.measure('files-interactive', 'files-start');
+        const [entry] = performance.getEntriesByName('files-interactive');
+        console.log(`✅ Files page interactive in ${entry.duration.toFixed(1)}ms`);
+    });
+}
+
+function setupFileGrid() {
+    const filesGrid = document.getElementById('files-grid');
+    const firstPage = JSON.parse(document.getElementById('files-first-page').textContent);
+
+    document.querySelectorAll('.category-filter').forEach(filter => {
+        const countElement = filter.querySelector('.count');
+        fileModel.counts[filter.dataset.category] = countElement ? parseInt(countElement.textContent) || 0 : 0;
+    });
+
+    fileModel.list = new VirtualList(filesGrid, {
+        renderItem: renderFileCard,
+        keyAttribute: 'data-file-id',
+        rowHeight: 320,
+        onNearEnd: loadMoreFiles
+    });
+    setFiles(firstPage.files, firstPage.next_cursor);
+}
+
+function setFiles(files, nextCursor) {
+    fileModel.files = files;
+    fileModel.nextCursor = nextCursor;
+    fileModel.list.setItems(fileModel.files);
 }
 
 // =============================================================================
@@ -280,11 +319,7 @@ function uploadFiles() {
         if (data.success) {
             showNotification(`${data.uploaded_count} files uploaded successfully!`, 'success');
             closeUploadModal();
-
-            // Refresh the page to show new files
-            setTimeout(() => {
-                window.location.reload();
-            }, 1000);
+            addUploadedFiles(data.files || []);
         } else {
             throw new Error(data.error || 'Upload failed');
         }
@@ -333,49 +368,119 @@ function setupCategoryFilters() {
     });
 }
 
-function filterFiles(searchTerm) {
-    const fileCards = document.querySelectorAll('.file-card');
-    const searchLower = searchTerm.toLowerCase();
-
-    fileCards.forEach(card => {
-        const fileName = card.querySelector('.file-name').textContent.toLowerCase();
-        const category = card.dataset.category.toLowerCase();
+const fileFilters = { category: 'all', search: '' };
+let fileSearchTimer = null;
 
-        if (fileName.includes(searchLower) || category.includes(searchLower)) {
-            card.classList.remove('hidden');
-        } else {
-            card.classList.add('hidden');
-        }
-    });
+function filterFiles(searchTerm) {
+    fileFilters.search = searchTerm.trim();
 
-    updateEmptyState();
+    // Debounce so typing doesn't fire one request per keystroke
+    clearTimeout(fileSearchTimer);
+    fileSearchTimer = setTimeout(() => reloadFiles(), 250);
 }
 
 function filterFilesByCategory(category) {
-    const fileCards = document.querySelectorAll('.file-card');
+    fileFilters.category = category;
+    reloadFiles();
+}
 
-    fileCards.forEach(card => {
-        if (category === 'all' || card.dataset.category === category) {
-            card.classList.remove('hidden');
-        } else {
-            card.classList.add('hidden');
-        }
-    });
+function buildFilesQuery(cursor) {
+    const params = new URLSearchParams();
+    if (fileFilters.category && fileFilters.category !== 'all') params.set('category', fileFilters.category);
+    if (fileFilters.search) params.set('search', fileFilters.search);
+    if (cursor) params.set('cursor', cursor);
+    return `/api/files?${params.toString()}`;
+}
 
-    updateEmptyState();
+function fetchFilesPage(cursor) {
+    return fetch(buildFilesQuery(cursor))
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) throw new Error(data.error || 'Failed to load files');
+            return data;
+        });
 }
 
-function updateEmptyState() {
-    const visibleCards = document.querySelectorAll('.file-card:not(.hidden)');
-    const emptyState = document.querySelector('.empty-state');
+function reloadFiles() {
+    fetchFilesPage(null)
+        .then(data => {
+            setFiles(data.files, data.next_cursor);
+            updateEmptyState();
+        })
+        .catch(error => {
+            console.error('Filter error:', error);
+            showNotification('Failed to load files', 'error');
+        });
+}
 
-    if (visibleCards.length === 0 && !emptyState) {
-        showTemporaryEmptyState();
-    }
+// Called by the grid when the last rendered row nears the viewport
+function loadMoreFiles() {
+    if (!fileModel.nextCursor || fileModel.loading) return;
+
+    fileModel.loading = true;
+    fetchFilesPage(fileModel.nextCursor)
+        .then(data => {
+            setFiles(fileModel.files.concat(data.files), data.next_cursor);
+        })
+        .catch(error => {
+            console.error('Load more error:', error);
+            showNotification('Failed to load more files', 'error');
+        })
+        .finally(() => {
+            fileModel.loading = false;
+        });
+}
+
+function renderFileCard(file) {
+    const icons = { pdf: 'fa-file-pdf', document: 'fa-file-word' };
+    const preview = file.type === 'image'
+        ? `<img src="/static/uploads/files/${encodeURIComponent(file.filename)}" alt="${escapeHtml(file.original_name)}" class="file-thumbnail" loading="lazy">`
+        : `<div class="file-icon ${icons[file.type] ? file.type : 'general'}"><i class="fas ${icons[file.type] || 'fa-file'}"></i></div>`;
+    const category = file.category || 'other';
+    const name = escapeHtml(file.original_name);
+    const jsName = escapeHtml(JSON.stringify(file.original_name || ''));
+    const jsFilename = escapeHtml(JSON.stringify(file.filename));
+
+    return `
+        <div class="file-card" data-category="${escapeHtml(category)}" data-file-id="${file.id}">
+            <div class="file-preview">${preview}</div>
+            <div class="file-info">
+                <div class="file-name" title="${name}">${name}</div>
+                <div class="file-details">
+                    <span class="file-size">${escapeHtml(file.size)}</span>
+                    <span class="file-date">${file.upload_date ? escapeHtml(file.upload_date.slice(0, 10)) : 'Unknown'}</span>
+                </div>
+                <div class="file-category">
+                    <span class="category-badge category-${escapeHtml(category)}">
+                        ${escapeHtml(category.charAt(0).toUpperCase() + category.slice(1))}
+                    </span>
+                </div>
+            </div>
+            <div class="file-actions">
+                <button class="action-btn download-btn" onclick="downloadFile(${jsFilename})" title="Download">
+                    <i class="fas fa-download"></i>
+                </button>
+                <button class="action-btn view-btn" onclick="viewFile(${jsFilename}, '${escapeHtml(file.type)}')" title="View">
+                    <i class="fas fa-eye"></i>
+                </button>
+                <button class="action-btn edit-btn" onclick="editFile(${file.id})" title="Edit Details">
+                    <i class="fas fa-edit"></i>
+                </button>
+                <button class="action-btn delete-btn" onclick="deleteFile(${file.id}, ${jsName})" title="Delete">
+                    <i class="fas fa-trash"></i>
+                </button>
+            </div>
+        </div>
+    `;
 }
 
-function showTemporaryEmptyState() {
+function updateEmptyState() {
     const filesGrid = document.getElementById('files-grid');
+    const existingTemp = filesGrid.querySelector('.empty-state.temporary');
+    if (existingTemp) existingTemp.remove();
+
+    if (fileModel.files.length > 0 || filesGrid.querySelector('.empty-state')) return;
+
     const tempEmpty = document.createElement('div');
     tempEmpty.className = 'empty-state temporary';
     tempEmpty.innerHTML = `
@@ -385,23 +490,7 @@ function showTemporaryEmptyState() {
         <h3>No Files Found</h3>
         <p>Try adjusting your search or filter criteria</p>
     `;
-
-    // Remove any existing temporary empty state
-    const existingTemp = filesGrid.querySelector('.empty-state.temporary');
-    if (existingTemp) existingTemp.remove();
-
     filesGrid.appendChild(tempEmpty);
-
-    // Remove when files become visible again
-    const observer = new MutationObserver(() => {
-        const visibleCards = document.querySelectorAll('.file-card:not(.hidden)');
-        if (visibleCards.length > 0 && tempEmpty.parentNode) {
-            tempEmpty.remove();
-            observer.disconnect();
-        }
-    });
-
-    observer.observe(filesGrid, { childList: true, subtree: true, attributes: true });
 }
 
 // =============================================================================
@@ -464,12 +553,8 @@ function closeViewerModal() {
 function editFile(fileId) {
     currentEditingFileId = fileId;
 
-    // Get file data (you might want to fetch this from server)
-    const fileCard = document.querySelector(`[data-file-id="${fileId}"]`);
-    if (!fileCard) return;
-
-    const fileName = fileCard.querySelector('.file-name').textContent;
-    const category = fileCard.dataset.category;
+    const file = fileModel.files.find(f => f.id === fileId);
+    if (!file) return;
 
     // Populate edit modal
     const editModal = document.getElementById('edit-file-modal');
@@ -477,9 +562,9 @@ function editFile(fileId) {
     const categorySelect = document.getElementById('edit-file-category');
     const notesTextarea = document.getElementById('edit-file-notes');
 
-    if (nameInput) nameInput.value = fileName;
-    if (categorySelect) categorySelect.value = category;
-    if (notesTextarea) notesTextarea.value = ''; // Would fetch from server
+    if (nameInput) nameInput.value = file.original_name || '';
+    if (categorySelect) categorySelect.value = file.category || 'other';
+    if (notesTextarea) notesTextarea.value = file.notes || '';
 
     if (editModal) editModal.classList.add('show');
 }
@@ -497,33 +582,48 @@ function deleteFile(fileId, fileName) {
         return;
     }
 
-    fetch(`/api/files/delete/${fileId}`, {
-        method: 'DELETE'
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            showNotification('File deleted successfully', 'success');
-
-            // Remove file card from UI
-            const fileCard = document.querySelector(`[data-file-id="${fileId}"]`);
-            if (fileCard) {
-                fileCard.style.animation = 'fadeOutUp 0.3s ease';
-                setTimeout(() => {
-                    fileCard.remove();
-                    updateStats();
-                }, 300);
-            }
-        } else {
-            showNotification('Failed to delete file', 'error');
-        }
-    })
-    .catch(error => {
-        console.error('Delete error:', error);
-        showNotification('Failed to delete file', 'error');
+    const index = fileModel.files.findIndex(f => f.id === fileId);
+    if (index === -1) return;
+    const file = fileModel.files[index];
+
+    optimisticUpdate({
+        key: `file:${fileId}`,
+        apply: () => {
+            fileModel.files.splice(fileModel.files.indexOf(file), 1);
+            adjustCounts(file.category, -1);
+            refreshFileGrid();
+            return () => {
+                fileModel.files.splice(Math.min(index, fileModel.files.length), 0, file);
+                adjustCounts(file.category, 1);
+                refreshFileGrid();
+            };
+        },
+        send: () => queueMutation('DELETE', `/api/files/delete/${fileId}`),
+        confirm: () => showNotification('File deleted successfully', 'success'),
+        failure: 'Failed to delete file'
     });
 }
 
+// Uploaded files join the grid if they match the current filter and the list is fully loaded
+// (otherwise paging will reach them)
+function addUploadedFiles(files) {
+    const search = fileFilters.search.toLowerCase();
+    files.forEach(file => {
+        adjustCounts(file.category, 1);
+        const inCategory = fileFilters.category === 'all' || file.category === fileFilters.category;
+        const inSearch = !search || (file.original_name || '').toLowerCase().includes(search) ||
+                         (file.category || '').toLowerCase().includes(search);
+        if (inCategory && inSearch && !fileModel.nextCursor) fileModel.files.push(file);
+    });
+    refreshFileGrid();
+}
+
+function refreshFileGrid() {
+    fileModel.list.refresh();
+    updateStats();
+    updateEmptyState();
+}
+
 // =============================================================================
 // MODAL MANAGEMENT
 // =============================================================================
@@ -565,55 +665,51 @@ function setupModals() {
 function saveFileChanges() {
     if (!currentEditingFileId) return;
 
+    const fileId = currentEditingFileId;
+    const file = fileModel.files.find(f => f.id === fileId);
+    if (!file) return;
+
     const nameInput = document.getElementById('edit-file-name');
     const categorySelect = document.getElementById('edit-file-category');
     const notesTextarea = document.getElementById('edit-file-notes');
 
+    const previous = { name: file.original_name, category: file.category, notes: file.notes };
     const data = {
         name: nameInput?.value,
         category: categorySelect?.value,
         notes: notesTextarea?.value
     };
 
-    fetch(`/api/files/update/${currentEditingFileId}`, {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
+    closeEditModal();
+    optimisticUpdate({
+        key: `file:${fileId}`,
+        apply: () => {
+            updateFileCardDisplay(fileId, data);
+            return () => updateFileCardDisplay(fileId, previous);
         },
-        body: JSON.stringify(data)
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
+        send: () => queueMutation('POST', `/api/files/update/${fileId}`, data),
+        confirm: response => {
+            if (response.file) updateFileCardDisplay(fileId, response.file);
             showNotification('File updated successfully', 'success');
-            closeEditModal();
-
-            // Update file card in UI
-            updateFileCardDisplay(currentEditingFileId, data.file);
-        } else {
-            showNotification('Failed to update file', 'error');
-        }
-    })
-    .catch(error => {
-        console.error('Update error:', error);
-        showNotification('Failed to update file', 'error');
+        },
+        failure: 'Failed to update file'
     });
 }
 
 function updateFileCardDisplay(fileId, fileData) {
-    const fileCard = document.querySelector(`[data-file-id="${fileId}"]`);
-    if (!fileCard) return;
-
-    const nameElement = fileCard.querySelector('.file-name');
-    const categoryBadge = fileCard.querySelector('.category-badge');
+    const file = fileModel.files.find(f => f.id === fileId);
+    if (!file) return;
 
-    if (nameElement) nameElement.textContent = fileData.name;
-    if (categoryBadge) {
-        categoryBadge.textContent = fileData.category.charAt(0).toUpperCase() + fileData.category.slice(1);
-        categoryBadge.className = `category-badge category-${fileData.category}`;
+    if (file.category !== fileData.category) {
+        adjustCounts(file.category, -1);
+        adjustCounts(fileData.category, 1);
+        updateStats();
     }
+    file.original_name = fileData.name;
+    file.category = fileData.category;
+    file.notes = fileData.notes;
 
-    fileCard.dataset.category = fileData.category;
+    fileModel.list.updateItem(file);
 }
 
 // =============================================================================
@@ -645,32 +741,22 @@ function getFileIcon(filename) {
     }
 }
 
+function adjustCounts(category, delta) {
+    fileModel.counts.all = (fileModel.counts.all || 0) + delta;
+    fileModel.counts[category] = (fileModel.counts[category] || 0) + delta;
+}
+
 function updateStats() {
-    // Update file count and other stats
-    const visibleFiles = document.querySelectorAll('.file-card:not(.hidden)');
+    // Counts cover every file, not just the loaded pages, so they come from the model
     const totalFilesElement = document.getElementById('total-files');
-
     if (totalFilesElement) {
-        totalFilesElement.textContent = visibleFiles.length;
+        totalFilesElement.textContent = fileModel.counts.all || 0;
     }
 
-    // Update category counts
-    const categories = {};
-    visibleFiles.forEach(card => {
-        const category = card.dataset.category;
-        categories[category] = (categories[category] || 0) + 1;
-    });
-
-    // Update filter counts
     document.querySelectorAll('.category-filter').forEach(filter => {
-        const category = filter.dataset.category;
         const countElement = filter.querySelector('.count');
         if (countElement) {
-            if (category === 'all') {
-                countElement.textContent = visibleFiles.length;
-            } else {
-                countElement.textContent = categories[category] || 0;
-            }
+            countElement.textContent = fileModel.counts[filter.dataset.category] || 0;
         }
     });
 }
@@ -5,52 +5,196 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeItineraryPage();
 });
 
+// =============================================================================
+// CLIENT-SIDE MODEL
+// Activities live in `itinerary`; each day card renders a windowed list of
+// its activities and progress counters are kept here, not read from the DOM.
+// =============================================================================
+const itinerary = {
+    activities: new Map(),  // id -> activity
+    days: new Map(),        // day -> { ids: [...sorted by time], completed, list }
+    nextCursor: null
+};
+
 function initializeItineraryPage() {
-    console.log('🎯 Initializing HERA Itinerary with Full CRUD...');
+    performance.mark('itinerary-start');
+    const firstPage = JSON.parse(document.getElementById('itinerary-first-page').textContent);
+
+    firstPage.days.forEach(day => getDay(day));
+    addActivities(firstPage.activities);
+    itinerary.nextCursor = firstPage.next_cursor;
+
     setupActivityEvents();
     setupActivityForms();
     setupModals();
     updateAllProgress();
-    updateActivityCounts();
-    console.log('✅ Itinerary initialized successfully');
+
+    requestAnimationFrame(() => {
+        performance.measure('itinerary-interactive', 'itinerary-start');
+        const [entry] = performance.getEntriesByName('itinerary-interactive');
+        console.log(`✅ Itinerary interactive in ${entry.duration.toFixed(1)}ms (${itinerary.activities.size} activities)`);
+        loadRemainingActivities();
+    });
 }
 
-// =============================================================================
-// EVENT SETUP
-// =============================================================================
-function setupActivityEvents(container = document) {
-    // Setup checkbox events for completion toggle
-    const checkboxes = container.querySelectorAll('.activity-item input[type="checkbox"]');
-    checkboxes.forEach(checkbox => {
-        checkbox.addEventListener('change', function() {
-            const item = this.closest('.activity-item');
-            toggleActivityComplete(item);
+// Fetch the rest of the itinerary page by page after the first render
+function loadRemainingActivities() {
+    if (!itinerary.nextCursor) {
+        performance.measure('itinerary-loaded', 'itinerary-start');
+        return;
+    }
+    const params = new URLSearchParams({ limit: 500, cursor: itinerary.nextCursor });
+    fetch(`/api/query/itinerary?${params}`)
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) throw new Error(data.error || 'Failed to load activities');
+            addActivities(data.items);
+            itinerary.nextCursor = data.next_cursor;
+            updateAllProgress();
+            loadRemainingActivities();
+        })
+        .catch(error => {
+            console.error('Error loading activities:', error);
+            showNotification('Some activities could not be loaded', 'error');
         });
+}
+
+function getDay(dayNumber) {
+    let day = itinerary.days.get(dayNumber);
+    if (!day) {
+        const container = document.querySelector(`.activities-list[data-day="${dayNumber}"]`);
+        day = {
+            ids: [],
+            completed: 0,
+            list: container ? new VirtualList(container, {
+                renderItem: id => renderActivityItem(itinerary.activities.get(id)),
+                keyAttribute: 'data-activity-id',
+                rowHeight: 96
+            }) : null
+        };
+        itinerary.days.set(dayNumber, day);
+    }
+    return day;
+}
+
+// Zero-padded 24h 'HH:MM' for '8:15 AM' and '08:15' style times, so they sort as strings
+function normalizeTime(value) {
+    const match = String(value || '').match(/(\d{1,2}):(\d{2})\s*([AaPp][Mm])?/);
+    if (!match) return '';
+    let hours = parseInt(match[1], 10) % 24;
+    const meridiem = (match[3] || '').toUpperCase();
+    if (meridiem === 'PM' && hours < 12) hours += 12;
+    if (meridiem === 'AM' && hours === 12) hours = 0;
+    return `${String(hours).padStart(2, '0')}:${match[2]}`;
+}
+
+function activitySortKey(activity) {
+    return `${normalizeTime(activity.time)}|${String(activity.id).padStart(10, '0')}`;
+}
+
+// Index in a day's sorted ids where `activity` belongs (binary search)
+function insertionIndex(day, activity) {
+    const key = activitySortKey(activity);
+    let low = 0;
+    let high = day.ids.length;
+    while (low < high) {
+        const mid = (low + high) >> 1;
+        if (activitySortKey(itinerary.activities.get(day.ids[mid])) < key) low = mid + 1;
+        else high = mid;
+    }
+    return low;
+}
+
+function addActivities(activities) {
+    const touched = new Set();
+    activities.forEach(activity => {
+        itinerary.activities.set(activity.id, activity);
+        const day = getDay(activity.day);
+        // Pages arrive in (day, time) order, so appending keeps each day sorted
+        day.ids.push(activity.id);
+        if (activity.completed) day.completed++;
+        touched.add(day);
     });
+    touched.forEach(day => day.list && day.list.setItems(day.ids));
+}
 
-    // Setup editable text events for inline editing
-    const editableElements = container.querySelectorAll('.editable-text');
-    editableElements.forEach(element => {
-        element.addEventListener('click', function() {
-            makeElementEditable(this);
-        });
+function insertActivity(activity) {
+    itinerary.activities.set(activity.id, activity);
+    const day = getDay(activity.day);
+    day.ids.splice(insertionIndex(day, activity), 0, activity.id);
+    if (activity.completed) day.completed++;
+    if (day.list) day.list.refresh();
+}
+
+function removeActivity(activityId) {
+    const activity = itinerary.activities.get(activityId);
+    if (!activity) return;
+    const day = getDay(activity.day);
+    const position = day.ids.indexOf(activityId);
+    if (position !== -1) day.ids.splice(position, 1);
+    if (activity.completed) day.completed--;
+    itinerary.activities.delete(activityId);
+    if (day.list) day.list.refresh();
+}
+
+// Apply changed fields to an activity, moving it if its day or time changed
+function updateActivity(activityId, changes) {
+    const activity = itinerary.activities.get(activityId);
+    if (!activity) return;
+    const moved = ('day' in changes && changes.day !== activity.day) ||
+                  ('time' in changes && normalizeTime(changes.time) !== normalizeTime(activity.time));
+    if (moved) {
+        removeActivity(activityId);
+        insertActivity({ ...activity, ...changes });
+        return;
+    }
+    const day = getDay(activity.day);
+    if ('completed' in changes && Boolean(changes.completed) !== Boolean(activity.completed)) {
+        day.completed += changes.completed ? 1 : -1;
+    }
+    Object.assign(activity, changes);
+    if (day.list) day.list.updateItem(activityId);
+}
+
+// Times one model edit from the change to the next painted frame
+function measureEdit(label, apply) {
+    const started = performance.now();
+    apply();
+    updateAllProgress();
+    requestAnimationFrame(() => {
+        console.debug(`${label}: ${(performance.now() - started).toFixed(1)}ms to next frame`);
     });
+}
 
-    // Setup edit button events
-    const editButtons = container.querySelectorAll('.edit-btn');
-    editButtons.forEach(button => {
-        button.addEventListener('click', function() {
-            const item = this.closest('.activity-item');
-            openEditActivityModal(item);
-        });
+// =============================================================================
+// EVENT SETUP
+// Rows are created and discarded as lists scroll, so events are delegated
+// =============================================================================
+function setupActivityEvents() {
+    const grid = document.querySelector('.days-grid');
+    if (!grid) return;
+
+    grid.addEventListener('change', function(e) {
+        if (e.target.matches('.activity-checkbox input[type="checkbox"]')) {
+            toggleActivityComplete(e.target.closest('.activity-item'));
+        }
     });
 
-    // Setup delete button events
-    const deleteButtons = container.querySelectorAll('.delete-btn');
-    deleteButtons.forEach(button => {
-        button.addEventListener('click', function() {
-            deleteActivity(this);
-        });
+    grid.addEventListener('click', function(e) {
+        const editable = e.target.closest('.editable-text');
+        if (editable) {
+            makeElementEditable(editable);
+            return;
+        }
+        const editButton = e.target.closest('.edit-btn');
+        if (editButton) {
+            openEditActivityModal(editButton.closest('.activity-item'));
+            return;
+        }
+        const deleteButton = e.target.closest('.delete-btn');
+        if (deleteButton) {
+            deleteActivity(deleteButton);
+        }
     });
 }
 
@@ -113,27 +257,17 @@ function openAddActivityModal() {
 function openEditActivityModal(activityItem) {
     if (!activityItem) return;
 
-    const activityId = activityItem.dataset.activityId;
-    const day = activityItem.closest('.activities-list').dataset.day;
-
-    // Get current data from the DOM
-    const time = activityItem.querySelector('.activity-time')?.textContent || '';
-    const titleElement = activityItem.querySelector('.activity-title');
-    const title = titleElement ? titleElement.textContent.replace('💍', '').trim() : '';
-    const locationElement = activityItem.querySelector('.activity-location span');
-    const location = locationElement ? locationElement.textContent : '';
-    const notesElement = activityItem.querySelector('.activity-notes');
-    const notes = notesElement ? notesElement.textContent : '';
-    const isProposal = activityItem.classList.contains('proposal-activity');
+    const activity = itinerary.activities.get(parseInt(activityItem.dataset.activityId));
+    if (!activity) return;
 
     // Populate edit form
-    document.getElementById('edit-activity-id').value = activityId;
-    document.getElementById('edit-activity-day').value = day;
-    document.getElementById('edit-activity-time').value = time;
-    document.getElementById('edit-activity-name').value = title;
-    document.getElementById('edit-activity-location').value = location;
-    document.getElementById('edit-activity-notes').value = notes;
-    document.getElementById('edit-is-proposal').checked = isProposal;
+    document.getElementById('edit-activity-id').value = activity.id;
+    document.getElementById('edit-activity-day').value = activity.day;
+    document.getElementById('edit-activity-time').value = normalizeTime(activity.time);
+    document.getElementById('edit-activity-name').value = activity.activity || '';
+    document.getElementById('edit-activity-location').value = activity.location || '';
+    document.getElementById('edit-activity-notes').value = activity.notes || '';
+    document.getElementById('edit-is-proposal').checked = Boolean(activity.isProposal);
 
     openModal('edit-activity-modal');
 }
@@ -142,48 +276,38 @@ function openEditActivityModal(activityItem) {
 // ACTIVITY COMPLETION TOGGLE
 // =============================================================================
 function toggleActivityComplete(item) {
-    const activityId = item.dataset.activityId;
+    const activityId = parseInt(item.dataset.activityId);
     const checkbox = item.querySelector('.activity-checkbox input[type="checkbox"]');
     const isCompleted = checkbox.checked;
 
-    // Update UI immediately for better UX
-    item.dataset.completed = isCompleted;
-    if (isCompleted) {
-        item.classList.add('completed');
-    } else {
-        item.classList.remove('completed');
-    }
-
-    updateAllProgress(); // Update progress immediately
+    editActivity({
+        activityId,
+        changes: { completed: isCompleted },
+        label: 'toggle',
+        send: () => queueMutation('POST', `/api/itinerary/${savedId(activityId)}/complete`, { completed: isCompleted }),
+        success: `Activity ${isCompleted ? 'completed' : 'reopened'}`,
+        failure: 'Failed to update activity'
+    });
+}
 
-    // Send to backend
-    fetch(`/api/itinerary/${activityId}/complete`, {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
+// Apply `changes` to the model now; put the previous values back if the server refuses
+function editActivity({ activityId, changes, label, send, success, failure }) {
+    const activity = itinerary.activities.get(activityId);
+    if (!activity) return;
+    const previous = Object.fromEntries(Object.keys(changes).map(field => [field, activity[field]]));
+
+    optimisticUpdate({
+        key: `itinerary:${activityId}`,
+        apply: () => {
+            measureEdit(label, () => updateActivity(savedId(activityId), changes));
+            return () => {
+                updateActivity(savedId(activityId), previous);
+                updateAllProgress();
+            };
         },
-        body: JSON.stringify({ completed: isCompleted })
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            showNotification(`Activity ${isCompleted ? 'completed' : 'reopened'}`, 'success');
-        } else {
-            // Revert on error
-            checkbox.checked = !isCompleted;
-            item.dataset.completed = !isCompleted;
-            item.classList.toggle('completed', !isCompleted);
-            showNotification(data.error || 'Failed to update activity', 'error');
-            updateAllProgress();
-        }
-    })
-    .catch(error => {
-        console.error('Error updating activity:', error);
-        checkbox.checked = !isCompleted;
-        item.dataset.completed = !isCompleted;
-        item.classList.toggle('completed', !isCompleted);
-        showNotification('Error updating activity', 'error');
-        updateAllProgress();
+        send,
+        confirm: () => showNotification(success, 'success'),
+        failure
     });
 }
 
@@ -193,9 +317,9 @@ function toggleActivityComplete(item) {
 function makeElementEditable(element) {
     if (element.classList.contains('editing')) return;
 
-    const originalValue = element.textContent.trim().replace('💍', '').trim();
     const field = element.dataset.field;
-    const activityId = element.dataset.itemId;
+    const activityId = parseInt(element.dataset.itemId);
+    const originalValue = String(itinerary.activities.get(activityId)?.[field] ?? '');
 
     element.classList.add('editing');
     element.contentEditable = true;
@@ -222,7 +346,7 @@ function makeElementEditable(element) {
         }
     }
 
-    element.addEventListener('blur', finishEditing);
+    element.addEventListener('blur', finishEditing, { once: true });
     element.addEventListener('keydown', function(e) {
         if (e.key === 'Enter') {
             e.preventDefault();
@@ -240,40 +364,22 @@ function restoreElementContent(element, value) {
     const isProposal = activityItem && activityItem.classList.contains('proposal-activity');
 
     if (element.classList.contains('activity-title') && isProposal) {
-        element.innerHTML = value + ' <span class="proposal-indicator">💍</span>';
+        element.innerHTML = escapeHtml(value) + ' <span class="proposal-indicator">💍</span>';
     } else {
         element.textContent = value;
     }
 }
 
 function updateActivityField(activityId, field, value, element, originalValue) {
-    const data = {
-        id: parseInt(activityId),
-        field: field,
-        value: value
-    };
-
-    fetch('/api/itinerary/update', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify(data)
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            showNotification('Activity updated', 'success');
-            restoreElementContent(element, value);
-        } else {
-            showNotification('Failed to update activity', 'error');
-            restoreElementContent(element, originalValue);
-        }
-    })
-    .catch(error => {
-        console.error('Update error:', error);
-        showNotification('Failed to update activity', 'error');
-        restoreElementContent(element, originalValue);
+    // The row re-renders from the model, so no separate rollback of `element` is needed
+    restoreElementContent(element, value);
+    editActivity({
+        activityId,
+        changes: { [field]: value },
+        label: 'inline edit',
+        send: () => queueMutation('POST', '/api/itinerary/update', { id: savedId(activityId), field: field, value: value }),
+        success: 'Activity updated',
+        failure: 'Failed to update activity'
     });
 }
 
@@ -288,41 +394,22 @@ function deleteActivity(button) {
         return;
     }
 
-    const activityId = item.dataset.activityId;
-
-    // Visual feedback
-    item.style.opacity = '0.5';
-    item.style.pointerEvents = 'none';
-
-    fetch(`/api/itinerary/delete/${activityId}`, {
-        method: 'DELETE'
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            // Remove from DOM with animation
-            item.style.transition = 'all 0.3s ease';
-            item.style.transform = 'translateX(-100%)';
+    const activityId = parseInt(item.dataset.activityId);
+    const activity = itinerary.activities.get(activityId);
+    if (!activity) return;
 
-            setTimeout(() => {
-                item.remove();
+    optimisticUpdate({
+        key: `itinerary:${activityId}`,
+        apply: () => {
+            measureEdit('delete', () => removeActivity(activityId));
+            return () => {
+                insertActivity(activity);
                 updateAllProgress();
-                updateActivityCounts();
-            }, 300);
-
-            showNotification('Activity deleted successfully', 'success');
-        } else {
-            // Revert visual feedback
-            item.style.opacity = '1';
-            item.style.pointerEvents = 'auto';
-            showNotification(data.error || 'Failed to delete activity', 'error');
-        }
-    })
-    .catch(error => {
-        console.error('Error deleting activity:', error);
-        item.style.opacity = '1';
-        item.style.pointerEvents = 'auto';
-        showNotification('Error deleting activity', 'error');
+            };
+        },
+        send: () => queueMutation('DELETE', `/api/itinerary/delete/${savedId(activityId)}`),
+        confirm: () => showNotification('Activity deleted successfully', 'success'),
+        failure: 'Failed to delete activity'
     });
 }
 
@@ -361,36 +448,30 @@ function handleAddActivity(e) {
         return;
     }
 
-    const submitBtn = e.target.querySelector('button[type="submit"]');
-    const originalText = submitBtn.textContent;
-    submitBtn.textContent = 'Adding...';
-    submitBtn.disabled = true;
+    const activity = { id: temporaryId(), ...data, completed: false };
+    closeModal('add-activity-modal');
+    e.target.reset();
 
-    fetch('/api/itinerary/add', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
+    optimisticUpdate({
+        key: `itinerary:${activity.id}`,
+        apply: () => {
+            measureEdit('add', () => insertActivity(activity));
+            return () => {
+                removeActivity(savedId(activity.id));
+                updateAllProgress();
+            };
         },
-        body: JSON.stringify(data)
-    })
-    .then(response => response.json())
-    .then(response => {
-        if (response.success) {
-            addActivityToDay(response.itinerary_item);
-            closeModal('add-activity-modal');
-            e.target.reset();
+        send: () => queueMutation('POST', '/api/itinerary/add', data),
+        confirm: response => {
+            // Swap the placeholder for the saved record (absent when queued offline)
+            if (response.itinerary_item) {
+                removeActivity(activity.id);
+                insertActivity(response.itinerary_item);
+                rememberSavedId(activity.id, response.itinerary_item.id);
+            }
             showNotification('Activity added successfully', 'success');
-        } else {
-            showNotification(response.error || 'Failed to add activity', 'error');
-        }
-    })
-    .catch(error => {
-        console.error('Error adding activity:', error);
-        showNotification('Error adding activity', 'error');
-    })
-    .finally(() => {
-        submitBtn.textContent = originalText;
-        submitBtn.disabled = false;
+        },
+        failure: 'Failed to add activity'
     });
 }
 
@@ -414,136 +495,48 @@ function handleEditActivity(e) {
         return;
     }
 
-    const submitBtn = e.target.querySelector('button[type="submit"]');
-    const originalText = submitBtn.textContent;
-    submitBtn.textContent = 'Saving...';
-    submitBtn.disabled = true;
-
-    fetch('/api/itinerary/update', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify(data)
-    })
-    .then(response => response.json())
-    .then(response => {
-        if (response.success) {
-            updateActivityInDay(data);
-            closeModal('edit-activity-modal');
-            showNotification('Activity updated successfully', 'success');
-        } else {
-            showNotification(response.error || 'Failed to update activity', 'error');
-        }
-    })
-    .catch(error => {
-        console.error('Error updating activity:', error);
-        showNotification('Error updating activity', 'error');
-    })
-    .finally(() => {
-        submitBtn.textContent = originalText;
-        submitBtn.disabled = false;
+    const { id, ...changes } = data;
+    closeModal('edit-activity-modal');
+    editActivity({
+        activityId: id,
+        changes,
+        label: 'edit',
+        send: () => queueMutation('POST', '/api/itinerary/update', { ...data, id: savedId(id) }),
+        success: 'Activity updated successfully',
+        failure: 'Failed to update activity'
     });
 }
 
 // =============================================================================
-// DOM MANIPULATION
+// RENDERING
 // =============================================================================
-function addActivityToDay(activityData) {
-    const dayList = document.querySelector(`.activities-list[data-day="${activityData.day}"]`);
-    if (!dayList) return;
-
-    const activityItem = createActivityItem(activityData);
-
-    // Insert in correct time order
-    const existingItems = dayList.querySelectorAll('.activity-item');
-    let inserted = false;
-
-    for (let item of existingItems) {
-        const itemTime = item.querySelector('.activity-time')?.textContent || '00:00';
-        if (activityData.time < itemTime) {
-            dayList.insertBefore(activityItem, item);
-            inserted = true;
-            break;
-        }
-    }
-
-    if (!inserted) {
-        dayList.appendChild(activityItem);
-    }
-
-    setupActivityEvents(activityItem);
-    updateAllProgress();
-    updateActivityCounts();
-}
-
-function updateActivityInDay(activityData) {
-    // Find existing activity item
-    const existingItem = document.querySelector(`.activity-item[data-activity-id="${activityData.id}"]`);
-    if (!existingItem) return;
-
-    // Check if day changed
-    const currentDay = existingItem.closest('.activities-list').dataset.day;
-    if (parseInt(currentDay) !== activityData.day) {
-        // Remove from current day and add to new day
-        existingItem.remove();
-        addActivityToDay(activityData);
-    } else {
-        // Update in place
-        updateActivityItem(existingItem, activityData);
-
-        // Re-sort if time changed
-        const activitiesList = existingItem.closest('.activities-list');
-        const activities = Array.from(activitiesList.querySelectorAll('.activity-item'));
-        activities.sort((a, b) => {
-            const timeA = a.querySelector('.activity-time')?.textContent || '00:00';
-            const timeB = b.querySelector('.activity-time')?.textContent || '00:00';
-            return timeA.localeCompare(timeB);
-        });
-
-        activities.forEach(item => activitiesList.appendChild(item));
-    }
-
-    updateAllProgress();
-    updateActivityCounts();
-}
-
-function createActivityItem(activity) {
-    const item = document.createElement('div');
-    item.className = `activity-item ${activity.isProposal ? 'proposal-activity' : ''}`;
-    item.dataset.activityId = activity.id;
-    item.dataset.completed = activity.completed ? 'true' : 'false';
-
-    const proposalIndicator = activity.isProposal ? '<span class="proposal-indicator">💍</span>' : '';
+function renderActivityItem(activity) {
+    const id = activity.id;
+    const proposalIndicator = activity.isProposal ? ' <span class="proposal-indicator">💍</span>' : '';
     const locationHtml = activity.location ? `
-        <div class="activity-location">
-            <i class="fas fa-map-marker-alt"></i>
-            <span class="editable-text" data-field="location" data-item-id="${activity.id}">${activity.location}</span>
-        </div>
-    ` : '';
-
+            <div class="activity-location">
+                <i class="fas fa-map-marker-alt"></i>
+                <span class="editable-text" data-field="location" data-item-id="${id}">${escapeHtml(activity.location)}</span>
+            </div>` : '';
     const notesHtml = activity.notes ? `
-        <div class="activity-notes editable-text" data-field="notes" data-item-id="${activity.id}">
-            ${activity.notes}
-        </div>
-    ` : '';
+            <div class="activity-notes">
+                <p class="editable-text" data-field="notes" data-item-id="${id}">${escapeHtml(activity.notes)}</p>
+            </div>` : '';
 
-    item.innerHTML = `
+    return `
+    <div class="activity-item ${activity.isProposal ? 'proposal-activity' : ''} ${activity.completed ? 'completed' : ''}"
+         data-activity-id="${id}" data-completed="${activity.completed ? 'true' : 'false'}">
         <div class="activity-checkbox">
             <input type="checkbox" ${activity.completed ? 'checked' : ''}>
         </div>
-
         <div class="activity-content">
-            <div class="activity-time">${activity.time}</div>
+            <div class="activity-time">${escapeHtml(activity.time)}</div>
             <div class="activity-details">
-                <h4 class="activity-title editable-text" data-field="activity" data-item-id="${activity.id}">
-                    ${activity.activity}${proposalIndicator}
-                </h4>
+                <h4 class="activity-title editable-text" data-field="activity" data-item-id="${id}">${escapeHtml(activity.activity)}${proposalIndicator}</h4>
                 ${locationHtml}
                 ${notesHtml}
             </div>
         </div>
-
         <div class="activity-actions">
             <button class="action-btn edit-btn" data-tooltip="Edit">
                 <i class="fas fa-edit"></i>
@@ -552,135 +545,46 @@ function createActivityItem(activity) {
                 <i class="fas fa-trash"></i>
             </button>
         </div>
-    `;
-
-    return item;
-}
-
-function updateActivityItem(item, activityData) {
-    // Update time
-    const timeElement = item.querySelector('.activity-time');
-    if (timeElement) {
-        timeElement.textContent = activityData.time;
-    }
-
-    // Update title
-    const titleElement = item.querySelector('.activity-title');
-    if (titleElement) {
-        const proposalIndicator = activityData.isProposal ? '<span class="proposal-indicator">💍</span>' : '';
-        titleElement.innerHTML = activityData.activity + proposalIndicator;
-        titleElement.dataset.itemId = activityData.id;
-    }
-
-    // Update or create location
-    let locationElement = item.querySelector('.activity-location span');
-    const locationContainer = item.querySelector('.activity-location');
-
-    if (activityData.location) {
-        if (locationElement) {
-            locationElement.textContent = activityData.location;
-        } else {
-            // Create location element
-            const detailsContainer = item.querySelector('.activity-details');
-            const locationDiv = document.createElement('div');
-            locationDiv.className = 'activity-location';
-            locationDiv.innerHTML = `
-                <i class="fas fa-map-marker-alt"></i>
-                <span class="editable-text" data-field="location" data-item-id="${activityData.id}">${activityData.location}</span>
-            `;
-            detailsContainer.appendChild(locationDiv);
-        }
-    } else if (locationContainer) {
-        locationContainer.remove();
-    }
-
-    // Update or create notes
-    let notesElement = item.querySelector('.activity-notes');
-
-    if (activityData.notes) {
-        if (notesElement) {
-            notesElement.textContent = activityData.notes;
-        } else {
-            // Create notes element
-            const detailsContainer = item.querySelector('.activity-details');
-            const notesDiv = document.createElement('div');
-            notesDiv.className = 'activity-notes editable-text';
-            notesDiv.dataset.field = 'notes';
-            notesDiv.dataset.itemId = activityData.id;
-            notesDiv.textContent = activityData.notes;
-            detailsContainer.appendChild(notesDiv);
-        }
-    } else if (notesElement) {
-        notesElement.remove();
-    }
-
-    // Update proposal class
-    if (activityData.isProposal) {
-        item.classList.add('proposal-activity');
-    } else {
-        item.classList.remove('proposal-activity');
-    }
+    </div>`;
 }
 
 // =============================================================================
-// PROGRESS TRACKING
+// PROGRESS TRACKING (from the model: O(days), no DOM scans)
 // =============================================================================
 function updateAllProgress() {
-    const days = document.querySelectorAll('.day-card');
+    // Until every page has loaded the server-rendered counters are the accurate ones
+    if (itinerary.nextCursor) return;
 
-    days.forEach(dayCard => {
-        const dayNumber = dayCard.dataset.day;
-        const activitiesInDay = dayCard.querySelectorAll('.activity-item');
-        const completedInDay = dayCard.querySelectorAll('.activity-item[data-completed="true"]');
+    let total = 0;
+    let completed = 0;
 
-        const total = activitiesInDay.length;
-        const completed = completedInDay.length;
-        const percentage = total > 0 ? (completed / total) * 100 : 0;
+    itinerary.days.forEach((day, dayNumber) => {
+        const count = day.ids.length;
+        const percentage = count > 0 ? (day.completed / count) * 100 : 0;
+        total += count;
+        completed += day.completed;
 
-        // Update progress bar
-        const progressFill = dayCard.querySelector('.day-progress-fill');
+        const progressFill = document.querySelector(`.day-progress-fill[data-day="${dayNumber}"]`);
         if (progressFill) {
             progressFill.style.width = `${percentage}%`;
         }
-
-        // Update completion text
-        const completionText = dayCard.querySelector('.day-completion');
+        const completionText = document.querySelector(`.day-completion[data-day="${dayNumber}"]`);
         if (completionText) {
-            completionText.textContent = `${completed}/${total}`;
+            completionText.textContent = `${day.completed}/${count}`;
         }
     });
 
-    // Update overall progress
-    updateOverallProgress();
-}
-
-function updateOverallProgress() {
-    const allActivities = document.querySelectorAll('.activity-item');
-    const completedActivities = document.querySelectorAll('.activity-item[data-completed="true"]');
-
-    const total = allActivities.length;
-    const completed = completedActivities.length;
-    const percentage = total > 0 ? (completed / total) * 100 : 0;
-
-    // Update overall progress if element exists
-    const overallProgress = document.querySelector('.overall-progress-fill');
-    if (overallProgress) {
-        overallProgress.style.width = `${percentage}%`;
+    const percentage = total > 0 ? Math.round((completed / total) * 100) : 0;
+    const tripFill = document.getElementById('trip-progress-fill');
+    if (tripFill) {
+        tripFill.style.width = `${percentage}%`;
     }
-
-    const overallText = document.querySelector('.overall-completion');
-    if (overallText) {
-        overallText.textContent = `${completed}/${total} Activities Complete`;
+    const tripPercentage = document.getElementById('trip-percentage');
+    if (tripPercentage) {
+        tripPercentage.textContent = `${percentage}%`;
     }
-}
-
-function updateActivityCounts() {
-    // Update any activity count displays
-    const totalActivities = document.querySelectorAll('.activity-item').length;
-    const countElements = document.querySelectorAll('.activity-count');
-
-    countElements.forEach(element => {
-        element.textContent = totalActivities;
+    document.querySelectorAll('.activity-count').forEach(element => {
+        element.textContent = total;
     });
 }
 
@@ -14,77 +14,43 @@ function initializePage() {
 // Toggle individual item packed status
 function toggleItemPacked(itemId) {
     const item = document.querySelector(`[data-item-id="${itemId}"]`);
-    const checkbox = item?.querySelector('.packing-checkbox');
-
-    if (!item || !checkbox) {
+    if (!item || !item.querySelector('.packing-checkbox')) {
         console.error('Item not found:', itemId);
         return;
     }
+    const packed = !item.classList.contains('packed');
 
-    // Simple loading state - just opacity, no size changes
-    item.style.opacity = '0.7';
-
-    // Simulate API call
-    setTimeout(() => {
-        try {
-            const isPacked = item.classList.contains('packed');
-
-            if (isPacked) {
-                // Unpack item
-                item.classList.remove('packed');
-                checkbox.classList.remove('checked');
-                checkbox.innerHTML = '';
-                showNotification('Item unpacked', 'info');
-            } else {
-                // Pack item
-                item.classList.add('packed');
-                checkbox.classList.add('checked');
-                checkbox.innerHTML = '<i class="fas fa-check"></i>';
-                showNotification('Item packed!', 'success');
-            }
-
+    optimisticUpdate({
+        key: `packing:${itemId}`,
+        apply: () => {
+            setItemPacked(item, packed);
             // Success flash animation (no layout change)
             item.classList.add('packed-animation');
             setTimeout(() => item.classList.remove('packed-animation'), 800);
-
             updateAllProgress();
-        } catch (error) {
-            console.error('Toggle failed:', error);
-            showNotification('Failed to update item', 'error');
-        } finally {
-            item.style.opacity = '';
-        }
-    }, 300);
-
-    /* Real API implementation would be:
-    fetch(`/api/packing/${itemId}/toggle`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' }
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            // Update UI based on packed state
-            if (data.packed) {
-                item.classList.add('packed');
-                checkbox.classList.add('checked');
-                checkbox.innerHTML = '<i class="fas fa-check"></i>';
-            } else {
-                item.classList.remove('packed');
-                checkbox.classList.remove('checked');
-                checkbox.innerHTML = '';
+            return () => {
+                setItemPacked(item, !packed);
+                updateAllProgress();
+            };
+        },
+        send: () => queueMutation('POST', `/api/packing/${savedId(itemId)}/toggle`),
+        confirm: data => {
+            // The server flips its own copy; trust its answer if the two disagree
+            if (typeof data.packed === 'boolean' && data.packed !== packed) {
+                setItemPacked(item, data.packed);
+                updateAllProgress();
             }
-            updateAllProgress();
-        }
-    })
-    .catch(error => {
-        console.error('Toggle failed:', error);
-        showNotification('Failed to update item', 'error');
-    })
-    .finally(() => {
-        item.style.opacity = '';
+            showNotification(packed ? 'Item packed!' : 'Item unpacked', packed ? 'success' : 'info');
+        },
+        failure: 'Failed to update item'
     });
-    */
+}
+
+function setItemPacked(item, packed) {
+    const checkbox = item.querySelector('.packing-checkbox');
+    item.classList.toggle('packed', packed);
+    checkbox.classList.toggle('checked', packed);
+    checkbox.innerHTML = packed ? '<i class="fas fa-check"></i>' : '';
 }
 
 // Mark all items as packed
@@ -97,10 +63,7 @@ function markAllPacked() {
     }
 
     if (confirm(`Pack all ${unpacked.length} remaining items?`)) {
-        unpacked.forEach((item, index) => {
-            const itemId = parseInt(item.dataset.itemId);
-            setTimeout(() => toggleItemPacked(itemId), index * 100);
-        });
+        bulkSetPacked({ packed: true }, `Packed ${unpacked.length} items!`);
     }
 }
 
@@ -112,19 +75,37 @@ function toggleCategoryPacked(category) {
 
     if (!items || items.length === 0) return;
 
-    const action = unpacked.length === 0 ? 'unpack' : 'pack';
-    const targets = unpacked.length === 0 ?
-        categoryDiv.querySelectorAll('.packing-item.packed') : unpacked;
+    const packed = unpacked.length > 0;
+    const count = packed ? unpacked.length : items.length;
+    const actionText = packed ? 'Pack' : 'Unpack';
+    if (confirm(`${actionText} all ${count} items in ${category}?`)) {
+        bulkSetPacked({ packed, category }, `${actionText}ed ${count} items in ${category}`);
+    }
+}
 
-    if (targets.length === 0) return;
+// One /api/packing/bulk request; every changed item is updated in a single frame up front
+function bulkSetPacked(body, message) {
+    const scope = body.category ? document.querySelector(`[data-category="${body.category}"]`) : document;
+    const changed = [...scope.querySelectorAll('.packing-item')]
+        .filter(item => item.classList.contains('packed') !== body.packed);
 
-    const actionText = action === 'pack' ? 'Pack' : 'Unpack';
-    if (confirm(`${actionText} all ${targets.length} items in ${category}?`)) {
-        targets.forEach((item, index) => {
-            const itemId = parseInt(item.dataset.itemId);
-            setTimeout(() => toggleItemPacked(itemId), index * 100);
-        });
-    }
+    return optimisticUpdate({
+        apply: () => {
+            changed.forEach(item => setItemPacked(item, body.packed));
+            updateAllProgress();
+            return () => {
+                changed.forEach(item => setItemPacked(item, !body.packed));
+                updateAllProgress();
+            };
+        },
+        send: () => queueMutation('POST', '/api/packing/bulk', body),
+        confirm: data => {
+            // The server's counts also cover edits from other tabs (absent when queued offline)
+            if (data.categories) renderProgress(data.packed_count, data.total_count, data.categories);
+            showNotification(message, 'success');
+        },
+        failure: 'Bulk update failed'
+    });
 }
 
 // Modal Management
@@ -183,48 +164,31 @@ function deleteItem(itemId) {
     if (!item) return;
 
     const itemName = item.querySelector('.packing-name').textContent.trim();
+    if (!confirm(`Delete "${itemName}" from packing list?`)) return;
 
-    if (confirm(`Delete "${itemName}" from packing list?`)) {
-        // Fade out animation
-        item.style.opacity = '0';
-        item.style.transform = 'scale(0.95)';
+    const parent = item.parentNode;
+    const nextSibling = item.nextElementSibling;
 
-        setTimeout(() => {
+    optimisticUpdate({
+        key: `packing:${itemId}`,
+        apply: () => {
             item.remove();
             updateAllProgress();
-            showNotification('Item deleted', 'info');
-        }, 300);
-
-        // Real implementation would call API
-        /*
-        fetch(`/api/packing/${itemId}/delete`, {
-            method: 'DELETE',
-            headers: { 'Content-Type': 'application/json' }
-        })
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                item.remove();
+            return () => {
+                parent.insertBefore(item, nextSibling && nextSibling.isConnected ? nextSibling : null);
                 updateAllProgress();
-                showNotification('Item deleted', 'info');
-            } else {
-                showNotification('Failed to delete item', 'error');
-                item.style.opacity = '';
-                item.style.transform = '';
-            }
-        });
-        */
-    }
+            };
+        },
+        send: () => queueMutation('DELETE', `/api/packing/delete/${savedId(itemId)}`),
+        confirm: () => showNotification('Item deleted', 'info'),
+        failure: 'Failed to delete item'
+    });
 }
 
 // Form Submissions
 function addNewItem(event) {
     event.preventDefault();
 
-    const form = event.target;
-    const submitBtn = form.querySelector('button[type="submit"]');
-    const originalText = submitBtn.innerHTML;
-
     // Get form data
     const itemName = document.getElementById('item-name').value.trim();
     const category = document.getElementById('item-category').value;
@@ -245,42 +209,49 @@ function addNewItem(event) {
         return;
     }
 
-    // Show loading state
-    submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Adding...';
-    submitBtn.disabled = true;
-
     const finalCategory = category === 'new' ? newCategory : category;
-
-    // Simulate API call
-    setTimeout(() => {
-        try {
-            // Create new item element
-            const newItemId = Date.now(); // Simulate ID
-            createNewItemElement(newItemId, itemName, finalCategory, notes, packed);
-
-            // Close modal and reset
-            closeModal();
+    const itemId = temporaryId();
+
+    closeModal();
+    optimisticUpdate({
+        key: `packing:${itemId}`,
+        apply: () => {
+            const createdCategory = !document.querySelector(`[data-category="${finalCategory}"]`);
+            createNewItemElement(itemId, itemName, finalCategory, notes, packed);
             updateAllProgress();
+            return () => {
+                const item = document.querySelector(`[data-item-id="${savedId(itemId)}"]`);
+                const categoryDiv = item && item.closest('.packing-category');
+                if (item) item.remove();
+                if (createdCategory && categoryDiv && !categoryDiv.querySelector('.packing-item')) {
+                    categoryDiv.remove();
+                }
+                updateAllProgress();
+            };
+        },
+        send: () => queueMutation('POST', '/api/packing/add', {
+            item_name: itemName,
+            category: finalCategory,
+            notes: notes,
+            packed: packed
+        }),
+        confirm: data => {
+            // Swap the placeholder id for the saved one (absent when queued offline)
+            if (data.packing_item) {
+                const item = document.querySelector(`[data-item-id="${itemId}"]`);
+                if (item) item.outerHTML = renderPackingItem(data.packing_item.id, itemName, notes, packed);
+                rememberSavedId(itemId, data.packing_item.id);
+            }
             showNotification('Item added successfully!', 'success');
-
-        } catch (error) {
-            console.error('Error adding item:', error);
-            showNotification('Failed to add item', 'error');
-        } finally {
-            submitBtn.innerHTML = originalText;
-            submitBtn.disabled = false;
-        }
-    }, 800);
+        },
+        failure: 'Failed to add item'
+    });
 }
 
 function saveItemChanges(event) {
     event.preventDefault();
 
-    const form = event.target;
-    const submitBtn = form.querySelector('button[type="submit"]');
-    const originalText = submitBtn.innerHTML;
-
-    const itemId = document.getElementById('edit-item-id').value;
+    const itemId = parseInt(document.getElementById('edit-item-id').value);
     const name = document.getElementById('edit-item-name').value.trim();
     const category = document.getElementById('edit-item-category').value;
     const notes = document.getElementById('edit-item-notes').value.trim();
@@ -292,25 +263,37 @@ function saveItemChanges(event) {
         return;
     }
 
-    // Show loading state
-    submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Saving...';
-    submitBtn.disabled = true;
-
-    // Simulate API call
-    setTimeout(() => {
-        try {
+    const item = document.querySelector(`[data-item-id="${itemId}"]`);
+    if (!item) return;
+    const previous = {
+        name: item.querySelector('.packing-name').textContent.trim(),
+        category: item.closest('.packing-category')?.dataset.category || '',
+        notes: item.querySelector('.packing-notes')?.textContent.trim() || '',
+        packed: item.classList.contains('packed')
+    };
+
+    closeModal();
+    optimisticUpdate({
+        key: `packing:${itemId}`,
+        apply: () => {
             updateItemElement(itemId, name, category, notes, packed);
-            closeModal();
             updateAllProgress();
-            showNotification('Item updated successfully', 'success');
-        } catch (error) {
-            console.error('Error updating item:', error);
-            showNotification('Failed to update item', 'error');
-        } finally {
-            submitBtn.innerHTML = originalText;
-            submitBtn.disabled = false;
-        }
-    }, 600);
+            return () => {
+                updateItemElement(savedId(itemId), previous.name, previous.category, previous.notes, previous.packed);
+                updateAllProgress();
+            };
+        },
+        // /api/packing/update takes one field at a time; apply them together or not at all
+        send: () => sendAtomic([
+            ['item', name], ['category', category], ['notes', notes], ['packed', packed]
+        ].map(([field, value]) => ({
+            method: 'POST',
+            url: '/api/packing/update',
+            body: { id: savedId(itemId), field: field, value: value }
+        }))),
+        confirm: () => showNotification('Item updated successfully', 'success'),
+        failure: 'Failed to update item'
+    });
 }
 
 // Helper Functions
@@ -330,15 +313,18 @@ function createNewItemElement(itemId, name, category, notes, packed) {
         emptyState.remove();
     }
 
-    // Create item HTML
-    const itemHTML = `
+    categoryDiv.querySelector('.packing-items').insertAdjacentHTML('beforeend', renderPackingItem(itemId, name, notes, packed));
+}
+
+function renderPackingItem(itemId, name, notes, packed) {
+    return `
         <div class="packing-item ${packed ? 'packed' : ''}" data-item-id="${itemId}">
             <div class="packing-checkbox ${packed ? 'checked' : ''}" onclick="toggleItemPacked(${itemId})">
                 ${packed ? '<i class="fas fa-check"></i>' : ''}
             </div>
             <div class="packing-content">
-                <div class="packing-name">${name}</div>
-                ${notes ? `<div class="packing-notes">${notes}</div>` : ''}
+                <div class="packing-name">${escapeHtml(name)}</div>
+                ${notes ? `<div class="packing-notes">${escapeHtml(notes)}</div>` : ''}
             </div>
             <div class="packing-actions">
                 <button class="action-btn edit-btn" onclick="editItem(${itemId})" title="Edit Item">
@@ -350,8 +336,6 @@ function createNewItemElement(itemId, name, category, notes, packed) {
             </div>
         </div>
     `;
-
-    categoryDiv.querySelector('.packing-items').insertAdjacentHTML('beforeend', itemHTML);
 }
 
 function createNewCategory(categoryName) {
@@ -393,7 +377,7 @@ function updateItemElement(itemId, name, category, notes, packed) {
         if (existingNotes) {
             existingNotes.textContent = notes;
         } else {
-            const notesHTML = `<div class="packing-notes">${notes}</div>`;
+            const notesHTML = `<div class="packing-notes">${escapeHtml(notes)}</div>`;
             item.querySelector('.packing-content').insertAdjacentHTML('beforeend', notesHTML);
         }
     } else if (existingNotes) {
@@ -401,16 +385,7 @@ function updateItemElement(itemId, name, category, notes, packed) {
     }
 
     // Update packed status
-    const checkbox = item.querySelector('.packing-checkbox');
-    if (packed) {
-        item.classList.add('packed');
-        checkbox.classList.add('checked');
-        checkbox.innerHTML = '<i class="fas fa-check"></i>';
-    } else {
-        item.classList.remove('packed');
-        checkbox.classList.remove('checked');
-        checkbox.innerHTML = '';
-    }
+    setItemPacked(item, packed);
 
     // Move to different category if needed
     const currentCategory = item.closest('.packing-category').dataset.category;
@@ -455,8 +430,19 @@ function closeModal() {
 
 // Update all progress indicators
 function updateAllProgress() {
-    const total = document.querySelectorAll('.packing-item').length;
-    const packed = document.querySelectorAll('.packing-item.packed').length;
+    const categories = {};
+    document.querySelectorAll('.packing-category').forEach(category => {
+        categories[category.dataset.category] = {
+            packed: category.querySelectorAll('.packing-item.packed').length,
+            total: category.querySelectorAll('.packing-item').length
+        };
+    });
+    renderProgress(document.querySelectorAll('.packing-item.packed').length,
+                   document.querySelectorAll('.packing-item').length, categories);
+}
+
+// Show packed/total counts, overall and per category ({ name: { packed, total } })
+function renderProgress(packed, total, categories) {
     const percentage = total > 0 ? Math.round((packed / total) * 100) : 0;
 
     // Update main progress
@@ -470,16 +456,16 @@ function updateAllProgress() {
 
     // Update category progress
     document.querySelectorAll('.packing-category').forEach(category => {
-        const categoryItems = category.querySelectorAll('.packing-item');
-        const categoryPacked = category.querySelectorAll('.packing-item.packed');
+        const counts = categories[category.dataset.category];
+        if (!counts) return;
         const categorySubtitle = category.querySelector('.category-subtitle');
 
         if (categorySubtitle) {
-            categorySubtitle.textContent = `${categoryPacked.length} / ${categoryItems.length} packed`;
+            categorySubtitle.textContent = `${counts.packed} / ${counts.total} packed`;
         }
 
         // Add completed class if all packed
-        if (categoryItems.length > 0 && categoryPacked.length === categoryItems.length) {
+        if (counts.total > 0 && counts.packed === counts.total) {
             category.classList.add('completed');
         } else {
             category.classList.remove('completed');
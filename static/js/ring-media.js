@@ -0,0 +1,259 @@
+// Ring photo upload and lightbox
+// Loaded by ring.js on first use (HERA.loadModule('ring-media')); the
+// declarations below replace ring.js's loader stubs.
+
+let selectedFiles = [];
+
+// Photo Upload System
+function setupPhotoUpload() {
+    const fileInput = document.getElementById('photo-upload-input');
+    if (fileInput) {
+        fileInput.addEventListener('change', function(e) {
+            handleFileSelection(e.target.files);
+        });
+    }
+
+    // Setup upload buttons
+    const uploadButtons = document.querySelectorAll('[onclick*="openImageUpload"]');
+    uploadButtons.forEach(btn => {
+        btn.onclick = function(e) {
+            e.preventDefault();
+            openImageUpload();
+        };
+    });
+}
+
+function setupDragAndDrop() {
+    const dropZone = document.getElementById('upload-drop-zone');
+    if (!dropZone) return;
+
+    dropZone.addEventListener('dragover', function(e) {
+        e.preventDefault();
+        e.stopPropagation();
+        this.classList.add('drag-over');
+    });
+
+    dropZone.addEventListener('dragleave', function(e) {
+        e.preventDefault();
+        e.stopPropagation();
+        this.classList.remove('drag-over');
+    });
+
+    dropZone.addEventListener('drop', function(e) {
+        e.preventDefault();
+        e.stopPropagation();
+        this.classList.remove('drag-over');
+
+        const files = Array.from(e.dataTransfer.files);
+        const imageFiles = files.filter(file => file.type.startsWith('image/'));
+
+        if (imageFiles.length > 0) {
+            handleFileSelection(imageFiles);
+        }
+    });
+
+    dropZone.addEventListener('click', function() {
+        document.getElementById('photo-upload-input').click();
+    });
+}
+
+function openImageUpload() {
+    const modal = document.getElementById('photo-upload-modal');
+    if (modal) {
+        modal.classList.add('show');
+        selectedFiles = [];
+        updateUploadPreview();
+    }
+}
+
+function closePhotoUploadModal() {
+    const modal = document.getElementById('photo-upload-modal');
+    if (modal) {
+        modal.classList.remove('show');
+        selectedFiles = [];
+        updateUploadPreview();
+    }
+}
+
+function handleFileSelection(files) {
+    const fileArray = Array.from(files);
+    const imageFiles = fileArray.filter(file => file.type.startsWith('image/'));
+
+    if (imageFiles.length === 0) {
+        showNotification('Please select only image files', 'error');
+        return;
+    }
+
+    // Check file sizes (10MB limit)
+    const oversizedFiles = imageFiles.filter(file => file.size > 10 * 1024 * 1024);
+    if (oversizedFiles.length > 0) {
+        showNotification('Some files are larger than 10MB and will be skipped', 'error');
+    }
+
+    const validFiles = imageFiles.filter(file => file.size <= 10 * 1024 * 1024);
+    selectedFiles = [...selectedFiles, ...validFiles];
+    updateUploadPreview();
+}
+
+function updateUploadPreview() {
+    const previewSection = document.getElementById('upload-preview');
+    const previewGrid = document.getElementById('preview-grid');
+    const uploadBtn = document.getElementById('upload-photos-btn');
+
+    if (selectedFiles.length === 0) {
+        if (previewSection) previewSection.style.display = 'none';
+        if (uploadBtn) uploadBtn.style.display = 'none';
+        return;
+    }
+
+    if (previewSection) previewSection.style.display = 'block';
+    if (uploadBtn) uploadBtn.style.display = 'inline-flex';
+
+    if (previewGrid) {
+        previewGrid.innerHTML = '';
+
+        selectedFiles.forEach((file, index) => {
+            const reader = new FileReader();
+            reader.onload = function(e) {
+                const previewItem = document.createElement('div');
+                previewItem.className = 'preview-item';
+                previewItem.innerHTML = `
+                    <img src="${e.target.result}" alt="Preview ${index + 1}">
+                    <button class="preview-remove" onclick="removeSelectedFile(${index})">
+                        <i class="fas fa-times"></i>
+                    </button>
+                `;
+                previewGrid.appendChild(previewItem);
+            };
+            reader.readAsDataURL(file);
+        });
+    }
+}
+
+function removeSelectedFile(index) {
+    selectedFiles.splice(index, 1);
+    updateUploadPreview();
+}
+
+function uploadSelectedPhotos() {
+    if (selectedFiles.length === 0) {
+        showNotification('No files selected', 'error');
+        return;
+    }
+
+    const uploadBtn = document.getElementById('upload-photos-btn');
+    const progressSection = document.getElementById('upload-progress');
+    const progressFill = document.getElementById('progress-fill');
+    const progressText = document.getElementById('progress-text');
+
+    // Show progress
+    if (progressSection) progressSection.style.display = 'block';
+    if (uploadBtn) {
+        uploadBtn.disabled = true;
+        uploadBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Uploading...';
+    }
+
+    const formData = new FormData();
+    selectedFiles.forEach((file, index) => {
+        formData.append('photos', file);
+    });
+
+    fetch('/api/ring/upload-photos', {
+        method: 'POST',
+        body: formData
+    })
+    .then(response => {
+        if (!response.ok) {
+            throw new Error(`Upload failed: ${response.status}`);
+        }
+        return response.json();
+    })
+    .then(data => {
+        if (data.success) {
+            showNotification('Photos uploaded successfully!', 'success');
+            closePhotoUploadModal();
+            // Refresh the page to show new images
+            setTimeout(() => {
+                window.location.reload();
+            }, 1000);
+        } else {
+            throw new Error(data.error || 'Upload failed');
+        }
+    })
+    .catch(error => {
+        console.error('Upload error:', error);
+        showNotification('Failed to upload photos', 'error');
+    })
+    .finally(() => {
+        // Reset UI
+        if (progressSection) progressSection.style.display = 'none';
+        if (uploadBtn) {
+            uploadBtn.disabled = false;
+            uploadBtn.innerHTML = '<i class="fas fa-upload"></i> Upload Photos';
+        }
+        if (progressFill) progressFill.style.width = '0%';
+    });
+}
+
+// Photo Lightbox Functions
+function openPhotoLightbox(imageName) {
+    const lightbox = document.getElementById('photo-lightbox');
+    const lightboxImage = document.getElementById('lightbox-image');
+
+    if (lightbox && lightboxImage) {
+        lightboxImage.src = `/static/uploads/ring/${imageName}`;
+        lightbox.classList.add('show');
+
+        // Set current index for navigation
+        if (window.RING_IMAGES) {
+            currentImageIndex = window.RING_IMAGES.indexOf(imageName);
+        }
+
+        // Prevent body scroll
+        document.body.style.overflow = 'hidden';
+    }
+}
+
+function closeLightbox() {
+    const lightbox = document.getElementById('photo-lightbox');
+    if (lightbox) {
+        lightbox.classList.remove('show');
+        document.body.style.overflow = '';
+    }
+}
+
+function previousPhoto() {
+    if (!window.RING_IMAGES || window.RING_IMAGES.length === 0) return;
+
+    currentImageIndex = (currentImageIndex - 1 + window.RING_IMAGES.length) % window.RING_IMAGES.length;
+    const imageName = window.RING_IMAGES[currentImageIndex];
+
+    const lightboxImage = document.getElementById('lightbox-image');
+    if (lightboxImage) {
+        lightboxImage.src = `/static/uploads/ring/${imageName}`;
+    }
+}
+
+function nextPhoto() {
+    if (!window.RING_IMAGES || window.RING_IMAGES.length === 0) return;
+
+    currentImageIndex = (currentImageIndex + 1) % window.RING_IMAGES.length;
+    const imageName = window.RING_IMAGES[currentImageIndex];
+
+    const lightboxImage = document.getElementById('lightbox-image');
+    if (lightboxImage) {
+        lightboxImage.src = `/static/uploads/ring/${imageName}`;
+    }
+}
+
+setupPhotoUpload();
+setupDragAndDrop();
+
+window.openPhotoLightbox = openPhotoLightbox;
+window.closeLightbox = closeLightbox;
+window.previousPhoto = previousPhoto;
+window.nextPhoto = nextPhoto;
+window.openImageUpload = openImageUpload;
+window.closePhotoUploadModal = closePhotoUploadModal;
+window.uploadSelectedPhotos = uploadSelectedPhotos;
+window.removeSelectedFile = removeSelectedFile;
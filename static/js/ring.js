@@ -1,8 +1,7 @@
 // Ring JavaScript functionality - COMPACT VERSION - FIXED
 // This file should be saved as static/js/ring.js
 
-let selectedFiles = [];
-let currentImageIndex = 0;
+let currentImageIndex = 0;  // Shared with the lightbox in ring-media.js
 
 document.addEventListener('DOMContentLoaded', function() {
     console.log('Initializing ring page...');
@@ -10,204 +9,35 @@ document.addEventListener('DOMContentLoaded', function() {
 });
 
 function initializeRingPage() {
-    setupPhotoUpload();
     setupEditableFields();
     setupImageGallery();
     setupModals();
-    setupDragAndDrop();
     console.log('Ring page initialized successfully');
 }
 
-// Photo Upload System
-function setupPhotoUpload() {
-    const fileInput = document.getElementById('photo-upload-input');
-    if (fileInput) {
-        fileInput.addEventListener('change', function(e) {
-            handleFileSelection(e.target.files);
+// Photo upload and lightbox live in ring-media.js, fetched on first use.
+// Loading it replaces these stubs with the real functions.
+function withRingMedia(name, ...args) {
+    const stub = window[name];
+    return HERA.loadModule('ring-media')
+        .then(() => {
+            if (window[name] === stub) throw new Error(`ring-media.js did not define ${name}`);
+            return window[name](...args);
+        })
+        .catch(error => {
+            console.error('Failed to load photo tools:', error);
+            showNotification('Failed to load photo tools', 'error');
         });
-    }
-
-    // Setup upload buttons
-    const uploadButtons = document.querySelectorAll('[onclick*="openImageUpload"]');
-    uploadButtons.forEach(btn => {
-        btn.onclick = function(e) {
-            e.preventDefault();
-            openImageUpload();
-        };
-    });
 }
 
-function setupDragAndDrop() {
-    const dropZone = document.getElementById('upload-drop-zone');
-    if (!dropZone) return;
-
-    dropZone.addEventListener('dragover', function(e) {
-        e.preventDefault();
-        e.stopPropagation();
-        this.classList.add('drag-over');
-    });
-
-    dropZone.addEventListener('dragleave', function(e) {
-        e.preventDefault();
-        e.stopPropagation();
-        this.classList.remove('drag-over');
-    });
-
-    dropZone.addEventListener('drop', function(e) {
-        e.preventDefault();
-        e.stopPropagation();
-        this.classList.remove('drag-over');
-
-        const files = Array.from(e.dataTransfer.files);
-        const imageFiles = files.filter(file => file.type.startsWith('image/'));
-
-        if (imageFiles.length > 0) {
-            handleFileSelection(imageFiles);
-        }
-    });
-
-    dropZone.addEventListener('click', function() {
-        document.getElementById('photo-upload-input').click();
-    });
-}
-
-function openImageUpload() {
-    const modal = document.getElementById('photo-upload-modal');
-    if (modal) {
-        modal.classList.add('show');
-        selectedFiles = [];
-        updateUploadPreview();
-    }
-}
-
-function closePhotoUploadModal() {
-    const modal = document.getElementById('photo-upload-modal');
-    if (modal) {
-        modal.classList.remove('show');
-        selectedFiles = [];
-        updateUploadPreview();
-    }
-}
-
-function handleFileSelection(files) {
-    const fileArray = Array.from(files);
-    const imageFiles = fileArray.filter(file => file.type.startsWith('image/'));
-
-    if (imageFiles.length === 0) {
-        showNotification('Please select only image files', 'error');
-        return;
-    }
-
-    // Check file sizes (10MB limit)
-    const oversizedFiles = imageFiles.filter(file => file.size > 10 * 1024 * 1024);
-    if (oversizedFiles.length > 0) {
-        showNotification('Some files are larger than 10MB and will be skipped', 'error');
-    }
-
-    const validFiles = imageFiles.filter(file => file.size <= 10 * 1024 * 1024);
-    selectedFiles = [...selectedFiles, ...validFiles];
-    updateUploadPreview();
-}
-
-function updateUploadPreview() {
-    const previewSection = document.getElementById('upload-preview');
-    const previewGrid = document.getElementById('preview-grid');
-    const uploadBtn = document.getElementById('upload-photos-btn');
-
-    if (selectedFiles.length === 0) {
-        if (previewSection) previewSection.style.display = 'none';
-        if (uploadBtn) uploadBtn.style.display = 'none';
-        return;
-    }
-
-    if (previewSection) previewSection.style.display = 'block';
-    if (uploadBtn) uploadBtn.style.display = 'inline-flex';
-
-    if (previewGrid) {
-        previewGrid.innerHTML = '';
-
-        selectedFiles.forEach((file, index) => {
-            const reader = new FileReader();
-            reader.onload = function(e) {
-                const previewItem = document.createElement('div');
-                previewItem.className = 'preview-item';
-                previewItem.innerHTML = `
-                    <img src="${e.target.result}" alt="Preview ${index + 1}">
-                    <button class="preview-remove" onclick="removeSelectedFile(${index})">
-                        <i class="fas fa-times"></i>
-                    </button>
-                `;
-                previewGrid.appendChild(previewItem);
-            };
-            reader.readAsDataURL(file);
-        });
-    }
-}
-
-function removeSelectedFile(index) {
-    selectedFiles.splice(index, 1);
-    updateUploadPreview();
-}
-
-function uploadSelectedPhotos() {
-    if (selectedFiles.length === 0) {
-        showNotification('No files selected', 'error');
-        return;
-    }
-
-    const uploadBtn = document.getElementById('upload-photos-btn');
-    const progressSection = document.getElementById('upload-progress');
-    const progressFill = document.getElementById('progress-fill');
-    const progressText = document.getElementById('progress-text');
-
-    // Show progress
-    if (progressSection) progressSection.style.display = 'block';
-    if (uploadBtn) {
-        uploadBtn.disabled = true;
-        uploadBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Uploading...';
-    }
-
-    const formData = new FormData();
-    selectedFiles.forEach((file, index) => {
-        formData.append('photos', file);
-    });
-
-    fetch('/api/ring/upload-photos', {
-        method: 'POST',
-        body: formData
-    })
-    .then(response => {
-        if (!response.ok) {
-            throw new Error(`Upload failed: ${response.status}`);
-        }
-        return response.json();
-    })
-    .then(data => {
-        if (data.success) {
-            showNotification('Photos uploaded successfully!', 'success');
-            closePhotoUploadModal();
-            // Refresh the page to show new images
-            setTimeout(() => {
-                window.location.reload();
-            }, 1000);
-        } else {
-            throw new Error(data.error || 'Upload failed');
-        }
-    })
-    .catch(error => {
-        console.error('Upload error:', error);
-        showNotification('Failed to upload photos', 'error');
-    })
-    .finally(() => {
-        // Reset UI
-        if (progressSection) progressSection.style.display = 'none';
-        if (uploadBtn) {
-            uploadBtn.disabled = false;
-            uploadBtn.innerHTML = '<i class="fas fa-upload"></i> Upload Photos';
-        }
-        if (progressFill) progressFill.style.width = '0%';
-    });
-}
+function openImageUpload() { withRingMedia('openImageUpload'); }
+function closePhotoUploadModal() { withRingMedia('closePhotoUploadModal'); }
+function uploadSelectedPhotos() { withRingMedia('uploadSelectedPhotos'); }
+function removeSelectedFile(index) { withRingMedia('removeSelectedFile', index); }
+function openPhotoLightbox(imageName) { withRingMedia('openPhotoLightbox', imageName); }
+function closeLightbox() { withRingMedia('closeLightbox'); }
+function previousPhoto() { withRingMedia('previousPhoto'); }
+function nextPhoto() { withRingMedia('nextPhoto'); }
 
 // Image Gallery Functions
 function setupImageGallery() {
@@ -216,11 +46,7 @@ function setupImageGallery() {
     thumbnails.forEach(thumbnail => {
         if (!thumbnail.onclick) {
             thumbnail.addEventListener('click', function() {
-                const img = this.querySelector('img');
-                if (img) {
-                    const imageName = img.src.split('/').pop();
-                    changeMainImage(imageName);
-                }
+                changeMainImage(this.dataset.photo);
             });
         }
     });
@@ -229,25 +55,59 @@ function setupImageGallery() {
     const mainImage = document.getElementById('main-ring-image');
     if (mainImage) {
         mainImage.addEventListener('click', function() {
-            const imageName = this.src.split('/').pop();
-            openPhotoLightbox(imageName);
+            openPhotoLightbox(this.dataset.photo);
         });
     }
+
+    releaseDistantThumbnails();
+}
+
+// Thumbnails lazy-load as they scroll into view (loading="lazy"). Ones
+// scrolled far out of view swap their image for the placeholder so the
+// browser can drop the decoded bitmap, and get it back on the way in.
+const THUMBNAIL_KEEP_DISTANCE = '0px 2000px';
+const BLANK_IMAGE = 'data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7';
+let thumbnailObserver = null;
+
+function releaseDistantThumbnails() {
+    const strip = document.querySelector('.ring-thumbnails');
+    if (!strip || thumbnailObserver || !('IntersectionObserver' in window)) return;
+
+    thumbnailObserver = new IntersectionObserver(entries => {
+        entries.forEach(entry => {
+            const img = entry.target;
+            if (entry.isIntersecting) {
+                if (img.dataset.src) {
+                    img.src = img.dataset.src;
+                    delete img.dataset.src;
+                }
+            } else if (img.complete && img.naturalWidth && !img.dataset.src) {
+                img.dataset.src = img.src;
+                img.src = BLANK_IMAGE;  // the placeholder background shows through
+            }
+        });
+    }, { root: strip, rootMargin: THUMBNAIL_KEEP_DISTANCE });
+
+    strip.querySelectorAll('.ring-thumbnail img').forEach(img => thumbnailObserver.observe(img));
 }
 
 function changeMainImage(imageName) {
     const mainImage = document.getElementById('main-ring-image');
     if (mainImage) {
+        const thumbnail = document.querySelector(`.ring-thumbnail[data-photo="${imageName}"]`);
+        const thumbnailImage = thumbnail && thumbnail.querySelector('img');
         mainImage.src = `/static/uploads/ring/${imageName}`;
+        mainImage.dataset.photo = imageName;
+        mainImage.removeAttribute('width');
+        mainImage.removeAttribute('height');
+        // Show the thumbnail's placeholder until the full image arrives
+        mainImage.style.backgroundImage = thumbnailImage ? thumbnailImage.style.backgroundImage : '';
+        mainImage.classList.toggle('has-placeholder', Boolean(mainImage.style.backgroundImage));
 
         // Update active thumbnail
         const thumbnails = document.querySelectorAll('.ring-thumbnail');
         thumbnails.forEach(thumb => {
-            thumb.classList.remove('active');
-            const img = thumb.querySelector('img');
-            if (img && img.src.includes(imageName)) {
-                thumb.classList.add('active');
-            }
+            thumb.classList.toggle('active', thumb.dataset.photo === imageName);
         });
 
         // Update current index for lightbox navigation
@@ -271,22 +131,18 @@ function deleteRingImage(imageName) {
             showNotification('Image deleted successfully', 'success');
 
             // Remove from UI
-            const thumbnail = document.querySelector(`[onclick*="${imageName}"]`);
+            const thumbnail = document.querySelector(`.ring-thumbnail[data-photo="${imageName}"]`);
             if (thumbnail) {
+                if (thumbnailObserver) thumbnailObserver.unobserve(thumbnail.querySelector('img'));
                 thumbnail.remove();
             }
 
             // If this was the main image, switch to another one or show placeholder
             const mainImage = document.getElementById('main-ring-image');
-            if (mainImage && mainImage.src.includes(imageName)) {
+            if (mainImage && mainImage.dataset.photo === imageName) {
                 const remainingThumbnails = document.querySelectorAll('.ring-thumbnail');
                 if (remainingThumbnails.length > 0) {
-                    const firstThumbnail = remainingThumbnails[0];
-                    const firstImg = firstThumbnail.querySelector('img');
-                    if (firstImg) {
-                        const newImageName = firstImg.src.split('/').pop();
-                        changeMainImage(newImageName);
-                    }
+                    changeMainImage(remainingThumbnails[0].dataset.photo);
                 } else {
                     // No images left, reload to show placeholder
                     window.location.reload();
@@ -310,57 +166,6 @@ function deleteRingImage(imageName) {
     });
 }
 
-// Photo Lightbox Functions
-function openPhotoLightbox(imageName) {
-    const lightbox = document.getElementById('photo-lightbox');
-    const lightboxImage = document.getElementById('lightbox-image');
-
-    if (lightbox && lightboxImage) {
-        lightboxImage.src = `/static/uploads/ring/${imageName}`;
-        lightbox.classList.add('show');
-
-        // Set current index for navigation
-        if (window.RING_IMAGES) {
-            currentImageIndex = window.RING_IMAGES.indexOf(imageName);
-        }
-
-        // Prevent body scroll
-        document.body.style.overflow = 'hidden';
-    }
-}
-
-function closeLightbox() {
-    const lightbox = document.getElementById('photo-lightbox');
-    if (lightbox) {
-        lightbox.classList.remove('show');
-        document.body.style.overflow = '';
-    }
-}
-
-function previousPhoto() {
-    if (!window.RING_IMAGES || window.RING_IMAGES.length === 0) return;
-
-    currentImageIndex = (currentImageIndex - 1 + window.RING_IMAGES.length) % window.RING_IMAGES.length;
-    const imageName = window.RING_IMAGES[currentImageIndex];
-
-    const lightboxImage = document.getElementById('lightbox-image');
-    if (lightboxImage) {
-        lightboxImage.src = `/static/uploads/ring/${imageName}`;
-    }
-}
-
-function nextPhoto() {
-    if (!window.RING_IMAGES || window.RING_IMAGES.length === 0) return;
-
-    currentImageIndex = (currentImageIndex + 1) % window.RING_IMAGES.length;
-    const imageName = window.RING_IMAGES[currentImageIndex];
-
-    const lightboxImage = document.getElementById('lightbox-image');
-    if (lightboxImage) {
-        lightboxImage.src = `/static/uploads/ring/${imageName}`;
-    }
-}
-
 // Ring Details Management
 function setupEditableFields() {
     const editableElements = document.querySelectorAll('.editable-text');
@@ -0,0 +1,174 @@
+// HERA Scheduler
+// One loop drives every periodic client job (countdowns, polling, offline
+// sync). Jobs run inside an animation frame, so all of a tick's DOM writes
+// land in one paint, and nothing runs while the tab is hidden. Open tabs
+// coordinate over a BroadcastChannel: the most recently visible tab leads and
+// runs shared jobs (server polling) and broadcasts their results to the rest.
+
+class Scheduler {
+    constructor(channelName = 'hera-scheduler') {
+        this.jobs = new Map();
+        this.timer = null;
+        this.frame = null;
+        this.tabId = `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 8)}`;
+        this.leader = !document.hidden;
+        this.channel = 'BroadcastChannel' in window ? new BroadcastChannel(channelName) : null;
+
+        if (this.channel) {
+            this.channel.onmessage = event => this.receive(event.data || {});
+        } else {
+            this.leader = true;  // No other tabs can be coordinated with
+        }
+
+        document.addEventListener('visibilitychange', () => {
+            if (document.hidden) {
+                this.pause();
+                this.resign();
+            } else {
+                this.claimLeadership();
+                this.wake();
+            }
+        });
+        window.addEventListener('pagehide', () => {
+            this.pause();
+            this.resign();
+        });
+        window.addEventListener('pageshow', event => {
+            // Restored from the back/forward cache
+            if (event.persisted && !document.hidden) {
+                this.claimLeadership();
+                this.wake();
+            }
+        });
+        if (this.leader) this.claimLeadership();
+    }
+
+    // Run `fn` every `interval` ms. Options:
+    //   align:   run on multiples of `interval` (e.g. on the minute)
+    //   shared:  only the leading tab runs `fn`; whatever its promise resolves
+    //            to is passed to `onResult` in every tab
+    //   onResult(result): applies a shared job's result
+    //   immediate: run as soon as registered (default true)
+    every(name, interval, fn, { align = false, shared = false, onResult = null, immediate = true } = {}) {
+        const now = Date.now();
+        this.jobs.set(name, {
+            name, interval, fn, align, shared, onResult,
+            running: false,
+            due: immediate ? now : this.nextDue(now, interval, align)
+        });
+        this.wake();
+    }
+
+    cancel(name) {
+        this.jobs.delete(name);
+    }
+
+    // Run a job now, out of schedule (a manual refresh, say)
+    runNow(name) {
+        const job = this.jobs.get(name);
+        if (!job) return Promise.resolve();
+        return this.run(job, Date.now());
+    }
+
+    nextDue(now, interval, align) {
+        return align ? Math.floor(now / interval) * interval + interval : now + interval;
+    }
+
+    wake() {
+        clearTimeout(this.timer);
+        this.timer = null;
+        if (document.hidden || this.jobs.size === 0) return;
+
+        const nextDue = Math.min(...[...this.jobs.values()].map(job => job.due));
+        const delay = Math.max(0, nextDue - Date.now());
+        this.timer = setTimeout(() => {
+            this.timer = null;
+            if (!this.frame) {
+                this.frame = requestAnimationFrame(() => {
+                    this.frame = null;
+                    this.tick();
+                });
+            }
+        }, delay);
+    }
+
+    pause() {
+        clearTimeout(this.timer);
+        this.timer = null;
+        if (this.frame) {
+            cancelAnimationFrame(this.frame);
+            this.frame = null;
+        }
+    }
+
+    tick() {
+        const now = Date.now();
+        this.jobs.forEach(job => {
+            if (job.due > now) return;
+            // A tab that was hidden for hours runs each job once, not once per missed interval
+            job.due = this.nextDue(now, job.interval, job.align);
+            if (job.shared && !this.leader) return;
+            this.run(job, now).catch(error => console.warn(`Scheduled job ${job.name} failed:`, error));
+        });
+        this.wake();
+    }
+
+    // Resolves once the job (and, for shared jobs, its onResult) has finished
+    run(job, now) {
+        if (job.running) return Promise.resolve();
+        job.running = true;
+        return new Promise(resolve => resolve(job.fn()))
+            .then(value => {
+                if (!job.shared) return;
+                this.broadcast({ type: 'result', name: job.name, at: now, value });
+                if (job.onResult) job.onResult(value);
+            })
+            .finally(() => { job.running = false; });
+    }
+
+    claimLeadership() {
+        this.leader = true;
+        this.broadcast({ type: 'leader', tabId: this.tabId });
+    }
+
+    // A hidden or closing leader hands over to any tab that is still visible
+    resign() {
+        if (!this.channel || !this.leader) return;
+        this.leader = false;
+        this.broadcast({ type: 'resign', tabId: this.tabId });
+    }
+
+    broadcast(message) {
+        if (this.channel) this.channel.postMessage({ ...message, from: this.tabId });
+    }
+
+    receive(message) {
+        if (message.type === 'leader' && message.tabId !== this.tabId) {
+            this.leader = false;
+        } else if (message.type === 'resign' && !document.hidden) {
+            this.claimLeadership();
+        } else if (message.type === 'result') {
+            const job = this.jobs.get(message.name);
+            if (!job) return;
+            // The leader just ran it: push this tab's copy back a full interval
+            job.due = this.nextDue(message.at, job.interval, job.align);
+            if (job.onResult) job.onResult(message.value);
+        }
+    }
+}
+
+// Countdown targets rendered by base.html from the trip data
+function loadTripSchedule() {
+    const element = document.getElementById('hera-schedule');
+    const raw = element ? JSON.parse(element.textContent) : {};
+    const toDate = value => (value ? new Date(value) : null);
+    return {
+        departure: toDate(raw.departure),
+        proposal: toDate(raw.proposal),
+        tripEnd: toDate(raw.tripEnd),
+        proposalLocation: raw.proposalLocation || ''
+    };
+}
+
+const scheduler = new Scheduler();
+const tripSchedule = loadTripSchedule();
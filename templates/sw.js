@@ -0,0 +1,491 @@
+// HERA Service Worker
+// Rendered by offline.py: VERSION changes whenever a static asset does, which
+// installs a new worker and drops the previous caches.
+//
+// - Fingerprinted static files are cache-first (their URLs change with content).
+// - Pages are served from cache when the cached copy is at the latest known
+//   revision (or the network is down) and revalidated in the background.
+// - GET /api/ requests are network-first with the last response as fallback;
+//   /api/query/<collection> falls back to the IndexedDB replica.
+// - Mutations that fail for lack of a connection are queued in IndexedDB and
+//   replayed in order once back online, with the revision they were made
+//   against so the server can refuse ones that would overwrite newer edits.
+
+const VERSION = {{ version|tojson }};
+const PRECACHE_ASSETS = {{ assets|tojson }};
+const PRECACHE_PAGES = {{ pages|tojson }};
+
+const ASSET_CACHE = `hera-assets-${VERSION}`;
+const PAGE_CACHE = `hera-pages-${VERSION}`;
+const API_CACHE = `hera-api-${VERSION}`;
+const CDN_CACHE = 'hera-cdn';
+const CACHES = [ASSET_CACHE, PAGE_CACHE, API_CACHE, CDN_CACHE];
+
+const CDN_HOSTS = ['cdnjs.cloudflare.com', 'fonts.googleapis.com', 'fonts.gstatic.com', 'cdn.jsdelivr.net'];
+const NETWORK_TIMEOUT_MS = 3000;
+const SYNC_INTERVAL_MS = 15000;
+
+// =============================================================================
+// INDEXEDDB
+// replica: top-level HERA_DATA values by key
+// meta:    'state' -> { workspace, revision, clientId }
+// outbox:  queued mutations, replayed in key order
+// conflicts: replayed mutations the server refused
+// =============================================================================
+let dbPromise = null;
+
+function openDatabase() {
+    if (!dbPromise) {
+        dbPromise = new Promise((resolve, reject) => {
+            const request = indexedDB.open('hera-offline', 1);
+            request.onupgradeneeded = () => {
+                const db = request.result;
+                db.createObjectStore('replica');
+                db.createObjectStore('meta');
+                db.createObjectStore('outbox', { keyPath: 'id', autoIncrement: true });
+                db.createObjectStore('conflicts', { keyPath: 'id', autoIncrement: true });
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+    }
+    return dbPromise;
+}
+
+// Run `work(stores)` in one transaction; resolves with its return value once committed
+function transaction(storeNames, mode, work) {
+    return openDatabase().then(db => new Promise((resolve, reject) => {
+        const tx = db.transaction(storeNames, mode);
+        const stores = Object.fromEntries(storeNames.map(name => [name, tx.objectStore(name)]));
+        let result;
+        Promise.resolve(work(stores)).then(value => { result = value; }, reject);
+        tx.oncomplete = () => resolve(result);
+        tx.onerror = () => reject(tx.error);
+        tx.onabort = () => reject(tx.error);
+    }));
+}
+
+function requestResult(request) {
+    return new Promise((resolve, reject) => {
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+}
+
+function getState() {
+    return transaction(['meta'], 'readwrite', ({ meta }) =>
+        requestResult(meta.get('state')).then(state => {
+            if (state) return state;
+            const fresh = { workspace: null, revision: null, clientId: crypto.randomUUID() };
+            meta.put(fresh, 'state');
+            return fresh;
+        }));
+}
+
+function readReplica(key) {
+    return transaction(['replica'], 'readonly', ({ replica }) => requestResult(replica.get(key)));
+}
+
+// =============================================================================
+// LIFECYCLE
+// =============================================================================
+self.addEventListener('install', event => {
+    event.waitUntil((async () => {
+        const assetCache = await caches.open(ASSET_CACHE);
+        await assetCache.addAll(PRECACHE_ASSETS);
+
+        // Pages need a session; skip them (and keep installing) if logged out
+        const pageCache = await caches.open(PAGE_CACHE);
+        await Promise.all(PRECACHE_PAGES.map(async url => {
+            try {
+                const response = await fetch(url, { credentials: 'same-origin' });
+                if (isCacheablePage(response)) await pageCache.put(url, response);
+            } catch (error) {
+                // Offline during install: the page is cached on first visit instead
+            }
+        }));
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        const names = await caches.keys();
+        await Promise.all(names.filter(name => name.startsWith('hera-') && !CACHES.includes(name))
+            .map(name => caches.delete(name)));
+        await self.clients.claim();
+        syncReplica(true).catch(() => {});
+    })());
+});
+
+self.addEventListener('message', event => {
+    const message = event.data || {};
+    if (message.type === 'sync') {
+        event.waitUntil(replayOutbox().then(() => syncReplica(message.force)).catch(() => {}));
+    } else if (message.type === 'status') {
+        event.waitUntil(offlineStatus().then(status => event.source.postMessage({ type: 'status', ...status })));
+    }
+});
+
+// Background Sync, where supported, replays the outbox even with no page open
+self.addEventListener('sync', event => {
+    if (event.tag === 'hera-outbox') {
+        event.waitUntil(replayOutbox());
+    }
+});
+
+// =============================================================================
+// FETCH ROUTING
+// =============================================================================
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+
+    if (url.origin !== self.location.origin) {
+        if (request.method === 'GET' && CDN_HOSTS.includes(url.hostname)) {
+            event.respondWith(cacheFirst(CDN_CACHE, request));
+        }
+        return;
+    }
+
+    if (url.pathname === '/logout' || url.pathname === '/login') {
+        // A different user may log in next: forget everything cached for this one
+        if (url.pathname === '/logout') event.waitUntil(clearUserData());
+        return;
+    }
+
+    if (request.method !== 'GET') {
+        if (url.pathname.startsWith('/api/') && request.mode !== 'navigate') {
+            event.respondWith(handleMutation(request, url));
+        }
+        return;
+    }
+
+    if (url.pathname.startsWith('/static/') && url.searchParams.has('v')) {
+        event.respondWith(cacheFirst(ASSET_CACHE, request));
+    } else if (request.mode === 'navigate' && isOfflinePage(url)) {
+        event.respondWith(handlePage(event, request, url));
+    } else if (url.pathname.startsWith('/api/') && !isUncachedApi(url)) {
+        event.respondWith(handleApiRead(request, url));
+    }
+});
+
+function isOfflinePage(url) {
+    return url.pathname === '/' || PRECACHE_PAGES.includes(url.pathname);
+}
+
+function isUncachedApi(url) {
+    return url.pathname === '/api/sync' || url.pathname.startsWith('/api/jobs') ||
+           url.pathname.startsWith('/api/files/download/');
+}
+
+// Redirects (to /login) and errors must never replace a good cached page
+function isCacheablePage(response) {
+    return response.ok && !response.redirected && response.type === 'basic';
+}
+
+async function cacheFirst(cacheName, request) {
+    const cache = await caches.open(cacheName);
+    const cached = await cache.match(request);
+    if (cached) return cached;
+    const response = await fetch(request);
+    if (response.ok || response.type === 'opaque') {
+        cache.put(request, response.clone());
+    }
+    return response;
+}
+
+function withTimeout(promise, ms) {
+    return new Promise((resolve, reject) => {
+        const timer = setTimeout(() => reject(new Error('timeout')), ms);
+        promise.then(value => { clearTimeout(timer); resolve(value); },
+                     error => { clearTimeout(timer); reject(error); });
+    });
+}
+
+// =============================================================================
+// PAGES
+// =============================================================================
+async function handlePage(event, request, url) {
+    const cache = await caches.open(PAGE_CACHE);
+    const key = url.pathname === '/' ? PRECACHE_PAGES[0] : url.pathname;
+    const cached = await cache.match(key);
+    const revalidate = fetch(request).then(async response => {
+        if (isCacheablePage(response)) {
+            await cache.put(key, response.clone());
+            if (cached && cached.headers.get('X-Hera-Revision') !== response.headers.get('X-Hera-Revision')) {
+                notifyClients({ type: 'page-updated', url: url.pathname });
+            }
+        }
+        return response;
+    });
+
+    if (cached) {
+        const state = await getState();
+        const current = cached.headers.get('X-Hera-Revision') === String(state.revision);
+        if (current || !navigator.onLine) {
+            event.waitUntil(revalidate.catch(() => {}));
+            return cached;
+        }
+    }
+
+    try {
+        return await withTimeout(revalidate, cached ? NETWORK_TIMEOUT_MS : 60000);
+    } catch (error) {
+        event.waitUntil(revalidate.catch(() => {}));
+        if (cached) return cached;
+        return new Response('<h1>Offline</h1><p>This page has not been saved for offline use yet.</p>',
+                            { status: 503, headers: { 'Content-Type': 'text/html; charset=utf-8' } });
+    }
+}
+
+// =============================================================================
+// API READS
+// =============================================================================
+async function handleApiRead(request, url) {
+    const cache = await caches.open(API_CACHE);
+    try {
+        const response = await fetch(request);
+        if (response.ok && !response.redirected) {
+            cache.put(request, response.clone());
+        }
+        return response;
+    } catch (error) {
+        const cached = await cache.match(request);
+        if (cached) return cached;
+        const fromReplica = await replicaResponse(url);
+        if (fromReplica) return fromReplica;
+        return jsonResponse({ success: false, offline: true, error: 'You are offline' }, 503);
+    }
+}
+
+// Answer /api/query/<collection> from the replica (unpaginated, unsorted by the server)
+async function replicaResponse(url) {
+    const match = url.pathname.match(/^\/api\/query\/([a-z]+)$/);
+    if (!match) return null;
+    const collection = match[1];
+    const value = collection === 'tasks'
+        ? ((await readReplica('main')) || {}).tasks
+        : await readReplica(collection);
+    if (!Array.isArray(value)) return null;
+    // Cursor pages after the first were already covered by this full answer
+    const items = url.searchParams.has('cursor') ? [] : value;
+    return jsonResponse({ success: true, offline: true, items, next_cursor: null, has_more: false });
+}
+
+function jsonResponse(body, status = 200) {
+    return new Response(JSON.stringify(body), { status, headers: { 'Content-Type': 'application/json' } });
+}
+
+// =============================================================================
+// MUTATIONS AND THE OUTBOX
+// =============================================================================
+async function handleMutation(request, url) {
+    const state = await getState();
+    const contentType = request.headers.get('Content-Type') || '';
+    const queueable = !contentType.startsWith('multipart/form-data');
+    const body = queueable ? await request.clone().text() : null;
+
+    const headers = new Headers(request.headers);
+    headers.set('X-Hera-Client', state.clientId);
+
+    try {
+        const response = await fetch(new Request(request, { headers }));
+        noteMutation(response, url);
+        return response;
+    } catch (error) {
+        if (!queueable) {
+            return jsonResponse({ success: false, offline: true, error: 'Uploads need a connection' }, 503);
+        }
+        await transaction(['outbox'], 'readwrite', ({ outbox }) => {
+            outbox.add({
+                method: request.method,
+                url: url.pathname + url.search,
+                contentType,
+                body,
+                workspace: state.workspace,
+                baseRevision: state.revision === null ? 0 : state.revision,
+                queuedAt: Date.now()
+            });
+        });
+        if (self.registration.sync) {
+            self.registration.sync.register('hera-outbox').catch(() => {});
+        }
+        const count = await outboxCount();
+        notifyClients({ type: 'queued', count });
+        return jsonResponse(queuedResult(url, body), 202);
+    }
+}
+
+// What a page sees for a queued mutation: success, flagged as queued
+function queuedResult(url, body) {
+    const result = { success: true, queued: true, offline: true };
+    if (url.pathname === '/api/batch') {
+        let operations = [];
+        try {
+            operations = JSON.parse(body).operations || [];
+        } catch (error) {
+            // Malformed batch: the server will reject it on replay
+        }
+        return { ...result, committed: true,
+                 results: operations.map(() => ({ status: 202, success: true, body: { ...result } })) };
+    }
+    return result;
+}
+
+async function noteMutation(response, url) {
+    if (!response.ok) return;
+    if (/^\/api\/workspaces\/[^/]+\/activate$/.test(url.pathname)) {
+        // Another trip: cached pages, API responses and the replica are all stale
+        await clearUserData({ keepOutbox: true });
+    } else {
+        // Move the replica to the new revision; pages cached before the edit
+        // then no longer count as current and are refetched on the next visit
+        scheduleSync();
+    }
+}
+
+function outboxCount() {
+    return transaction(['outbox'], 'readonly', ({ outbox }) => requestResult(outbox.count()));
+}
+
+let replaying = null;
+
+// Send queued mutations in order; stops at the first network failure
+function replayOutbox() {
+    if (!replaying) {
+        replaying = doReplay().finally(() => { replaying = null; });
+    }
+    return replaying;
+}
+
+async function doReplay() {
+    const entries = await transaction(['outbox'], 'readonly', ({ outbox }) => requestResult(outbox.getAll()));
+    if (entries.length === 0) return;
+    const state = await getState();
+    let replayed = 0;
+    const conflicts = [];
+
+    for (const entry of entries) {
+        const headers = { 'X-Hera-Client': state.clientId, 'X-Hera-Base-Revision': String(entry.baseRevision) };
+        if (entry.contentType) headers['Content-Type'] = entry.contentType;
+        if (entry.workspace) headers['X-Hera-Workspace'] = entry.workspace;
+
+        let response;
+        try {
+            response = await fetch(entry.url, { method: entry.method, headers, body: entry.body,
+                                                credentials: 'same-origin' });
+        } catch (error) {
+            break;  // Still offline
+        }
+        if (response.status === 429 || response.status >= 500 || response.redirected) {
+            break;  // Try again later (rate limited, server trouble or logged out)
+        }
+
+        const data = await response.json().catch(() => null);
+        for (const conflict of findConflicts(entry, response.status, data)) {
+            conflicts.push(conflict);
+        }
+        await transaction(['outbox', 'conflicts'], 'readwrite', stores => {
+            stores.outbox.delete(entry.id);
+            conflicts.filter(conflict => conflict.entryId === entry.id)
+                .forEach(conflict => stores.conflicts.add(conflict));
+        });
+        replayed++;
+    }
+
+    if (replayed > 0) {
+        const remaining = await outboxCount();
+        notifyClients({ type: 'replayed', count: replayed, remaining, conflicts });
+        await syncReplica(true);
+    }
+}
+
+// Conflicts (and other refusals) in a replayed response, as records for the conflicts store
+function findConflicts(entry, status, data) {
+    const base = { entryId: entry.id, method: entry.method, url: entry.url, body: entry.body,
+                   detectedAt: Date.now() };
+    if (entry.url.startsWith('/api/batch') && data && Array.isArray(data.results)) {
+        let operations = [];
+        try {
+            operations = JSON.parse(entry.body).operations || [];
+        } catch (error) {
+            operations = [];
+        }
+        return data.results
+            .map((result, index) => ({ result, operation: operations[index] || {} }))
+            .filter(({ result }) => result.status >= 400)
+            .map(({ result, operation }) => ({ ...base, url: operation.url, method: operation.method,
+                                               body: JSON.stringify(operation.body ?? null),
+                                               status: result.status, response: result.body }));
+    }
+    if (status >= 400) {
+        return [{ ...base, status, response: data }];
+    }
+    return [];
+}
+
+// =============================================================================
+// REPLICA SYNC
+// =============================================================================
+let lastSync = 0;
+let syncTimer = null;
+
+function scheduleSync() {
+    clearTimeout(syncTimer);
+    syncTimer = setTimeout(() => syncReplica(true).catch(() => {}), 1000);
+}
+
+async function syncReplica(force = false) {
+    if (!force && Date.now() - lastSync < SYNC_INTERVAL_MS) return;
+    lastSync = Date.now();
+
+    const state = await getState();
+    const params = new URLSearchParams();
+    if (state.workspace !== null && state.revision !== null) {
+        params.set('workspace', state.workspace);
+        params.set('since', state.revision);
+    }
+    const response = await fetch(`/api/sync?${params}`, { credentials: 'same-origin' });
+    if (!response.ok || response.redirected) return;
+    const data = await response.json();
+    if (!data.success) return;
+
+    await transaction(['replica', 'meta'], 'readwrite', ({ replica, meta }) => {
+        if (data.full) replica.clear();
+        Object.entries(data.changes).forEach(([key, value]) => replica.put(value, key));
+        meta.put({ ...state, workspace: data.workspace, revision: data.revision }, 'state');
+    });
+    if (data.full || Object.keys(data.changes).length > 0) {
+        notifyClients({ type: 'synced', revision: data.revision, keys: Object.keys(data.changes) });
+    }
+}
+
+async function offlineStatus() {
+    const state = await getState();
+    const [queued, conflicts] = await transaction(['outbox', 'conflicts'], 'readonly', stores =>
+        Promise.all([requestResult(stores.outbox.count()), requestResult(stores.conflicts.getAll())]));
+    return { version: VERSION, workspace: state.workspace, revision: state.revision, queued, conflicts };
+}
+
+async function clearUserData({ keepOutbox = false } = {}) {
+    await Promise.all([PAGE_CACHE, API_CACHE].map(name => caches.delete(name)));
+    const stores = keepOutbox ? ['replica', 'meta'] : ['replica', 'meta', 'outbox', 'conflicts'];
+    await transaction(stores, 'readwrite', tx => {
+        Object.entries(tx).forEach(([name, store]) => {
+            if (name === 'meta') {
+                // Keep the client id so replayed edits stay attributed to this browser
+                return requestResult(store.get('state')).then(state => {
+                    store.put({ clientId: (state && state.clientId) || crypto.randomUUID(),
+                                workspace: null, revision: null }, 'state');
+                });
+            }
+            store.clear();
+        });
+    });
+}
+
+async function notifyClients(message) {
+    const clients = await self.clients.matchAll({ type: 'window' });
+    clients.forEach(client => client.postMessage(message));
+}
@@ -0,0 +1,41 @@
+"""Shared fixtures
+
+The app is imported once, from a scratch directory, so hera_data.json, the
+user store, the job queue and uploads never touch the checkout.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope='session')
+def hera(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp('hera')
+    previous = os.getcwd()
+    os.environ.setdefault('HERA_JOB_WORKERS', '0')
+    os.environ.setdefault('HERA_ADMISSION', '0')
+    os.chdir(workdir)
+    import app as hera
+
+    hera.app.config['TESTING'] = True
+    hera.app.static_folder = str(workdir / 'static')
+    hera.ring_photos.directory = os.path.join(hera.app.static_folder, 'uploads', 'ring')
+    yield hera
+    os.chdir(previous)
+
+
+@pytest.fixture(scope='session')
+def client(hera):
+    client = hera.app.test_client()
+    response = client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+    assert response.status_code == 302
+    return client
+
+
+@pytest.fixture
+def upload_dir(hera):
+    return os.path.join(hera.app.static_folder, 'uploads', 'files')
@@ -0,0 +1,69 @@
+"""Admission control: per-client token buckets and the upload pool"""
+import threading
+
+from flask import Flask
+from flask_login import LoginManager
+
+from admission import AdmissionControl, TokenBucket
+
+
+def limited_app(**config):
+    app = Flask(__name__)
+    app.config.update({'ADMISSION_MUTATION_LIMIT': (0.001, 2), 'ADMISSION_UPLOAD_CONCURRENCY': 1,
+                       'ADMISSION_UPLOAD_QUEUE_SECONDS': 0.05, **config})
+    LoginManager(app).user_loader(lambda user_id: None)
+    entered, release = threading.Event(), threading.Event()
+
+    @app.route('/api/things', methods=['GET', 'POST'])
+    def things():
+        return {'success': True}
+
+    @app.route('/api/upload', methods=['POST'], endpoint='upload_files')
+    def upload():
+        entered.set()
+        release.wait(5)
+        return {'success': True}
+
+    admission = AdmissionControl()
+    admission.init_app(app)
+    return app, entered, release
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate=2.0, burst=1, now=0)
+    assert bucket.take(0) == 0
+    assert bucket.take(0.25) == 0.25
+    assert bucket.take(0.5) == 0
+
+
+def test_mutations_beyond_the_burst_get_a_429():
+    app, _, _ = limited_app()
+    client = app.test_client()
+
+    assert [client.post('/api/things').status_code for _ in range(2)] == [200, 200]
+    shed = client.post('/api/things')
+    assert shed.status_code == 429 and int(shed.headers['Retry-After']) >= 1
+    assert client.get('/api/things').status_code == 200
+
+    other = app.test_client()
+    assert other.post('/api/things', environ_base={'REMOTE_ADDR': '10.0.0.2'}).status_code == 200
+
+
+def test_uploads_wait_for_a_slot_then_are_shed():
+    app, entered, release = limited_app()
+    first = threading.Thread(target=lambda: app.test_client().post('/api/upload'))
+    first.start()
+    entered.wait(5)
+
+    shed = app.test_client().post('/api/upload', environ_base={'REMOTE_ADDR': '10.0.0.3'})
+    release.set()
+    first.join()
+
+    assert shed.status_code == 429
+    assert app.test_client().post('/api/upload', environ_base={'REMOTE_ADDR': '10.0.0.4'}).status_code == 200
+
+
+def test_disabled_admission_limits_nothing():
+    app, _, _ = limited_app(ADMISSION_ENABLED=False)
+    client = app.test_client()
+    assert {client.post('/api/things').status_code for _ in range(5)} == {200}
@@ -0,0 +1,97 @@
+import io
+import os
+import threading
+import time
+
+from workspaces import Savepoint, Workspace, empty_data
+
+
+def packing_names(client):
+    items = client.get('/api/query/packing?limit=500').get_json()['items']
+    return {item['item'] for item in items}
+
+
+def test_atomic_batch_rolls_back_every_operation(hera, client):
+    before = packing_names(client)
+    response = client.post('/api/batch', json={'operations': [
+        {'method': 'POST', 'url': '/api/packing/add', 'body': {'item_name': 'Rolled back'}},
+        {'method': 'POST', 'url': '/api/budget/add', 'body': {'category': 'x', 'budget_amount': 'lots'}},
+        {'method': 'POST', 'url': '/api/packing/add', 'body': {'item_name': 'Never run'}},
+    ]}).get_json()
+
+    assert not response['success'] and not response['committed']
+    assert [result.get('status') for result in response['results']] == [200, 400, None]
+    assert response['results'][2]['skipped']
+    assert packing_names(client) == before
+    assert client.get('/api/indexes/validate').get_json()['problems'] == []
+
+
+def test_non_atomic_batch_keeps_successful_operations(client):
+    response = client.post('/api/batch', json={'atomic': False, 'operations': [
+        {'method': 'POST', 'url': '/api/packing/add', 'body': {'item_name': 'Kept'}},
+        {'method': 'POST', 'url': '/api/packing/add', 'body': {}},
+    ]}).get_json()
+
+    assert response['committed'] and not response['success']
+    assert 'Kept' in packing_names(client)
+
+
+def test_rolled_back_batch_does_not_delete_files(client, upload_dir):
+    upload = client.post('/api/files/upload', data={'files': (io.BytesIO(b'%PDF-1.4 batch test file'), 'plan.pdf')},
+                         content_type='multipart/form-data').get_json()['files'][0]
+    path = os.path.join(upload_dir, upload['filename'])
+    delete = {'method': 'DELETE', 'url': f"/api/files/delete/{upload['id']}"}
+
+    response = client.post('/api/batch', json={'operations': [
+        delete, {'method': 'POST', 'url': '/api/packing/update', 'body': {'id': 'x'}}]}).get_json()
+    assert not response['committed']
+    assert os.path.exists(path)
+
+    assert client.post('/api/batch', json={'operations': [delete]}).get_json()['committed']
+    assert not os.path.exists(path)
+
+
+def test_batch_refuses_excluded_and_nested_operations(client):
+    response = client.post('/api/batch', json={'atomic': False, 'operations': [
+        {'method': 'POST', 'url': '/api/batch', 'body': {'operations': []}},
+        {'method': 'GET', 'url': '/api/files'},
+    ]}).get_json()
+    assert [result['status'] for result in response['results']] == [400, 400]
+
+
+def test_savepoint_copies_and_restores_only_kept_keys(tmp_path):
+    workspace = Workspace('trip', str(tmp_path / 'trip.json')).load(empty_data())
+    family = workspace.data['family']
+    savepoint = Savepoint(workspace)
+
+    savepoint.keep(['packing'])
+    workspace.data['packing'].append({'id': 1, 'item': 'Ring'})
+    savepoint.keep(['packing', 'extra'])  # already kept: the first copy wins
+    workspace.data['extra'] = True
+    savepoint.restore()
+
+    assert workspace.data['packing'] == [] and 'extra' not in workspace.data
+    assert workspace.data['family'] is family
+    assert workspace.collection_indexes['packing'].records == {}
+
+
+def test_writes_wait_for_a_workspace_held_by_a_batch(hera, client):
+    workspace = hera.workspace_manager.get('default')
+    locked, release = threading.Event(), threading.Event()
+
+    def hold():
+        with workspace.lock:
+            locked.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    locked.wait()
+    threading.Timer(0.2, release.set).start()
+    started = time.perf_counter()
+    response = client.post('/api/packing/add', json={'item_name': 'Waited'})
+    holder.join()
+
+    assert response.get_json()['success']
+    assert time.perf_counter() - started >= 0.2
+    assert client.get('/api/query/packing?limit=1').status_code == 200
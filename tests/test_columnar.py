@@ -0,0 +1,41 @@
+"""Columnar export: typed schemas and snapshots"""
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+
+import utils
+
+DATA = {
+    'main': {'tripDates': 'May 1 - May 9', 'proposalDate': '2025-05-04', 'totalBudget': '12000',
+             'totalSaved': 4500.5, 'totalRemaining': '7499.5', 'tasks': []},
+    'packing': [{'id': 1, 'item': 'Ring', 'category': 'Essentials', 'packed': 'false', 'quantity': 1},
+                {'id': 2, 'item': 'Camera', 'category': 'Gear', 'packed': 'yes', 'quantity': '2'}],
+}
+
+
+def test_main_amounts_are_floats():
+    table = utils.build_columnar_table('main', utils._columnar_collections(DATA)['main'])
+
+    assert table.schema.field('totalBudget').type == pa.float64()
+    assert table.schema.field('proposalDate').type == pa.date32()
+    assert table.column('totalBudget').to_pylist() == [12000.0]
+    assert table.column('totalRemaining').to_pylist() == [7499.5]
+
+
+def test_string_booleans_are_parsed():
+    table = utils.build_columnar_table('packing', DATA['packing'])
+
+    assert table.column('packed').to_pylist() == [False, True]
+    assert table.column('quantity').to_pylist() == [1, 2]
+
+
+def test_snapshot_round_trip(tmp_path):
+    success, message = utils.write_columnar_snapshot(DATA, root=str(tmp_path))
+    assert success, message
+
+    (directory,) = tmp_path.iterdir()
+    tables = utils.read_columnar_snapshot(str(directory))
+
+    assert tables['main'].num_rows == 1
+    assert tables['packing'].column('item').to_pylist() == ['Ring', 'Camera']
+    assert tables['files'].num_rows == 0
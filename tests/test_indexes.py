@@ -0,0 +1,81 @@
+import pytest
+
+from indexes import CollectionIndex
+
+
+def assert_indexes_valid(client):
+    response = client.get('/api/indexes/validate').get_json()
+    assert response['problems'] == []
+
+
+def test_collection_index_validate_reports_drift():
+    items = [{'id': 1, 'category': 'Gear', 'packed': False}, {'id': 2, 'category': 'Docs', 'packed': True}]
+    index = CollectionIndex('packing')
+    for item in items:
+        index.add(item)
+    index.sorted_index('id', lambda item: item['id'])
+    assert index.validate(items) == []
+
+    items[0]['packed'] = True  # changed without reindexing
+    assert any('packing.packed' in problem for problem in index.validate(items))
+    index.add(items[0])
+    assert index.validate(items) == []
+
+    items.append({'id': 3, 'category': 'Gear'})
+    assert any('records out of sync' in problem for problem in index.validate(items))
+
+
+def test_packing_crud_keeps_indexes_consistent(client):
+    added = client.post('/api/packing/add', json={'item_name': 'Tripod', 'category': 'Camera Gear'}).get_json()
+    item_id = added['packing_item']['id']
+    assert_indexes_valid(client)
+
+    assert client.post(f'/api/packing/{item_id}/toggle').get_json()['success']
+    assert client.post('/api/packing/update', json={'id': item_id, 'field': 'category', 'value': 'Gear'}).get_json()['success']
+    assert_indexes_valid(client)
+
+    assert client.post('/api/packing/bulk', json={'packed': False, 'category': 'Gear'}).get_json()['success']
+    assert_indexes_valid(client)
+
+    assert client.delete(f'/api/packing/delete/{item_id}').get_json()['success']
+    assert_indexes_valid(client)
+
+
+def test_budget_and_itinerary_crud_keeps_indexes_consistent(client):
+    budget = client.post('/api/budget/add', json={'category': 'Flowers', 'budget_amount': '120', 'budget_saved': 20,
+                                                  'status': 'Outstanding'}).get_json()['budget_item']
+    assert budget['remaining'] == 100
+    assert client.post(f"/api/budget/{budget['id']}/toggle").get_json()['status'] == 'Paid'
+    assert client.post('/api/budget/update', json={'id': budget['id'], 'category': 'Flowers', 'budget_amount': 150,
+                                                   'budget_saved': 50, 'status': 'Outstanding'}).get_json()['success']
+    assert_indexes_valid(client)
+    client.delete(f"/api/budget/delete/{budget['id']}")
+
+    activity = client.post('/api/itinerary/add', json={'day': 2, 'time': '9:00 AM', 'activity': 'Hike'}).get_json()
+    activity_id = activity['itinerary_item']['id']
+    assert client.post(f'/api/itinerary/{activity_id}/complete', json={'completed': True}).get_json()['success']
+    assert client.post('/api/itinerary/update', json={'id': activity_id, 'day': 3}).get_json()['success']
+    assert_indexes_valid(client)
+    client.delete(f'/api/itinerary/delete/{activity_id}')
+    assert_indexes_valid(client)
+
+
+@pytest.mark.parametrize('endpoint,collection,add', [
+    ('/api/packing/update', 'packing', ('/api/packing/add', {'item_name': 'Lens cloth'}, 'packing_item')),
+    ('/api/family/update', 'family', None),
+])
+@pytest.mark.parametrize('field,value', [('id', 999), ('secret', 'x'), ('notes', {'bad': 1})])
+def test_field_updates_are_limited_to_the_schema(client, endpoint, collection, add, field, value):
+    if add:
+        item_id = client.post(add[0], json=add[1]).get_json()[add[2]]['id']
+    else:
+        item_id = client.get(f'/api/query/{collection}').get_json()['items'][0]['id']
+    before = client.get(f'/api/query/{collection}?limit=500').get_json()['items']
+
+    response = client.post(endpoint, json={'id': item_id, 'field': field, 'value': value})
+    assert response.status_code == 400 and not response.get_json()['success']
+    assert client.get(f'/api/query/{collection}?limit=500').get_json()['items'] == before
+    assert_indexes_valid(client)
+
+    assert client.post(endpoint, json={'id': item_id, 'field': 'notes', 'value': 'ok'}).get_json()['success']
+    assert_indexes_valid(client)
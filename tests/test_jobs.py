@@ -0,0 +1,106 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import jobs as jobs_module
+from jobs import JobQueue, UnknownJob
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / 'jobs.sqlite3'), workers=0)
+    queue.calls = []
+
+    @queue.handler('echo')
+    def echo(value):
+        queue.calls.append(value)
+        return {'value': value}
+
+    @queue.handler('flaky')
+    def flaky(failures):
+        queue.calls.append('flaky')
+        if len(queue.calls) <= failures:
+            raise RuntimeError('not yet')
+        return 'ok'
+
+    return queue
+
+
+def make_due(queue, job_id):
+    with sqlite3.connect(queue.path) as connection:
+        connection.execute('UPDATE jobs SET run_at = 0 WHERE id = ?', (job_id,))
+
+
+def test_job_runs_and_records_its_result(queue):
+    job_id = queue.enqueue('echo', value=3)
+    queue.work(once=True)
+    job = queue.get(job_id)
+    assert (job['status'], job['attempts'], job['result']) == ('done', 1, {'value': 3})
+
+
+def test_failed_job_is_retried_with_backoff(queue):
+    job_id = queue.enqueue('flaky', failures=2, max_attempts=3)
+    queue.work(once=True)
+    job = queue.get(job_id)
+    assert job['status'] == 'queued' and 'not yet' in job['error']
+    assert job['run_at'] > time.time()
+    assert queue.claim() is None  # backing off
+
+    make_due(queue, job_id)
+    queue.work(once=True)
+    make_due(queue, job_id)
+    queue.work(once=True)
+    job = queue.get(job_id)
+    assert (job['status'], job['attempts'], job['error']) == ('done', 3, None)
+
+
+def test_job_fails_once_out_of_attempts(queue):
+    job_id = queue.enqueue('flaky', failures=5, max_attempts=2)
+    queue.work(once=True)
+    make_due(queue, job_id)
+    queue.work(once=True)
+    assert queue.get(job_id)['status'] == 'failed'
+    assert queue.counts()['failed'] == 1
+
+
+def test_unknown_job_kind_is_refused(queue):
+    with pytest.raises(UnknownJob):
+        queue.enqueue('missing')
+
+
+def test_expired_lease_is_reclaimed(queue):
+    job_id = queue.enqueue('echo', value=1)
+    assert queue.claim()['id'] == job_id  # this worker dies without finishing
+    assert queue.claim() is None
+
+    with sqlite3.connect(queue.path) as connection:
+        connection.execute('UPDATE jobs SET updated = ? WHERE id = ?',
+                           (time.time() - jobs_module.LEASE_SECONDS - 1, job_id))
+    job = queue.claim()
+    assert (job['id'], job['attempts']) == (job_id, 2)
+    queue.run(job)
+    assert queue.get(job_id)['status'] == 'done'
+
+
+def test_heartbeat_keeps_a_long_job_leased(queue, monkeypatch):
+    monkeypatch.setattr(jobs_module, 'HEARTBEAT_SECONDS', 0.05)
+    release = threading.Event()
+
+    @queue.handler('slow')
+    def slow():
+        release.wait(5)
+
+    job_id = queue.enqueue('slow')
+    job = queue.claim()
+    worker = threading.Thread(target=queue.run, args=(job,))
+    worker.start()
+    try:
+        leased_at = queue.get(job_id)['updated']
+        time.sleep(0.2)
+        assert queue.get(job_id)['updated'] > leased_at
+    finally:
+        release.set()
+        worker.join()
+    assert queue.get(job_id)['status'] == 'done'
@@ -0,0 +1,43 @@
+"""Metrics registry and Prometheus rendering"""
+from metrics import Metrics
+
+
+def enabled_metrics():
+    registry = Metrics()
+    registry.enabled = True
+    registry.describe('hera_http_requests_total', 'counter', 'HTTP requests')
+    return registry
+
+
+def test_label_order_does_not_split_series():
+    registry = enabled_metrics()
+    registry.inc('hera_http_requests_total', endpoint='index', method='GET', status=200)
+    registry.inc('hera_http_requests_total', status=200, method='GET', endpoint='index')
+    registry.observe('hera_save_data_duration_seconds', 0.002, route='a', kind='b')
+    registry.observe('hera_save_data_duration_seconds', 0.2, kind='b', route='a')
+
+    text = registry.render()
+    assert 'hera_http_requests_total{endpoint="index",method="GET",status="200"} 2' in text
+    assert 'hera_save_data_duration_seconds_count{kind="b",route="a"} 2' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = enabled_metrics()
+    for value in (0.001, 0.02, 3):
+        registry.observe('latency', value)
+
+    text = registry.render()
+    assert 'latency_bucket{le="0.001"} 1' in text
+    assert 'latency_bucket{le="0.025"} 2' in text
+    assert 'latency_bucket{le="+Inf"} 3' in text
+    assert 'latency_sum{} ' not in text and 'latency_count 3' in text
+
+
+def test_disabled_registry_records_nothing_and_labels_are_escaped():
+    registry = Metrics()
+    registry.inc('hera_errors_total', exception='ValueError')
+    assert registry.render() == '\n'
+
+    registry.enabled = True
+    registry.inc('hera_errors_total', endpoint='say "hi"\\')
+    assert 'hera_errors_total{endpoint="say \\"hi\\"\\\\"} 1' in registry.render()
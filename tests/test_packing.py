@@ -0,0 +1,33 @@
+"""Bulk packing updates"""
+import pytest
+
+
+@pytest.fixture
+def packing_client(hera):
+    client = hera.app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+    assert client.post('/api/workspaces', json={'name': 'packing-bulk'}).get_json()['success']
+    client.post('/api/workspaces/packing-bulk/activate')
+    for name, category, packed in (('Ring', 'Essential', False), ('Passport', 'Essential', True),
+                                   ('Tripod', 'Equipment', False), ('Boots', 'Clothing', False)):
+        client.post('/api/packing/add', json={'item_name': name, 'category': category, 'packed': packed})
+    return client
+
+
+def test_bulk_updates_return_current_counts(packing_client):
+    body = packing_client.post('/api/packing/bulk', json={'packed': True, 'category': 'Essential'}).get_json()
+    assert body['updated'] == [1]
+    assert (body['packed_count'], body['total_count']) == (2, 4)
+    assert body['categories']['Essential'] == {'packed': 2, 'total': 2}
+
+    body = packing_client.post('/api/packing/bulk', json={'packed': True, 'ids': [3, 99]}).get_json()
+    assert body['updated'] == [3] and body['categories']['Equipment'] == {'packed': 1, 'total': 1}
+
+    body = packing_client.post('/api/packing/bulk', json={'packed': False}).get_json()
+    assert body['updated'] == [1, 2, 3] and body['packed_count'] == 0
+    assert packing_client.get('/api/indexes/validate').get_json()['problems'] == []
+
+
+@pytest.mark.parametrize('body', [{}, {'packed': 'yes'}, {'packed': True, 'ids': 3}])
+def test_bulk_update_rejects_bad_bodies(client, body):
+    assert client.post('/api/packing/bulk', json=body).status_code == 400
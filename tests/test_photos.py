@@ -0,0 +1,81 @@
+"""Photo header parsing and the photo library index"""
+import struct
+
+from photos import PhotoLibrary, image_size, read_exif
+
+
+def tiff(entries, exif_entries):
+    """Little-endian TIFF block: IFD0 `entries` plus an EXIF sub-IFD, as (tag, kind, value)"""
+    def ifd(offset, items, extra_entries=0):
+        count = len(items) + extra_entries
+        data_offset = offset + 2 + 12 * count + 4
+        table, data = b'', b''
+        for tag, kind, value in items:
+            if kind == 2:
+                text = value.encode() + b'\x00'
+                table += struct.pack('<HHII', tag, kind, len(text), data_offset + len(data))
+                data += text
+            elif kind == 3:
+                table += struct.pack('<HHIHH', tag, kind, 1, value, 0)
+            else:
+                table += struct.pack('<HHII', tag, kind, 1, value)
+        return count, table, data, data_offset + len(data)
+
+    count, table, data, end = ifd(8, entries, extra_entries=1)
+    exif_count, exif_table, exif_data, _ = ifd(end, exif_entries)
+    pointer = struct.pack('<HHII', 0x8769, 4, 1, end)
+    return (b'II*\x00' + struct.pack('<I', 8) + struct.pack('<H', count) + table + pointer + b'\x00' * 4 + data
+            + struct.pack('<H', exif_count) + exif_table + b'\x00' * 4 + exif_data)
+
+
+def jpeg(width, height, exif=None):
+    app1 = b''
+    if exif is not None:
+        payload = b'Exif\x00\x00' + exif
+        app1 = b'\xff\xe1' + struct.pack('>H', len(payload) + 2) + payload
+    sof = b'\xff\xc0' + struct.pack('>HBHHB', 11, 8, height, width, 1) + b'\x01\x11\x00'
+    return b'\xff\xd8' + app1 + sof + b'\xff\xda\x00\x02' + b'\x00' * 16 + b'\xff\xd9'
+
+
+CANON = tiff([(0x010F, 2, 'Canon'), (0x0110, 2, 'Canon EOS R5'), (0x0112, 3, 6)],
+             [(0x9003, 2, '2025:09:24 18:05:00')])
+
+
+def test_jpeg_size_and_exif():
+    data = jpeg(4000, 3000, CANON)
+    assert image_size(data) == (4000, 3000)
+    assert read_exif(data) == {'taken': '2025-09-24T18:05:00', 'camera': 'Canon EOS R5', 'orientation': 6}
+
+
+def test_missing_or_truncated_exif_keeps_defaults():
+    defaults = {'taken': None, 'camera': None, 'orientation': 1}
+    assert read_exif(jpeg(10, 10)) == defaults
+    assert read_exif(jpeg(10, 10, CANON[:40])) == defaults
+    png = b'\x89PNG\r\n\x1a\n' + struct.pack('>I4sII', 13, b'IHDR', 640, 480) + b'\x08\x02\x00\x00\x00'
+    assert image_size(png) == (640, 480)
+
+
+def test_library_indexes_and_queries_photos(tmp_path):
+    (tmp_path / 'rotated.jpg').write_bytes(jpeg(4000, 3000, CANON))
+    (tmp_path / 'plain.jpg').write_bytes(jpeg(800, 600))
+    library = PhotoLibrary(path=str(tmp_path / 'photos.json'), directory=str(tmp_path))
+
+    rotated = library.add('rotated.jpg', session_for=lambda taken: taken[:10])
+    assert (rotated['width'], rotated['height'], rotated['session']) == (3000, 4000, '2025-09-24')
+    assert sorted(library.sync()) == ['plain.jpg']
+
+    reloaded = PhotoLibrary(path=library.path, directory=library.directory)
+    page = reloaded.query({'camera': 'canon eos r5'})
+    assert [photo['id'] for photo in page['items']] == ['rotated.jpg']
+    page = reloaded.query({'sort': '-size', 'limit': '1'})
+    assert page['items'][0]['id'] == 'rotated.jpg' and page['has_more']
+    assert reloaded.query({'sort': '-size', 'cursor': page['next_cursor']})['items'][0]['id'] == 'plain.jpg'
+
+    reloaded.remove('plain.jpg')
+    assert library.get('plain.jpg') is None
+
+
+def test_ring_photos_route(client):
+    body = client.get('/api/ring/photos?sort=taken').get_json()
+    assert body['success'] and body['sort'] == 'taken'
+    assert client.get('/api/ring/photos?sort=shutter').status_code == 400
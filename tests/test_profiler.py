@@ -0,0 +1,64 @@
+"""Sampling profiler"""
+import time
+
+from flask import Flask
+
+from profiler import Profiler
+
+
+def profiled_app(**config):
+    app = Flask(__name__)
+    app.config.update({'LOGIN_DISABLED': True, 'PROFILE_ENABLED': True, 'PROFILE_INTERVAL_MS': 1,
+                       'PROFILE_KEEP': 2, 'PROFILE_TOKEN': 'secret', **config})
+
+    @app.route('/slow')
+    def slow():
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        return 'done'
+
+    @app.route('/fast')
+    def fast():
+        return 'done'
+
+    profiler = Profiler()
+    profiler.init_app(app)
+    return app, profiler
+
+
+def test_header_profile_is_served_in_both_formats():
+    app, _ = profiled_app()
+    client = app.test_client()
+
+    response = client.get('/slow', headers={'X-Hera-Profile': 'secret'})
+    profile_id = response.headers['X-Hera-Profile-Id']
+    assert client.get('/fast', headers={'X-Hera-Profile': 'wrong'}).headers.get('X-Hera-Profile-Id') is None
+
+    (summary,) = client.get('/api/profiles').get_json()['profiles']
+    assert summary['reason'] == 'header' and summary['samples'] > 0
+
+    collapsed = client.get(f'/api/profiles/{profile_id}?format=collapsed').get_data(as_text=True)
+    assert 'slow (test_profiler.py' in collapsed
+    speedscope = client.get(f'/api/profiles/{profile_id}').get_json()
+    assert speedscope['profiles'][0]['type'] == 'sampled'
+    assert len(speedscope['profiles'][0]['samples']) == len(speedscope['profiles'][0]['weights'])
+
+
+def test_threshold_keeps_only_slow_requests_and_routes_are_always_kept():
+    app, profiler = profiled_app(PROFILE_THRESHOLD_MS=20, PROFILE_ROUTES=['fast'])
+    client = app.test_client()
+
+    client.get('/slow')
+    client.get('/fast')
+    client.get('/api/profiles')
+    reasons = [p['reason'] for p in client.get('/api/profiles').get_json()['profiles']]
+    assert reasons == ['route', 'threshold']
+    assert client.get('/api/profiles/999').status_code == 404
+
+
+def test_disabled_profiler_hides_its_endpoints():
+    app, _ = profiled_app(PROFILE_ENABLED=False)
+    client = app.test_client()
+    assert client.get('/slow', headers={'X-Hera-Profile': 'secret'}).headers.get('X-Hera-Profile-Id') is None
+    assert client.get('/api/profiles').status_code == 404
@@ -0,0 +1,99 @@
+import base64
+import json
+
+import pytest
+
+from indexes import CollectionIndex
+from query import QueryError, SortSpec, decode_cursor, encode_cursor, run_query
+
+
+def packing_index(count=23):
+    index = CollectionIndex('packing')
+    for i in range(1, count + 1):
+        index.add({'id': i, 'item': f'item {i % 7}', 'category': ['Clothes', 'Gear', 'Docs'][i % 3],
+                   'packed': i % 2 == 0})
+    return index
+
+
+def all_pages(index, args):
+    items, cursor = [], None
+    while True:
+        page = run_query(index, {**args, **({'cursor': cursor} if cursor else {})})
+        items.extend(item['id'] for item in page['items'])
+        if not page['has_more']:
+            assert page['next_cursor'] is None
+            return items
+        cursor = page['next_cursor']
+
+
+@pytest.mark.parametrize('sort', [None, 'id', '-id', 'item', 'category,-item', '-packed,item'])
+def test_cursor_pages_cover_the_collection_in_order(sort):
+    index = packing_index()
+    args = {'limit': '4', **({'sort': sort} if sort else {})}
+    spec = SortSpec('packing', sort)
+    expected = [item['id'] for item in sorted(index.records.values(), key=lambda item: (spec.key(item), item['id']))]
+    assert all_pages(index, args) == expected
+
+
+def test_cursor_pages_apply_filters():
+    index = packing_index()
+    ids = all_pages(index, {'limit': '2', 'category': 'gear', 'packed': 'true'})
+    assert ids and all(index.records[i]['category'] == 'Gear' and index.records[i]['packed'] for i in ids)
+    assert sorted(ids) == sorted(i for i, item in index.records.items()
+                                 if item['category'] == 'Gear' and item['packed'])
+
+
+def test_cursor_survives_deleting_the_item_it_points_at():
+    index = packing_index()
+    first = run_query(index, {'limit': '5', 'sort': 'id'})
+    index.remove(first['items'][-1]['id'])
+    rest = run_query(index, {'limit': '5', 'sort': 'id', 'cursor': first['next_cursor']})
+    assert [item['id'] for item in rest['items']] == [6, 7, 8, 9, 10]
+
+
+def test_cursor_round_trips_its_position():
+    spec = SortSpec('packing', 'category,-item')
+    item = {'id': 3, 'item': 'Socks', 'category': 'Clothes'}
+    assert decode_cursor(spec, encode_cursor(spec, item)) == (spec.key(item), 3)
+
+
+def test_cursor_for_another_sort_is_rejected():
+    index = packing_index()
+    page = run_query(index, {'limit': '3', 'sort': 'item'})
+    with pytest.raises(QueryError):
+        run_query(index, {'limit': '3', 'sort': 'id', 'cursor': page['next_cursor']})
+    with pytest.raises(QueryError):
+        run_query(index, {'cursor': 'not-a-cursor'})
+
+
+def test_query_endpoint_pages(client):
+    first = client.get('/api/query/itinerary?limit=3').get_json()
+    assert first['success'] and len(first['items']) == 3 and first['has_more']
+    second = client.get(f"/api/query/itinerary?limit=3&cursor={first['next_cursor']}").get_json()
+    assert not {item['id'] for item in first['items']} & {item['id'] for item in second['items']}
+    assert client.get('/api/query/itinerary?sort=nope').status_code == 400
+
+
+def forge_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+@pytest.mark.parametrize('payload', [
+    ['id', [1.0], '3'],
+    ['id', [1.0], True],
+    ['id', ['one'], 3],
+    ['category,item', ['gear'], 3],
+    ['category,item', [1, 'socks'], 3],
+    ['-packed,item', [False, 'socks'], 3],
+    ['id', {'a': 1}, 3],
+])
+def test_crafted_cursor_is_rejected(payload):
+    index = packing_index()
+    with pytest.raises(QueryError):
+        run_query(index, {'sort': payload[0], 'cursor': forge_cursor(payload)})
+
+
+def test_crafted_cursor_gets_a_400(client):
+    cursor = forge_cursor(['day,time', ['1', None], 'x'])
+    response = client.get(f'/api/query/itinerary?cursor={cursor}')
+    assert response.status_code == 400 and not response.get_json()['success']
@@ -0,0 +1,67 @@
+import pytest
+
+from records import RecordError, build_record, request_value
+
+
+def test_record_fields_are_coerced():
+    item = build_record('packing', {'id': '4', 'item': 'Socks', 'packed': 'false', 'quantity': 2.0})
+    assert (item['id'], item['packed'], item['quantity']) == (4, False, 2)
+    item['packed'] = 'yes'
+    assert item['packed'] is True
+
+
+@pytest.mark.parametrize('field, value', [('id', 'four'), ('packed', 'maybe'), ('quantity', 1.5)])
+def test_bad_record_values_raise(field, value):
+    with pytest.raises(RecordError):
+        build_record('packing', {'id': 1, 'item': 'Socks', field: value})
+
+
+def test_request_value():
+    assert request_value({'n': '2.5'}, 'n', 'number') == 2.5
+    assert request_value({}, 'n', 'int', default=1) == 1
+    for data, kind in (({}, None), ({'n': None}, 'number'), ({'n': 'x'}, 'int'), (None, None)):
+        with pytest.raises(RecordError):
+            request_value(data, 'n', kind)
+
+
+@pytest.mark.parametrize('url, body', [
+    ('/api/budget/add', {'category': 'Cake', 'budget_amount': 'lots', 'budget_saved': 0, 'status': 'Outstanding'}),
+    ('/api/budget/add', {'category': 'Cake', 'budget_saved': 0, 'status': 'Outstanding'}),
+    ('/api/budget/update', {'id': 'first', 'category': 'Cake', 'budget_amount': 1, 'budget_saved': 0, 'status': 'Paid'}),
+    ('/api/family/update', {'field': 'status', 'value': 'Told'}),
+    ('/api/packing/add', {'item_name': 'Socks', 'quantity': 'several'}),
+    ('/api/packing/update', {'id': 1, 'field': 'packed', 'value': 'perhaps'}),
+    ('/api/itinerary/add', {'day': 'Tuesday', 'time': '9:00 AM', 'activity': 'Hike'}),
+    ('/api/itinerary/update', {'id': None}),
+    ('/api/tasks/add', {'task': 'Book table'}),
+])
+def test_malformed_request_bodies_are_400(client, url, body):
+    response = client.post(url, json=body)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_non_object_body_is_400(client):
+    response = client.post('/api/packing/add', data='[1, 2]', content_type='application/json')
+    assert response.status_code == 400
+
+
+def stored(client, collection, item_id):
+    items = client.get(f'/api/query/{collection}?limit=500').get_json()['items']
+    return next(item for item in items if item['id'] == item_id)
+
+
+@pytest.mark.parametrize('collection, url, changes', [
+    ('budget', '/api/budget/update', {'category': 'Renamed', 'budget_amount': 999, 'budget_saved': 1,
+                                      'status': 'Paid', 'notes': {'not': 'text'}}),
+    ('itinerary', '/api/itinerary/update', {'day': 9, 'activity': 'Renamed', 'isProposal': 'perhaps'}),
+    ('itinerary', '/api/itinerary/update', {'field': 'id', 'value': 999}),
+])
+def test_rejected_update_changes_nothing(client, collection, url, changes):
+    item_id = client.get(f'/api/query/{collection}').get_json()['items'][0]['id']
+    before = stored(client, collection, item_id)
+
+    response = client.post(url, json={'id': item_id, **changes})
+    assert response.status_code == 400
+    assert stored(client, collection, item_id) == before
+    assert client.get('/api/indexes/validate').get_json()['problems'] == []
@@ -0,0 +1,45 @@
+"""Full-text search index"""
+from search import SearchIndex
+
+
+def build_index():
+    index = SearchIndex()
+    index.add('itinerary', {'id': 1, 'activity': 'Sunset proposal', 'location': 'Café de Flore', 'notes': ''})
+    index.add('itinerary', {'id': 2, 'activity': 'Museum visit', 'location': 'Louvre', 'notes': 'Book a sunset slot'})
+    index.add('packing', {'id': 1, 'item': 'Ring box', 'category': 'Essentials'})
+    return index
+
+
+def test_title_match_ranks_first_and_accents_fold():
+    total, results = build_index().search('sunset')
+    assert total == 2
+    assert [(r['collection'], r['id']) for r in results] == [('itinerary', 1), ('itinerary', 2)]
+
+    total, results = build_index().search('cafe')
+    assert total == 1
+    assert '<mark>Café</mark>' in results[0]['snippet']
+
+
+def test_prefix_and_every_token_required():
+    index = build_index()
+    assert index.search('sun prop')[0] == 1
+    assert index.search('ring sunset')[0] == 0
+
+
+def test_collection_filter_paging_and_removal():
+    index = build_index()
+    assert index.search('sunset', collections=['packing']) == (0, [])
+
+    total, page = index.search('sunset', offset=1, limit=1)
+    assert total == 2 and [r['id'] for r in page] == [2]
+
+    index.remove('itinerary', 1)
+    assert index.search('proposal') == (0, [])
+    assert len(index) == 2
+
+
+def test_search_route(client):
+    response = client.get('/api/search?q=photographer&per_page=5')
+    body = response.get_json()
+    assert response.status_code == 200 and body['success']
+    assert any(r['collection'] == 'tasks' for r in body['results'])
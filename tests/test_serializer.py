@@ -0,0 +1,60 @@
+"""JSON serializer and fragment cache"""
+from datetime import date, datetime, time
+
+import serializer
+from records import PackingItem
+from serializer import FragmentCache, dumps, loads, script_json
+
+
+def test_dumps_handles_records_dates_and_sets():
+    encoded = dumps({'item': PackingItem({'id': 1, 'item': 'Ring'}), 'day': date(2025, 5, 1),
+                     'at': datetime(2025, 5, 1, 9, 30), 'time': time(8, 15), 'tags': {'a'}, 'name': 'Café'})
+    assert loads(encoded) == {'item': {'id': 1, 'item': 'Ring', 'category': 'Essential'}, 'day': '2025-05-01',
+                              'at': '2025-05-01T09:30:00', 'time': '08:15:00', 'tags': ['a'], 'name': 'Café'}
+    assert 'Café'.encode() in encoded
+
+
+def test_script_json_cannot_close_the_script_element():
+    text = script_json(dumps({'notes': "</script><b>&'"}))
+    assert '</script>' not in text and '<' not in text and "'" not in text
+    assert loads(text) == {'notes': "</script><b>&'"}
+
+
+def test_fragment_cache_reuses_until_touched_or_rebound(monkeypatch):
+    calls = []
+    real_dumps = serializer.dumps
+    def counting_dumps(value, indent=False):
+        if not isinstance(value, str):  # keys are encoded on every call
+            calls.append(value)
+        return real_dumps(value)
+
+    monkeypatch.setattr(serializer, 'dumps', counting_dumps)
+
+    cache = FragmentCache()
+    data = {'budget': [{'id': 1}], 'family': [{'id': 2}]}
+    first = cache.encode(data)
+    assert loads(first) == data and len(calls) == 2
+
+    assert cache.encode(data) == first and len(calls) == 2
+
+    data['budget'].append({'id': 3})
+    cache.touch('budget')
+    assert loads(cache.encode(data))['budget'] == [{'id': 1}, {'id': 3}] and len(calls) == 3
+
+    data['family'] = []
+    assert loads(cache.encode(data, prefix={'version': 1})) == {'version': 1, **data}
+
+
+def test_dashboard_data_route(client):
+    response = client.get('/api/dashboard/data')
+    assert response.status_code == 200 and response.mimetype == 'application/json'
+    assert response.get_json()
+
+
+def test_flashed_messages_survive_the_session(hera):
+    client = hera.app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+    client.get('/export_json')
+    with client.session_transaction() as session:
+        assert session['_flashes'][0][0] == 'message'
+    assert client.get('/').status_code == 200
@@ -0,0 +1,53 @@
+"""Offline replica sync and replay conflicts"""
+import itertools
+
+import pytest
+
+_names = itertools.count(1)
+
+
+@pytest.fixture
+def sync_client(hera):
+    """A client in a fresh workspace, named sync-<n>"""
+    client = hera.app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+    client.workspace = f'sync-{next(_names)}'
+    assert client.post('/api/workspaces', json={'name': client.workspace}).get_json()['success']
+    client.post(f'/api/workspaces/{client.workspace}/activate')
+    return client
+
+
+def test_sync_sends_only_changed_keys(sync_client):
+    full = sync_client.get(f'/api/sync?workspace={sync_client.workspace}').get_json()
+    assert full['full'] and set(full['changes']) >= {'main', 'packing', 'budget'}
+
+    sync_client.post('/api/packing/add', json={'item_name': 'Ring'})
+    delta = sync_client.get(f"/api/sync?workspace={sync_client.workspace}&since={full['revision']}").get_json()
+    assert not delta['full'] and delta['revision'] == full['revision'] + 1
+    assert list(delta['changes']) == ['packing']
+    assert delta['changes']['packing'][0]['item'] == 'Ring'
+
+    assert sync_client.get(f"/api/sync?workspace=other&since={full['revision']}").get_json()['full']
+
+
+def test_replayed_edit_of_a_record_changed_elsewhere_is_a_409(sync_client):
+    base = sync_client.get(f'/api/sync?workspace={sync_client.workspace}').get_json()['revision']
+    item_id = sync_client.post('/api/packing/add', json={'item_name': 'Tripod'},
+                               headers={'X-Hera-Client': 'laptop'}).get_json()['packing_item']['id']
+    edit = {'id': item_id, 'field': 'notes', 'value': 'offline edit'}
+
+    replay = {'X-Hera-Base-Revision': str(base), 'X-Hera-Workspace': sync_client.workspace}
+    conflict = sync_client.post('/api/packing/update', json=edit, headers={**replay, 'X-Hera-Client': 'phone'})
+    assert conflict.status_code == 409
+    assert conflict.get_json()['conflict']['id'] == item_id
+
+    own = sync_client.post('/api/packing/update', json=edit, headers={**replay, 'X-Hera-Client': 'laptop'})
+    assert own.status_code == 200
+
+    elsewhere = {**replay, 'X-Hera-Workspace': 'default', 'X-Hera-Client': 'laptop'}
+    assert sync_client.post('/api/packing/update', json=edit, headers=elsewhere).status_code == 409
+
+    batch = sync_client.post('/api/batch', json={'operations': [
+        {'method': 'POST', 'url': '/api/packing/update', 'body': edit}]},
+        headers={'X-Hera-Base-Revision': str(base), 'X-Hera-Client': 'phone'}).get_json()
+    assert not batch['committed'] and batch['results'][0]['status'] == 409
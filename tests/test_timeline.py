@@ -0,0 +1,58 @@
+"""Itinerary timeline and conflict detection"""
+from datetime import date, datetime
+
+from timeline import Timeline
+
+FLIGHT = {'id': 7, 'flightNumber': 'LH 400', 'date': '2025-05-02', 'departureTime': '10:00', 'arrivalTime': '13:00'}
+
+
+def build_timeline():
+    timeline = Timeline()
+    timeline.reset(date(2025, 5, 1), [
+        {'id': 1, 'day': 1, 'time': '09:00–11:00', 'activity': 'Breakfast'},
+        {'id': 2, 'day': 1, 'time': '10:30', 'activity': 'Museum'},
+        {'id': 3, 'day': 1, 'time': '10:30 AM', 'activity': 'Boat tour'},
+        {'id': 4, 'day': 2, 'time': '11:00', 'activity': 'Nap'},
+        {'id': 5, 'day': 2, 'time': '13:30', 'activity': 'Check-in'},
+        {'id': 6, 'day': 2, 'time': '16:00', 'activity': 'Dinner'},
+    ], [FLIGHT])
+    return timeline
+
+
+def conflict_types(conflicts, day):
+    return sorted((c['type'], tuple(c['items'])) for c in conflicts.get(day, []))
+
+
+def test_conflicts_cover_overlaps_and_flights():
+    conflicts, recomputed = build_timeline().conflicts()
+
+    assert recomputed == [1, 2]
+    assert conflict_types(conflicts, 1) == [('overlap', (1, 2)), ('same_start', (2, 3))]
+    assert conflict_types(conflicts, 2) == [('during_flight', (4,)), ('travel_gap', (5,))]
+
+
+def test_only_touched_days_are_recomputed():
+    timeline = build_timeline()
+    timeline.conflicts()
+
+    timeline.remove(4)
+    conflicts, recomputed = timeline.conflicts()
+    assert recomputed == [2]
+    assert conflict_types(conflicts, 2) == [('travel_gap', (5,))]
+    assert timeline.conflicts()[1] == []
+
+
+def test_point_lookups():
+    timeline = build_timeline()
+
+    assert timeline.at(datetime(2025, 5, 1, 9, 30))['activity'] == 'Breakfast'
+    assert timeline.at(datetime(2025, 5, 1, 8, 0)) is None
+    assert timeline.next_after(datetime(2025, 5, 1, 10, 45))['activity'] == 'Nap'
+
+
+def test_conflicts_route(client):
+    body = client.get('/api/itinerary/conflicts').get_json()
+    assert body['success']
+    assert body['total'] == sum(len(day['conflicts']) for day in body['conflicts'])
+
+    assert client.get('/api/itinerary/timeline?at=not-a-date').status_code == 400
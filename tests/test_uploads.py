@@ -0,0 +1,93 @@
+import io
+import os
+
+import pytest
+
+from uploads import UploadBatch, UploadRejected, matches_signature
+
+PDF = b'%PDF-1.4\n' + b'0' * 64
+
+
+def upload(client, *files, field='files'):
+    data = {field: [(io.BytesIO(content), name) for name, content in files]}
+    return client.post('/api/files/upload', data=data, content_type='multipart/form-data')
+
+
+def stored(upload_dir):
+    return set(os.listdir(upload_dir)) if os.path.isdir(upload_dir) else set()
+
+
+@pytest.mark.parametrize('extension, head, ok', [
+    ('pdf', PDF, True),
+    ('pdf', b'<html>not a pdf</html>', False),
+    ('png', b'\x89PNG\r\n\x1a\n' + b'\x00' * 8, True),
+    ('jpg', b'GIF89a' + b'\x00' * 10, False),
+    ('txt', 'café notes'.encode(), True),
+    ('txt', b'MZ\x90\x00\x03\x00', False),
+])
+def test_matches_signature(extension, head, ok):
+    assert matches_signature(extension, head) is ok
+
+
+def test_accepted_upload_is_hashed_and_stored(client, upload_dir):
+    response = upload(client, ('itinerary.pdf', PDF))
+    assert response.status_code == 200
+    record = response.get_json()['files'][0]
+    assert record['size_bytes'] == len(PDF) and len(record['checksum']) == 64
+    assert record['filename'] in stored(upload_dir)
+
+
+@pytest.mark.parametrize('files, status', [
+    ([('fake.pdf', b'<html>not a pdf</html>')], 400),
+    ([('empty.pdf', b'')], 400),
+    ([('good.pdf', PDF), ('bad.pdf', b'GIF89a........')], 400),
+])
+def test_rejected_uploads_leave_nothing_behind(client, upload_dir, files, status):
+    before = stored(upload_dir)
+    response = upload(client, *files)
+    assert response.status_code == status
+    assert response.get_json()['success'] is False
+    assert stored(upload_dir) == before
+
+
+def test_file_over_its_type_limit_is_413(hera, client, upload_dir, monkeypatch):
+    monkeypatch.setitem(hera.TYPE_LIMITS, 'pdf', 32)
+    before = stored(upload_dir)
+    assert upload(client, ('big.pdf', PDF)).status_code == 413
+    assert stored(upload_dir) == before
+
+
+def test_upload_over_quota_is_413(hera, client, upload_dir, monkeypatch):
+    monkeypatch.setitem(hera.app.config, 'UPLOAD_USER_QUOTA', 16)
+    before = stored(upload_dir)
+    response = upload(client, ('plan.pdf', PDF))
+    assert response.status_code == 413
+    assert 'quota' in response.get_json()['error']
+    assert stored(upload_dir) == before
+
+
+def test_quota_is_charged_while_streaming(tmp_path):
+    batch = UploadBatch(str(tmp_path), 'file', {'pdf'}, lambda filename: 1024, quota=100)
+    part = batch(None, 'application/pdf', 'a.pdf')
+    part.write(PDF[:60])
+    with pytest.raises(UploadRejected) as rejected:
+        part.write(PDF[:60])
+    assert rejected.value.status == 413
+    batch.discard()
+    assert os.listdir(tmp_path) == []
+
+
+def test_parts_outside_the_files_field_are_not_kept(client, upload_dir):
+    before = stored(upload_dir)
+    response = upload(client, ('stray.pdf', PDF), field='other')
+    assert response.get_json()['success'] is False
+    assert stored(upload_dir) == before
+
+
+def test_file_ids_are_not_reused_after_a_delete(client):
+    first, second = upload(client, ('a.pdf', PDF), ('b.pdf', PDF)).get_json()['files']
+    assert second['id'] == first['id'] + 1
+
+    assert client.delete(f"/api/files/delete/{first['id']}").get_json()['success']
+    (third,) = upload(client, ('c.pdf', PDF)).get_json()['files']
+    assert third['id'] == second['id'] + 1
@@ -0,0 +1,73 @@
+"""User store and login"""
+import threading
+import time
+
+import pytest
+
+import users
+from users import LoginBusy, UserStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return UserStore(str(tmp_path / 'users.json'))
+
+
+def test_default_admin_is_seeded_and_verified(store):
+    assert store.verify('admin', 'admin123').id == 'admin'
+    assert store.verify('admin', 'wrong') is None
+    assert store.verify('nobody', 'admin123') is None
+
+
+def test_set_password_is_picked_up_by_another_store(store):
+    store.set_password('sam', 'hunter22', workspaces=['paris'])
+    other = UserStore(store.path)
+    sam = other.verify('sam', 'hunter22')
+    assert sam.can_access('paris') and not sam.can_access('default')
+
+
+def slow_check(release):
+    def check(password_hash, password):
+        release.wait(5)
+        return True
+    return check
+
+
+def test_checks_beyond_the_queue_are_turned_away(tmp_path, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(users, 'check_password_hash', slow_check(release))
+    store = UserStore(str(tmp_path / 'users.json'), max_concurrent=1, max_pending=1)
+
+    waiting = threading.Thread(target=store.verify, args=('admin', 'x'))
+    waiting.start()
+    time.sleep(0.05)
+    with pytest.raises(LoginBusy):
+        store.verify('admin', 'x')
+    release.set()
+    waiting.join()
+
+    monkeypatch.setattr(users, 'check_password_hash', lambda password_hash, password: True)
+    assert store.verify('admin', 'x').id == 'admin'
+
+
+def test_slow_check_times_out_and_frees_its_slot(tmp_path, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(users, 'check_password_hash', slow_check(release))
+    store = UserStore(str(tmp_path / 'users.json'), max_pending=1, timeout=0.05)
+
+    with pytest.raises(LoginBusy):
+        store.verify('admin', 'x')
+    release.set()
+    time.sleep(0.05)
+    assert store.verify('admin', 'x').id == 'admin'
+
+
+def test_login_route(hera, monkeypatch):
+    client = hera.app.test_client()
+    assert client.post('/login', data={'username': 'admin', 'password': 'nope'}).status_code == 200
+
+    def busy(username, password):
+        raise LoginBusy('busy')
+
+    monkeypatch.setattr(hera.user_store, 'verify', busy)
+    assert client.post('/login', data={'username': 'admin', 'password': 'admin123'}).status_code == 429
@@ -0,0 +1,39 @@
+from workspaces import WorkspaceManager, empty_data
+
+
+def test_checked_out_workspace_is_not_evicted(tmp_path):
+    manager = WorkspaceManager(root=str(tmp_path), max_loaded=1)
+    for name in ('a', 'b', 'c'):
+        manager.create(name, empty_data())
+
+    a = manager.checkout('a')
+    manager.get('b')
+    assert 'a' in manager.loaded()
+    assert manager.get('a') is a
+
+    manager.unpin(a)
+    manager.get('c')
+    assert manager.loaded() == ['c']
+
+
+def test_travel_and_export_use_the_active_workspace(hera):
+    client = hera.app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+    created = client.post('/api/workspaces', json={'name': 'flights', 'tripDates': '9/20/2025 - 9/28/2025',
+                                                   'proposalDate': '9/24/2025'}).get_json()
+    assert created['success']
+
+    workspace = hera.workspace_manager.get('flights')
+    workspace.data['travel'] = [
+        {'id': 1, 'segment': 'SFO - CDG', 'flightNumber': 'OUT123', 'date': '9/20/2025'},
+        {'id': 2, 'segment': 'CDG - SFO', 'flightNumber': 'RET456', 'date': '2025-09-28'},
+    ]
+    workspace.rebuild_indexes()
+    assert client.post('/api/workspaces/flights/activate').get_json()['success']
+
+    page = client.get('/travel').get_data(as_text=True)
+    returns = page.index('Return Flights Section')
+    assert page.index('OUT123') < returns < page.index('RET456')
+
+    page = client.get('/export_json', follow_redirects=True).get_data(as_text=True)
+    assert workspace.path in page and 'hera_data.json' not in page
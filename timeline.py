@@ -0,0 +1,218 @@
+"""Per-day itinerary timeline with conflict detection against flights"""
+import math
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+
+from query import normalize_date, normalize_time
+
+# Minimum time between a flight landing and the next scheduled activity
+ARRIVAL_BUFFER_MINUTES = 60
+
+
+def parse_trip_start(trip_dates):
+    """First date of a 'M/D/YYYY - M/D/YYYY' range"""
+    if not trip_dates:
+        return None
+    start = normalize_date(trip_dates.split(' - ')[0])
+    return datetime.strptime(start, '%Y-%m-%d').date() if start else None
+
+
+def to_minutes(value):
+    """'HH:MM' (or '8:15 AM') to minutes after midnight"""
+    normalized = normalize_time(value)
+    if normalized is None:
+        return None
+    hours, minutes = normalized.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def format_minutes(minutes):
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+
+def activity_interval(item):
+    """(start, end) in minutes; end comes from a 'HH:MM–HH:MM' range or an explicit end_time"""
+    time_value = str(item.get('time') or '')
+    start = to_minutes(time_value)
+    end = None
+    if '–' in time_value or '-' in time_value:
+        end = to_minutes(time_value.replace('–', '-').split('-', 1)[1])
+    if item.get('end_time'):
+        end = to_minutes(item['end_time'])
+    if start is not None and end is not None and end <= start:
+        end = None
+    return start, end
+
+
+class Timeline:
+    """Itinerary activities kept sorted per trip day
+
+    Point lookups ("what's happening at T", "next activity") bisect a single
+    day's list. Conflicts are cached per day and only recomputed for days
+    touched since the last request.
+    """
+
+    def __init__(self):
+        self.trip_start = None
+        self._days = {}        # day -> sorted [(start, id)]
+        self._items = {}       # id -> (day, start, end, item)
+        self._flights = {}     # day -> [(departure, arrival, travel item)]
+        self._conflicts = {}   # day -> cached conflict list
+        self._dirty = set()
+
+    def reset(self, trip_start, items, flights):
+        self.trip_start = trip_start
+        self._days.clear()
+        self._items.clear()
+        self._conflicts.clear()
+        self._dirty.clear()
+        for item in items:
+            self.add(item)
+        self.set_flights(flights)
+
+    def day_for(self, value):
+        """Trip day number for a date"""
+        if self.trip_start is None or value is None:
+            return None
+        return (value - self.trip_start).days + 1
+
+    def add(self, item):
+        self.remove(item['id'])
+        day = item.get('day')
+        if day is None and item.get('date'):
+            day = self.day_for(datetime.strptime(normalize_date(item['date']), '%Y-%m-%d').date())
+        start, end = activity_interval(item)
+        if day is None or start is None:
+            return
+        day = int(day)
+        insort(self._days.setdefault(day, []), (start, item['id']))
+        self._items[item['id']] = (day, start, end, item)
+        self._dirty.add(day)
+
+    def remove(self, item_id):
+        entry = self._items.pop(item_id, None)
+        if entry is None:
+            return
+        day, start = entry[0], entry[1]
+        entries = self._days[day]
+        index = bisect_left(entries, (start, item_id))
+        if index < len(entries) and entries[index] == (start, item_id):
+            del entries[index]
+        self._dirty.add(day)
+
+    def set_flights(self, travel_items):
+        """Index flight windows by trip day; every day's conflicts become stale"""
+        self._flights.clear()
+        for segment in travel_items:
+            departure = to_minutes(segment.get('departureTime'))
+            arrival = to_minutes(segment.get('arrivalTime'))
+            flight_date = normalize_date(segment.get('date'))
+            if departure is None or arrival is None or flight_date is None:
+                continue
+            day = self.day_for(datetime.strptime(flight_date, '%Y-%m-%d').date())
+            if day is None:
+                continue
+            if arrival < departure:  # lands after midnight
+                arrival = 24 * 60
+            self._flights.setdefault(day, []).append((departure, arrival, segment))
+        self._dirty.update(self._days)
+        self._dirty.update(self._flights)
+
+    def _end_of(self, day, index):
+        """Explicit end, else the next activity's start, else end of day"""
+        start, item_id = self._days[day][index]
+        end = self._items[item_id][2]
+        if end is not None:
+            return end
+        if index + 1 < len(self._days[day]):
+            return self._days[day][index + 1][0]
+        return 24 * 60
+
+    def _position(self, when):
+        day = self.day_for(when.date())
+        return day, when.hour * 60 + when.minute
+
+    def at(self, when):
+        """Activity in progress at datetime `when`, or None"""
+        day, minute = self._position(when)
+        entries = self._days.get(day)
+        if not entries:
+            return None
+        index = bisect_right(entries, (minute, math.inf)) - 1
+        if index < 0 or minute >= self._end_of(day, index):
+            return None
+        return self._items[entries[index][1]][3]
+
+    def next_after(self, when):
+        """First activity starting after datetime `when`, searching later days too"""
+        day, minute = self._position(when)
+        if day is None:
+            return None
+        entries = self._days.get(day, [])
+        index = bisect_right(entries, (minute, math.inf))
+        if index < len(entries):
+            return self._items[entries[index][1]][3]
+        later_days = sorted(d for d in self._days if d > day and self._days[d])
+        if later_days:
+            return self._items[self._days[later_days[0]][0][1]][3]
+        return None
+
+    def _compute_conflicts(self, day):
+        conflicts = []
+        entries = self._days.get(day, [])
+        for index, (start, item_id) in enumerate(entries):
+            item = self._items[item_id][3]
+            end = self._items[item_id][2]
+            if index + 1 < len(entries):
+                next_start, next_id = entries[index + 1]
+                next_item = self._items[next_id][3]
+                if next_start == start:
+                    conflicts.append({'type': 'same_start', 'day': day, 'time': format_minutes(start),
+                                      'items': [item_id, next_id],
+                                      'message': f"'{item['activity']}' and '{next_item['activity']}' start at the same time"})
+                elif end is not None and end > next_start:
+                    conflicts.append({'type': 'overlap', 'day': day, 'time': format_minutes(next_start),
+                                      'items': [item_id, next_id],
+                                      'message': f"'{item['activity']}' runs until {format_minutes(end)}, "
+                                                 f"overlapping '{next_item['activity']}'"})
+
+        for departure, arrival, segment in self._flights.get(day, []):
+            flight = segment.get('flightNumber') or segment.get('segment')
+            # Activities starting while in the air
+            lo = bisect_right(entries, (departure, math.inf))
+            hi = bisect_left(entries, (arrival, -math.inf))
+            for start, item_id in entries[lo:hi]:
+                conflicts.append({'type': 'during_flight', 'day': day, 'time': format_minutes(start),
+                                  'items': [item_id], 'flight': segment.get('id'),
+                                  'message': f"'{self._items[item_id][3]['activity']}' starts during flight {flight}"})
+            # Activities starting too soon after landing
+            lo = bisect_left(entries, (arrival, -math.inf))
+            hi = bisect_left(entries, (arrival + ARRIVAL_BUFFER_MINUTES, -math.inf))
+            for start, item_id in entries[lo:hi]:
+                conflicts.append({'type': 'travel_gap', 'day': day, 'time': format_minutes(start),
+                                  'items': [item_id], 'flight': segment.get('id'),
+                                  'message': f"'{self._items[item_id][3]['activity']}' starts "
+                                             f"{start - arrival} min after {flight} lands"})
+        return conflicts
+
+    def conflicts(self):
+        """All conflicts by day; returns (conflicts, days recomputed for this call)"""
+        recomputed = sorted(self._dirty)
+        for day in recomputed:
+            found = self._compute_conflicts(day)
+            if found:
+                self._conflicts[day] = found
+            else:
+                self._conflicts.pop(day, None)
+        self._dirty.clear()
+        return {day: self._conflicts[day] for day in sorted(self._conflicts)}, recomputed
+
+    def first_departure(self, day):
+        """Minutes after midnight of the day's earliest flight, or None"""
+        flights = self._flights.get(day)
+        return min(departure for departure, _, _ in flights) if flights else None
+
+    def date_of(self, day):
+        if self.trip_start is None:
+            return None
+        return (self.trip_start + timedelta(days=day - 1)).isoformat()
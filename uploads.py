@@ -0,0 +1,221 @@
+"""Streaming validation of multipart uploads
+
+Upload views hand the request a stream factory (stream_uploads) before
+touching request.files. As Werkzeug parses the body, each file part is
+written straight to its final path while its first bytes are checked
+against the magic numbers of its extension and every chunk is counted
+against the type's size limit and the user's remaining quota and fed to
+a SHA-256. A part that fails stops the parse with UploadRejected, so the
+rest of the body is never read. The view keeps only the files it
+recorded; every other file written for the request is removed. A request whose Content-Length alone exceeds the quota is
+rejected before any of the body is read.
+"""
+import hashlib
+import os
+import uuid
+from datetime import datetime
+
+from flask import Request, request
+
+MB = 1024 * 1024
+SNIFF_BYTES = 16
+OLE_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'  # legacy .doc/.xls
+ZIP_SIGNATURES = (b'PK\x03\x04', b'PK\x05\x06')
+SIGNATURES = {
+    'jpg': (b'\xff\xd8\xff',),
+    'jpeg': (b'\xff\xd8\xff',),
+    'png': (b'\x89PNG\r\n\x1a\n',),
+    'gif': (b'GIF87a', b'GIF89a'),
+    'pdf': (b'%PDF-',),
+    'zip': ZIP_SIGNATURES,
+    'docx': ZIP_SIGNATURES,
+    'xlsx': ZIP_SIGNATURES,
+    'doc': (OLE_SIGNATURE,),
+    'xls': (OLE_SIGNATURE,),
+}
+FILE_EXTENSIONS = frozenset(SIGNATURES) | {'webp', 'txt'}
+IMAGE_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'webp'})
+
+# Largest single file per type (as named by app.get_file_type)
+TYPE_LIMITS = {
+    'image': 25 * MB,
+    'pdf': 25 * MB,
+    'document': 25 * MB,
+    'spreadsheet': 25 * MB,
+    'archive': 25 * MB,
+    'text': 10 * MB,
+}
+DEFAULT_USER_QUOTA = 500 * MB
+
+
+class UploadRejected(Exception):
+    """Raised mid-parse for a file that is the wrong type or too large
+
+    Not a ValueError: Werkzeug's form parser silently drops those.
+    """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def matches_signature(extension, head):
+    """Whether the first bytes of a file fit its extension"""
+    if extension == 'webp':
+        return head[:4] == b'RIFF' and head[8:12] == b'WEBP'
+    if extension == 'txt':
+        if b'\x00' in head:
+            return False
+        try:
+            head.decode('utf-8')
+        except UnicodeDecodeError as e:
+            return e.start >= len(head) - 3  # a character cut off by the sniff window
+        return True
+    return head.startswith(SIGNATURES.get(extension, ()))
+
+
+class _Discarded:
+    """Sink for file parts the view skips (unknown extensions); nothing is stored"""
+    path = None
+
+    def write(self, data):
+        return len(data)
+
+    def seek(self, offset, whence=0):
+        return 0
+
+    def read(self, size=-1):
+        return b''
+
+    def close(self):
+        pass
+
+
+class StreamedUpload:
+    """One file part: written to disk, sniffed, measured and hashed as it arrives"""
+
+    def __init__(self, batch, path, original_name, extension, limit):
+        self.batch = batch
+        self.path = path
+        self.filename = os.path.basename(path)
+        self.original_name = original_name
+        self.extension = extension
+        self.limit = limit
+        self.size = 0
+        self.checked = False
+        self._head = b''
+        self._digest = hashlib.sha256()
+        self._file = open(path, 'wb')
+
+    @property
+    def checksum(self):
+        return self._digest.hexdigest()
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.limit:
+            raise UploadRejected(f'{self.original_name} is larger than {self.limit // MB} MB', 413)
+        self.batch.charge(len(data))
+        if not self.checked:
+            self._head += data[:SNIFF_BYTES]
+            if len(self._head) >= SNIFF_BYTES:
+                self._check()
+        self._digest.update(data)
+        self._file.write(data)
+        return len(data)
+
+    def _check(self):
+        self.checked = True
+        if not matches_signature(self.extension, self._head[:SNIFF_BYTES]):
+            raise UploadRejected(f'{self.original_name} is not a valid .{self.extension} file')
+
+    def finish(self):
+        """Check a part shorter than the sniff window and close it"""
+        if self.size == 0:
+            raise UploadRejected(f'{self.original_name} is empty')
+        if not self.checked:
+            self._check()
+        self._file.close()
+
+    def seek(self, offset, whence=0):
+        # Werkzeug rewinds each part once it is complete; the content is on disk
+        self._file.flush()
+        return 0
+
+    def read(self, size=-1):
+        return b''
+
+    def close(self):
+        self._file.close()
+
+
+class UploadBatch:
+    """Stream factory for one request's file parts"""
+
+    def __init__(self, directory, prefix, extensions, limit_for, quota=None):
+        self.directory = directory
+        self.prefix = prefix
+        self.extensions = extensions
+        self.limit_for = limit_for
+        self.quota = quota  # bytes this request may still store, or None
+        self.uploads = []
+        self.received = 0
+
+    def __call__(self, total_content_length, content_type, filename=None, content_length=None):
+        extension = filename.rsplit('.', 1)[1].lower() if filename and '.' in filename else ''
+        if extension not in self.extensions:
+            return _Discarded()
+        # Timestamp plus random suffix avoids conflicts
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        safe_filename = f'{self.prefix}_{timestamp}_{str(uuid.uuid4())[:8]}.{extension}'
+        upload = StreamedUpload(self, os.path.join(self.directory, safe_filename), filename, extension,
+                                self.limit_for(filename))
+        self.uploads.append(upload)
+        return upload
+
+    def charge(self, size):
+        self.received += size
+        if self.quota is not None and self.received > self.quota:
+            raise UploadRejected('Upload quota exceeded', 413)
+
+    def discard(self, keep=()):
+        """Remove the files written for this request, except those whose filename is in `keep`"""
+        kept = []
+        for upload in self.uploads:
+            if upload.filename in keep:
+                kept.append(upload)
+                continue
+            upload.close()
+            try:
+                os.remove(upload.path)
+            except FileNotFoundError:
+                pass
+        self.uploads = kept
+
+
+class UploadRequest(Request):
+    """Request that streams multipart file parts into `upload_batch` when one is set"""
+    upload_batch = None
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.upload_batch is None:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        return self.upload_batch(total_content_length, content_type, filename, content_length)
+
+
+def stream_uploads(directory, prefix, extensions, limit_for, quota=None):
+    """Route this request's file parts through a new UploadBatch; call before request.files
+
+    Raises UploadRejected straight away if the declared body is over the quota.
+    """
+    if quota is not None and (request.content_length or 0) > quota:
+        raise UploadRejected('Upload quota exceeded', 413)
+    os.makedirs(directory, exist_ok=True)
+    batch = UploadBatch(directory, prefix, extensions, limit_for, quota)
+    request.upload_batch = batch
+    return batch
+
+
+def configure(app):
+    app.request_class = UploadRequest
+    app.config.setdefault('UPLOAD_USER_QUOTA', int(os.environ.get('HERA_UPLOAD_QUOTA_MB', DEFAULT_USER_QUOTA // MB)) * MB)
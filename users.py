@@ -0,0 +1,173 @@
+"""User store backed by hera_users.json
+
+Password hashes are stored once in the file instead of being generated at
+import time. Loaded users are cached in memory and reloaded only when the
+file changes, so several app processes can share one store. Password
+checks (600k-iteration hashes) run on a small dedicated pool of
+MAX_CONCURRENT_LOGINS threads; the login request waits up to
+LOGIN_TIMEOUT_SECONDS for its result, and logins beyond
+MAX_PENDING_LOGINS queued checks are turned away.
+"""
+import argparse
+import getpass
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from flask_login import UserMixin
+from werkzeug.security import check_password_hash, generate_password_hash
+
+USERS_FILE = 'hera_users.json'
+
+# pbkdf2:sha256 hash of the default 'admin123' password, computed once so
+# startup does not pay for 600k iterations
+DEFAULT_ADMIN = {
+    'id': 'admin',
+    'password_hash': 'pbkdf2:sha256:600000$klOC6Z8TjNmsh8jr$f22c48ab92fa83e018b33307cc064f8bd0d8d3ea35a3ce310dc4a6b104116061',
+    'display_name': 'Vikrant',
+    'workspaces': ['*'],
+}
+
+MAX_CONCURRENT_LOGINS = 4
+MAX_PENDING_LOGINS = 16
+LOGIN_TIMEOUT_SECONDS = 5
+
+
+class LoginBusy(Exception):
+    """Raised when too many password checks are queued or one does not finish in time"""
+
+
+class User(UserMixin):
+    def __init__(self, id, username, password_hash, display_name=None, workspaces=None):
+        self.id = id
+        self.username = username
+        self.password_hash = password_hash
+        self.display_name = display_name or username
+        self.workspaces = workspaces or ['default']
+
+    def can_access(self, workspace):
+        """'*' in a user's workspaces grants access to every workspace"""
+        return '*' in self.workspaces or workspace in self.workspaces
+
+
+class UserStore:
+    """Users keyed by username, persisted as JSON and cached per file version"""
+
+    def __init__(self, path=USERS_FILE, max_concurrent=MAX_CONCURRENT_LOGINS, max_pending=MAX_PENDING_LOGINS,
+                 timeout=LOGIN_TIMEOUT_SECONDS):
+        self.path = path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._users = {}
+        self._by_id = {}
+        self._version = None
+        self._hashers = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='hera-login')
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._dummy_hash = DEFAULT_ADMIN['password_hash']
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self):
+        """Reload the file if it changed since the last read; seed it on first use"""
+        version = self._stat()
+        if version is not None and version == self._version:
+            return
+        with self._lock:
+            version = self._stat()
+            if version is None:
+                self._write({'admin': DEFAULT_ADMIN})
+                version = self._stat()
+            if version == self._version:
+                return
+            with open(self.path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+            self._users = {username: User(record['id'], username, record['password_hash'],
+                                          record.get('display_name'), record.get('workspaces'))
+                           for username, record in records.items()}
+            self._by_id = {user.id: user for user in self._users.values()}
+            self._version = version
+
+    def _write(self, records):
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _records(self):
+        return {username: {'id': user.id, 'password_hash': user.password_hash,
+                           'display_name': user.display_name, 'workspaces': user.workspaces}
+                for username, user in self._users.items()}
+
+    def get(self, user_id):
+        """User for a session's user id (the Flask-Login user_loader)"""
+        self._refresh()
+        return self._by_id.get(user_id)
+
+    def get_by_username(self, username):
+        self._refresh()
+        return self._users.get(username)
+
+    def set_password(self, username, password, display_name=None, workspaces=None):
+        """Create or update a user, hashing the password once"""
+        self._refresh()
+        with self._lock:
+            records = self._records()
+            record = records.setdefault(username, {'id': username})
+            record['password_hash'] = generate_password_hash(password)
+            if display_name:
+                record['display_name'] = display_name
+            if workspaces:
+                record['workspaces'] = workspaces
+            self._write(records)
+            self._version = None
+        self._refresh()
+
+    def verify(self, username, password):
+        """Return the user if the password matches, else None
+
+        The hash is checked on the login pool and waited for up to `timeout`
+        seconds; unknown usernames are checked against a dummy hash so
+        response time does not reveal which exist. Raises LoginBusy when
+        MAX_PENDING_LOGINS checks are already queued or the check times out.
+        """
+        user = self.get_by_username(username)
+        if not self._pending.acquire(blocking=False):
+            raise LoginBusy('Too many login attempts in progress')
+        try:
+            check = self._hashers.submit(check_password_hash, user.password_hash if user else self._dummy_hash,
+                                         password)
+        except BaseException:
+            self._pending.release()
+            raise
+        # The slot is freed when the hash finishes, even if this request gave up on it
+        check.add_done_callback(lambda _: self._pending.release())
+        try:
+            matches = check.result(timeout=self.timeout)
+        except TimeoutError:
+            check.cancel()
+            raise LoginBusy('Login check timed out')
+        return user if user and matches else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Manage HERA dashboard users')
+    parser.add_argument('username')
+    parser.add_argument('--display-name')
+    parser.add_argument('--workspaces', help="comma-separated workspaces the user may open ('*' for all)")
+    parser.add_argument('--file', default=USERS_FILE)
+    args = parser.parse_args(argv)
+
+    password = getpass.getpass(f'Password for {args.username}: ')
+    workspaces = [w.strip() for w in args.workspaces.split(',')] if args.workspaces else None
+    UserStore(args.file).set_password(args.username, password, args.display_name, workspaces)
+    print(f'Saved {args.username} to {args.file}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,10 @@
 import csv
+import json
 import os
 from datetime import datetime, date, time
 
+from query import parse_date, parse_time
+
 
 def import_csv_data(data_dir='documents'):
     """Import data from CSV files into the database using Python's built-in csv module"""
@@ -392,6 +395,167 @@ def export_to_csv(output_dir='exports'):
         return False, f"Error exporting data: {str(e)}"
 
 
+# Column types used by the columnar (Arrow/Parquet) export. Fields not listed
+# here are exported as plain strings so ad-hoc keys are never dropped.
+COLUMNAR_SCHEMAS = {
+    'main': {'tripDates': 'string', 'proposalDate': 'date', 'totalBudget': 'float', 'totalSaved': 'float',
+             'totalRemaining': 'float', 'utcOffset': 'string'},
+    'tasks': {'id': 'int', 'task': 'string', 'deadline': 'date', 'status': 'category', 'notes': 'string'},
+    'savings_timeline': {'amount': 'float', 'month': 'category'},
+    'budget': {'id': 'int', 'category': 'category', 'budget': 'float', 'saved': 'float', 'remaining': 'float',
+               'notes': 'string', 'status': 'category', 'priority': 'category'},
+    'family': {'id': 'int', 'name': 'string', 'status': 'category', 'notes': 'string'},
+    'travel': {'id': 'int', 'segment': 'string', 'airline': 'category', 'flightNumber': 'string',
+               'departureTime': 'time', 'arrivalTime': 'time', 'date': 'date', 'pickupDate': 'date',
+               'checkIn': 'time', 'checkOut': 'time', 'status': 'category'},
+    'itinerary': {'id': 'int', 'date': 'date', 'day': 'int', 'time': 'time', 'activity': 'string',
+                  'location': 'string', 'notes': 'string', 'isProposal': 'bool', 'completed': 'bool'},
+    'packing': {'id': 'int', 'item': 'string', 'category': 'category', 'packed': 'bool', 'notes': 'string',
+                'quantity': 'int', 'priority': 'category'},
+    'files': {'id': 'int', 'filename': 'string', 'original_name': 'string', 'size': 'string',
+              'size_bytes': 'int', 'type': 'category', 'category': 'category', 'notes': 'string',
+              'upload_date': 'timestamp', 'updated_date': 'timestamp', 'mimetype': 'category'},
+}
+
+
+def _parse_bool(value):
+    """Parse booleans stored as JSON or as form/CSV strings ('false', '0', 'no')"""
+    if value is None or isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('true', '1', 'yes'):
+        return True
+    if text in ('false', '0', 'no'):
+        return False
+    return None
+
+
+def _parse_timestamp(value):
+    """Parse ISO timestamps written by the upload routes"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _columnar_collections(data):
+    """Flatten HERA_DATA into {name: list of row dicts} for columnar export"""
+    main = data.get('main', {})
+    scalars = {k: v for k, v in main.items() if not isinstance(v, (list, dict))}
+    return {
+        'main': [scalars] if scalars else [],
+        'tasks': main.get('tasks', []),
+        'savings_timeline': main.get('savingsTimeline', []),
+        'budget': data.get('budget', []),
+        'ring': [data['ring']] if data.get('ring') else [],
+        'family': data.get('family', []),
+        'travel': data.get('travel', []),
+        'itinerary': data.get('itinerary', []),
+        'packing': data.get('packing', []),
+        'files': data.get('files', []),
+    }
+
+
+def build_columnar_table(name, rows):
+    """Build a typed pyarrow Table for one HERA_DATA collection"""
+    import pyarrow as pa
+
+    schema = COLUMNAR_SCHEMAS.get(name, {})
+    fields = list(schema)
+    for row in rows:
+        for key in row:
+            if key not in fields:
+                fields.append(key)
+
+    converters = {
+        'int': (pa.int64(), lambda v: None if v in (None, '') else int(v)),
+        'float': (pa.float64(), lambda v: None if v in (None, '') else float(v)),
+        'bool': (pa.bool_(), _parse_bool),
+        'date': (pa.date32(), parse_date),
+        'time': (pa.time32('s'), parse_time),
+        'timestamp': (pa.timestamp('us'), _parse_timestamp),
+        'category': (pa.dictionary(pa.int32(), pa.string()), lambda v: None if v is None else str(v)),
+        'string': (pa.string(), lambda v: None if v is None else str(v)),
+    }
+
+    columns = {}
+    for field in fields:
+        arrow_type, convert = converters[schema.get(field, 'string')]
+        values = [convert(row.get(field)) for row in rows]
+        columns[field] = pa.array(values, type=arrow_type)
+
+    return pa.table(columns)
+
+
+def export_to_columnar(data, output_dir='exports', fmt='parquet'):
+    """Export each HERA_DATA collection as a typed Parquet or Arrow IPC file"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return False, "Columnar export requires pyarrow (pip install pyarrow)"
+
+    if fmt not in ('parquet', 'arrow'):
+        return False, f"Unsupported columnar format: {fmt}"
+
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+
+        for name, rows in _columnar_collections(data).items():
+            table = build_columnar_table(name, rows)
+            path = os.path.join(output_dir, f'{name}.{fmt}')
+            if fmt == 'parquet':
+                pq.write_table(table, path)
+            else:
+                with pa.OSFile(path, 'wb') as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+
+        return True, f"Data exported successfully to {output_dir}/"
+    except Exception as e:
+        return False, f"Error exporting columnar data: {str(e)}"
+
+
+def write_columnar_snapshot(data, root='exports/snapshots', fmt='arrow'):
+    """Write a timestamped snapshot: one columnar file per collection plus a manifest.json"""
+    directory = os.path.join(root, datetime.now().strftime('%Y%m%d_%H%M%S_%f'))
+    success, message = export_to_columnar(data, output_dir=directory, fmt=fmt)
+    if not success:
+        return False, message
+    manifest = {
+        'created': datetime.now().isoformat(),
+        'format': fmt,
+        'collections': {name: len(rows) for name, rows in _columnar_collections(data).items()},
+    }
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return True, f"Snapshot written to {directory}/"
+
+
+def read_columnar_snapshot(directory, memory_map=True):
+    """Read every collection of a snapshot back as {name: pyarrow Table}"""
+    with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    return {name: read_columnar(os.path.join(directory, f"{name}.{manifest['format']}"), memory_map=memory_map)
+            for name in manifest['collections']}
+
+
+def read_columnar(path, memory_map=True):
+    """Read a columnar export back as a pyarrow Table, memory-mapped by default"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if path.endswith('.parquet'):
+        return pq.read_table(path, memory_map=memory_map)
+
+    # Closing the source releases the file handle; the mapping itself lives
+    # on for as long as the returned table's buffers reference it
+    with (pa.memory_map(path, 'r') if memory_map else pa.OSFile(path, 'rb')) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
 # Legacy function for backward compatibility
 def import_excel_data(file_path):
     """Legacy function - redirects to CSV import"""
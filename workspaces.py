@@ -0,0 +1,285 @@
+"""Per-workspace (trip) data partitioning with lazy loading and LRU eviction
+
+Each workspace owns its HERA_DATA document, derived indexes, encoding cache
+and revision counter, persisted to its own JSON file. Workspaces are loaded
+on first access and evicted when the node holds more than
+HERA_MAX_WORKSPACES of them or one has been idle for
+HERA_WORKSPACE_IDLE_SECONDS; workspaces pinned by in-flight requests are
+never evicted.
+"""
+import copy
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from indexes import CollectionIndex
+from records import hydrate
+from search import SearchIndex
+from serializer import FragmentCache, loads as json_loads
+from timeline import Timeline, parse_trip_start
+
+COLLECTIONS = ['tasks', 'budget', 'family', 'travel', 'itinerary', 'packing', 'files']
+
+DEFAULT_WORKSPACE = 'default'
+DEFAULT_DATA_FILE = 'hera_data.json'
+WORKSPACE_DIR = 'workspaces'
+MAX_LOADED_WORKSPACES = 64
+IDLE_SECONDS = 1800
+
+_ABSENT = object()
+
+_NAME_RE = re.compile(r'^[a-z0-9][a-z0-9_-]{0,63}$')
+
+
+def valid_name(name):
+    return bool(name) and bool(_NAME_RE.match(name))
+
+
+def empty_data(trip_dates='', proposal_date=''):
+    """HERA_DATA skeleton for a new workspace"""
+    return {
+        'main': {'tripDates': trip_dates, 'proposalDate': proposal_date, 'totalBudget': 0, 'totalSaved': 0,
+                 'totalRemaining': 0, 'savingsTimeline': [], 'tasks': []},
+        'budget': [],
+        'ring': {},
+        'family': [],
+        'travel': [],
+        'itinerary': [],
+        'packing': [],
+        'files': [],
+    }
+
+
+class Workspace:
+    """One trip's data, derived indexes and persistence file"""
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.data = None
+        self.revision = 0
+        self.search_index = SearchIndex()
+        self.collection_indexes = {collection: CollectionIndex(collection) for collection in COLLECTIONS}
+        self.timeline = Timeline()
+        self.fragments = FragmentCache()
+        self.last_used = time.monotonic()
+        self.pins = 0
+        # Held by requests that write the document, so a rolled-back batch
+        # cannot discard another request's changes
+        self.lock = threading.RLock()
+        # Change history since this process loaded the workspace, for /api/sync
+        # and offline replay: top-level key -> revision of its last change, and
+        # (collection, record id) -> (revision, client id) of its last change
+        self.loaded_revision = 0
+        self.key_revisions = {}
+        self.record_revisions = {}
+        self._pending_records = {}
+        self._saved_keys = {}
+
+    def collection(self, name):
+        """Return the list backing a record collection (tasks live under 'main')"""
+        if name == 'tasks':
+            return self.data['main']['tasks']
+        return self.data.setdefault(name, [])
+
+    def load(self, initial=None):
+        """Read the workspace file, or start from `initial` when there is none"""
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                data = json_loads(f.read())
+            self.revision = data.pop('_revision', 0)
+        else:
+            data = initial if initial is not None else empty_data()
+            self.revision = 0
+        self.data = hydrate(data)
+        self.rebuild_indexes()
+        self.loaded_revision = self.revision
+        self.key_revisions = {key: self.revision for key in self.data}
+        self.record_revisions = {}
+        self._saved_keys = self._key_versions()
+        return self
+
+    def _key_versions(self):
+        return {key: (value, self.fragments.revision(key)) for key, value in self.data.items()}
+
+    def record_change(self, collection, item_id, client=None):
+        """Note that a record changed; the next save() stamps it with its revision"""
+        self._pending_records[(collection, item_id)] = client
+
+    def changed_since(self, revision):
+        """Top-level keys changed after `revision`, or None if the history does not reach back that far"""
+        if revision is None or revision > self.revision:
+            return None
+        return [key for key in self.data if self.key_revisions.get(key, self.loaded_revision) > revision]
+
+    def record_changed_since(self, collection, item_id, revision, client=None):
+        """Revision at which another client changed the record after `revision`, else None
+
+        History starts when the workspace was loaded; earlier changes are not
+        reported.
+        """
+        changed = self.record_revisions.get((collection, item_id))
+        if changed and changed[0] > revision and (client is None or changed[1] != client):
+            return changed[0]
+        return None
+
+    def save(self):
+        """Write the document with the next revision number; returns bytes written"""
+        self.revision += 1
+        versions = self._key_versions()
+        for key, (value, revision) in versions.items():
+            saved = self._saved_keys.get(key)
+            if saved is None or saved[0] is not value or saved[1] != revision:
+                self.key_revisions[key] = self.revision
+        self._saved_keys = versions
+        for record, client in self._pending_records.items():
+            self.record_revisions[record] = (self.revision, client)
+        self._pending_records = {}
+        payload = self.fragments.encode(self.data, prefix={'_revision': self.revision})
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        # Request threads and job workers may save concurrently; each writes its own temp file
+        tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, self.path)
+        return len(payload)
+
+    def rebuild_indexes(self):
+        """Rebuild every derived index from the workspace document"""
+        self.fragments.clear()
+        self._pending_records = {}
+        self.search_index.clear()
+        for index in self.collection_indexes.values():
+            index.clear()
+        for name in COLLECTIONS:
+            for item in self.collection(name):
+                self.collection_indexes[name].add(item)
+                self.search_index.add(name, item)
+        self.timeline.reset(parse_trip_start(self.data['main'].get('tripDates')),
+                            self.collection('itinerary'), self.collection('travel'))
+
+
+class Savepoint:
+    """Copies of the top-level keys a batch is about to change, put back on rollback"""
+
+    def __init__(self, workspace):
+        self.workspace = workspace
+        self._saved = {}
+
+    def keep(self, keys=None):
+        """Copy `keys` (every key when None) as they are now, unless already kept"""
+        data = self.workspace.data
+        for key in list(data) if keys is None else keys:
+            if key not in self._saved:
+                self._saved[key] = copy.deepcopy(data[key]) if key in data else _ABSENT
+
+    def restore(self):
+        data = self.workspace.data
+        for key, value in self._saved.items():
+            if value is _ABSENT:
+                data.pop(key, None)
+            else:
+                data[key] = value
+        self.workspace.rebuild_indexes()
+
+
+class WorkspaceManager:
+    """Loads workspaces on demand and keeps at most `max_loaded` in memory"""
+
+    def __init__(self, root=WORKSPACE_DIR, max_loaded=MAX_LOADED_WORKSPACES, idle_seconds=IDLE_SECONDS,
+                 default_data=None):
+        self.root = root
+        self.max_loaded = max_loaded
+        self.idle_seconds = idle_seconds
+        self.default_data = default_data
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}  # name -> lock held while that workspace loads
+
+    def path_for(self, name):
+        if name == DEFAULT_WORKSPACE:
+            return DEFAULT_DATA_FILE
+        return os.path.join(self.root, f'{name}.json')
+
+    def exists(self, name):
+        return name == DEFAULT_WORKSPACE or os.path.exists(self.path_for(name))
+
+    def names(self):
+        """Every workspace with a persistence file, plus the default one"""
+        names = {DEFAULT_WORKSPACE}
+        if os.path.isdir(self.root):
+            names.update(f[:-5] for f in os.listdir(self.root) if f.endswith('.json') and valid_name(f[:-5]))
+        return sorted(names)
+
+    def loaded(self):
+        with self._lock:
+            return list(self._loaded)
+
+    def initial_data(self, name):
+        """Document a workspace starts from when it has no file yet"""
+        if name == DEFAULT_WORKSPACE and self.default_data:
+            return self.default_data()
+        return None
+
+    def get(self, name):
+        """The named workspace, loading it if it is not in memory"""
+        return self._acquire(name, 0)
+
+    def checkout(self, name):
+        """Like get, but pinned in the same critical section; release it with unpin"""
+        return self._acquire(name, 1)
+
+    def _acquire(self, name, pins):
+        with self._lock:
+            workspace = self._loaded.get(name)
+            if workspace is not None:
+                self._loaded.move_to_end(name)
+                workspace.last_used = time.monotonic()
+                workspace.pins += pins
+                self._evict()
+                return workspace
+            loading = self._loading.setdefault(name, threading.Lock())
+
+        with loading:
+            with self._lock:
+                workspace = self._loaded.get(name)
+                if workspace is not None:
+                    workspace.pins += pins
+                    return workspace
+            workspace = Workspace(name, self.path_for(name)).load(self.initial_data(name))
+            with self._lock:
+                workspace.pins += pins
+                self._loaded[name] = workspace
+                self._loading.pop(name, None)
+                self._evict()
+        return workspace
+
+    def create(self, name, data):
+        """Persist a new workspace; raises ValueError if the name is invalid or taken"""
+        if not valid_name(name):
+            raise ValueError('Workspace names use lowercase letters, digits, - and _')
+        if self.exists(name):
+            raise ValueError(f"Workspace '{name}' already exists")
+        workspace = Workspace(name, self.path_for(name)).load(data)
+        workspace.save()
+        with self._lock:
+            self._loaded[name] = workspace
+            self._evict()
+        return workspace
+
+    def unpin(self, workspace):
+        with self._lock:
+            workspace.pins -= 1
+
+    def _evict(self):
+        """Drop idle and least recently used workspaces; caller holds the lock"""
+        now = time.monotonic()
+        for name, workspace in list(self._loaded.items()):
+            over_capacity = len(self._loaded) > self.max_loaded
+            idle = now - workspace.last_used > self.idle_seconds
+            if not (over_capacity or idle):
+                break
+            if workspace.pins == 0:
+                del self._loaded[name]